@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+End-to-end throughput benchmark: simulated adapters -> EIPtoNATSBridge -> NATS stand-in
+
+The adapters (eip_sim.py) and the NATS stand-in (nats_stub.py) run in a child
+process, so the CPU time measured here is the bridge's alone. Adapter i listens
+on 127.0.0.(2+i) and sends its T2O packets to port base_port+i, which is the
+receive port of bridge i. Linux only (the whole 127.0.0.0/8 is loopback).
+
+For every RPI, bridge count and NATS write mode it reports:
+    nats       "buffered" (nats.c default: the flusher thread coalesces publishes
+               into one socket write) or "asap" (NatsOptions(send_asap=True):
+               one write per publish)
+    pkt/s      packets received by the bridges per second
+    pub/s      messages accepted by the NATS stand-in per second
+    CPU%       CPU time of this process / wall time (100% = one core)
+    drop%      1 - received / sent by the adapters
+    ovf        queue overflows
+    p50/p99/p99.9/max   receive-to-publish latency in microseconds
+
+The simulator is plain Python: past roughly 20-50k packets/s in total it
+becomes the bottleneck, which shows up as a lower "sent" rate, not as drops.
+
+Usage:
+    python benchmarks/bench_e2e.py [--rpi 100 1000 10000 100000] [--bridges 1 8 64]
+                                   [--duration 5] [--payload 166] [--group] [--event-driven]
+                                   [--nats-mode buffered asap]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+WARMUP_S = 1.0
+
+
+def adapter_host(index):
+    return f"127.0.0.{2 + index}"
+
+
+def _simulators(conn, count, payload, base_port):
+    """Child process: adapters and NATS stand-in, answering counter requests."""
+    from eip_sim import Adapter
+    from nats_stub import NatsStub
+
+    stub = NatsStub(port=0).start()
+    adapters = [Adapter(adapter_host(i), payload, base_port + i).start() for i in range(count)]
+    conn.send(stub.url)
+
+    while True:
+        command = conn.recv()
+        if command == "counters":
+            conn.send((sum(a.sent for a in adapters), stub.messages))
+        elif command == "stop":
+            break
+
+    for adapter in adapters:
+        adapter.stop()
+    stub.stop()
+    conn.send("stopped")
+
+
+def _percentile_row(stats):
+    latency = stats["latency_us"]
+    return [latency["p50"], latency["p99"], latency["p999"], latency["max"]]
+
+
+def run_case(eip2nats, nats_url, sim, rpi, count, nats_mode, args):
+    subjects = [f"bench.plc{i}" for i in range(count)]
+    options = dict(use_binary_format=True, t2o_size=args.payload, rpi=rpi,
+                   queue_depth=args.queue_depth)
+    nats_options = eip2nats.NatsOptions(send_asap=nats_mode == "asap")
+
+    if args.group:
+        group = eip2nats.BridgeGroup(nats_url, event_driven=args.event_driven,
+                                     nats_options=nats_options)
+        for i in range(count):
+            group.add_bridge(adapter_host(i), subjects[i], port=args.base_port + i, **options)
+        bridges = [group[i] for i in range(count)]
+        started = group.start()
+    else:
+        group = None
+        bridges = [eip2nats.EIPtoNATSBridge(adapter_host(i), nats_url, subjects[i],
+                                            port=args.base_port + i,
+                                            event_driven=args.event_driven,
+                                            nats_options=nats_options, **options)
+                   for i in range(count)]
+        started = all([bridge.start() for bridge in bridges])
+
+    try:
+        if not started:
+            raise RuntimeError("Bridge failed to start")
+
+        time.sleep(WARMUP_S)
+        for bridge in bridges:
+            bridge.get_stats(reset=True)
+        sim.send("counters")
+        sent0, nats0 = sim.recv()
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+
+        time.sleep(args.duration)
+
+        wall = time.perf_counter() - wall0
+        cpu = time.process_time() - cpu0
+        sim.send("counters")
+        sent1, nats1 = sim.recv()
+        stats = [bridge.get_stats(reset=True) for bridge in bridges]
+    finally:
+        if group is not None:
+            group.stop()
+        else:
+            for bridge in bridges:
+                bridge.stop()
+
+    received = sum(s["received"] for s in stats)
+    sent = sent1 - sent0
+    # Worst latency across bridges: percentiles cannot be merged exactly
+    worst = max(stats, key=lambda s: s["latency_us"]["p99"])
+    return {
+        "sent": sent / wall,
+        "received": received / wall,
+        "published": (nats1 - nats0) / wall,
+        "cpu": 100.0 * cpu / wall,
+        "drop": 100.0 * max(0.0, 1.0 - received / sent) if sent else 0.0,
+        "overflows": sum(s["overflows"] for s in stats),
+        "latency": _percentile_row(worst),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end bridge throughput benchmark")
+    parser.add_argument("--rpi", type=int, nargs="+", default=[100, 1000, 10000, 100000],
+                        help="RPIs to test in microseconds")
+    parser.add_argument("--bridges", type=int, nargs="+", default=[1, 8, 64],
+                        help="Numbers of bridges to test")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds measured per case")
+    parser.add_argument("--payload", type=int, default=166, help="T2O payload size in bytes")
+    parser.add_argument("--queue-depth", type=int, default=1024)
+    parser.add_argument("--base-port", type=int, default=2300,
+                        help="Receive port of the first bridge (one port per bridge)")
+    parser.add_argument("--group", action="store_true", help="Run the bridges in one BridgeGroup")
+    parser.add_argument("--event-driven", action="store_true", help="Use event_driven=True")
+    parser.add_argument("--nats-mode", nargs="+", choices=["buffered", "asap"],
+                        default=["buffered"],
+                        help="NATS write modes to test (asap = NatsOptions(send_asap=True))")
+    args = parser.parse_args()
+
+    import eip2nats
+    eip2nats.set_log_level(eip2nats.LogLevel.ERROR)
+
+    mode = "BridgeGroup" if args.group else "EIPtoNATSBridge"
+    print(f"{mode}, payload {args.payload} bytes, {args.duration:.0f}s per case"
+          f"{', event-driven' if args.event_driven else ''}\n")
+    print(f"{'bridges':>7} {'rpi_us':>7} {'nats':>8} {'sent/s':>9} {'pkt/s':>9} {'pub/s':>9} "
+          f"{'CPU%':>6} {'drop%':>6} {'ovf':>6} {'p50':>7} {'p99':>7} {'p99.9':>7} {'max':>8}")
+
+    for count in args.bridges:
+        sim, child = multiprocessing.Pipe()
+        process = multiprocessing.Process(
+            target=_simulators, args=(child, count, args.payload, args.base_port), daemon=True)
+        process.start()
+        nats_url = sim.recv()
+
+        try:
+            for rpi in args.rpi:
+                for nats_mode in args.nats_mode:
+                    r = run_case(eip2nats, nats_url, sim, rpi, count, nats_mode, args)
+                    p50, p99, p999, pmax = r["latency"]
+                    print(f"{count:>7} {rpi:>7} {nats_mode:>8} {r['sent']:>9.0f} "
+                          f"{r['received']:>9.0f} {r['published']:>9.0f} {r['cpu']:>6.1f} "
+                          f"{r['drop']:>6.2f} "
+                          f"{r['overflows']:>6} {p50:>7.1f} {p99:>7.1f} {p999:>7.1f} {pmax:>8.1f}",
+                          flush=True)
+        finally:
+            sim.send("stop")
+            sim.recv()
+            process.join(timeout=5)
+
+
+if __name__ == "__main__":
+    main()
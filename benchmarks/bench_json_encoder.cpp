@@ -0,0 +1,169 @@
+/*
+ * bench_json_encoder.cpp
+ *
+ * Per-packet cost of the publish path on the publisher thread for each
+ * message format: the binary path, the table-driven JSON encoder (hex and
+ * base64) and the previous ostringstream JSON encoder.
+ *
+ * Every variant is measured twice:
+ *   encode   the message is built and copied into a reusable buffer, which
+ *            isolates the encoder
+ *   publish  the message is built and handed to natsConnection_Publish on a
+ *            live connection, with a flush at the end of the run, which is
+ *            what sendToNATS does per packet
+ * The "vs binary" column compares the publish times.
+ *
+ * It needs a NATS server; benchmarks/nats_stub.py will do:
+ *   python benchmarks/nats_stub.py --port 4222 &
+ *
+ * Build and run:
+ *   python scripts/build_benchmarks.py bench_json_encoder
+ *   build/benchmarks/bench_json_encoder [payload_size=166] [iterations=1000000] [url=nats://127.0.0.1:4222]
+ */
+
+#include "PayloadEncoder.h"
+#include <nats.h>
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+#include <ctime>
+#include <iomanip>
+#include <random>
+#include <sstream>
+#include <string>
+#include <utility>
+#include <vector>
+
+using namespace bridge;
+
+using Message = std::pair<const uint8_t*, size_t>;
+
+static constexpr const char* kSubject = "bench.json_encoder";
+
+// Reference: the encoder used by publishToNATS before the table-driven one
+static std::string legacyJson(const std::vector<uint8_t>& data, uint64_t sequence) {
+    std::ostringstream jsonStream;
+    jsonStream << "{\"timestamp\":" << time(nullptr)
+               << ",\"sequence\":" << sequence
+               << ",\"size\":" << data.size()
+               << ",\"data\":\"";
+    for (const auto& byte : data) {
+        jsonStream << std::hex << std::setfill('0') << std::setw(2) << (int)byte;
+    }
+    jsonStream << "\"}";
+    return jsonStream.str();
+}
+
+struct Result {
+    const char* name;
+    double encodeNs;
+    double publishNs;
+    size_t messageSize;
+};
+
+template <typename Fn>
+static double timePerMessage(size_t iterations, Fn&& step) {
+    const auto begin = std::chrono::steady_clock::now();
+    for (size_t i = 0; i < iterations; i++) {
+        step(i);
+    }
+    const auto end = std::chrono::steady_clock::now();
+    return std::chrono::duration<double, std::nano>(end - begin).count() / iterations;
+}
+
+template <typename Encode>
+static Result run(const char* name, size_t iterations, natsConnection* conn, Encode&& encode) {
+    std::vector<uint8_t> socketBuffer;
+    const size_t messageSize = encode(0).second;  // warm-up, sizes the buffers
+
+    const double encodeNs = timePerMessage(iterations, [&](size_t i) {
+        const Message message = encode(i);
+        socketBuffer.assign(message.first, message.first + message.second);
+    });
+
+    natsStatus status = NATS_OK;
+    const double publishNs = timePerMessage(iterations, [&](size_t i) {
+        const Message message = encode(i);
+        natsStatus s = natsConnection_Publish(conn, kSubject, message.first,
+                                              static_cast<int>(message.second));
+        if (s != NATS_OK) {
+            status = s;
+        }
+        if (i + 1 == iterations && status == NATS_OK) {
+            status = natsConnection_Flush(conn);
+        }
+    });
+    if (status != NATS_OK) {
+        std::fprintf(stderr, "%s: publish failed: %s\n", name, natsStatus_GetText(status));
+    }
+
+    return {name, encodeNs, publishNs, messageSize};
+}
+
+int main(int argc, char** argv) {
+    const size_t payloadSize = argc > 1 ? std::strtoul(argv[1], nullptr, 10) : 166;  // ClipX T2O
+    const size_t iterations = argc > 2 ? std::strtoul(argv[2], nullptr, 10) : 1000000;
+    const char* url = argc > 3 ? argv[3] : "nats://127.0.0.1:4222";
+
+    natsOptions* opts = nullptr;
+    natsConnection* conn = nullptr;
+    natsStatus s = natsOptions_Create(&opts);
+    if (s == NATS_OK) s = natsOptions_SetURL(opts, url);
+    if (s == NATS_OK) s = natsConnection_Connect(&conn, opts);
+    natsOptions_Destroy(opts);
+    if (s != NATS_OK) {
+        std::fprintf(stderr, "Cannot connect to %s: %s\n"
+                             "Start a server first, e.g. python benchmarks/nats_stub.py --port 4222\n",
+                     url, natsStatus_GetText(s));
+        return 1;
+    }
+
+    std::vector<uint8_t> payload(payloadSize);
+    std::mt19937 rng(42);
+    for (auto& byte : payload) {
+        byte = static_cast<uint8_t>(rng());
+    }
+
+    std::vector<uint8_t> encodeBuffer;
+    std::string legacyBuffer;
+    std::vector<Result> results;
+
+    results.push_back(run("binary", iterations, conn, [&](size_t) {
+        return Message(payload.data(), payload.size());
+    }));
+
+    results.push_back(run("json/hex (table)", iterations, conn, [&](size_t i) {
+        encodeBuffer.clear();
+        encoder::appendJsonPacket(encodeBuffer, time(nullptr), i, payload.data(), payload.size(),
+                                  JsonEncoding::Hex);
+        return Message(encodeBuffer.data(), encodeBuffer.size());
+    }));
+
+    results.push_back(run("json/base64 (table)", iterations, conn, [&](size_t i) {
+        encodeBuffer.clear();
+        encoder::appendJsonPacket(encodeBuffer, time(nullptr), i, payload.data(), payload.size(),
+                                  JsonEncoding::Base64);
+        return Message(encodeBuffer.data(), encodeBuffer.size());
+    }));
+
+    results.push_back(run("json/hex (ostringstream)", iterations / 10, conn, [&](size_t i) {
+        legacyBuffer = legacyJson(payload, i);
+        return Message(reinterpret_cast<const uint8_t*>(legacyBuffer.data()), legacyBuffer.size());
+    }));
+
+    natsConnection_Destroy(conn);
+    nats_Close();
+
+    const double binaryNs = results.front().publishNs;
+
+    std::printf("Payload: %zu bytes, %zu iterations, %s\n\n", payloadSize, iterations, url);
+    std::printf("%-26s %12s %12s %12s %12s %10s\n",
+                "encoder", "encode ns", "publish ns", "Mmsg/s", "msg bytes", "vs binary");
+    for (const auto& r : results) {
+        std::printf("%-26s %12.1f %12.1f %12.2f %12zu %9.1fx\n",
+                    r.name, r.encodeNs, r.publishNs, 1000.0 / r.publishNs, r.messageSize,
+                    r.publishNs / binaryNs);
+    }
+
+    return 0;
+}
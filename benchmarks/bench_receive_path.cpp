@@ -0,0 +1,143 @@
+/*
+ * bench_receive_path.cpp
+ *
+ * Heap allocations and CPU time per packet on the EIP worker thread, from the
+ * moment EIPScanner hands a T2O frame to the bridge until it sits in the
+ * publisher queue: EIPtoNATSBridge::receivePacket(), the function the receive
+ * listener calls.
+ *
+ * Global operator new is replaced by a counting one. Every case warms up first
+ * (the queue wraps around and every buffer grows to the largest frame), then
+ * measures. The publisher is not running, so the queue stays full and the
+ * DropOldest path is exercised too. Any allocation in the measured part makes
+ * the program exit with status 1.
+ *
+ * Build and run:
+ *   python scripts/build_benchmarks.py bench_receive_path
+ *   build/benchmarks/bench_receive_path [iterations=1000000]
+ */
+
+#include <atomic>
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <new>
+#include <vector>
+
+#include "EIPtoNATSBridge.h"
+
+using Clock = std::chrono::steady_clock;
+
+static std::atomic<uint64_t> g_allocations{0};
+
+void* operator new(std::size_t size) {
+    g_allocations.fetch_add(1, std::memory_order_relaxed);
+    if (void* p = std::malloc(size ? size : 1)) {
+        return p;
+    }
+    throw std::bad_alloc();
+}
+
+void* operator new[](std::size_t size) {
+    return operator new(size);
+}
+
+void operator delete(void* p) noexcept {
+    std::free(p);
+}
+
+void operator delete[](void* p) noexcept {
+    std::free(p);
+}
+
+void operator delete(void* p, std::size_t) noexcept {
+    std::free(p);
+}
+
+void operator delete[](void* p, std::size_t) noexcept {
+    std::free(p);
+}
+
+struct Case {
+    const char* name;
+    uint16_t payloadSize;
+    bool changeOnly;
+    bool localQueue;
+};
+
+struct Result {
+    double allocationsPerPacket;
+    uint64_t allocations;
+    double nsPerPacket;
+};
+
+static Result runCase(const Case& c, size_t iterations) {
+    using namespace bridge;
+
+    // Bytes 0..3 count packets; masked out so change-only passes 1 in 4 frames
+    const std::vector<uint8_t> mask = {0x00, 0x00, 0x00, 0x00};
+    EIPtoNATSBridge bridge("127.0.0.2", "nats://127.0.0.1:4222", "bench.rx",
+                           true, devices::RM75E::CONFIG_ASSEMBLY, devices::RM75E::O2T_ASSEMBLY,
+                           devices::RM75E::T2O_ASSEMBLY, c.payloadSize, 1000, 2222, 1024,
+                           OverflowPolicy::DropOldest, 1, 0, JsonEncoding::Hex, false,
+                           c.changeOnly, mask, 0, true);
+    if (c.localQueue) {
+        bridge.readBatch(1, std::chrono::milliseconds(0));
+    }
+
+    std::vector<uint8_t> frame(c.payloadSize, 0);
+    auto feed = [&](uint32_t i) {
+        std::memcpy(frame.data(), &i, sizeof(i));
+        frame[4] = static_cast<uint8_t>(i / 4);
+        bridge.receivePacket(0x00000001, static_cast<uint16_t>(i), frame.data(), frame.size());
+    };
+
+    uint32_t i = 0;
+    for (; i < 4096; i++) {
+        feed(i);
+    }
+
+    const uint64_t before = g_allocations.load(std::memory_order_relaxed);
+    const auto start = Clock::now();
+    for (size_t n = 0; n < iterations; n++, i++) {
+        feed(i);
+    }
+    const auto elapsed = Clock::now() - start;
+    const uint64_t allocations = g_allocations.load(std::memory_order_relaxed) - before;
+
+    Result r;
+    r.allocations = allocations;
+    r.allocationsPerPacket = static_cast<double>(allocations) / iterations;
+    r.nsPerPacket = std::chrono::duration<double, std::nano>(elapsed).count() / iterations;
+    return r;
+}
+
+int main(int argc, char** argv) {
+    const size_t iterations = argc > 1 ? std::strtoull(argv[1], nullptr, 10) : 1000000;
+
+    const Case cases[] = {
+        {"32 B", 32, false, false},
+        {"166 B", 166, false, false},
+        {"504 B", 504, false, false},
+        {"166 B change-only", 166, true, false},
+        {"166 B + local queue", 166, false, true},
+        {"1400 B + local queue", 1400, true, true},
+    };
+
+    std::printf("%-24s %14s %12s %10s\n", "case", "allocations", "allocs/pkt", "ns/pkt");
+    bool allocated = false;
+    for (const auto& c : cases) {
+        const Result r = runCase(c, iterations);
+        std::printf("%-24s %14llu %12.4f %10.1f\n", c.name,
+                    static_cast<unsigned long long>(r.allocations),
+                    r.allocationsPerPacket, r.nsPerPacket);
+        allocated = allocated || r.allocations != 0;
+    }
+
+    if (allocated) {
+        std::printf("\nFAIL: the receive path allocated after warm-up\n");
+        return 1;
+    }
+    return 0;
+}
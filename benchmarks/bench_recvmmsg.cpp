@@ -0,0 +1,251 @@
+/*
+ * bench_recvmmsg.cpp
+ *
+ * System calls and CPU time per T2O packet on the EIP worker thread: the
+ * receive loop of ConnectionManager::handleConnections() (select(), then one
+ * recvfrom() into a new buffer per ready socket and wakeup) against the
+ * patched handleConnectionsBatched() (poll(), then recvmmsg() until the socket
+ * is drained, into buffers allocated once; the connection ticks that follow
+ * make no system call).
+ *
+ * A generator thread plays N PLCs sharing one local UDP port, like a
+ * BridgeGroup: every RPI it sends one CPF-framed Class 1 datagram per
+ * connection (sequenced address item + connected data item, 166 byte
+ * payload). Both receivers parse the framing, look the connection ID up and
+ * check the sequence count. Reported: packets per second actually received,
+ * syscalls and thread CPU time per packet, CPU % and packets lost.
+ *
+ * Build and run:
+ *   python scripts/build_benchmarks.py bench_recvmmsg
+ *   build/benchmarks/bench_recvmmsg [seconds_per_case=2]
+ */
+
+#include <arpa/inet.h>
+#include <netinet/in.h>
+#include <poll.h>
+#include <sys/select.h>
+#include <sys/socket.h>
+#include <sys/uio.h>
+#include <unistd.h>
+
+#include <array>
+#include <atomic>
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <ctime>
+#include <map>
+#include <thread>
+#include <vector>
+
+using Clock = std::chrono::steady_clock;
+
+static constexpr size_t kPayloadSize = 166;
+static constexpr size_t kHeaderSize = 18;
+static constexpr size_t kBatch = 64;
+static constexpr size_t kDatagramSize = 4096 + 32;
+
+static double threadCpuSeconds() {
+    timespec ts{};
+    clock_gettime(CLOCK_THREAD_CPUTIME_ID, &ts);
+    return ts.tv_sec + ts.tv_nsec / 1e9;
+}
+
+static uint16_t u16(const uint8_t* p) {
+    return static_cast<uint16_t>(p[0] | (p[1] << 8));
+}
+
+static uint32_t u32(const uint8_t* p) {
+    return p[0] | (p[1] << 8) | (p[2] << 16) | (static_cast<uint32_t>(p[3]) << 24);
+}
+
+/// What the IOConnection does with a datagram: here, follow the sequence count
+struct Connection {
+    uint16_t lastSequence = 0;
+    uint64_t packets = 0;
+    uint64_t gaps = 0;
+};
+
+struct Receiver {
+    std::map<uint32_t, Connection> connections;
+    uint64_t packets = 0;
+    uint64_t syscalls = 0;
+
+    void dispatch(const uint8_t* p, size_t size) {
+        if (size < kHeaderSize || u16(p) != 2 || u16(p + 2) != 0x8002 || u16(p + 14) != 0x00B1) {
+            return;
+        }
+        auto it = connections.find(u32(p + 6));
+        if (it == connections.end()) {
+            return;
+        }
+        Connection& c = it->second;
+        const uint16_t sequence = u16(p + kHeaderSize);
+        if (c.packets && sequence != static_cast<uint16_t>(c.lastSequence + 1)) {
+            c.gaps++;
+        }
+        c.lastSequence = sequence;
+        c.packets++;
+        packets++;
+    }
+};
+
+/// handleConnections(): select(), one Receive() (a new vector) per ready socket
+static void receiveSelect(int rx, Receiver& r, const Clock::time_point& end) {
+    while (Clock::now() < end) {
+        fd_set readSet;
+        FD_ZERO(&readSet);
+        FD_SET(rx, &readSet);
+        timeval tv{0, 1000};
+        r.syscalls++;
+        if (select(rx + 1, &readSet, nullptr, nullptr, &tv) > 0 && FD_ISSET(rx, &readSet)) {
+            std::vector<uint8_t> buffer(504);
+            r.syscalls++;
+            const ssize_t size = recv(rx, buffer.data(), buffer.size(), 0);
+            if (size > 0) {
+                r.dispatch(buffer.data(), static_cast<size_t>(size));
+            }
+        }
+    }
+}
+
+/// handleConnectionsBatched(): poll(), recvmmsg() until drained
+static void receiveBatched(int rx, Receiver& r, const Clock::time_point& end) {
+    std::vector<uint8_t> storage(kBatch * kDatagramSize);
+    std::array<mmsghdr, kBatch> headers{};
+    std::array<iovec, kBatch> iovecs{};
+    for (size_t i = 0; i < kBatch; i++) {
+        iovecs[i].iov_base = storage.data() + i * kDatagramSize;
+        iovecs[i].iov_len = kDatagramSize;
+        headers[i].msg_hdr.msg_iov = &iovecs[i];
+        headers[i].msg_hdr.msg_iovlen = 1;
+    }
+
+    while (Clock::now() < end) {
+        pollfd fd{rx, POLLIN, 0};
+        r.syscalls++;
+        if (poll(&fd, 1, 1) > 0 && (fd.revents & POLLIN)) {
+            int count = 0;
+            do {
+                r.syscalls++;
+                count = recvmmsg(rx, headers.data(), kBatch, MSG_DONTWAIT, nullptr);
+                for (int i = 0; i < count; i++) {
+                    r.dispatch(static_cast<const uint8_t*>(iovecs[i].iov_base), headers[i].msg_len);
+                }
+            } while (count == static_cast<int>(kBatch));
+        }
+    }
+}
+
+struct Result {
+    double packetsPerSecond;
+    double syscallsPerPacket;
+    double cpuUsPerPacket;
+    double cpuPercent;
+    uint64_t lost;
+};
+
+static Result runCase(uint32_t connections, uint32_t rpiUs, bool batched, double seconds) {
+    int rx = socket(AF_INET, SOCK_DGRAM, 0);
+    int tx = socket(AF_INET, SOCK_DGRAM, 0);
+    int bufferSize = 4 << 20;
+    setsockopt(rx, SOL_SOCKET, SO_RCVBUF, &bufferSize, sizeof(bufferSize));
+
+    sockaddr_in addr{};
+    addr.sin_family = AF_INET;
+    addr.sin_addr.s_addr = htonl(INADDR_LOOPBACK);
+    addr.sin_port = 0;
+    bind(rx, reinterpret_cast<sockaddr*>(&addr), sizeof(addr));
+    socklen_t len = sizeof(addr);
+    getsockname(rx, reinterpret_cast<sockaddr*>(&addr), &len);
+
+    Receiver receiver;
+    for (uint32_t id = 1; id <= connections; id++) {
+        receiver.connections[id];
+    }
+
+    std::atomic<bool> stop(false);
+    std::atomic<uint64_t> sent(0);
+    std::thread generator([&]() {
+        std::vector<std::array<uint8_t, kHeaderSize + 2 + kPayloadSize>> frames(connections);
+        for (uint32_t c = 0; c < connections; c++) {
+            uint8_t* p = frames[c].data();
+            std::memset(p, 0, frames[c].size());
+            const uint32_t id = c + 1;
+            const uint16_t dataSize = 2 + kPayloadSize;
+            p[0] = 2;                                  // item count
+            p[2] = 0x02; p[3] = 0x80; p[4] = 8;        // sequenced address item, length 8
+            std::memcpy(p + 6, &id, 4);                // connection ID
+            p[14] = 0xB1; p[16] = dataSize & 0xFF; p[17] = dataSize >> 8;  // connected data item
+        }
+
+        uint32_t sequence = 0;
+        auto next = Clock::now();
+        while (!stop) {
+            next += std::chrono::microseconds(rpiUs);
+            std::this_thread::sleep_until(next);
+            sequence++;
+            for (auto& frame : frames) {
+                std::memcpy(frame.data() + 10, &sequence, 4);
+                const uint16_t cipSequence = static_cast<uint16_t>(sequence);
+                std::memcpy(frame.data() + kHeaderSize, &cipSequence, 2);
+                sendto(tx, frame.data(), frame.size(), 0, reinterpret_cast<sockaddr*>(&addr), sizeof(addr));
+                sent++;
+            }
+        }
+    });
+
+    const double cpuBegin = threadCpuSeconds();
+    const Clock::time_point end = Clock::now() + std::chrono::duration_cast<Clock::duration>(
+        std::chrono::duration<double>(seconds));
+    if (batched) {
+        receiveBatched(rx, receiver, end);
+    } else {
+        receiveSelect(rx, receiver, end);
+    }
+    const double cpu = threadCpuSeconds() - cpuBegin;
+
+    stop = true;
+    generator.join();
+    close(rx);
+    close(tx);
+
+    const uint64_t packets = receiver.packets ? receiver.packets : 1;
+    const uint64_t total = sent.load();
+    return {
+        receiver.packets / seconds,
+        static_cast<double>(receiver.syscalls) / packets,
+        cpu * 1e6 / packets,
+        100.0 * cpu / seconds,
+        total > receiver.packets + connections ? total - receiver.packets - connections : 0,
+    };
+}
+
+int main(int argc, char** argv) {
+    const double seconds = argc > 1 ? std::atof(argv[1]) : 2.0;
+
+    const struct {
+        uint32_t connections;
+        uint32_t rpiUs;
+    } cases[] = {
+        {1, 100},     //  10k packets/s, one connection
+        {10, 1000},   //  10k packets/s in bursts of 10
+        {20, 500},    //  40k packets/s
+        {50, 500},    // 100k packets/s
+    };
+
+    std::printf("%-6s %-7s %-16s %10s %12s %12s %8s %8s\n",
+                "conns", "rpi_us", "mode", "pkts/s", "syscall/pkt", "cpu_us/pkt", "cpu_%", "lost");
+    for (const auto& c : cases) {
+        for (bool batched : {false, true}) {
+            const Result r = runCase(c.connections, c.rpiUs, batched, seconds);
+            std::printf("%-6u %-7u %-16s %10.0f %12.2f %12.2f %8.1f %8llu\n",
+                        c.connections, c.rpiUs, batched ? "poll+recvmmsg" : "select+recvfrom",
+                        r.packetsPerSecond, r.syscallsPerPacket, r.cpuUsPerPacket, r.cpuPercent,
+                        static_cast<unsigned long long>(r.lost));
+        }
+    }
+
+    return 0;
+}
@@ -0,0 +1,212 @@
+/*
+ * bench_socket_buffer.cpp
+ *
+ * What SocketOptions changes on the T2O socket, in two parts:
+ *
+ * 1. Kernel drops during a stall: N PLCs send one 184 byte datagram each per
+ *    RPI to one socket while the receiver stops reading for a while (the
+ *    worker descheduled, or a burst of Forward Opens), then drains it.
+ *    Reported per SO_RCVBUF size: datagrams the kernel dropped (SO_RXQ_OVFL)
+ *    and the buffer it actually granted, which net.core.rmem_max caps unless
+ *    SO_RCVBUFFORCE is permitted.
+ *
+ * 2. Receive delay: the time from the kernel timestamp (SO_TIMESTAMPNS) until
+ *    the receiver returned from recvmmsg(), idle and with every CPU busy.
+ *    This is the part of the latency a user-space receive timestamp misses.
+ *
+ * Build and run:
+ *   python scripts/build_benchmarks.py bench_socket_buffer
+ *   build/benchmarks/bench_socket_buffer [connections=50] [rpi_us=1000] [stall_ms=50]
+ */
+
+#include <arpa/inet.h>
+#include <netinet/in.h>
+#include <poll.h>
+#include <sys/socket.h>
+#include <unistd.h>
+
+#include <algorithm>
+#include <array>
+#include <atomic>
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <ctime>
+#include <string>
+#include <thread>
+#include <vector>
+
+using Clock = std::chrono::steady_clock;
+
+static constexpr size_t kDatagramSize = 184;   // CPF framing + 166 byte payload
+static constexpr size_t kBatch = 64;
+static constexpr size_t kControlSize = CMSG_SPACE(sizeof(timespec)) + CMSG_SPACE(sizeof(uint32_t));
+
+static int64_t realtimeNs() {
+    timespec ts{};
+    clock_gettime(CLOCK_REALTIME, &ts);
+    return static_cast<int64_t>(ts.tv_sec) * 1000000000 + ts.tv_nsec;
+}
+
+struct Socket {
+    int rx;
+    int tx;
+    sockaddr_in addr{};
+    int granted = 0;
+
+    explicit Socket(int receiveBufferBytes) {
+        rx = socket(AF_INET, SOCK_DGRAM, 0);
+        tx = socket(AF_INET, SOCK_DGRAM, 0);
+        const int on = 1;
+        setsockopt(rx, SOL_SOCKET, SO_RXQ_OVFL, &on, sizeof(on));
+        setsockopt(rx, SOL_SOCKET, SO_TIMESTAMPNS, &on, sizeof(on));
+        if (receiveBufferBytes > 0 &&
+            setsockopt(rx, SOL_SOCKET, SO_RCVBUFFORCE, &receiveBufferBytes, sizeof(int)) != 0) {
+            setsockopt(rx, SOL_SOCKET, SO_RCVBUF, &receiveBufferBytes, sizeof(int));
+        }
+        socklen_t length = sizeof(granted);
+        getsockopt(rx, SOL_SOCKET, SO_RCVBUF, &granted, &length);
+        granted /= 2;
+
+        addr.sin_family = AF_INET;
+        addr.sin_addr.s_addr = htonl(INADDR_LOOPBACK);
+        bind(rx, reinterpret_cast<sockaddr*>(&addr), sizeof(addr));
+        socklen_t len = sizeof(addr);
+        getsockname(rx, reinterpret_cast<sockaddr*>(&addr), &len);
+    }
+
+    ~Socket() {
+        close(rx);
+        close(tx);
+    }
+};
+
+/// recvmmsg() with control messages, like handleConnectionsBatched()
+struct Receiver {
+    std::vector<uint8_t> storage = std::vector<uint8_t>(kBatch * 4128);
+    std::array<mmsghdr, kBatch> headers{};
+    std::array<iovec, kBatch> iovecs{};
+    std::array<std::array<char, kControlSize>, kBatch> control{};
+    uint32_t drops = 0;
+    uint64_t packets = 0;
+    std::vector<double> delayUs;
+
+    Receiver() {
+        for (size_t i = 0; i < kBatch; i++) {
+            iovecs[i].iov_base = storage.data() + i * 4128;
+            iovecs[i].iov_len = 4128;
+            headers[i].msg_hdr.msg_iov = &iovecs[i];
+            headers[i].msg_hdr.msg_iovlen = 1;
+            headers[i].msg_hdr.msg_control = control[i].data();
+        }
+    }
+
+    int drain(int fd) {
+        for (auto& header : headers) {
+            header.msg_hdr.msg_controllen = kControlSize;
+        }
+        const int count = recvmmsg(fd, headers.data(), kBatch, MSG_DONTWAIT, nullptr);
+        const int64_t now = realtimeNs();
+        for (int i = 0; i < count; i++) {
+            msghdr& header = headers[i].msg_hdr;
+            for (cmsghdr* message = CMSG_FIRSTHDR(&header); message; message = CMSG_NXTHDR(&header, message)) {
+                if (message->cmsg_level != SOL_SOCKET) continue;
+                if (message->cmsg_type == SCM_TIMESTAMPNS) {
+                    timespec ts;
+                    std::memcpy(&ts, CMSG_DATA(message), sizeof(ts));
+                    delayUs.push_back((now - (static_cast<int64_t>(ts.tv_sec) * 1000000000 + ts.tv_nsec)) / 1e3);
+                } else if (message->cmsg_type == SO_RXQ_OVFL) {
+                    std::memcpy(&drops, CMSG_DATA(message), sizeof(drops));
+                }
+            }
+        }
+        packets += count > 0 ? count : 0;
+        return count;
+    }
+
+    void run(int fd, const Clock::time_point& end) {
+        while (Clock::now() < end) {
+            pollfd p{fd, POLLIN, 0};
+            if (poll(&p, 1, 1) > 0) {
+                while (drain(fd) == static_cast<int>(kBatch)) {}
+            }
+        }
+    }
+};
+
+static void sendFor(Socket& s, uint32_t connections, uint32_t rpiUs, double seconds, std::atomic<uint64_t>& sent) {
+    std::array<uint8_t, kDatagramSize> frame{};
+    auto next = Clock::now();
+    const auto end = next + std::chrono::duration_cast<Clock::duration>(std::chrono::duration<double>(seconds));
+    while (next < end) {
+        next += std::chrono::microseconds(rpiUs);
+        std::this_thread::sleep_until(next);
+        for (uint32_t c = 0; c < connections; c++) {
+            sendto(s.tx, frame.data(), frame.size(), 0, reinterpret_cast<sockaddr*>(&s.addr), sizeof(s.addr));
+            sent++;
+        }
+    }
+}
+
+static double percentile(std::vector<double> values, double p) {
+    if (values.empty()) return 0.0;
+    const size_t index = std::min(values.size() - 1, static_cast<size_t>(p * values.size()));
+    std::nth_element(values.begin(), values.begin() + index, values.end());
+    return values[index];
+}
+
+int main(int argc, char** argv) {
+    const uint32_t connections = argc > 1 ? static_cast<uint32_t>(std::atoi(argv[1])) : 50;
+    const uint32_t rpiUs = argc > 2 ? static_cast<uint32_t>(std::atoi(argv[2])) : 1000;
+    const int stallMs = argc > 3 ? std::atoi(argv[3]) : 50;
+
+    std::printf("Stall of %d ms, %u connections every %u us (%.0f datagrams/s)\n",
+                stallMs, connections, rpiUs, connections * 1e6 / rpiUs);
+    std::printf("%-14s %14s %10s %10s\n", "rcvbuf", "granted_bytes", "sent", "dropped");
+    for (int size : {0, 1 << 20, 4 << 20, 16 << 20}) {
+        Socket s(size);
+        Receiver receiver;
+        std::atomic<uint64_t> sent(0);
+        std::thread sender(sendFor, std::ref(s), connections, rpiUs, 0.2 + stallMs / 1e3, std::ref(sent));
+
+        // Stall, then catch up and keep reading until the sender is done
+        std::this_thread::sleep_for(std::chrono::milliseconds(stallMs));
+        receiver.run(s.rx, Clock::now() + std::chrono::milliseconds(300));
+        sender.join();
+
+        // One more datagram carries the final drop count
+        sendto(s.tx, "x", 1, 0, reinterpret_cast<sockaddr*>(&s.addr), sizeof(s.addr));
+        receiver.run(s.rx, Clock::now() + std::chrono::milliseconds(20));
+        std::printf("%-14s %14d %10llu %10u\n", size ? std::to_string(size).c_str() : "default",
+                    s.granted, static_cast<unsigned long long>(sent.load()), receiver.drops);
+    }
+
+    std::printf("\nKernel timestamp -> recvmmsg() return, %u connections every %u us\n", connections, rpiUs);
+    std::printf("%-10s %9s %9s %9s %9s\n", "load", "p50_us", "p99_us", "p999_us", "max_us");
+    const unsigned cpus = std::max(1u, std::thread::hardware_concurrency());
+    for (bool loaded : {false, true}) {
+        Socket s(4 << 20);
+        Receiver receiver;
+        std::atomic<bool> stop(false);
+        std::vector<std::thread> load;
+        for (unsigned i = 0; loaded && i < cpus; i++) {
+            load.emplace_back([&]() {
+                volatile uint64_t x = 0;
+                while (!stop.load(std::memory_order_relaxed)) x = x + 1;
+            });
+        }
+        std::atomic<uint64_t> sent(0);
+        std::thread sender(sendFor, std::ref(s), connections, rpiUs, 2.0, std::ref(sent));
+        receiver.run(s.rx, Clock::now() + std::chrono::milliseconds(2100));
+        sender.join();
+        stop = true;
+        for (auto& thread : load) thread.join();
+
+        std::printf("%-10s %9.1f %9.1f %9.1f %9.1f\n", loaded ? "all_cpus" : "idle",
+                    percentile(receiver.delayUs, 0.5), percentile(receiver.delayUs, 0.99),
+                    percentile(receiver.delayUs, 0.999), percentile(receiver.delayUs, 1.0));
+    }
+
+    return 0;
+}
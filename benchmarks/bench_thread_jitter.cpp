@@ -0,0 +1,188 @@
+/*
+ * bench_thread_jitter.cpp
+ *
+ * Wakeup latency of the EIP worker thread under CPU load, with and without
+ * ThreadOptions: the time from a T2O datagram being sent until the receiving
+ * thread is back from poll() and has read it, which is the jitter the bridge
+ * adds on top of the network.
+ *
+ * A sender thread plays the PLC (SCHED_FIFO when permitted, so the load does
+ * not delay the sends themselves) and stamps every datagram with its send time;
+ * a receiver thread waits in poll()/recv() like the worker. Meanwhile one
+ * busy-loop thread per CPU (memory-touching, so the caches are cold too) keeps
+ * every CPU at 100%. Cases:
+ *
+ *   default        receiver on the normal scheduler, any CPU
+ *   pinned         receiver alone on the last CPU, the load on the others
+ *   pinned+fifo    the same with SCHED_FIFO, plus mlockall()
+ *
+ * With one CPU "pinned" cannot move the load away. Real-time scheduling and
+ * mlockall() need CAP_SYS_NICE / CAP_IPC_LOCK; without them the case runs
+ * without and says so, like the bridge does.
+ *
+ * Build and run:
+ *   python scripts/build_benchmarks.py bench_thread_jitter
+ *   build/benchmarks/bench_thread_jitter [seconds_per_case=5] [rpi_us=1000] [priority=80]
+ */
+
+#include "ThreadOptions.h"
+
+#include <arpa/inet.h>
+#include <netinet/in.h>
+#include <poll.h>
+#include <sys/socket.h>
+#include <unistd.h>
+
+#include <algorithm>
+#include <atomic>
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <string>
+#include <thread>
+#include <vector>
+
+using Clock = std::chrono::steady_clock;
+using bridge::SchedulingPolicy;
+
+static int64_t nowNs() {
+    return std::chrono::duration_cast<std::chrono::nanoseconds>(Clock::now().time_since_epoch()).count();
+}
+
+static double percentile(std::vector<double>& values, double p) {
+    if (values.empty()) return 0.0;
+    const size_t index = std::min(values.size() - 1, static_cast<size_t>(p * values.size()));
+    std::nth_element(values.begin(), values.begin() + index, values.end());
+    return values[index];
+}
+
+struct Case {
+    const char* name;
+    bool pinned;
+    bool realtime;
+};
+
+struct Result {
+    std::vector<double> latencyUs;
+    uint64_t sent = 0;
+    std::string note;
+};
+
+static Result runCase(const Case& c, double seconds, uint32_t rpiUs, int priority, int cpus) {
+    Result result;
+    const int receiverCpu = cpus - 1;
+    std::vector<int> loadCpus;
+    for (int cpu = 0; cpu < cpus; cpu++) {
+        if (cpus == 1 || cpu != receiverCpu) loadCpus.push_back(cpu);
+    }
+
+    int rx = socket(AF_INET, SOCK_DGRAM, 0);
+    int tx = socket(AF_INET, SOCK_DGRAM, 0);
+    sockaddr_in addr{};
+    addr.sin_family = AF_INET;
+    addr.sin_addr.s_addr = htonl(INADDR_LOOPBACK);
+    bind(rx, reinterpret_cast<sockaddr*>(&addr), sizeof(addr));
+    socklen_t len = sizeof(addr);
+    getsockname(rx, reinterpret_cast<sockaddr*>(&addr), &len);
+
+    std::atomic<bool> stop(false);
+
+    // One busy thread per CPU
+    std::vector<std::thread> load;
+    for (int i = 0; i < cpus; i++) {
+        load.emplace_back([&, i]() {
+            std::string error;
+            if (c.pinned) {
+                bridge::pinCurrentThread({loadCpus[i % loadCpus.size()]}, error);
+            }
+            std::vector<uint8_t> memory(8 << 20);
+            size_t offset = 0;
+            while (!stop.load(std::memory_order_relaxed)) {
+                memory[offset] += 1;
+                offset = (offset + 4096 + 64) % memory.size();
+            }
+        });
+    }
+
+    std::thread receiver([&]() {
+        std::string error;
+        if (c.pinned && !bridge::pinCurrentThread({receiverCpu}, error)) {
+            result.note += " not pinned: " + error + ";";
+        }
+        if (c.realtime) {
+            if (!bridge::setCurrentThreadScheduling(SchedulingPolicy::Fifo, priority, error)) {
+                result.note += " no SCHED_FIFO: " + error + ";";
+            }
+            if (!bridge::lockProcessMemory(error)) {
+                result.note += " no mlockall: " + error + ";";
+            }
+        }
+        result.latencyUs.reserve(static_cast<size_t>(seconds * 1e6 / rpiUs) + 16);
+
+        int64_t stamp = 0;
+        while (!stop.load(std::memory_order_relaxed)) {
+            pollfd fd{rx, POLLIN, 0};
+            if (poll(&fd, 1, 50) <= 0) continue;
+            if (recv(rx, &stamp, sizeof(stamp), MSG_DONTWAIT) == sizeof(stamp)) {
+                result.latencyUs.push_back((nowNs() - stamp) / 1e3);
+            }
+        }
+    });
+
+    std::thread sender([&]() {
+        std::string error;
+        bridge::setCurrentThreadScheduling(SchedulingPolicy::Fifo, 99, error);
+        auto next = Clock::now();
+        const auto end = next + std::chrono::duration_cast<Clock::duration>(std::chrono::duration<double>(seconds));
+        while (next < end) {
+            next += std::chrono::microseconds(rpiUs);
+            std::this_thread::sleep_until(next);
+            const int64_t stamp = nowNs();
+            sendto(tx, &stamp, sizeof(stamp), 0, reinterpret_cast<sockaddr*>(&addr), sizeof(addr));
+            result.sent++;
+        }
+    });
+
+    sender.join();
+    std::this_thread::sleep_for(std::chrono::milliseconds(100));
+    stop = true;
+    receiver.join();
+    for (auto& thread : load) thread.join();
+    close(rx);
+    close(tx);
+    munlockall();
+    return result;
+}
+
+int main(int argc, char** argv) {
+    const double seconds = argc > 1 ? std::atof(argv[1]) : 5.0;
+    const uint32_t rpiUs = argc > 2 ? static_cast<uint32_t>(std::atoi(argv[2])) : 1000;
+    const int priority = argc > 3 ? std::atoi(argv[3]) : 80;
+    const int cpus = std::max(1, static_cast<int>(sysconf(_SC_NPROCESSORS_ONLN)));
+
+    std::printf("%d CPU(s) busy, RPI %u us, %.0f s per case\n", cpus, rpiUs, seconds);
+    std::printf("%-12s %9s %9s %9s %9s %9s %8s\n",
+                "case", "p50_us", "p99_us", "p999_us", "max_us", "mean_us", "lost");
+
+    const Case cases[] = {
+        {"default", false, false},
+        {"pinned", true, false},
+        {"pinned+fifo", true, true},
+    };
+    for (const Case& c : cases) {
+        Result r = runCase(c, seconds, rpiUs, priority, cpus);
+        double sum = 0;
+        for (double v : r.latencyUs) sum += v;
+        const double mean = r.latencyUs.empty() ? 0.0 : sum / r.latencyUs.size();
+        const uint64_t lost = r.sent > r.latencyUs.size() ? r.sent - r.latencyUs.size() : 0;
+        const double p50 = percentile(r.latencyUs, 0.50);
+        const double p99 = percentile(r.latencyUs, 0.99);
+        const double p999 = percentile(r.latencyUs, 0.999);
+        const double max = r.latencyUs.empty() ? 0.0 : *std::max_element(r.latencyUs.begin(), r.latencyUs.end());
+        std::printf("%-12s %9.1f %9.1f %9.1f %9.1f %9.1f %8llu%s\n",
+                    c.name, p50, p99, p999, max, mean, static_cast<unsigned long long>(lost), r.note.c_str());
+    }
+
+    return 0;
+}
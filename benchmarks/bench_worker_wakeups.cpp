@@ -0,0 +1,147 @@
+/*
+ * bench_worker_wakeups.cpp
+ *
+ * CPU cost of the worker loop per bridge: the fixed 1 ms select() timeout the
+ * worker used to pass to handleConnections(), against the event-driven timeout
+ * (half the RPI, 1..100 ms).
+ *
+ * A sender thread emits one UDP datagram per RPI to a local socket; the
+ * receiver loop mimics ConnectionManager::handleConnections(): select() with
+ * the timeout, read the datagram if any, run the per-tick bookkeeping. The
+ * receiver's own thread CPU time, its wakeups per second and the send->receive
+ * latency are reported. An RPI of 0 means no traffic (PLC idle / disconnected).
+ *
+ * Build and run:
+ *   python scripts/build_benchmarks.py bench_worker_wakeups
+ *   build/benchmarks/bench_worker_wakeups [seconds_per_case=2]
+ */
+
+#include <arpa/inet.h>
+#include <netinet/in.h>
+#include <sys/select.h>
+#include <sys/socket.h>
+#include <unistd.h>
+
+#include <algorithm>
+#include <atomic>
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+#include <ctime>
+#include <thread>
+#include <vector>
+
+using Clock = std::chrono::steady_clock;
+
+static double threadCpuSeconds() {
+    timespec ts{};
+    clock_gettime(CLOCK_THREAD_CPUTIME_ID, &ts);
+    return ts.tv_sec + ts.tv_nsec / 1e9;
+}
+
+struct Result {
+    double cpuPercent;
+    double wakeupsPerSecond;
+    double meanLatencyUs;
+    double maxLatencyUs;
+};
+
+static Result runCase(uint32_t rpiUs, std::chrono::milliseconds timeout, double seconds) {
+    int rx = socket(AF_INET, SOCK_DGRAM, 0);
+    int tx = socket(AF_INET, SOCK_DGRAM, 0);
+
+    sockaddr_in addr{};
+    addr.sin_family = AF_INET;
+    addr.sin_addr.s_addr = htonl(INADDR_LOOPBACK);
+    addr.sin_port = 0;
+    bind(rx, reinterpret_cast<sockaddr*>(&addr), sizeof(addr));
+    socklen_t len = sizeof(addr);
+    getsockname(rx, reinterpret_cast<sockaddr*>(&addr), &len);
+
+    std::atomic<bool> stop(false);
+    std::thread sender([&]() {
+        if (rpiUs == 0) return;
+        auto next = Clock::now();
+        while (!stop) {
+            next += std::chrono::microseconds(rpiUs);
+            std::this_thread::sleep_until(next);
+            const int64_t sentAt = Clock::now().time_since_epoch().count();
+            sendto(tx, &sentAt, sizeof(sentAt), 0, reinterpret_cast<sockaddr*>(&addr), sizeof(addr));
+        }
+    });
+
+    uint64_t wakeups = 0;
+    uint64_t packets = 0;
+    double latencySumUs = 0;
+    double latencyMaxUs = 0;
+
+    const double cpuBegin = threadCpuSeconds();
+    const auto end = Clock::now() + std::chrono::duration<double>(seconds);
+    while (Clock::now() < end) {
+        fd_set readSet;
+        FD_ZERO(&readSet);
+        FD_SET(rx, &readSet);
+        timeval tv{};
+        tv.tv_sec = timeout.count() / 1000;
+        tv.tv_usec = (timeout.count() % 1000) * 1000;
+
+        const int ready = select(rx + 1, &readSet, nullptr, nullptr, &tv);
+        wakeups++;
+        if (ready > 0 && FD_ISSET(rx, &readSet)) {
+            int64_t sentAt = 0;
+            if (recv(rx, &sentAt, sizeof(sentAt), 0) == sizeof(sentAt)) {
+                const double us = (Clock::now().time_since_epoch().count() - sentAt) / 1000.0;
+                latencySumUs += us;
+                latencyMaxUs = std::max(latencyMaxUs, us);
+                packets++;
+            }
+        }
+        // Per-tick bookkeeping of handleConnections (socket list, notifyTick)
+        std::vector<int> sockets{rx};
+        (void)sockets;
+    }
+    const double cpu = threadCpuSeconds() - cpuBegin;
+
+    stop = true;
+    sender.join();
+    close(rx);
+    close(tx);
+
+    return {
+        100.0 * cpu / seconds,
+        wakeups / seconds,
+        packets ? latencySumUs / packets : 0.0,
+        latencyMaxUs,
+    };
+}
+
+int main(int argc, char** argv) {
+    const double seconds = argc > 1 ? std::atof(argv[1]) : 2.0;
+    const uint32_t rpis[] = {0, 1000, 10000, 100000};
+
+    std::printf("%-10s %-14s %8s %12s %14s %14s\n",
+                "rpi_us", "mode", "cpu_%", "wakeups/s", "mean_lat_us", "max_lat_us");
+
+    for (uint32_t rpi : rpis) {
+        // Same rule as EIPtoNATSBridge with eventDriven=true (idle uses the cap)
+        const uint32_t halfRpiMs = rpi == 0 ? 100 : rpi / 2000;
+        const auto eventTimeout = std::chrono::milliseconds(std::min<uint32_t>(std::max<uint32_t>(halfRpiMs, 1), 100));
+
+        const struct {
+            const char* name;
+            std::chrono::milliseconds timeout;
+        } modes[] = {
+            {"poll-1ms", std::chrono::milliseconds(1)},
+            {"event-driven", eventTimeout},
+        };
+
+        for (const auto& mode : modes) {
+            const Result r = runCase(rpi, mode.timeout, seconds);
+            std::printf("%-10u %-14s %8.2f %12.0f %14.1f %14.1f\n",
+                        rpi, mode.name, r.cpuPercent, r.wakeupsPerSecond,
+                        r.meanLatencyUs, r.maxLatencyUs);
+        }
+    }
+
+    return 0;
+}
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Minimal EtherNet/IP adapter (target) simulator for local tests and benchmarks
+
+Implements just what the bridge uses:
+  - TCP 44818: ListIdentity, RegisterSession, UnRegisterSession and SendRRData
+    carrying Forward Open / Large Forward Open / Forward Close
+  - UDP: cyclic Class 1 T2O packets at the RPI requested in the Forward Open,
+    to the port of its T2O sockaddr info item (t2o_port if it has none), with
+    a configurable payload size, and O2T consumption with the usual connection
+    timeout (no O2T for timeout_multiplier * RPI closes the connection)
+
+Every simulated adapter listens on its own address, so on Linux several of them
+can run side by side on 127.0.0.2, 127.0.0.3, ...
+
+Usage:
+    python benchmarks/eip_sim.py --host 127.0.0.2 [--count 8] [--payload 166] [--t2o-port 2222]
+"""
+
+import argparse
+import itertools
+import socket
+import socketserver
+import struct
+import threading
+import time
+
+ENCAP_PORT = 44818
+
+CMD_LIST_IDENTITY = 0x0063
+CMD_REGISTER_SESSION = 0x0065
+CMD_UNREGISTER_SESSION = 0x0066
+CMD_SEND_RR_DATA = 0x006F
+
+ITEM_NULL_ADDRESS = 0x0000
+ITEM_IDENTITY = 0x000C
+ITEM_CONNECTED_DATA = 0x00B1
+ITEM_UNCONNECTED_DATA = 0x00B2
+ITEM_O2T_SOCKADDR = 0x8000
+ITEM_T2O_SOCKADDR = 0x8001
+ITEM_SEQUENCED_ADDRESS = 0x8002
+
+SERVICE_FORWARD_OPEN = 0x54
+SERVICE_LARGE_FORWARD_OPEN = 0x5B
+SERVICE_FORWARD_CLOSE = 0x4E
+
+STATUS_SUCCESS = 0x00
+STATUS_SERVICE_NOT_SUPPORTED = 0x08
+
+ENCAP_STATUS_INVALID_COMMAND = 0x0001
+
+_ENCAP_HEADER = struct.Struct("<HHII8sI")
+_FORWARD_OPEN_HEADER = "<BBIIHHIB"
+
+
+def _cpf(items):
+    """Pack (item_id, data) pairs as a Common Packet Format list."""
+    out = struct.pack("<H", len(items))
+    for item_id, data in items:
+        out += struct.pack("<HH", item_id, len(data)) + data
+    return out
+
+
+def _parse_cpf(data):
+    """Parse a Common Packet Format list into (item_id, data) pairs."""
+    (count,) = struct.unpack_from("<H", data, 0)
+    offset = 2
+    items = []
+    for _ in range(count):
+        item_id, length = struct.unpack_from("<HH", data, offset)
+        items.append((item_id, data[offset + 4:offset + 4 + length]))
+        offset += 4 + length
+    return items
+
+
+def _sockaddr(host, port):
+    """sockaddr_in as used in CPF sockaddr info items (big-endian)."""
+    return struct.pack(">HH4s8x", socket.AF_INET, port, socket.inet_aton(host))
+
+
+def _parse_sockaddr(data):
+    """(host, port) of a CPF sockaddr info item; host is None for INADDR_ANY."""
+    _, port, address = struct.unpack_from(">HH4s", data, 0)
+    host = socket.inet_ntoa(address)
+    return (None if host == "0.0.0.0" else host), port
+
+
+class Connection:
+    """One Class 1 connection opened by a Forward Open."""
+
+    def __init__(self, o2t_id, t2o_id, serial, vendor_id, originator_serial,
+                 o2t_rpi_us, t2o_rpi_us, timeout_multiplier, destination):
+        self.o2t_id = o2t_id
+        self.t2o_id = t2o_id
+        self.key = (serial, vendor_id, originator_serial)
+        self.t2o_rpi = t2o_rpi_us / 1e6
+        self.timeout = (4 << timeout_multiplier) * o2t_rpi_us / 1e6
+        self.destination = destination
+        self.encap_sequence = 0
+        self.cip_sequence = 0
+        self.next_send = time.perf_counter()
+        self.last_o2t = time.monotonic()
+
+
+class Adapter:
+    """Simulated EtherNet/IP adapter listening on one IP address.
+
+    Args:
+        host (str): Address to listen on (TCP 44818 and an ephemeral UDP port for O2T)
+        payload_size (int): T2O payload size in bytes
+        t2o_port (int): UDP port T2O packets are sent to on the originator when the
+            Forward Open does not ask for one (default: 2222)
+        product_name (str): Name reported by ListIdentity
+    """
+
+    def __init__(self, host="127.0.0.1", payload_size=32, t2o_port=2222,
+                 product_name="eip2nats sim"):
+        self.host = host
+        self.payload_size = payload_size
+        self.t2o_port = t2o_port
+        self.product_name = product_name
+
+        self._connections = {}  # t2o id -> Connection
+        self._lock = threading.Lock()
+        self._ids = itertools.count(0x10000000 + (socket.inet_aton(host)[3] << 16))
+        self._stop = threading.Event()
+        self._threads = []
+
+        # Statistics
+        self.sent = 0
+        self.o2t_received = 0
+        self.forward_opens = 0
+        self.forward_closes = 0
+        self.timeouts = 0
+
+        self._udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._udp.bind((host, 0))
+        self._udp.settimeout(0.1)
+        self.o2t_port = self._udp.getsockname()[1]
+
+        adapter = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                adapter._serve_tcp(self.request, self.client_address[0])
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self._tcp = socketserver.ThreadingTCPServer((host, ENCAP_PORT), Handler)
+        self._tcp.daemon_threads = True
+
+    # -- lifecycle ---------------------------------------------------------
+
+    def start(self):
+        """Start serving in background threads."""
+        for target in (self._tcp.serve_forever, self._send_loop, self._receive_loop):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        """Stop serving and close the sockets."""
+        self._stop.set()
+        self._tcp.shutdown()
+        self._tcp.server_close()
+        for thread in self._threads:
+            thread.join(timeout=1)
+        self._udp.close()
+
+    def connection_count(self):
+        with self._lock:
+            return len(self._connections)
+
+    def drop_connections(self):
+        """Stop sending T2O on every connection, as if the device rebooted."""
+        with self._lock:
+            self._connections.clear()
+
+    # -- TCP encapsulation -------------------------------------------------
+
+    def _serve_tcp(self, sock, peer_host):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        buffer = b""
+        while not self._stop.is_set():
+            try:
+                chunk = sock.recv(4096)
+            except OSError:
+                return
+            if not chunk:
+                return
+            buffer += chunk
+
+            while len(buffer) >= _ENCAP_HEADER.size:
+                command, length, session_handle, _, context, options = \
+                    _ENCAP_HEADER.unpack_from(buffer)
+                if len(buffer) < _ENCAP_HEADER.size + length:
+                    break
+                data = buffer[_ENCAP_HEADER.size:_ENCAP_HEADER.size + length]
+                buffer = buffer[_ENCAP_HEADER.size + length:]
+
+                status, reply = 0, b""
+                if command == CMD_REGISTER_SESSION:
+                    session_handle = next(self._ids)
+                    reply = data[:4]
+                elif command == CMD_UNREGISTER_SESSION:
+                    return
+                elif command == CMD_LIST_IDENTITY:
+                    reply = _cpf([(ITEM_IDENTITY, self._identity())])
+                elif command == CMD_SEND_RR_DATA:
+                    reply = self._send_rr_data(data, peer_host)
+                else:
+                    status = ENCAP_STATUS_INVALID_COMMAND
+
+                sock.sendall(_ENCAP_HEADER.pack(command, len(reply), session_handle, status,
+                                                context, options) + reply)
+
+    def _identity(self):
+        name = self.product_name.encode()
+        return (struct.pack("<H", 1) + _sockaddr(self.host, ENCAP_PORT)
+                + struct.pack("<HHHBBHI", 0xFFFF, 0x0C, 1, 1, 0, 0, 0x12345678)
+                + struct.pack("<B", len(name)) + name + b"\x03")
+
+    def _send_rr_data(self, data, peer_host):
+        # Interface handle (4) + timeout (2) + CPF with a null address and the request,
+        # plus the T2O sockaddr info of a Forward Open that names its receive port
+        items = dict(_parse_cpf(data[6:]))
+        request = items.get(ITEM_UNCONNECTED_DATA, b"")
+        destination = (peer_host, self.t2o_port)
+        if ITEM_T2O_SOCKADDR in items:
+            host, port = _parse_sockaddr(items[ITEM_T2O_SOCKADDR])
+            destination = (host or peer_host, port)
+        response, extra_items = self._message_router(request, destination)
+        items = [(ITEM_NULL_ADDRESS, b""), (ITEM_UNCONNECTED_DATA, response)] + extra_items
+        return data[:6] + _cpf(items)
+
+    def _message_router(self, request, destination):
+        service = request[0]
+        path_words = request[1]
+        body = request[2 + 2 * path_words:]
+
+        if service in (SERVICE_FORWARD_OPEN, SERVICE_LARGE_FORWARD_OPEN):
+            return self._forward_open(service, body, destination)
+        if service == SERVICE_FORWARD_CLOSE:
+            return self._forward_close(body), []
+        return struct.pack("<BBBB", service | 0x80, 0, STATUS_SERVICE_NOT_SUPPORTED, 0), []
+
+    def _forward_open(self, service, body, destination):
+        large = service == SERVICE_LARGE_FORWARD_OPEN
+        (_, _, o2t_id, t2o_id, serial, vendor_id, originator_serial, multiplier) = \
+            struct.unpack_from(_FORWARD_OPEN_HEADER, body, 0)
+        offset = struct.calcsize(_FORWARD_OPEN_HEADER) + 3  # 3 reserved bytes
+        if large:
+            o2t_rpi, _, t2o_rpi, _ = struct.unpack_from("<IIII", body, offset)
+            offset += 16
+        else:
+            o2t_rpi, _, t2o_rpi, _ = struct.unpack_from("<IHIH", body, offset)
+            offset += 12
+
+        # The target chooses the O2T id; the originator's T2O id is kept
+        o2t_id = next(self._ids)
+        connection = Connection(o2t_id, t2o_id, serial, vendor_id, originator_serial,
+                                o2t_rpi, t2o_rpi, multiplier, destination)
+        with self._lock:
+            self._connections[t2o_id] = connection
+        self.forward_opens += 1
+
+        reply = struct.pack("<BBBB", service | 0x80, 0, STATUS_SUCCESS, 0)
+        reply += struct.pack("<IIHHIIIBB", o2t_id, t2o_id, serial, vendor_id, originator_serial,
+                             o2t_rpi, t2o_rpi, 0, 0)
+        # Tell the originator where to send O2T
+        return reply, [(ITEM_O2T_SOCKADDR, _sockaddr(self.host, self.o2t_port))]
+
+    def _forward_close(self, body):
+        _, _, serial, vendor_id, originator_serial = struct.unpack_from("<BBHHI", body, 0)
+        key = (serial, vendor_id, originator_serial)
+        with self._lock:
+            for t2o_id, connection in list(self._connections.items()):
+                if connection.key == key:
+                    del self._connections[t2o_id]
+        self.forward_closes += 1
+
+        reply = struct.pack("<BBBB", SERVICE_FORWARD_CLOSE | 0x80, 0, STATUS_SUCCESS, 0)
+        return reply + struct.pack("<HHIBB", serial, vendor_id, originator_serial, 0, 0)
+
+    # -- UDP I/O -----------------------------------------------------------
+
+    def _send_loop(self):
+        payload = bytearray(self.payload_size)
+        while not self._stop.is_set():
+            now = time.perf_counter()
+            with self._lock:
+                connections = list(self._connections.values())
+
+            next_due = now + 0.01
+            for connection in connections:
+                # Catch up on missed periods, so short RPIs keep their rate even
+                # when sleep() overshoots
+                while connection.next_send <= now:
+                    connection.encap_sequence = (connection.encap_sequence + 1) & 0xFFFFFFFF
+                    connection.cip_sequence = (connection.cip_sequence + 1) & 0xFFFF
+                    if len(payload) >= 4:
+                        struct.pack_into("<I", payload, 0, connection.encap_sequence)
+                    address = struct.pack("<II", connection.t2o_id, connection.encap_sequence)
+                    data = struct.pack("<H", connection.cip_sequence) + bytes(payload)
+                    packet = _cpf([
+                        (ITEM_SEQUENCED_ADDRESS, address),
+                        (ITEM_CONNECTED_DATA, data),
+                    ])
+                    try:
+                        self._udp.sendto(packet, connection.destination)
+                        self.sent += 1
+                    except OSError:
+                        pass
+                    connection.next_send += connection.t2o_rpi
+                next_due = min(next_due, connection.next_send)
+
+            delay = next_due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    def _receive_loop(self):
+        while not self._stop.is_set():
+            # O2T traffic keeps connections alive
+            try:
+                packet = self._udp.recv(2048)
+            except socket.timeout:
+                packet = None
+            except OSError:
+                return
+
+            now = time.monotonic()
+            if packet:
+                for item_id, data in _parse_cpf(packet):
+                    if item_id == ITEM_SEQUENCED_ADDRESS:
+                        (o2t_id,) = struct.unpack_from("<I", data, 0)
+                        with self._lock:
+                            for connection in self._connections.values():
+                                if connection.o2t_id == o2t_id:
+                                    connection.last_o2t = now
+                        self.o2t_received += 1
+
+            with self._lock:
+                for t2o_id, connection in list(self._connections.items()):
+                    if now - connection.last_o2t > max(connection.timeout, 0.1):
+                        del self._connections[t2o_id]
+                        self.timeouts += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EtherNet/IP adapter simulator")
+    parser.add_argument("--host", default="127.0.0.1", help="First address to listen on")
+    parser.add_argument("--count", type=int, default=1, help="Adapters on consecutive addresses")
+    parser.add_argument("--payload", type=int, default=32, help="T2O payload size in bytes")
+    parser.add_argument("--t2o-port", type=int, default=2222,
+                        help="Originator UDP port for T2O when the Forward Open names none "
+                             "(incremented per adapter with --port-per-adapter)")
+    parser.add_argument("--port-per-adapter", action="store_true",
+                        help="Send T2O of adapter i to t2o-port + i")
+    args = parser.parse_args()
+
+    base = struct.unpack(">I", socket.inet_aton(args.host))[0]
+    adapters = []
+    for i in range(args.count):
+        host = socket.inet_ntoa(struct.pack(">I", base + i))
+        port = args.t2o_port + i if args.port_per_adapter else args.t2o_port
+        adapters.append(Adapter(host, args.payload, port).start())
+        print(f"Adapter on {host}:{ENCAP_PORT} (default T2O port {port}, {args.payload} bytes)")
+
+    try:
+        while True:
+            time.sleep(2)
+            print("connections={} sent={} o2t={} timeouts={}".format(
+                sum(a.connection_count() for a in adapters),
+                sum(a.sent for a in adapters),
+                sum(a.o2t_received for a in adapters),
+                sum(a.timeouts for a in adapters)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for adapter in adapters:
+            adapter.stop()
+
+
+if __name__ == "__main__":
+    main()
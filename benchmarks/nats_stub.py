@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Minimal NATS server stand-in for local tests and benchmarks
+
+Speaks enough of the NATS client protocol for nats.c: INFO, CONNECT, PING/PONG,
+PUB, HPUB, SUB and UNSUB, with MSG/HMSG delivery to subscribers (subjects with
+`*` and `>` wildcards). It counts messages and bytes per subject and can hand
+every published message to a callback. There is no clustering, auth, TLS or
+JetStream.
+
+Usage:
+    python benchmarks/nats_stub.py [--host 127.0.0.1] [--port 4222]
+"""
+
+import argparse
+import json
+import socket
+import socketserver
+import threading
+import time
+from collections import defaultdict
+
+
+def subject_matches(pattern, subject):
+    """NATS subject matching with `*` (one token) and `>` (the rest)."""
+    pattern_tokens = pattern.split(".")
+    subject_tokens = subject.split(".")
+    for i, token in enumerate(pattern_tokens):
+        if token == ">":
+            return len(subject_tokens) > i
+        if i >= len(subject_tokens) or (token != "*" and token != subject_tokens[i]):
+            return False
+    return len(pattern_tokens) == len(subject_tokens)
+
+
+class _Client:
+    def __init__(self, sock):
+        self.sock = sock
+        self.lock = threading.Lock()
+        self.verbose = False
+        self.subscriptions = {}  # sid -> subject
+
+    def send(self, data):
+        with self.lock:
+            try:
+                self.sock.sendall(data)
+            except OSError:
+                pass
+
+
+class NatsStub:
+    """In-process NATS stand-in.
+
+    Args:
+        host (str): Address to listen on
+        port (int): TCP port (0 picks a free one, see `url`)
+        on_message (callable): Called as on_message(subject, headers, payload) for
+            every PUB/HPUB, from the connection's thread; headers is b"" for PUB
+    """
+
+    def __init__(self, host="127.0.0.1", port=4222, on_message=None):
+        self.on_message = on_message
+        self.messages = 0
+        self.bytes = 0
+        self.per_subject = defaultdict(int)
+        self.connections = 0
+        self._clients = set()
+        self._lock = threading.Lock()
+
+        stub = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                stub._serve(self.request)
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self._server = socketserver.ThreadingTCPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.host, self.port = self._server.server_address
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"nats://{self.host}:{self.port}"
+
+    def start(self):
+        """Start serving in a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and drop every client."""
+        self._server.shutdown()
+        self._server.server_close()
+        with self._lock:
+            for client in self._clients:
+                try:
+                    client.sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+        if self._thread:
+            self._thread.join(timeout=1)
+
+    def publish(self, subject, payload, reply=None):
+        """Deliver a message to matching subscribers, as if a client published it."""
+        self._deliver(subject, reply, b"", payload)
+
+    # -- protocol ----------------------------------------------------------
+
+    def _info(self):
+        return ("INFO " + json.dumps({
+            "server_id": "eip2nats-stub",
+            "server_name": "eip2nats-stub",
+            "version": "2.10.0",
+            "proto": 1,
+            "host": self.host,
+            "port": self.port,
+            "headers": True,
+            "max_payload": 1048576,
+        }) + "\r\n").encode()
+
+    def _serve(self, sock):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        client = _Client(sock)
+        with self._lock:
+            self._clients.add(client)
+            self.connections += 1
+        client.send(self._info())
+
+        buffer = bytearray()
+        try:
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    return
+                buffer += chunk
+                consumed = self._process(client, buffer)
+                del buffer[:consumed]
+        except OSError:
+            return
+        finally:
+            with self._lock:
+                self._clients.discard(client)
+
+    def _process(self, client, buffer):
+        """Handle every complete operation in buffer; return the bytes consumed."""
+        offset = 0
+        while True:
+            end = buffer.find(b"\r\n", offset)
+            if end < 0:
+                return offset
+            line = bytes(buffer[offset:end])
+            op, _, rest = line.partition(b" ")
+            op = op.upper()
+            args = rest.split()
+
+            if op in (b"PUB", b"HPUB"):
+                # PUB <subject> [reply] <size> / HPUB <subject> [reply] <header size> <total size>
+                sizes = 2 if op == b"HPUB" else 1
+                total = int(args[-1])
+                header_size = int(args[-2]) if op == b"HPUB" else 0
+                reply = args[1].decode() if len(args) == sizes + 2 else None
+                start = end + 2
+                if len(buffer) < start + total + 2:
+                    return offset
+                headers = bytes(buffer[start:start + header_size])
+                payload = bytes(buffer[start + header_size:start + total])
+                offset = start + total + 2
+                self._on_publish(args[0].decode(), reply, headers, payload)
+            else:
+                offset = end + 2
+                if op == b"PING":
+                    client.send(b"PONG\r\n")
+                elif op == b"CONNECT":
+                    client.verbose = bool(json.loads(rest or b"{}").get("verbose", False))
+                elif op == b"SUB":
+                    client.subscriptions[args[-1].decode()] = args[0].decode()
+                elif op == b"UNSUB":
+                    client.subscriptions.pop(args[0].decode(), None)
+
+            if client.verbose and op not in (b"PING", b"PONG"):
+                client.send(b"+OK\r\n")
+
+    def _on_publish(self, subject, reply, headers, payload):
+        with self._lock:
+            self.messages += 1
+            self.bytes += len(payload)
+            self.per_subject[subject] += 1
+        if self.on_message:
+            self.on_message(subject, headers, payload)
+        self._deliver(subject, reply, headers, payload)
+
+    def _deliver(self, subject, reply, headers, payload):
+        with self._lock:
+            targets = [(client, sid) for client in self._clients
+                       for sid, pattern in list(client.subscriptions.items())
+                       if subject_matches(pattern, subject)]
+        reply_part = f" {reply}" if reply else ""
+        for client, sid in targets:
+            if headers:
+                total = len(headers) + len(payload)
+                head = f"HMSG {subject} {sid}{reply_part} {len(headers)} {total}\r\n"
+                client.send(head.encode() + headers + payload + b"\r\n")
+            else:
+                head = f"MSG {subject} {sid}{reply_part} {len(payload)}\r\n"
+                client.send(head.encode() + payload + b"\r\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Minimal NATS server stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4222)
+    args = parser.parse_args()
+
+    stub = NatsStub(args.host, args.port).start()
+    print(f"Listening on {stub.url}")
+    try:
+        last = 0
+        while True:
+            time.sleep(2)
+            print(f"connections={stub.connections} messages={stub.messages} "
+                  f"({(stub.messages - last) / 2:.0f}/s) bytes={stub.bytes}")
+            last = stub.messages
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
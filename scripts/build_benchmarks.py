@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Builds the C++ microbenchmarks in benchmarks/ (Linux only).
+Usage: python scripts/build_benchmarks.py [name ...]
+"""
+
+import sys
+
+from build_config import IS_LINUX, BuildConfig
+
+# name -> what the benchmark links against: None, "nats" (nats.c only) or
+# "bridge" (nats.c, EIPScanner and the bridge sources)
+BENCHMARKS = {
+    "bench_json_encoder": "nats",
+    "bench_worker_wakeups": None,
+    "bench_receive_path": "bridge",
+    "bench_recvmmsg": None,
+    "bench_thread_jitter": None,
+    "bench_socket_buffer": None,
+}
+
+
+def _build_benchmark(cfg, name, deps, output_dir):
+    """Build one benchmark with g++."""
+    source = cfg.root_dir / "benchmarks" / f"{name}.cpp"
+    if not source.exists():
+        raise FileNotFoundError(f"Not found: {source}")
+
+    output = output_dir / name
+    cmd = [
+        "g++", "-O3",
+        "-Wall", "-Wextra",
+        "-std=c++17",
+        f"-I{cfg.src_dir}",
+    ]
+
+    nats_dir = cfg.deps_dir / "nats.c"
+    eip_dir = cfg.deps_dir / "EIPScanner"
+    if deps == "nats":
+        if not (nats_dir / "build").exists():
+            raise RuntimeError(
+                f"{name} needs nats.c.\n"
+                "Run first: python scripts/build_nats.py"
+            )
+        cmd += [
+            f"-I{nats_dir / 'src'}",
+            str(source),
+            f"-L{cfg.lib_dir}",
+            "-lnats",
+            f"-Wl,-rpath,{cfg.lib_dir}",
+        ]
+    elif deps == "bridge":
+        if not (nats_dir / "build").exists() or not (eip_dir / "build").exists():
+            raise RuntimeError(
+                f"{name} needs the dependencies.\n"
+                "Run first: python scripts/build_nats.py && python scripts/build_eipscanner.py"
+            )
+        cmd += [
+            f"-I{nats_dir / 'src'}",
+            f"-I{eip_dir / 'src'}",
+            str(source),
+            str(cfg.src_dir / "EIPtoNATSBridge.cpp"),
+            str(cfg.src_dir / "BridgeGroup.cpp"),
+            str(cfg.src_dir / "DiskSpool.cpp"),
+            f"-L{cfg.lib_dir}",
+            "-lnats",
+            "-lEIPScanner",
+            f"-Wl,-rpath,{cfg.lib_dir}",
+        ]
+    else:
+        cmd.append(str(source))
+
+    cmd += ["-lpthread", "-o", str(output)]
+    cfg.run_command(cmd)
+    print(f"OK Benchmark compiled: {output}")
+
+
+def build_benchmarks(names=None, cfg=None):
+    """Build the selected benchmarks (all by default)."""
+    if cfg is None:
+        cfg = BuildConfig()
+
+    print("\n" + "=" * 70)
+    print("  Building benchmarks")
+    print("=" * 70)
+
+    if not IS_LINUX:
+        raise RuntimeError("Benchmarks are only supported on Linux")
+
+    names = names or list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"Unknown benchmark(s): {', '.join(unknown)}")
+
+    output_dir = cfg.build_dir / "benchmarks"
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    for name in names:
+        _build_benchmark(cfg, name, BENCHMARKS[name], output_dir)
+
+
+if __name__ == "__main__":
+    try:
+        build_benchmarks(sys.argv[1:])
+    except Exception as e:
+        print(f"\nERROR: {e}")
+        sys.exit(1)
@@ -39,6 +39,8 @@ def _build_binding_gcc(cfg, nats_include, eip_include, ext_suffix):
         f"-I{python_include}",
         str(cfg.src_dir / "bindings.cpp"),
         str(cfg.src_dir / "EIPtoNATSBridge.cpp"),
+        str(cfg.src_dir / "BridgeGroup.cpp"),
+        str(cfg.src_dir / "DiskSpool.cpp"),
         "-o", str(output_name),
         f"-L{cfg.lib_dir}",
         "-lnats",
@@ -4,6 +4,7 @@ Builds EIPScanner from source.
 Usage: python scripts/build_eipscanner.py
 """
 
+import re
 import sys
 from build_config import BuildConfig, IS_WINDOWS, IS_LINUX
 
@@ -92,6 +93,12 @@ def _patch_eipscanner_for_windows(cfg, eip_dir):
     print(f"  {patches_applied} file(s) patched")
 
 
+def _patch_failed(message):
+    """Stop the build: a patch anchor is missing from the EIPScanner sources."""
+    print(f"  ERROR: {message}; not the pinned EIPScanner commit?")
+    sys.exit(1)
+
+
 def _patch_eipscanner_receive_port(eip_dir):
     """Add configurable receivePort to ConnectionParameters.
 
@@ -174,6 +181,850 @@ def _patch_eipscanner_receive_port(eip_dir):
     print(f"  {patches_applied} file(s) patched")
 
 
+def _patch_eipscanner_multicast(eip_dir):
+    """Support multicast T2O connections (ConnectionType MULTICAST / LISTEN_ONLY).
+
+    Builds on the receivePort patch. For a Forward Open with a multicast T2O:
+    - no T2O_SOCKADDR_INFO is sent, the target chooses the multicast group;
+    - the T2O_SOCKADDR_INFO of the reply gives the group and port (normally
+      2222): the socket is bound to that port and joins the group on the
+      interface of the EIP session (SessionInfo::getLocalAddress()), so a
+      multi-homed host joins on the network the target is on.
+    UDPBoundSocket gets joinMulticastGroup(); it disables IP_MULTICAST_ALL on
+    Linux so a socket only gets the groups it joined. Several processes (or
+    standalone bridges) can receive the same stream as long as the bound
+    socket uses SO_REUSEADDR.
+    """
+    print("\nApplying multicast patch...")
+    patches_applied = 0
+    sockets_dir = eip_dir / "src" / "sockets"
+
+    # 1. Declare UDPBoundSocket::joinMulticastGroup()
+    bound_h = sockets_dir / "UDPBoundSocket.h"
+    content = bound_h.read_text(encoding="utf-8")
+    marker = "explicit UDPBoundSocket(EndPoint endPoint);"
+    if "joinMulticastGroup" not in content:
+        if marker in content:
+            content = content.replace(
+                marker,
+                marker + "\n\n\t\t// Receive the datagrams sent to a multicast group (IPv4) on the"
+                         "\n\t\t// interface with the given local address"
+                         "\n\t\tvoid joinMulticastGroup(const std::string& group, "
+                         "const std::string& interfaceAddress);"
+            )
+            bound_h.write_text(content, encoding="utf-8")
+            patches_applied += 1
+            print("  Patched: UDPBoundSocket.h (added joinMulticastGroup)")
+        else:
+            _patch_failed("UDPBoundSocket.h constructor not found")
+
+    # 2. Define it at the end of UDPBoundSocket.cpp
+    bound_cpp = sockets_dir / "UDPBoundSocket.cpp"
+    content = bound_cpp.read_text(encoding="utf-8")
+    if "joinMulticastGroup" not in content:
+        content += (
+            '\n'
+            '#ifdef _WIN32\n'
+            '#include <winsock2.h>\n'
+            '#include <ws2tcpip.h>\n'
+            '#else\n'
+            '#include <arpa/inet.h>\n'
+            '#include <netinet/in.h>\n'
+            '#include <sys/socket.h>\n'
+            '#endif\n'
+            '#include <cerrno>\n'
+            '#include <system_error>\n'
+            '#include "utils/Logger.h"\n'
+            '\n'
+            'void eipScanner::sockets::UDPBoundSocket::joinMulticastGroup('
+            'const std::string& group,\n'
+            '\t\tconst std::string& interfaceAddress) {\n'
+            '\tstruct ip_mreq request {};\n'
+            '\trequest.imr_multiaddr.s_addr = inet_addr(group.c_str());\n'
+            '\trequest.imr_interface.s_addr = inet_addr(interfaceAddress.c_str());\n'
+            '\tif (setsockopt(getSocketFd(), IPPROTO_IP, IP_ADD_MEMBERSHIP,\n'
+            '\t\t\treinterpret_cast<const char*>(&request), sizeof(request)) < 0) {\n'
+            '\t\tconst int error = BaseSocket::getLastError();\n'
+            '#ifdef _WIN32\n'
+            '\t\tconst bool alreadyMember = error == WSAEADDRINUSE;\n'
+            '#else\n'
+            '\t\tconst bool alreadyMember = error == EADDRINUSE;\n'
+            '#endif\n'
+            '\t\t// Rejoining after a reconnect: the socket is kept by the ConnectionManager\n'
+            '\t\tif (!alreadyMember) {\n'
+            '\t\t\tthrow std::system_error(error, BaseSocket::getErrorCategory());\n'
+            '\t\t}\n'
+            '\t\treturn;\n'
+            '\t}\n'
+            '#ifdef IP_MULTICAST_ALL\n'
+            '\tint all = 0;\n'
+            '\tsetsockopt(getSocketFd(), IPPROTO_IP, IP_MULTICAST_ALL, &all, sizeof(all));\n'
+            '#endif\n'
+            '\teipScanner::utils::Logger(eipScanner::utils::LogLevel::INFO)\n'
+            '\t\t<< "Joined multicast group " << group << " on port " '
+            '<< getRemoteEndPoint().getPort()\n'
+            '\t\t<< " via " << interfaceAddress;\n'
+            '}\n'
+        )
+        bound_cpp.write_text(content, encoding="utf-8")
+        patches_applied += 1
+        print("  Patched: UDPBoundSocket.cpp (joinMulticastGroup)")
+    if "SO_REUSEADDR" not in content:
+        print("  NOTE: UDPBoundSocket does not set SO_REUSEADDR; only one process per host "
+              "can receive a multicast stream")
+
+    # 3. SessionInfo::getLocalAddress(): the local end of the session's TCP connection
+    session_h = eip_dir / "src" / "SessionInfo.h"
+    content = session_h.read_text(encoding="utf-8")
+    marker = "sockets::EndPoint getRemoteEndPoint() const override;"
+    if "getLocalAddress" not in content:
+        if marker not in content or "sockets::TCPSocket _socket;" not in content:
+            _patch_failed("getRemoteEndPoint() or _socket not found in SessionInfo.h")
+        content = content.replace(
+            marker,
+            marker + "\n\n\t\t// Local IPv4 address of the session's TCP connection, "
+                     "\"0.0.0.0\" if unknown"
+                     "\n\t\tstd::string getLocalAddress() const;"
+        )
+        session_h.write_text(content, encoding="utf-8")
+        patches_applied += 1
+        print("  Patched: SessionInfo.h (added getLocalAddress)")
+
+    session_cpp = eip_dir / "src" / "SessionInfo.cpp"
+    content = session_cpp.read_text(encoding="utf-8")
+    if "getLocalAddress" not in content:
+        content += (
+            '\n'
+            '#ifdef _WIN32\n'
+            '#include <winsock2.h>\n'
+            '#include <ws2tcpip.h>\n'
+            '#else\n'
+            '#include <arpa/inet.h>\n'
+            '#include <netinet/in.h>\n'
+            '#include <sys/socket.h>\n'
+            '#endif\n'
+            '\n'
+            'std::string eipScanner::SessionInfo::getLocalAddress() const {\n'
+            '\tstruct sockaddr_in address {};\n'
+            '\tsocklen_t length = sizeof(address);\n'
+            '\tif (getsockname(_socket.getSocketFd(), '
+            'reinterpret_cast<struct sockaddr*>(&address), &length) < 0) {\n'
+            '\t\treturn "0.0.0.0";\n'
+            '\t}\n'
+            '\treturn inet_ntoa(address.sin_addr);\n'
+            '}\n'
+        )
+        session_cpp.write_text(content, encoding="utf-8")
+        patches_applied += 1
+        print("  Patched: SessionInfo.cpp (getLocalAddress)")
+
+    # 4. ConnectionManager.cpp
+    cm_cpp = eip_dir / "src" / "ConnectionManager.cpp"
+    content = cm_cpp.read_text(encoding="utf-8")
+
+    # 4a. Only ask for T2O data on receivePort when the T2O is point-to-point
+    old_request = (
+        '\t\tstd::vector<eip::CommonPacketItem> fwdOpenItems;\n'
+        '\t\t{\n'
+    )
+    new_request = (
+        '\t\tstd::vector<eip::CommonPacketItem> fwdOpenItems;\n'
+        '\t\tif (!(connectionParameters.t2oNetworkConnectionParams '
+        '& NetworkConnectionParams::MULTICAST)) {\n'
+    )
+    if old_request in content:
+        content = content.replace(old_request, new_request)
+        patches_applied += 1
+        print("  Patched: ConnectionManager.cpp "
+              "(no T2O_SOCKADDR_INFO request for multicast)")
+    elif new_request not in content:
+        _patch_failed("T2O_SOCKADDR_INFO request not found in ConnectionManager.cpp")
+
+    # 4b. Bind to the port from the reply and join the multicast group
+    old_bind = ("findOrCreateSocket(sockets::EndPoint(si->getRemoteEndPoint().getHost(), "
+                "connectionParameters.receivePort));")
+    match = re.search(r"^([ \t]*)" + re.escape(old_bind), content, re.MULTILINE)
+    if "joinMulticastGroup" in content:
+        pass
+    elif match:
+        indent = match.group(1)
+        block = [
+            "if (connectionParameters.t2oNetworkConnectionParams "
+            "& NetworkConnectionParams::MULTICAST) {",
+            "\t// The target reports the group and port it produces the T2O data on",
+            "\tauto replyItems = messageRouterResponse.getAdditionalPacketItems();",
+            "\tauto t2oSockAddrInfo = std::find_if(replyItems.begin(), replyItems.end(),",
+            "\t\t\t[](const eip::CommonPacketItem& item) {",
+            "\t\t\t\treturn item.getTypeId() "
+            "== eip::CommonPacketItemIds::T2O_SOCKADDR_INFO;",
+            "\t\t\t});",
+            "\tif (t2oSockAddrInfo != replyItems.end()) {",
+            "\t\tBuffer sockAddrBuffer(t2oSockAddrInfo->getData());",
+            "\t\tsockets::EndPoint group(\"\", 0);",
+            "\t\tsockAddrBuffer >> group;",
+            "\t\t// Join on the interface the session to the target goes through",
+            "\t\tauto session = std::dynamic_pointer_cast<SessionInfo>(si);",
+            "\t\tconst std::string interfaceAddress = "
+            "session ? session->getLocalAddress() : \"0.0.0.0\";",
+            "\t\tfindOrCreateSocket(sockets::EndPoint(si->getRemoteEndPoint().getHost(), "
+            "group.getPort()))",
+            "\t\t\t\t->joinMulticastGroup(group.getHost(), interfaceAddress);",
+            "\t} else {",
+            "\t\tLogger(LogLevel::WARNING) "
+            "<< \"Multicast Forward Open reply without T2O_SOCKADDR_INFO\";",
+            "\t\tfindOrCreateSocket(sockets::EndPoint(si->getRemoteEndPoint().getHost(), "
+            "EIP_DEFAULT_IMPLICIT_PORT));",
+            "\t}",
+            "} else {",
+            "\t" + old_bind,
+            "}",
+        ]
+        new_bind = "\n".join(indent + line for line in block)
+        content = content[:match.start()] + new_bind + content[match.end():]
+        patches_applied += 1
+        print("  Patched: ConnectionManager.cpp (join the multicast T2O group)")
+    else:
+        _patch_failed("receivePort bind not found in ConnectionManager.cpp")
+
+    if "#include <algorithm>" not in content:
+        content = "#include <algorithm>\n" + content
+    if '#include "SessionInfo.h"' not in content:
+        content = '#include "SessionInfo.h"\n' + content
+
+    cm_cpp.write_text(content, encoding="utf-8")
+    print(f"  {patches_applied} file(s) patched")
+
+
+def _patch_eipscanner_recvmmsg(eip_dir):
+    """Add ConnectionManager::handleConnectionsBatched().
+
+    handleConnections() reads one datagram per ready socket and select() call,
+    so at short RPIs with many connections every packet costs a select() and a
+    recvfrom(), plus the allocations of CommonPacket. The batched variant
+    waits with poll() and then drains each readable socket with recvmmsg()
+    into per-thread buffers that are allocated once, parses the CPF framing in
+    place and dispatches every datagram to its IOConnection. It then runs the
+    per-connection ticks (timeouts, O2T heartbeats) itself rather than through
+    handleConnections(), which would select() the sockets a second time. Other
+    platforms fall back to handleConnections().
+
+    The CPF items are walked like CommonPacket::expand() does, so items other
+    than the sequenced address and the connected data are skipped. Datagrams
+    without both are counted (takeMalformedDatagrams()) and logged at most
+    once every 10 s, so a misbehaving adapter cannot flood the log.
+    """
+    print("\nApplying recvmmsg patch...")
+    patches_applied = 0
+
+    # 1. Declarations
+    cm_h = eip_dir / "src" / "ConnectionManager.h"
+    content = cm_h.read_text(encoding="utf-8")
+    marker = "void handleConnections(std::chrono::milliseconds timeout);"
+    members = re.search(r"^([ \t]*)std::(?:unordered_)?map<[^;]*>\s+_connectionMap;",
+                        content, re.MULTILINE)
+    if "handleConnectionsBatched" not in content:
+        if marker not in content or not members:
+            _patch_failed("handleConnections() or _connectionMap not found "
+                          "in ConnectionManager.h")
+        indent = members.group(1)
+        content = content.replace(
+            members.group(0),
+            members.group(0) + "\n\n"
+            f"{indent}// handleConnectionsBatched(): datagrams without valid CPF framing\n"
+            f"{indent}uint64_t _malformedDatagrams = 0;\n"
+            f"{indent}std::chrono::steady_clock::time_point _malformedWarnAt;"
+        )
+        content = content.replace(
+            marker,
+            marker + "\n\n\t\t/**\n"
+                     "\t\t * @brief Same as handleConnections(), but drains every readable socket\n"
+                     "\t\t * with recvmmsg() (Linux) before the per-connection ticks\n"
+                     "\t\t * @return Number of datagrams dispatched to connections\n"
+                     "\t\t */\n"
+                     "\t\tsize_t handleConnectionsBatched(std::chrono::milliseconds timeout);\n"
+                     "\n"
+                     "\t\t/**\n"
+                     "\t\t * @brief Datagrams handleConnectionsBatched() dropped since the last\n"
+                     "\t\t * call because they were not a Class 1 CPF packet\n"
+                     "\t\t */\n"
+                     "\t\tuint64_t takeMalformedDatagrams();"
+        )
+        cm_h.write_text(content, encoding="utf-8")
+        patches_applied += 1
+        print("  Patched: ConnectionManager.h (added handleConnectionsBatched)")
+
+    # 2. Definitions, at the end of ConnectionManager.cpp
+    cm_cpp = eip_dir / "src" / "ConnectionManager.cpp"
+    content = cm_cpp.read_text(encoding="utf-8")
+    if "handleConnectionsBatched" not in content:
+        content += (
+            '\n'
+            '#ifdef __linux__\n'
+            '#include <poll.h>\n'
+            '#include <sys/socket.h>\n'
+            '#include <sys/uio.h>\n'
+            '#endif\n'
+            '#include <array>\n'
+            '#include <cstring>\n'
+            '\n'
+            'uint64_t eipScanner::ConnectionManager::takeMalformedDatagrams() {\n'
+            '\tconst uint64_t count = _malformedDatagrams;\n'
+            '\t_malformedDatagrams = 0;\n'
+            '\treturn count;\n'
+            '}\n'
+            '\n'
+            '#ifdef __linux__\n'
+            '// Walks the CPF items of a Class 1 datagram like CommonPacket::expand():\n'
+            '// the sequenced address item (0x8002) names the connection, the connected\n'
+            '// data item (0x00B1) holds the payload, any other item is skipped\n'
+            'static bool parseClass1Packet(const uint8_t* p, size_t size,\n'
+            '\t\teipScanner::cip::CipUdint& connectionId, const uint8_t*& data,\n'
+            '\t\tsize_t& dataSize) {\n'
+            '\tauto u16 = [p](size_t offset) {\n'
+            '\t\treturn static_cast<uint16_t>(p[offset] | (p[offset + 1] << 8));\n'
+            '\t};\n'
+            '\tif (size < 2) {\n'
+            '\t\treturn false;\n'
+            '\t}\n'
+            '\n'
+            '\tbool hasAddress = false;\n'
+            '\tdata = nullptr;\n'
+            '\tsize_t offset = 2;\n'
+            '\tfor (uint16_t item = 0, items = u16(0); item < items; item++) {\n'
+            '\t\tif (offset + 4 > size || offset + 4 + u16(offset + 2) > size) {\n'
+            '\t\t\treturn false;\n'
+            '\t\t}\n'
+            '\t\tconst uint16_t type = u16(offset);\n'
+            '\t\tconst uint16_t length = u16(offset + 2);\n'
+            '\t\tif (type == 0x8002 && length == 8) {\n'
+            '\t\t\tconnectionId = static_cast<eipScanner::cip::CipUdint>(u16(offset + 4))\n'
+            '\t\t\t\t| static_cast<eipScanner::cip::CipUdint>(u16(offset + 6)) << 16;\n'
+            '\t\t\thasAddress = true;\n'
+            '\t\t} else if (type == 0x00B1) {\n'
+            '\t\t\tdata = p + offset + 4;\n'
+            '\t\t\tdataSize = length;\n'
+            '\t\t}\n'
+            '\t\toffset += 4 + length;\n'
+            '\t}\n'
+            '\treturn hasAddress && data;\n'
+            '}\n'
+            '#endif\n'
+            '\n'
+            'size_t eipScanner::ConnectionManager::handleConnectionsBatched(\n'
+            '\t\tstd::chrono::milliseconds timeout) {\n'
+            '#ifdef __linux__\n'
+            '\tusing eipScanner::utils::Logger;\n'
+            '\tusing eipScanner::utils::LogLevel;\n'
+            '\n'
+            '\tconstexpr size_t kBatch = 64;\n'
+            '\tconstexpr size_t kDatagramSize = 4096 + 32;  // Large Forward Open payload + CPF\n'
+            '\n'
+            '\t// Allocated once per thread, reused by every call\n'
+            '\tstruct Pool {\n'
+            '\t\tstd::vector<uint8_t> storage;\n'
+            '\t\tstd::array<mmsghdr, kBatch> headers;\n'
+            '\t\tstd::array<iovec, kBatch> iovecs;\n'
+            '\t\tstd::vector<uint8_t> data;\n'
+            '\t\tstd::vector<pollfd> fds;\n'
+            '\t\tstd::vector<cip::CipUdint> closing;\n'
+            '\n'
+            '\t\tPool() : storage(kBatch * kDatagramSize) {\n'
+            '\t\t\tstd::memset(headers.data(), 0, sizeof(headers));\n'
+            '\t\t\tfor (size_t i = 0; i < kBatch; i++) {\n'
+            '\t\t\t\tiovecs[i].iov_base = storage.data() + i * kDatagramSize;\n'
+            '\t\t\t\tiovecs[i].iov_len = kDatagramSize;\n'
+            '\t\t\t\theaders[i].msg_hdr.msg_iov = &iovecs[i];\n'
+            '\t\t\t\theaders[i].msg_hdr.msg_iovlen = 1;\n'
+            '\t\t\t}\n'
+            '\t\t\tdata.reserve(kDatagramSize);\n'
+            '\t\t}\n'
+            '\t};\n'
+            '\tstatic thread_local Pool pool;\n'
+            '\n'
+            '\tpool.fds.clear();\n'
+            '\tfor (auto& entry : _socketMap) {\n'
+            '\t\tpool.fds.push_back({entry.second->getSocketFd(), POLLIN, 0});\n'
+            '\t}\n'
+            '\n'
+            '\tsize_t dispatched = 0;\n'
+            '\tif (::poll(pool.fds.data(), pool.fds.size(), '
+            'static_cast<int>(timeout.count())) > 0) {\n'
+            '\t\tfor (const auto& fd : pool.fds) {\n'
+            '\t\t\tif (!(fd.revents & POLLIN)) {\n'
+            '\t\t\t\tcontinue;\n'
+            '\t\t\t}\n'
+            '\n'
+            '\t\t\tint count = 0;\n'
+            '\t\t\tdo {\n'
+            '\t\t\t\tcount = ::recvmmsg(fd.fd, pool.headers.data(), kBatch, MSG_DONTWAIT,\n'
+            '\t\t\t\t\tnullptr);\n'
+            '\t\t\t\tfor (int i = 0; i < count; i++) {\n'
+            '\t\t\t\t\tconst auto* p = static_cast<const uint8_t*>(pool.iovecs[i].iov_base);\n'
+            '\t\t\t\t\tconst size_t size = pool.headers[i].msg_len;\n'
+            '\n'
+            '\t\t\t\t\tcip::CipUdint connectionId = 0;\n'
+            '\t\t\t\t\tconst uint8_t* data = nullptr;\n'
+            '\t\t\t\t\tsize_t dataSize = 0;\n'
+            '\t\t\t\t\tif (!parseClass1Packet(p, size, connectionId, data, dataSize)) {\n'
+            '\t\t\t\t\t\t_malformedDatagrams++;\n'
+            '\t\t\t\t\t\tconst auto now = std::chrono::steady_clock::now();\n'
+            '\t\t\t\t\t\tif (now >= _malformedWarnAt) {\n'
+            '\t\t\t\t\t\t\t_malformedWarnAt = now + std::chrono::seconds(10);\n'
+            '\t\t\t\t\t\t\tLogger(LogLevel::WARNING) << "Dropped a malformed implicit I/O "\n'
+            '\t\t\t\t\t\t\t\t<< "datagram of " << size << " bytes (further ones are "\n'
+            '\t\t\t\t\t\t\t\t<< "only counted for 10 s)";\n'
+            '\t\t\t\t\t\t}\n'
+            '\t\t\t\t\t\tcontinue;\n'
+            '\t\t\t\t\t}\n'
+            '\n'
+            '\t\t\t\t\tauto io = _connectionMap.find(connectionId);\n'
+            '\t\t\t\t\tif (io == _connectionMap.end()) {\n'
+            '\t\t\t\t\t\tLogger(LogLevel::ERROR) << "Received data from unknown connection "\n'
+            '\t\t\t\t\t\t\t<< "T2O_ID=" << connectionId;\n'
+            '\t\t\t\t\t\tcontinue;\n'
+            '\t\t\t\t\t}\n'
+            '\n'
+            '\t\t\t\t\tpool.data.assign(data, data + dataSize);\n'
+            '\t\t\t\t\tio->second->notifyReceiveData(pool.data);\n'
+            '\t\t\t\t\tdispatched++;\n'
+            '\t\t\t\t}\n'
+            '\t\t\t} while (count == static_cast<int>(kBatch));\n'
+            '\t\t}\n'
+            '\t}\n'
+            '\n'
+            '\t// Connection timeouts and O2T heartbeats, as in handleConnections()\n'
+            '\tpool.closing.clear();\n'
+            '\tfor (auto& entry : _connectionMap) {\n'
+            '\t\tif (!entry.second->notifyTick()) {\n'
+            '\t\t\tpool.closing.push_back(entry.first);\n'
+            '\t\t}\n'
+            '\t}\n'
+            '\tfor (auto connectionId : pool.closing) {\n'
+            '\t\t_connectionMap.erase(connectionId);\n'
+            '\t}\n'
+            '\treturn dispatched;\n'
+            '#else\n'
+            '\thandleConnections(timeout);\n'
+            '\treturn 0;\n'
+            '#endif\n'
+            '}\n'
+        )
+        cm_cpp.write_text(content, encoding="utf-8")
+        patches_applied += 1
+        print("  Patched: ConnectionManager.cpp (handleConnectionsBatched with recvmmsg)")
+
+    print(f"  {patches_applied} file(s) patched")
+
+
+def _patch_eipscanner_shared_port(eip_dir):
+    """Share one receive socket per local port across every connection.
+
+    ConnectionManager keys its bound sockets by (PLC address, port), so a
+    BridgeGroup with N PLCs on port 2222 opened N sockets on the same port.
+    Keying them by the local port alone binds 2222 once; incoming Class 1
+    packets are routed by T2O connection ID, and the connection index becomes
+    an unordered_map for that lookup.
+    """
+    print("\nApplying shared receive port patch...")
+    patches_applied = 0
+
+    # 1. Key the receive sockets by local port only
+    cm_cpp = eip_dir / "src" / "ConnectionManager.cpp"
+    content = cm_cpp.read_text(encoding="utf-8")
+    old_key = "findOrCreateSocket(sockets::EndPoint(si->getRemoteEndPoint().getHost(), "
+    new_key = 'findOrCreateSocket(sockets::EndPoint("0.0.0.0", '
+    if old_key in content:
+        content = content.replace(old_key, new_key)
+        cm_cpp.write_text(content, encoding="utf-8")
+        patches_applied += 1
+        print("  Patched: ConnectionManager.cpp (one receive socket per local port)")
+    elif new_key not in content:
+        _patch_failed("findOrCreateSocket() calls not found in ConnectionManager.cpp")
+
+    # 2. Hash index from T2O connection ID to connection
+    cm_h = eip_dir / "src" / "ConnectionManager.h"
+    content = cm_h.read_text(encoding="utf-8")
+    content, replaced = re.subn(r"std::map<([^;]*)>\s+_connectionMap;",
+                                r"std::unordered_map<\1> _connectionMap;", content)
+    if replaced:
+        if "#include <unordered_map>" not in content:
+            content = content.replace("#include <map>",
+                                      "#include <map>\n#include <unordered_map>", 1)
+        if "#include <unordered_map>" not in content:
+            content = "#include <unordered_map>\n" + content
+        cm_h.write_text(content, encoding="utf-8")
+        patches_applied += 1
+        print("  Patched: ConnectionManager.h (unordered_map connection index)")
+    elif "std::unordered_map" not in content:
+        _patch_failed("_connectionMap not found in ConnectionManager.h")
+
+    print(f"  {patches_applied} file(s) patched")
+
+
+def _patch_eipscanner_socket_options(eip_dir):
+    """Add ConnectionManager::setSocketOptions() and kernel receive timestamps.
+
+    The receive sockets get SO_RCVBUF (SO_RCVBUFFORCE when permitted),
+    SO_BUSY_POLL and SO_TIMESTAMPNS on request, and always SO_RXQ_OVFL so the
+    datagrams the kernel drops on a full buffer are counted
+    (takeReceiveDrops()). DSCP is set on the receive and O2T sockets. The
+    recvmmsg loop reads the control messages of every datagram and exposes its
+    kernel receive time to the listener through receiveTimestampNs(). Needs the
+    recvmmsg and shared port patches; other platforms ignore the options.
+    """
+    print("\nApplying socket options patch...")
+    patches_applied = 0
+
+    # 1. Declarations
+    cm_h = eip_dir / "src" / "ConnectionManager.h"
+    content = cm_h.read_text(encoding="utf-8")
+    marker = "size_t handleConnectionsBatched(std::chrono::milliseconds timeout);"
+    members = re.search(r"^([ \t]*)std::(?:unordered_)?map<[^;]*>\s+_connectionMap;",
+                        content, re.MULTILINE)
+    if "setSocketOptions" not in content:
+        if marker not in content or not members:
+            _patch_failed("handleConnectionsBatched() or _connectionMap not found "
+                          "in ConnectionManager.h")
+        indent = members.group(1)
+        content = content.replace(
+            members.group(0),
+            members.group(0) + "\n\n"
+            f"{indent}// setSocketOptions(), and the kernel drop counters of the receive sockets\n"
+            f"{indent}int _receiveBufferBytes = 0;\n"
+            f"{indent}int _busyPollUs = 0;\n"
+            f"{indent}int _dscp = -1;\n"
+            f"{indent}bool _timestamps = false;\n"
+            f"{indent}int _effectiveReceiveBufferBytes = 0;\n"
+            f"{indent}uint64_t _receiveDrops = 0;\n"
+            f"{indent}std::unordered_map<int, uint32_t> _dropCounters;\n"
+            "\n"
+            f"{indent}void applySocketOptions(int fd, bool receive);\n"
+            f"{indent}static int64_t& currentReceiveTimestamp();"
+        )
+        content = content.replace(
+            marker,
+            marker + "\n\n\t\t/**\n"
+                     "\t\t * @brief Options of the receive sockets (DSCP also of the O2T\n"
+                     "\t\t * sockets), applied to the open sockets and to every socket\n"
+                     "\t\t * opened later (Linux)\n"
+                     "\t\t * @param receiveBufferBytes SO_RCVBUF, 0 = system default\n"
+                     "\t\t * @param busyPollUs SO_BUSY_POLL, 0 = off\n"
+                     "\t\t * @param dscp DSCP of the packets sent (0..63), -1 = unchanged\n"
+                     "\t\t * @param timestamps SO_TIMESTAMPNS kernel receive timestamps\n"
+                     "\t\t */\n"
+                     "\t\tvoid setSocketOptions(int receiveBufferBytes, int busyPollUs, int dscp,\n"
+                     "\t\t\t\tbool timestamps);\n"
+                     "\n"
+                     "\t\t/**\n"
+                     "\t\t * @brief Receive buffer of the last configured receive socket, as\n"
+                     "\t\t * granted by the kernel\n"
+                     "\t\t */\n"
+                     "\t\tint getReceiveBufferBytes() const;\n"
+                     "\n"
+                     "\t\t/**\n"
+                     "\t\t * @brief Datagrams the kernel dropped on the receive sockets since the\n"
+                     "\t\t * last call (SO_RXQ_OVFL, seen by handleConnectionsBatched())\n"
+                     "\t\t */\n"
+                     "\t\tuint64_t takeReceiveDrops();\n"
+                     "\n"
+                     "\t\t/**\n"
+                     "\t\t * @brief Kernel receive time (CLOCK_REALTIME, ns) of the datagram\n"
+                     "\t\t * being handed to a receive listener on this thread, 0 if unknown\n"
+                     "\t\t */\n"
+                     "\t\tstatic int64_t receiveTimestampNs();"
+        )
+        cm_h.write_text(content, encoding="utf-8")
+        patches_applied += 1
+        print("  Patched: ConnectionManager.h (added setSocketOptions)")
+
+    cm_cpp = eip_dir / "src" / "ConnectionManager.cpp"
+    content = cm_cpp.read_text(encoding="utf-8")
+    if "setSocketOptions" not in content:
+        # 2. Control messages in the recvmmsg loop
+        loop_edits = [
+            ("\tconstexpr size_t kBatch = 64;\n",
+             "\tconstexpr size_t kBatch = 64;\n"
+             "\tconstexpr size_t kControlSize = CMSG_SPACE(sizeof(timespec))\n"
+             "\t\t+ CMSG_SPACE(sizeof(uint32_t));  // SCM_TIMESTAMPNS, SO_RXQ_OVFL\n"),
+            ("\t\tstd::vector<pollfd> fds;\n",
+             "\t\tstd::vector<pollfd> fds;\n"
+             "\t\tstd::array<std::array<char, kControlSize>, kBatch> control;\n"),
+            ("\t\t\t\theaders[i].msg_hdr.msg_iovlen = 1;\n",
+             "\t\t\t\theaders[i].msg_hdr.msg_iovlen = 1;\n"
+             "\t\t\t\theaders[i].msg_hdr.msg_control = control[i].data();\n"),
+            ("\t\t\tint count = 0;\n",
+             "\t\t\tint count = 0;\n"
+             "\t\t\tuint32_t& dropCounter = _dropCounters[fd.fd];\n"),
+            ("\t\t\t\tcount = ::recvmmsg(",
+             "\t\t\t\tfor (auto& header : pool.headers) {\n"
+             "\t\t\t\t\theader.msg_hdr.msg_controllen = kControlSize;\n"
+             "\t\t\t\t}\n"
+             "\t\t\t\tcount = ::recvmmsg("),
+            ("\t\t\t\t\tconst size_t size = pool.headers[i].msg_len;\n",
+             "\t\t\t\t\tconst size_t size = pool.headers[i].msg_len;\n"
+             "\t\t\t\t\tconst int64_t timestampNs = readControlMessages(\n"
+             "\t\t\t\t\t\tpool.headers[i].msg_hdr, dropCounter, _receiveDrops);\n"),
+            ("\t\t\t\t\tio->second->notifyReceiveData(pool.data);\n",
+             "\t\t\t\t\tcurrentReceiveTimestamp() = timestampNs;\n"
+             "\t\t\t\t\tio->second->notifyReceiveData(pool.data);\n"
+             "\t\t\t\t\tcurrentReceiveTimestamp() = 0;\n"),
+            ("size_t eipScanner::ConnectionManager::handleConnectionsBatched(",
+             "#ifdef __linux__\n"
+             "#include <ctime>\n"
+             "\n"
+             "// Kernel receive time (SO_TIMESTAMPNS, ns since the epoch, 0 if absent) of a\n"
+             "// datagram; adds the datagrams dropped before it (SO_RXQ_OVFL) to drops\n"
+             "static int64_t readControlMessages(msghdr& header, uint32_t& dropCounter,\n"
+             "\t\tuint64_t& drops) {\n"
+             "\tint64_t timestampNs = 0;\n"
+             "\tfor (cmsghdr* message = CMSG_FIRSTHDR(&header); message;\n"
+             "\t\t\tmessage = CMSG_NXTHDR(&header, message)) {\n"
+             "\t\tif (message->cmsg_level != SOL_SOCKET) {\n"
+             "\t\t\tcontinue;\n"
+             "\t\t}\n"
+             "\t\tif (message->cmsg_type == SCM_TIMESTAMPNS) {\n"
+             "\t\t\ttimespec ts;\n"
+             "\t\t\tstd::memcpy(&ts, CMSG_DATA(message), sizeof(ts));\n"
+             "\t\t\ttimestampNs = static_cast<int64_t>(ts.tv_sec) * 1000000000 + ts.tv_nsec;\n"
+             "\t\t} else if (message->cmsg_type == SO_RXQ_OVFL) {\n"
+             "\t\t\tuint32_t count;\n"
+             "\t\t\tstd::memcpy(&count, CMSG_DATA(message), sizeof(count));\n"
+             "\t\t\tdrops += count >= dropCounter ? count - dropCounter : count;\n"
+             "\t\t\tdropCounter = count;\n"
+             "\t\t}\n"
+             "\t}\n"
+             "\treturn timestampNs;\n"
+             "}\n"
+             "#endif\n"
+             "\n"
+             "size_t eipScanner::ConnectionManager::handleConnectionsBatched("),
+        ]
+        if any(old not in content for old, _ in loop_edits):
+            _patch_failed("recvmmsg loop not found in ConnectionManager.cpp")
+        for old, new in loop_edits:
+            content = content.replace(old, new, 1)
+
+        # 3. Configure every receive socket when it is opened, and the O2T sockets for DSCP
+        bind = re.search(r"^([ \t]*)_socketMap\[endPoint\]\s*=\s*(\w+);", content, re.MULTILINE)
+        if not bind:
+            _patch_failed("findOrCreateSocket() not found in ConnectionManager.cpp")
+        content = content.replace(
+            bind.group(0),
+            bind.group(0)
+            + f"\n{bind.group(1)}applySocketOptions({bind.group(2)}->getSocketFd(), true);",
+            1)
+        o2t = re.search(r"^([ \t]*)(\w+)->_socket\s*=\s*std::make_unique<[^;]+;",
+                        content, re.MULTILINE)
+        if not o2t:
+            _patch_failed("O2T socket not found in ConnectionManager.cpp")
+        content = content.replace(
+            o2t.group(0),
+            o2t.group(0)
+            + f"\n{o2t.group(1)}applySocketOptions({o2t.group(2)}->_socket->getSocketFd(), false);",
+            1)
+
+        # 4. Definitions, at the end of ConnectionManager.cpp
+        content += (
+            '\n'
+            '#ifdef __linux__\n'
+            '#include <netinet/in.h>\n'
+            '#include <netinet/ip.h>\n'
+            '#endif\n'
+            '#include <cerrno>\n'
+            '\n'
+            'int64_t& eipScanner::ConnectionManager::currentReceiveTimestamp() {\n'
+            '\tstatic thread_local int64_t timestampNs = 0;\n'
+            '\treturn timestampNs;\n'
+            '}\n'
+            '\n'
+            'int64_t eipScanner::ConnectionManager::receiveTimestampNs() {\n'
+            '\treturn currentReceiveTimestamp();\n'
+            '}\n'
+            '\n'
+            'void eipScanner::ConnectionManager::setSocketOptions(int receiveBufferBytes,\n'
+            '\t\tint busyPollUs, int dscp, bool timestamps) {\n'
+            '\t_receiveBufferBytes = receiveBufferBytes;\n'
+            '\t_busyPollUs = busyPollUs;\n'
+            '\t_dscp = dscp;\n'
+            '\t_timestamps = timestamps;\n'
+            '\tfor (auto& entry : _socketMap) {\n'
+            '\t\tapplySocketOptions(entry.second->getSocketFd(), true);\n'
+            '\t}\n'
+            '}\n'
+            '\n'
+            'int eipScanner::ConnectionManager::getReceiveBufferBytes() const {\n'
+            '\treturn _effectiveReceiveBufferBytes;\n'
+            '}\n'
+            '\n'
+            'uint64_t eipScanner::ConnectionManager::takeReceiveDrops() {\n'
+            '\tconst uint64_t drops = _receiveDrops;\n'
+            '\t_receiveDrops = 0;\n'
+            '\treturn drops;\n'
+            '}\n'
+            '\n'
+            'void eipScanner::ConnectionManager::applySocketOptions(int fd, bool receive) {\n'
+            '#ifdef __linux__\n'
+            '\tusing eipScanner::utils::Logger;\n'
+            '\tusing eipScanner::utils::LogLevel;\n'
+            '\n'
+            '\tif (_dscp >= 0) {\n'
+            '\t\tconst int tos = (_dscp & 0x3F) << 2;\n'
+            '\t\tif (::setsockopt(fd, IPPROTO_IP, IP_TOS, &tos, sizeof(tos)) != 0) {\n'
+            '\t\t\tLogger(LogLevel::WARNING) << "Cannot set DSCP " << _dscp << ": "\n'
+            '\t\t\t\t<< std::strerror(errno);\n'
+            '\t\t}\n'
+            '\t}\n'
+            '\tif (!receive) {\n'
+            '\t\treturn;\n'
+            '\t}\n'
+            '\n'
+            '\tconst int on = 1;\n'
+            '\t::setsockopt(fd, SOL_SOCKET, SO_RXQ_OVFL, &on, sizeof(on));\n'
+            '\tif (_timestamps\n'
+            '\t\t\t&& ::setsockopt(fd, SOL_SOCKET, SO_TIMESTAMPNS, &on, sizeof(on)) != 0) {\n'
+            '\t\tLogger(LogLevel::WARNING) << "Cannot enable kernel receive timestamps: "\n'
+            '\t\t\t<< std::strerror(errno);\n'
+            '\t}\n'
+            '\n'
+            '\tif (_receiveBufferBytes > 0) {\n'
+            '\t\t// SO_RCVBUFFORCE may exceed net.core.rmem_max, with CAP_NET_ADMIN\n'
+            '\t\tconst int bytes = _receiveBufferBytes;\n'
+            '\t\tif (::setsockopt(fd, SOL_SOCKET, SO_RCVBUFFORCE, &bytes, sizeof(bytes)) != 0) {\n'
+            '\t\t\t::setsockopt(fd, SOL_SOCKET, SO_RCVBUF, &bytes, sizeof(bytes));\n'
+            '\t\t}\n'
+            '\t}\n'
+            '\tint size = 0;\n'
+            '\tsocklen_t length = sizeof(size);\n'
+            '\tif (::getsockopt(fd, SOL_SOCKET, SO_RCVBUF, &size, &length) == 0) {\n'
+            '\t\t// The kernel doubles it for its bookkeeping\n'
+            '\t\t_effectiveReceiveBufferBytes = size / 2;\n'
+            '\t\tif (_effectiveReceiveBufferBytes < _receiveBufferBytes) {\n'
+            '\t\t\tLogger(LogLevel::WARNING) << "Receive buffer is "\n'
+            '\t\t\t\t<< _effectiveReceiveBufferBytes << " bytes instead of "\n'
+            '\t\t\t\t<< _receiveBufferBytes\n'
+            '\t\t\t\t<< " (raise net.core.rmem_max or grant CAP_NET_ADMIN)";\n'
+            '\t\t}\n'
+            '\t}\n'
+            '\n'
+            '\tif (_busyPollUs > 0 && ::setsockopt(fd, SOL_SOCKET, SO_BUSY_POLL,\n'
+            '\t\t\t&_busyPollUs, sizeof(_busyPollUs)) != 0) {\n'
+            '\t\tLogger(LogLevel::WARNING) << "Cannot enable busy polling: "\n'
+            '\t\t\t<< std::strerror(errno)\n'
+            '\t\t\t<< " (above net.core.busy_read it needs CAP_NET_ADMIN)";\n'
+            '\t}\n'
+            '#else\n'
+            '\t(void)fd;\n'
+            '\t(void)receive;\n'
+            '#endif\n'
+            '}\n'
+        )
+        cm_cpp.write_text(content, encoding="utf-8")
+        patches_applied += 1
+        print("  Patched: ConnectionManager.cpp "
+              "(socket options, kernel timestamps and drop counter)")
+
+    print(f"  {patches_applied} file(s) patched")
+
+
+
+def _patch_eipscanner_threads(eip_dir):
+    """Let several threads share one ConnectionManager.
+
+    A BridgeGroup reconnects its PLCs on helper threads while the worker keeps
+    handling the other connections. ConnectionManager gets a mutex (mutex())
+    that callers hold around every call. forwardOpen() releases it while the
+    request is on the wire, which takes up to the session timeout on a dead
+    PLC, and handleConnectionsBatched() while it polls, so neither holds up
+    the other thread for longer than it takes to update the connection and
+    socket maps or to dispatch a batch. Needs the receivePort and recvmmsg
+    patches.
+    """
+    print("\nApplying thread-safety patch...")
+    patches_applied = 0
+
+    # 1. The mutex, and a scope that releases it
+    cm_h = eip_dir / "src" / "ConnectionManager.h"
+    content = cm_h.read_text(encoding="utf-8")
+    marker = "size_t handleConnectionsBatched(std::chrono::milliseconds timeout);"
+    members = re.search(r"^([ \t]*)std::(?:unordered_)?map<[^;]*>\s+_connectionMap;",
+                        content, re.MULTILINE)
+    if "_mutex" not in content:
+        if marker not in content or not members:
+            _patch_failed("handleConnectionsBatched() or _connectionMap not found "
+                          "in ConnectionManager.h")
+        indent = members.group(1)
+        content = content.replace(
+            members.group(0),
+            members.group(0) + "\n\n"
+            f"{indent}std::mutex _mutex;\n"
+            "\n"
+            f"{indent}// Releases _mutex for a scope, e.g. while a request is on the wire\n"
+            f"{indent}struct Unlocked {{\n"
+            f"{indent}\tstd::mutex& mutex;\n"
+            f"{indent}\texplicit Unlocked(std::mutex& m) : mutex(m) {{ mutex.unlock(); }}\n"
+            f"{indent}\t~Unlocked() {{ mutex.lock(); }}\n"
+            f"{indent}}};"
+        )
+        content = content.replace(
+            marker,
+            marker + "\n\n\t\t/**\n"
+                     "\t\t * @brief Lock for calling one ConnectionManager from several threads\n"
+                     "\t\t *\n"
+                     "\t\t * Hold it around every call. forwardOpen() releases it while it\n"
+                     "\t\t * waits for the reply of the target, handleConnectionsBatched() while\n"
+                     "\t\t * it polls the sockets.\n"
+                     "\t\t */\n"
+                     "\t\tstd::mutex& mutex() { return _mutex; }"
+        )
+        if "#include <mutex>" not in content:
+            content = content.replace("#include <map>", "#include <map>\n#include <mutex>", 1)
+        if "#include <mutex>" not in content:
+            content = "#include <mutex>\n" + content
+        cm_h.write_text(content, encoding="utf-8")
+        patches_applied += 1
+        print("  Patched: ConnectionManager.h (added mutex)")
+
+    cm_cpp = eip_dir / "src" / "ConnectionManager.cpp"
+    content = cm_cpp.read_text(encoding="utf-8")
+    if "Unlocked unlocked(_mutex);" not in content:
+        # 2. forwardOpen(): no lock while waiting for the reply
+        start = "\t\tMessageRouterResponse messageRouterResponse;\n\t\tif (isLarge) {\n"
+        end = "EPath(6, 1), request.pack(), fwdOpenItems);\n\t\t}\n"
+        begin = content.find(start)
+        finish = content.find(end, begin)
+        if begin < 0 or finish < 0:
+            _patch_failed("Forward Open request not found in ConnectionManager.cpp")
+        begin += len("\t\tMessageRouterResponse messageRouterResponse;\n")
+        finish += len(end)
+        request = "".join("\t" + line for line in content[begin:finish].splitlines(True))
+        content = (content[:begin]
+                   + "\t\t{\n"
+                   + "\t\t\t// Other threads may handle their connections meanwhile\n"
+                   + "\t\t\tUnlocked unlocked(_mutex);\n"
+                   + request
+                   + "\t\t}\n"
+                   + content[finish:])
+
+        # 3. handleConnectionsBatched(): no lock while polling
+        old_poll = ("\tif (::poll(pool.fds.data(), pool.fds.size(), "
+                    "static_cast<int>(timeout.count())) > 0) {\n")
+        new_poll = ("\tint ready = 0;\n"
+                    "\t{\n"
+                    "\t\t// Other threads may open connections meanwhile\n"
+                    "\t\tUnlocked unlocked(_mutex);\n"
+                    "\t\tready = ::poll(pool.fds.data(), pool.fds.size(),\n"
+                    "\t\t\tstatic_cast<int>(timeout.count()));\n"
+                    "\t}\n"
+                    "\tif (ready > 0) {\n")
+        if old_poll not in content:
+            _patch_failed("recvmmsg poll() not found in ConnectionManager.cpp")
+        content = content.replace(old_poll, new_poll, 1)
+        cm_cpp.write_text(content, encoding="utf-8")
+        patches_applied += 1
+        print("  Patched: ConnectionManager.cpp (unlocked Forward Open request and poll)")
+
+    print(f"  {patches_applied} file(s) patched")
+
 def build_eipscanner(cfg=None):
     """Build EIPScanner"""
     if cfg is None:
@@ -210,6 +1061,21 @@ def build_eipscanner(cfg=None):
     # Apply receivePort patch (all platforms)
     _patch_eipscanner_receive_port(eip_dir)
 
+    # Apply multicast T2O patch (all platforms, needs the receivePort patch)
+    _patch_eipscanner_multicast(eip_dir)
+
+    # Apply batched receive patch (recvmmsg on Linux, all platforms)
+    _patch_eipscanner_recvmmsg(eip_dir)
+
+    # Apply shared receive port patch (all platforms, after the patches above)
+    _patch_eipscanner_shared_port(eip_dir)
+
+    # Apply socket options patch (all platforms, after the patches above)
+    _patch_eipscanner_socket_options(eip_dir)
+
+    # Apply thread-safety patch (all platforms, after the patches above)
+    _patch_eipscanner_threads(eip_dir)
+
     # Build
     eip_build_dir.mkdir(exist_ok=True)
 
@@ -59,6 +59,8 @@ def _build_gcc(cfg, nats_dir, eip_dir, source, output):
         f"-I{cfg.src_dir}",
         str(source),
         str(cfg.src_dir / "EIPtoNATSBridge.cpp"),
+        str(cfg.src_dir / "BridgeGroup.cpp"),
+        str(cfg.src_dir / "DiskSpool.cpp"),
         f"-L{cfg.lib_dir}",
         "-lnats",
         "-lEIPScanner",
@@ -80,6 +82,8 @@ def _build_msvc(cfg, nats_dir, eip_dir, source, output, build_dir):
     lib_dir = str(cfg.lib_dir).replace("\\", "/")
     source_str = str(source).replace("\\", "/")
     bridge_src = str(cfg.src_dir / "EIPtoNATSBridge.cpp").replace("\\", "/")
+    group_src = str(cfg.src_dir / "BridgeGroup.cpp").replace("\\", "/")
+    spool_src = str(cfg.src_dir / "DiskSpool.cpp").replace("\\", "/")
     output_dir = str(build_dir).replace("\\", "/")
 
     cmakelists.write_text(f"""cmake_minimum_required(VERSION 3.14)
@@ -89,6 +93,8 @@ set(CMAKE_CXX_STANDARD 17)
 add_executable(example_cpp
     {source_str}
     {bridge_src}
+    {group_src}
+    {spool_src}
 )
 
 target_include_directories(example_cpp PRIVATE
@@ -0,0 +1,457 @@
+#include "BridgeGroup.h"
+#include "utils/Logger.h"
+#include <algorithm>
+#include <stdexcept>
+
+using namespace bridge;
+using namespace eipScanner;
+using namespace eipScanner::utils;
+
+BridgeGroup::BridgeGroup(const std::string& natsUrl, bool eventDriven, const NatsOptions& natsOptions,
+                         const ThreadOptions& threadOptions, const SocketOptions& socketOptions)
+    : natsUrl_(natsUrl)
+    , eventDriven_(eventDriven)
+    , natsOptions_(natsOptions)
+    , threadOptions_(threadOptions)
+    , socketOptions_(socketOptions)
+    , natsConn_(nullptr)
+    , natsOpts_(nullptr)
+    , connectionManager_(nullptr)
+    , running_(false)
+    , shouldStop_(false)
+    , stopPublisher_(false)
+    , pollTimeout_(1)
+{
+    Logger(LogLevel::INFO) << "BridgeGroup created - NATS: " << natsUrl
+                           << (eventDriven ? " (event-driven)" : "");
+}
+
+BridgeGroup::~BridgeGroup() {
+    if (running_) {
+        Logger(LogLevel::WARNING) << "BridgeGroup destroyed while running - stopping...";
+        stop();
+    }
+}
+
+EIPtoNATSBridge& BridgeGroup::addBridge(const std::string& plcAddress,
+                                        const std::string& natsSubject,
+                                        bool useBinaryFormat,
+                                        uint8_t configAssembly,
+                                        uint8_t o2tAssembly,
+                                        uint8_t t2oAssembly,
+                                        uint16_t t2oSize,
+                                        uint32_t rpi,
+                                        uint16_t port,
+                                        size_t queueDepth,
+                                        OverflowPolicy overflowPolicy,
+                                        uint32_t batchMaxPackets,
+                                        uint32_t batchMaxDelayUs,
+                                        JsonEncoding jsonEncoding,
+                                        bool changeOnly,
+                                        const std::vector<uint8_t>& changeMask,
+                                        uint32_t heartbeatMs,
+                                        bool tagSequence,
+                                        bool natsHeaders,
+                                        const JetStreamOptions& jetStreamOptions,
+                                        const SpoolOptions& spoolOptions,
+                                        const ReconnectOptions& reconnectOptions,
+                                        ConnectionType connectionType,
+                                        bool t2oRunIdleHeader) {
+    // Not waiting: a stop() in progress may need the caller's GIL
+    std::unique_lock<std::mutex> lifecycle(lifecycleMutex_, std::try_to_lock);
+    if (!lifecycle.owns_lock() || running_) {
+        throw std::runtime_error("Cannot add a bridge while the BridgeGroup is running");
+    }
+
+    // Every consumer of a multicast stream gets the same T2O connection ID
+    if (connectionType != ConnectionType::PointToPoint) {
+        for (const auto& other : bridges_) {
+            if (other->connectionType_ != ConnectionType::PointToPoint &&
+                other->plcAddress_ == plcAddress && other->t2oAssembly_ == t2oAssembly) {
+                throw std::runtime_error("Bridge for " + natsSubject + " would receive the same multicast "
+                                         "stream as the one for " + other->natsSubject_ +
+                                         "; use a separate bridge or BridgeGroup for it");
+            }
+        }
+    }
+
+    auto bridge = std::make_unique<EIPtoNATSBridge>(plcAddress, natsUrl_, natsSubject,
+                                                    useBinaryFormat, configAssembly,
+                                                    o2tAssembly, t2oAssembly, t2oSize,
+                                                    rpi, port, queueDepth, overflowPolicy,
+                                                    batchMaxPackets, batchMaxDelayUs,
+                                                    jsonEncoding, eventDriven_,
+                                                    changeOnly, changeMask, heartbeatMs,
+                                                    tagSequence, natsHeaders, jetStreamOptions,
+                                                    spoolOptions,
+                                                    natsOptions_, reconnectOptions, connectionType,
+                                                    threadOptions_, socketOptions_,
+                                                    t2oRunIdleHeader);
+    bridge->hosted_ = true;
+    bridge->signal_ = &signal_;
+    bridge->natsEvents_ = &natsEvents_;
+    bridge->threadStatus_ = &threadStatus_;
+    bridge->socketStats_ = &socketStats_;
+
+    bridges_.push_back(std::move(bridge));
+    return *bridges_.back();
+}
+
+bool BridgeGroup::start() {
+    std::lock_guard<std::mutex> lifecycle(lifecycleMutex_);
+
+    if (running_) {
+        Logger(LogLevel::WARNING) << "BridgeGroup is already running";
+        return false;
+    }
+
+    if (bridges_.empty()) {
+        Logger(LogLevel::WARNING) << "BridgeGroup has no bridges to start";
+        return false;
+    }
+
+    Logger(LogLevel::INFO) << "Starting BridgeGroup with " << bridges_.size() << " bridges...";
+
+    // One NATS connection for every bridge; with a spool it has to outlive outages
+    const bool keepTrying = std::any_of(bridges_.begin(), bridges_.end(),
+                                        [](const auto& bridge) { return bridge->spool_ != nullptr; });
+    if (!EIPtoNATSBridge::connectNATS(natsUrl_, natsOptions_, natsEvents_,
+                                      natsConn_, natsOpts_, keepTrying)) {
+        Logger(LogLevel::ERROR) << "Failed to initialize NATS";
+        return false;
+    }
+
+    // Every bridge publishes on the shared connection (JetStream bridges
+    // through their own context on it)
+    for (auto& bridge : bridges_) {
+        {
+            std::lock_guard<std::mutex> lock(bridge->natsMutex_);
+            bridge->natsConn_ = natsConn_;
+        }
+        if (!bridge->openJetStream()) {
+            releaseNATS();
+            return false;
+        }
+    }
+
+    // One ConnectionManager, so a single handleConnections() serves every PLC
+    connectionManager_ = std::make_shared<ConnectionManager>();
+    EIPtoNATSBridge::configureSockets(*connectionManager_, socketOptions_);
+
+    // The worker has to wake up for the bridge with the shortest RPI
+    pollTimeout_ = std::chrono::milliseconds(EIPtoNATSBridge::kMaxPollTimeoutMs);
+    for (const auto& bridge : bridges_) {
+        pollTimeout_ = std::min(pollTimeout_, bridge->pollTimeout_);
+    }
+
+    for (auto& bridge : bridges_) {
+        bridge->connectionManager_ = connectionManager_;
+        bridge->shouldStop_ = false;
+        bridge->needsReconnect_ = false;
+        // From here on setDataCallback() refuses, before startDelivery() reads the callback
+        std::lock_guard<std::mutex> bridgeLifecycle(bridge->lifecycleMutex_);
+        bridge->running_ = true;
+    }
+
+    const auto now = std::chrono::steady_clock::now();
+    connected_.assign(bridges_.size(), false);
+    everConnected_.assign(bridges_.size(), false);
+    retryAt_.assign(bridges_.size(), now);
+    pendingConnects_.clear();
+    pendingConnects_.resize(bridges_.size());
+
+    // Connect to every PLC at once
+    for (size_t i = 0; i < bridges_.size(); i++) {
+        bridges_[i]->backoff_.reset();
+        connectBridge(i);
+    }
+    for (size_t i = 0; i < bridges_.size(); i++) {
+        finishConnect(i);
+    }
+
+    EIPtoNATSBridge::lockMemory(threadOptions_, threadStatus_);
+
+    // Start the publisher thread first so it is ready to drain the queues
+    stopPublisher_ = false;
+    publisherThread_ = std::thread(&BridgeGroup::publisherLoop, this);
+    for (auto& bridge : bridges_) {
+        bridge->startDelivery();
+    }
+
+    shouldStop_ = false;
+    running_ = true;
+    workerThread_ = std::thread(&BridgeGroup::workerLoop, this);
+
+    Logger(LogLevel::INFO) << "BridgeGroup started - "
+                           << std::count(connected_.begin(), connected_.end(), true)
+                           << "/" << bridges_.size() << " PLCs connected";
+    return true;
+}
+
+void BridgeGroup::stop() {
+    std::lock_guard<std::mutex> lifecycle(lifecycleMutex_);
+
+    if (!running_) {
+        Logger(LogLevel::WARNING) << "BridgeGroup is already stopped";
+        return;
+    }
+
+    Logger(LogLevel::INFO) << "Stopping BridgeGroup...";
+
+    // Also releases bridges waiting on a full queue in Block mode
+    shouldStop_ = true;
+    for (auto& bridge : bridges_) {
+        bridge->shouldStop_ = true;
+        bridge->roomSignal_.notify();
+    }
+
+    if (workerThread_.joinable()) {
+        workerThread_.join();
+    }
+
+    // Let the publisher drain what is still queued, then stop it
+    {
+        std::lock_guard<std::mutex> lock(signal_.mutex);
+        stopPublisher_ = true;
+    }
+    signal_.cv.notify_one();
+    if (publisherThread_.joinable()) {
+        publisherThread_.join();
+    }
+
+    // Connections still being opened take at most the session timeout
+    for (auto& pending : pendingConnects_) {
+        if (pending.valid()) {
+            pending.wait();
+        }
+    }
+    pendingConnects_.clear();
+
+    for (auto& bridge : bridges_) {
+        bridge->stopDelivery();
+        bridge->closeEIP();
+        bridge->connectionManager_.reset();
+        bridge->running_ = false;
+    }
+
+    connectionManager_.reset();
+    releaseNATS();
+
+    running_ = false;
+
+    Logger(LogLevel::INFO) << "BridgeGroup stopped - Messages received: "
+                           << getReceivedCount() << " - Messages published: "
+                           << getPublishedCount();
+}
+
+bool BridgeGroup::isRunning() const {
+    return running_;
+}
+
+size_t BridgeGroup::size() const {
+    return bridges_.size();
+}
+
+EIPtoNATSBridge& BridgeGroup::getBridge(size_t index) {
+    if (index >= bridges_.size()) {
+        throw std::out_of_range("BridgeGroup index out of range");
+    }
+    return *bridges_[index];
+}
+
+uint64_t BridgeGroup::getReceivedCount() const {
+    uint64_t total = 0;
+    for (const auto& bridge : bridges_) {
+        total += bridge->getReceivedCount();
+    }
+    return total;
+}
+
+uint64_t BridgeGroup::getPublishedCount() const {
+    uint64_t total = 0;
+    for (const auto& bridge : bridges_) {
+        total += bridge->getPublishedCount();
+    }
+    return total;
+}
+
+uint64_t BridgeGroup::getReconnectCount() const {
+    uint64_t total = 0;
+    for (const auto& bridge : bridges_) {
+        total += bridge->getReconnectCount();
+    }
+    return total;
+}
+
+NatsConnectionStats BridgeGroup::getNatsStats() const {
+    return natsEvents_.stats();
+}
+
+const ThreadStatus& BridgeGroup::getThreadStatus() const {
+    return threadStatus_;
+}
+
+const SocketStats& BridgeGroup::getSocketStats() const {
+    return socketStats_;
+}
+
+void BridgeGroup::connectBridge(size_t index) {
+    EIPtoNATSBridge& bridge = *bridges_[index];
+    if (everConnected_[index]) {
+        bridge.reconnectTracker_.attempt();
+    }
+
+    // A powered-off PLC makes this wait for the connect or session timeout,
+    // which the other PLCs' connections would not survive on the worker
+    pendingConnects_[index] = std::async(std::launch::async, [&bridge]() {
+        if (bridge.reuseSession()) {
+            return ConnectResult::SessionReused;
+        }
+        return bridge.initEIP() ? ConnectResult::Connected : ConnectResult::Failed;
+    });
+}
+
+void BridgeGroup::finishConnect(size_t index) {
+    EIPtoNATSBridge& bridge = *bridges_[index];
+
+    ConnectResult result = ConnectResult::Failed;
+    try {
+        result = pendingConnects_[index].get();
+    } catch (const std::exception& e) {
+        Logger(LogLevel::ERROR) << "Could not connect to " << bridge.plcAddress_ << ": " << e.what();
+    }
+
+    if (result != ConnectResult::Failed) {
+        bridgeConnected(index, result == ConnectResult::SessionReused);
+        return;
+    }
+
+    const auto delay = bridge.backoff_.next();
+    retryAt_[index] = std::chrono::steady_clock::now() + delay;
+    Logger(LogLevel::WARNING) << "Could not connect to " << bridge.plcAddress_
+                              << ", retrying in " << delay.count() << " ms...";
+}
+
+void BridgeGroup::bridgeConnected(size_t index, bool sessionReused) {
+    EIPtoNATSBridge& bridge = *bridges_[index];
+
+    if (everConnected_[index]) {
+        bridge.reconnectTracker_.reconnected(sessionReused);
+        Logger(LogLevel::INFO) << "Reconnected to " << bridge.plcAddress_;
+    }
+    bridge.backoff_.reset();
+    connected_[index] = true;
+    everConnected_[index] = true;
+}
+
+void BridgeGroup::releaseNATS() {
+    for (auto& bridge : bridges_) {
+        // Wait for outstanding JetStream acks while the connection is still up
+        bridge->jetStream_.close();
+
+        std::lock_guard<std::mutex> lock(bridge->natsMutex_);
+        bridge->natsConn_ = nullptr;
+    }
+
+    EIPtoNATSBridge::disconnectNATS(natsConn_, natsOpts_, natsEvents_);
+}
+
+void BridgeGroup::workerLoop() {
+    EIPtoNATSBridge::setupThread(threadOptions_, threadStatus_, true, threadName("w"));
+    Logger(LogLevel::INFO) << "Group worker thread started";
+
+    while (!shouldStop_) {
+        // Reconnect lost PLCs without holding up the others for the retry delay
+        const auto now = std::chrono::steady_clock::now();
+        for (size_t i = 0; i < bridges_.size() && !shouldStop_; i++) {
+            EIPtoNATSBridge& bridge = *bridges_[i];
+
+            if (connected_[i] && bridge.needsReconnect_) {
+                bridge.needsReconnect_ = false;
+                bridge.reconnectTracker_.lost(now);
+                Logger(LogLevel::WARNING) << "EIP connection to " << bridge.plcAddress_
+                                          << " lost, attempting reconnection...";
+                bridge.closeEIP(bridge.reconnectOptions_.reuseSession);
+                connected_[i] = false;
+                bridge.backoff_.reset();
+                retryAt_[i] = now + bridge.backoff_.next();
+            }
+
+            if (connected_[i]) continue;
+
+            auto& pending = pendingConnects_[i];
+            if (pending.valid()) {
+                if (pending.wait_for(std::chrono::seconds(0)) == std::future_status::ready) {
+                    finishConnect(i);
+                }
+            } else if (now >= retryAt_[i]) {
+                connectBridge(i);
+            }
+        }
+
+        if (shouldStop_) break;
+
+        std::unique_lock<std::mutex> lock(connectionManager_->mutex());
+        if (connectionManager_->hasOpenConnections()) {
+            connectionManager_->handleConnectionsBatched(pollTimeout_);
+            lock.unlock();
+            for (auto& bridge : bridges_) {
+                bridge->notifyReceived();
+            }
+            EIPtoNATSBridge::collectSocketStats(*connectionManager_, socketStats_);
+        } else {
+            lock.unlock();
+            std::this_thread::sleep_for(std::chrono::milliseconds(kIdlePollMs));
+        }
+    }
+
+    Logger(LogLevel::INFO) << "Group worker thread finishing";
+}
+
+void BridgeGroup::publisherLoop() {
+    EIPtoNATSBridge::setupThread(threadOptions_, threadStatus_, false, threadName("p"));
+    Logger(LogLevel::INFO) << "Group publisher thread started";
+
+    while (true) {
+        bool busy = false;
+        for (auto& bridge : bridges_) {
+            if (bridge->drainQueue()) busy = true;
+        }
+        if (busy) continue;
+
+        // Every queue is empty: close the batches whose time is up
+        for (auto& bridge : bridges_) {
+            if (bridge->flushDueBatch(stopPublisher_)) busy = true;
+        }
+        if (busy) continue;
+
+        if (stopPublisher_) break;
+
+        // Live traffic is all out: catch up on the spools
+        for (auto& bridge : bridges_) {
+            if (bridge->replaySpool()) busy = true;
+        }
+        if (busy) continue;
+
+        // Sleep until a bridge queues a packet, the earliest batch is due or
+        // the next replay batch
+        auto wakeAt = std::chrono::steady_clock::now()
+                    + std::chrono::milliseconds(EIPtoNATSBridge::kPublisherIdleWaitMs);
+        for (const auto& bridge : bridges_) {
+            if (bridge->batchCount_ > 0) {
+                wakeAt = std::min(wakeAt, bridge->batchDeadline_);
+            }
+            wakeAt = std::min(wakeAt, bridge->replayDueAt());
+        }
+
+        signal_.waitUntil(wakeAt, [this]() {
+            if (stopPublisher_) return true;
+            for (const auto& bridge : bridges_) {
+                if (!bridge->queue_->empty()) return true;
+            }
+            return false;
+        });
+    }
+
+    Logger(LogLevel::INFO) << "Group publisher thread finishing";
+}
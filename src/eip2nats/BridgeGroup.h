@@ -0,0 +1,233 @@
+#ifndef BRIDGE_GROUP_H
+#define BRIDGE_GROUP_H
+
+#include <memory>
+#include <mutex>
+#include <thread>
+#include <atomic>
+#include <string>
+#include <vector>
+#include <chrono>
+#include <future>
+#include <nats.h>
+#include "ConnectionManager.h"
+#include "EIPtoNATSBridge.h"
+
+namespace bridge {
+
+/**
+ * @brief Runs many PLC connections on one worker thread and one NATS connection
+ *
+ * Every EIPtoNATSBridge owns two threads, a NATS connection and a
+ * ConnectionManager. With dozens of PLCs that becomes dozens of threads
+ * polling their own sockets. A group instead drives all of its bridges from a
+ * single EIPScanner ConnectionManager (one select() over every UDP socket),
+ * publishes for all of them from a single thread and shares one NATS
+ * connection. Each bridge keeps its own subject, format, queue, batching and
+ * statistics.
+ *
+ * Bridges are added before start() and are owned by the group; their own
+ * start()/stop() are disabled. Bridges may share the same receive port, the
+ * ConnectionManager routes T2O packets by connection ID.
+ *
+ * A PLC that cannot be reached does not stop the group: it is retried with
+ * its own backoff while the others keep running. Opening the TCP session is
+ * what waits for an unreachable PLC, so that happens on a helper thread per
+ * PLC, several at once; the worker only does the Forward Open.
+ */
+class BridgeGroup {
+public:
+    /**
+     * @brief Constructor
+     * @param natsUrl NATS server URL shared by all bridges
+     * @param eventDriven If true the worker blocks on the sockets for up to half
+     *        the shortest RPI instead of waking up every millisecond (default: false)
+     * @param natsOptions Settings of the shared NATS connection (default: nats.c defaults)
+     * @param threadOptions CPU affinity, real-time priority, memory locking and
+     *        names of the group threads and of every bridge's delivery thread
+     * @param socketOptions Receive buffer, busy polling, DSCP and kernel receive
+     *        timestamps of the shared UDP socket(s)
+     */
+    explicit BridgeGroup(const std::string& natsUrl, bool eventDriven = false,
+                         const NatsOptions& natsOptions = NatsOptions(),
+                         const ThreadOptions& threadOptions = ThreadOptions(),
+                         const SocketOptions& socketOptions = SocketOptions());
+
+    /**
+     * @brief Destructor - stops the group if it is running
+     */
+    ~BridgeGroup();
+
+    BridgeGroup(const BridgeGroup&) = delete;
+    BridgeGroup& operator=(const BridgeGroup&) = delete;
+
+    /**
+     * @brief Add a PLC connection to the group (only while stopped)
+     *
+     * Parameters have the same meaning as in the EIPtoNATSBridge constructor.
+     *
+     * @return The new bridge, owned by the group, for reading its statistics
+     * @throws std::runtime_error if the group is running, starting or stopping, or
+     *         if a bridge of the group already consumes the same multicast stream
+     *         (the shared ConnectionManager routes T2O data by connection ID, which
+     *         such connections have in common)
+     */
+    EIPtoNATSBridge& addBridge(const std::string& plcAddress,
+                               const std::string& natsSubject,
+                               bool useBinaryFormat = true,
+                               uint8_t configAssembly = devices::RM75E::CONFIG_ASSEMBLY,
+                               uint8_t o2tAssembly = devices::RM75E::O2T_ASSEMBLY,
+                               uint8_t t2oAssembly = devices::RM75E::T2O_ASSEMBLY,
+                               uint16_t t2oSize = 0,
+                               uint32_t rpi = 2000,
+                               uint16_t port = 2222,
+                               size_t queueDepth = 1024,
+                               OverflowPolicy overflowPolicy = OverflowPolicy::DropOldest,
+                               uint32_t batchMaxPackets = 1,
+                               uint32_t batchMaxDelayUs = 0,
+                               JsonEncoding jsonEncoding = JsonEncoding::Hex,
+                               bool changeOnly = false,
+                               const std::vector<uint8_t>& changeMask = {},
+                               uint32_t heartbeatMs = 0,
+                               bool tagSequence = false,
+                               bool natsHeaders = false,
+                               const JetStreamOptions& jetStreamOptions = JetStreamOptions(),
+                               const SpoolOptions& spoolOptions = SpoolOptions(),
+                               const ReconnectOptions& reconnectOptions = ReconnectOptions(),
+                               ConnectionType connectionType = ConnectionType::PointToPoint,
+                               bool t2oRunIdleHeader = false);
+
+    /**
+     * @brief Connect to NATS, open every EIP connection and start the threads
+     *
+     * PLCs that cannot be reached are retried in the background. start() and
+     * stop() may be called from any thread; concurrent calls are serialized.
+     *
+     * @return true if started, false if already running, empty or NATS failed
+     */
+    bool start();
+
+    /**
+     * @brief Stop the threads, close every EIP connection and disconnect NATS
+     */
+    void stop();
+
+    /**
+     * @brief Check if the group is running
+     */
+    bool isRunning() const;
+
+    /**
+     * @brief Number of bridges in the group
+     */
+    size_t size() const;
+
+    /**
+     * @brief Get a bridge by the order it was added
+     * @throws std::out_of_range if index >= size()
+     */
+    EIPtoNATSBridge& getBridge(size_t index);
+
+    /**
+     * @brief Packets received by all bridges
+     */
+    uint64_t getReceivedCount() const;
+
+    /**
+     * @brief Packets published by all bridges
+     */
+    uint64_t getPublishedCount() const;
+
+    /**
+     * @brief Reconnections performed by all bridges
+     */
+    uint64_t getReconnectCount() const;
+
+    /**
+     * @brief State and disconnect/reconnect counters of the shared NATS connection
+     */
+    NatsConnectionStats getNatsStats() const;
+
+    /**
+     * @brief Which ThreadOptions took effect when the threads last started
+     */
+    const ThreadStatus& getThreadStatus() const;
+
+    /**
+     * @brief Kernel drops and granted buffer size of the shared receive socket(s)
+     */
+    const SocketStats& getSocketStats() const;
+
+private:
+    std::string natsUrl_;
+    bool eventDriven_;
+    NatsOptions natsOptions_;
+    ThreadOptions threadOptions_;
+    ThreadStatus threadStatus_;
+    SocketOptions socketOptions_;
+    SocketStats socketStats_;
+
+    std::vector<std::unique_ptr<EIPtoNATSBridge>> bridges_;
+
+    // Shared resources handed to every bridge while running
+    natsConnection* natsConn_;
+    natsOptions* natsOpts_;
+    NatsConnectionEvents natsEvents_;
+    std::shared_ptr<eipScanner::ConnectionManager> connectionManager_;
+    QueueSignal signal_;
+
+    // Thread control
+    std::thread workerThread_;
+    std::thread publisherThread_;
+    std::atomic<bool> running_;
+    std::atomic<bool> shouldStop_;
+    std::mutex lifecycleMutex_;   // serializes start()/stop()/addBridge()
+    std::atomic<bool> stopPublisher_;
+    std::chrono::milliseconds pollTimeout_;
+
+    // Worker-thread reconnection state, one entry per bridge
+    std::vector<bool> connected_;
+    std::vector<bool> everConnected_;
+    std::vector<std::chrono::steady_clock::time_point> retryAt_;
+    enum class ConnectResult { Failed, Connected, SessionReused };
+    std::vector<std::future<ConnectResult>> pendingConnects_;
+    static constexpr int kIdlePollMs = 10;
+
+    /**
+     * @brief Worker thread: handle every EIP connection and reconnect lost ones
+     */
+    void workerLoop();
+
+    /**
+     * @brief Publisher thread: drain every bridge queue into NATS
+     */
+    void publisherLoop();
+
+    /**
+     * @brief Start connecting one bridge on a helper thread: a new I/O
+     *        connection on its kept session, or else a new session and I/O
+     *        connection
+     */
+    void connectBridge(size_t index);
+
+    /**
+     * @brief Bookkeeping of the helper thread's outcome, or schedule a retry
+     *
+     * Waits for the helper thread if it is not done yet.
+     */
+    void finishConnect(size_t index);
+
+    /**
+     * @brief Bookkeeping of a bridge whose I/O connection has been opened
+     */
+    void bridgeConnected(size_t index, bool sessionReused);
+
+    /**
+     * @brief Detach every bridge from the shared NATS connection and close it
+     */
+    void releaseNATS();
+};
+
+} // namespace bridge
+
+#endif // BRIDGE_GROUP_H
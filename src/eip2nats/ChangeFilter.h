@@ -0,0 +1,88 @@
+#ifndef CHANGE_FILTER_H
+#define CHANGE_FILTER_H
+
+#include <chrono>
+#include <cstddef>
+#include <cstdint>
+#include <cstring>
+#include <utility>
+#include <vector>
+
+namespace bridge {
+
+/**
+ * @brief Decides whether a T2O frame differs enough from the last published one
+ *
+ * A frame passes when its size changes or when any byte differs from the last
+ * frame that passed. With a mask, byte i is only compared on the bits set in
+ * mask[i] (0x00 ignores the byte, e.g. a free-running counter); bytes past the
+ * end of the mask are compared in full. A heartbeat lets an unchanged frame
+ * through when nothing has passed for that long, so subscribers still see the
+ * connection is alive.
+ *
+ * Not thread-safe: used only from the EIP worker thread.
+ */
+class ChangeFilter {
+public:
+    /**
+     * @param mask Per-byte compare mask (empty compares every byte)
+     * @param heartbeat Maximum time between passed frames; 0 disables it
+     * @param frameSize Bytes reserved for the last frame, so pass() does not allocate
+     */
+    ChangeFilter(std::vector<uint8_t> mask, std::chrono::milliseconds heartbeat, size_t frameSize = 0)
+        : mask_(std::move(mask))
+        , heartbeat_(heartbeat)
+        , hasLast_(false)
+    {
+        last_.reserve(frameSize);
+    }
+
+    /**
+     * @brief Check a frame and remember it if it passes
+     * @return true if the frame should be published
+     */
+    bool pass(const uint8_t* data, size_t size, std::chrono::steady_clock::time_point now) {
+        const bool heartbeatDue = heartbeat_.count() > 0 && now - lastPassedAt_ >= heartbeat_;
+        if (hasLast_ && !heartbeatDue && !changed(data, size)) {
+            return false;
+        }
+
+        last_.assign(data, data + size);
+        lastPassedAt_ = now;
+        hasLast_ = true;
+        return true;
+    }
+
+    /**
+     * @brief Forget the last frame so the next one always passes
+     */
+    void reset() {
+        hasLast_ = false;
+    }
+
+private:
+    std::vector<uint8_t> mask_;
+    std::chrono::milliseconds heartbeat_;
+    std::vector<uint8_t> last_;
+    std::chrono::steady_clock::time_point lastPassedAt_;
+    bool hasLast_;
+
+    bool changed(const uint8_t* data, size_t size) const {
+        if (size != last_.size()) {
+            return true;
+        }
+
+        const size_t masked = mask_.size() < size ? mask_.size() : size;
+        for (size_t i = 0; i < masked; i++) {
+            if ((data[i] ^ last_[i]) & mask_[i]) {
+                return true;
+            }
+        }
+        return masked < size &&
+               std::memcmp(data + masked, last_.data() + masked, size - masked) != 0;
+    }
+};
+
+} // namespace bridge
+
+#endif // CHANGE_FILTER_H
@@ -0,0 +1,464 @@
+#include "DiskSpool.h"
+#include "utils/Logger.h"
+
+#include <algorithm>
+#include <cerrno>
+#include <cstdio>
+#include <cstring>
+#include <filesystem>
+#include <system_error>
+#include <vector>
+
+#ifdef _WIN32
+#ifndef NOMINMAX
+#define NOMINMAX
+#endif
+#define NOGDI  // wingdi.h defines ERROR
+#include <windows.h>
+#else
+#include <fcntl.h>
+#include <sys/file.h>
+#include <sys/mman.h>
+#include <unistd.h>
+#endif
+
+namespace fs = std::filesystem;
+
+using eipScanner::utils::Logger;
+using eipScanner::utils::LogLevel;
+
+namespace bridge {
+
+namespace {
+
+constexpr uint32_t kMagic = 0x53504945;  // "EIPS"
+constexpr uint32_t kVersion = 1;
+
+// magic, version, offset of the first unread record
+constexpr size_t kHeaderSize = 16;
+constexpr size_t kReadOffsetAt = 8;
+
+// size of the rest, metadata size
+constexpr size_t kRecordHeaderSize = 8;
+
+constexpr char kPrefix[] = "spool-";
+constexpr char kSuffix[] = ".seg";
+constexpr char kLockName[] = "spool.lock";
+
+uint32_t load32(const uint8_t* p) {
+    uint32_t value;
+    std::memcpy(&value, p, sizeof(value));
+    return value;
+}
+
+void store32(uint8_t* p, uint32_t value) {
+    std::memcpy(p, &value, sizeof(value));
+}
+
+/**
+ * @brief Segment number from a file name, or false if it is not a segment
+ */
+bool parseSegmentId(const std::string& name, uint64_t& id) {
+    const size_t prefix = sizeof(kPrefix) - 1;
+    const size_t suffix = sizeof(kSuffix) - 1;
+    if (name.size() <= prefix + suffix
+        || name.compare(0, prefix, kPrefix) != 0
+        || name.compare(name.size() - suffix, suffix, kSuffix) != 0) {
+        return false;
+    }
+
+    id = 0;
+    for (size_t i = prefix; i < name.size() - suffix; i++) {
+        if (name[i] < '0' || name[i] > '9') return false;
+        id = id * 10 + static_cast<uint64_t>(name[i] - '0');
+    }
+    return true;
+}
+
+} // namespace
+
+DiskSpool::DiskSpool(std::string directory, size_t segmentBytes, uint64_t maxBytes, SpoolEviction eviction)
+    : directory_(std::move(directory))
+    , segmentBytes_(std::max<size_t>(segmentBytes, 64 * 1024))
+    , maxSegments_(std::max<size_t>(static_cast<size_t>(maxBytes / segmentBytes_), 2))
+    , eviction_(eviction)
+    , nextId_(0)
+    , sealed_(true)
+    , spooled_(0)
+    , replayed_(0)
+    , dropped_(0)
+    , pending_(0)
+    , bytes_(0)
+{
+}
+
+DiskSpool::~DiskSpool() {
+    for (auto& segment : segments_) {
+        unmapSegment(segment);
+    }
+    unlockDirectory();
+}
+
+std::string DiskSpool::segmentPath(uint64_t id) const {
+    char name[48];
+    std::snprintf(name, sizeof(name), "%s%020llu%s", kPrefix, static_cast<unsigned long long>(id), kSuffix);
+    return (fs::path(directory_) / name).string();
+}
+
+bool DiskSpool::open() {
+    std::error_code ec;
+    fs::create_directories(directory_, ec);
+    if (ec) {
+        Logger(LogLevel::ERROR) << "Cannot create spool directory " << directory_ << ": " << ec.message();
+        return false;
+    }
+    if (!lockDirectory()) {
+        return false;
+    }
+
+    std::vector<uint64_t> ids;
+    for (const auto& entry : fs::directory_iterator(directory_, ec)) {
+        uint64_t id;
+        if (entry.is_regular_file() && parseSegmentId(entry.path().filename().string(), id)) {
+            ids.push_back(id);
+        }
+    }
+    if (ec) {
+        Logger(LogLevel::ERROR) << "Cannot list spool directory " << directory_ << ": " << ec.message();
+        return false;
+    }
+    std::sort(ids.begin(), ids.end());
+
+    for (uint64_t id : ids) {
+        Segment segment;
+        segment.id = id;
+        segment.path = segmentPath(id);
+        nextId_ = id + 1;
+
+        if (!mapSegment(segment, false)) {
+            continue;
+        }
+        if (load32(segment.base) != kMagic || load32(segment.base + 4) != kVersion) {
+            Logger(LogLevel::WARNING) << "Ignoring unknown spool file " << segment.path;
+            unmapSegment(segment);
+            continue;
+        }
+
+        scanSegment(segment);
+        if (segment.records == 0) {
+            unmapSegment(segment);
+            fs::remove(segment.path, ec);
+            continue;
+        }
+
+        bytes_ += segment.size;
+        pending_ += segment.records;
+        segments_.push_back(std::move(segment));
+    }
+
+    // Recovered segments are only read; new messages go to a new segment
+    sealed_ = true;
+
+    if (!segments_.empty()) {
+        Logger(LogLevel::INFO) << "Recovered " << pending_.load() << " spooled messages from " << directory_;
+    }
+    return true;
+}
+
+bool DiskSpool::lockDirectory() {
+    const std::string path = (fs::path(directory_) / kLockName).string();
+#ifdef _WIN32
+    HANDLE file = CreateFileA(path.c_str(), GENERIC_READ | GENERIC_WRITE, FILE_SHARE_READ | FILE_SHARE_WRITE,
+                              nullptr, OPEN_ALWAYS, FILE_ATTRIBUTE_NORMAL, nullptr);
+    if (file == INVALID_HANDLE_VALUE) {
+        Logger(LogLevel::ERROR) << "Cannot open spool lock " << path << ": error " << GetLastError();
+        return false;
+    }
+    OVERLAPPED overlapped = {};
+    if (!LockFileEx(file, LOCKFILE_EXCLUSIVE_LOCK | LOCKFILE_FAIL_IMMEDIATELY, 0, 1, 0, &overlapped)) {
+        Logger(LogLevel::ERROR) << "Spool directory " << directory_ << " is in use by another bridge or process";
+        CloseHandle(file);
+        return false;
+    }
+    lockFile_ = file;
+#else
+    const int fd = ::open(path.c_str(), O_RDWR | O_CREAT | O_CLOEXEC, 0644);
+    if (fd < 0) {
+        Logger(LogLevel::ERROR) << "Cannot open spool lock " << path << ": " << std::strerror(errno);
+        return false;
+    }
+    // flock() rather than fcntl(): its lock belongs to the open file, so a
+    // second spool in the same process is refused as well
+    if (flock(fd, LOCK_EX | LOCK_NB) != 0) {
+        if (errno == EWOULDBLOCK) {
+            Logger(LogLevel::ERROR) << "Spool directory " << directory_ << " is in use by another bridge or process";
+        } else {
+            Logger(LogLevel::ERROR) << "Cannot lock " << path << ": " << std::strerror(errno);
+        }
+        ::close(fd);
+        return false;
+    }
+    lockFd_ = fd;
+#endif
+    return true;
+}
+
+void DiskSpool::unlockDirectory() {
+#ifdef _WIN32
+    if (lockFile_ == nullptr) return;
+    CloseHandle(lockFile_);  // releases the lock
+    lockFile_ = nullptr;
+#else
+    if (lockFd_ < 0) return;
+    ::close(lockFd_);  // releases the lock
+    lockFd_ = -1;
+#endif
+}
+
+void DiskSpool::scanSegment(Segment& segment) {
+    uint64_t readOffset;
+    std::memcpy(&readOffset, segment.base + kReadOffsetAt, sizeof(readOffset));
+
+    size_t offset = kHeaderSize;
+    segment.records = 0;
+    segment.readOffset = segment.size;
+    while (offset + kRecordHeaderSize <= segment.size) {
+        const uint32_t length = load32(segment.base + offset);
+        if (length == 0 || length > segment.size - offset - 4) break;
+
+        if (offset >= readOffset) {
+            if (segment.readOffset == segment.size) segment.readOffset = offset;
+            segment.records++;
+        }
+        offset += 4 + length;
+    }
+    segment.writeOffset = offset;
+    if (segment.records == 0) segment.readOffset = offset;
+}
+
+bool DiskSpool::mapSegment(Segment& segment, bool create) {
+#ifdef _WIN32
+    HANDLE file = CreateFileA(segment.path.c_str(), GENERIC_READ | GENERIC_WRITE, 0, nullptr,
+                              create ? CREATE_NEW : OPEN_EXISTING, FILE_ATTRIBUTE_NORMAL, nullptr);
+    if (file == INVALID_HANDLE_VALUE) {
+        Logger(LogLevel::ERROR) << "Cannot open spool file " << segment.path << ": error " << GetLastError();
+        return false;
+    }
+
+    LARGE_INTEGER size;
+    if (create) {
+        size.QuadPart = static_cast<LONGLONG>(segmentBytes_);
+    } else if (!GetFileSizeEx(file, &size)) {
+        size.QuadPart = 0;
+    }
+    if (size.QuadPart < static_cast<LONGLONG>(kHeaderSize)) {
+        CloseHandle(file);
+        return false;
+    }
+
+    HANDLE mapping = CreateFileMappingA(file, nullptr, PAGE_READWRITE,
+                                        static_cast<DWORD>(size.QuadPart >> 32),
+                                        static_cast<DWORD>(size.QuadPart & 0xFFFFFFFF), nullptr);
+    void* base = mapping ? MapViewOfFile(mapping, FILE_MAP_ALL_ACCESS, 0, 0, 0) : nullptr;
+    if (base == nullptr) {
+        Logger(LogLevel::ERROR) << "Cannot map spool file " << segment.path << ": error " << GetLastError();
+        if (mapping) CloseHandle(mapping);
+        CloseHandle(file);
+        return false;
+    }
+
+    segment.file = file;
+    segment.mapping = mapping;
+    segment.size = static_cast<size_t>(size.QuadPart);
+#else
+    const int fd = ::open(segment.path.c_str(), create ? (O_RDWR | O_CREAT | O_EXCL) : O_RDWR, 0644);
+    if (fd < 0) {
+        Logger(LogLevel::ERROR) << "Cannot open spool file " << segment.path << ": " << std::strerror(errno);
+        return false;
+    }
+
+    size_t size = segmentBytes_;
+    if (create) {
+        // Reserve the blocks now: running out of disk on a mapped page is a SIGBUS
+#ifdef __linux__
+        const int err = posix_fallocate(fd, 0, static_cast<off_t>(size));
+#else
+        const int err = ftruncate(fd, static_cast<off_t>(size)) == 0 ? 0 : errno;
+#endif
+        if (err != 0) {
+            Logger(LogLevel::ERROR) << "Cannot allocate spool file " << segment.path << ": " << std::strerror(err);
+            ::close(fd);
+            ::unlink(segment.path.c_str());
+            return false;
+        }
+    } else {
+        const off_t end = lseek(fd, 0, SEEK_END);
+        size = end > 0 ? static_cast<size_t>(end) : 0;
+        if (size < kHeaderSize) {
+            ::close(fd);
+            return false;
+        }
+    }
+
+    void* base = mmap(nullptr, size, PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0);
+    if (base == MAP_FAILED) {
+        Logger(LogLevel::ERROR) << "Cannot map spool file " << segment.path << ": " << std::strerror(errno);
+        ::close(fd);
+        return false;
+    }
+
+    segment.fd = fd;
+    segment.size = size;
+#endif
+
+    segment.base = static_cast<uint8_t*>(base);
+    return true;
+}
+
+void DiskSpool::unmapSegment(Segment& segment) {
+    if (segment.base == nullptr) return;
+#ifdef _WIN32
+    UnmapViewOfFile(segment.base);
+    CloseHandle(segment.mapping);
+    CloseHandle(segment.file);
+    segment.mapping = nullptr;
+    segment.file = nullptr;
+#else
+    munmap(segment.base, segment.size);
+    ::close(segment.fd);
+    segment.fd = -1;
+#endif
+    segment.base = nullptr;
+}
+
+bool DiskSpool::createSegment(Segment& segment) {
+    segment.id = nextId_;
+    segment.path = segmentPath(segment.id);
+    if (!mapSegment(segment, true)) {
+        return false;
+    }
+    nextId_++;
+
+    const uint64_t readOffset = kHeaderSize;
+    store32(segment.base, kMagic);
+    store32(segment.base + 4, kVersion);
+    std::memcpy(segment.base + kReadOffsetAt, &readOffset, sizeof(readOffset));
+
+    segment.writeOffset = kHeaderSize;
+    segment.readOffset = kHeaderSize;
+    segment.records = 0;
+    return true;
+}
+
+void DiskSpool::removeFront() {
+    Segment& segment = segments_.front();
+    unmapSegment(segment);
+
+    std::error_code ec;
+    fs::remove(segment.path, ec);
+
+    pending_ -= segment.records;
+    bytes_ -= segment.size;
+    if (segments_.size() == 1) sealed_ = true;
+    segments_.pop_front();
+}
+
+bool DiskSpool::append(const uint8_t* meta, size_t metaSize, const uint8_t* payload, size_t payloadSize) {
+    const size_t recordSize = kRecordHeaderSize + metaSize + payloadSize;
+    // Room for the record and the zero size that ends the data
+    if (recordSize + 4 > segmentBytes_ - kHeaderSize) {
+        dropped_++;
+        return false;
+    }
+
+    if (sealed_ || segments_.back().writeOffset + recordSize + 4 > segments_.back().size) {
+        if (segments_.size() >= maxSegments_) {
+            if (eviction_ == SpoolEviction::DropNewest) {
+                dropped_++;
+                return false;
+            }
+            dropped_ += segments_.front().records;
+            removeFront();
+        }
+
+        Segment segment;
+        if (!createSegment(segment)) {
+            dropped_++;
+            return false;
+        }
+        bytes_ += segment.size;
+        segments_.push_back(std::move(segment));
+        sealed_ = false;
+    }
+
+    Segment& segment = segments_.back();
+    uint8_t* const record = segment.base + segment.writeOffset;
+    store32(record + 4, static_cast<uint32_t>(metaSize));
+    if (metaSize > 0) std::memcpy(record + kRecordHeaderSize, meta, metaSize);
+    if (payloadSize > 0) std::memcpy(record + kRecordHeaderSize + metaSize, payload, payloadSize);
+    // Size last: a record without it is not there
+    store32(record, static_cast<uint32_t>(recordSize - 4));
+
+    segment.writeOffset += recordSize;
+    segment.records++;
+    spooled_++;
+    pending_++;
+    return true;
+}
+
+bool DiskSpool::front(Record& record) {
+    while (!segments_.empty()) {
+        Segment& segment = segments_.front();
+        if (segment.records > 0) {
+            const uint8_t* const data = segment.base + segment.readOffset;
+            const uint32_t length = load32(data);
+            record.metaSize = load32(data + 4);
+            record.meta = data + kRecordHeaderSize;
+            record.payload = record.meta + record.metaSize;
+            record.payloadSize = length + 4 - kRecordHeaderSize - record.metaSize;
+            return true;
+        }
+        if (!sealed_ && segments_.size() == 1) {
+            return false;  // the segment being written: keep it
+        }
+        removeFront();
+    }
+    return false;
+}
+
+void DiskSpool::pop() {
+    if (segments_.empty() || segments_.front().records == 0) return;
+
+    Segment& segment = segments_.front();
+    segment.readOffset += 4 + load32(segment.base + segment.readOffset);
+    segment.records--;
+    pending_--;
+    replayed_++;
+
+    if (segment.records == 0 && (sealed_ || segments_.size() > 1)) {
+        removeFront();
+    } else {
+        storeReadOffset(segment);
+    }
+}
+
+void DiskSpool::storeReadOffset(Segment& segment) {
+    const uint64_t readOffset = segment.readOffset;
+    std::memcpy(segment.base + kReadOffsetAt, &readOffset, sizeof(readOffset));
+}
+
+bool DiskSpool::empty() const {
+    return pending_.load(std::memory_order_relaxed) == 0;
+}
+
+SpoolStats DiskSpool::stats() const {
+    SpoolStats result;
+    result.spooled = spooled_.load(std::memory_order_relaxed);
+    result.replayed = replayed_.load(std::memory_order_relaxed);
+    result.dropped = dropped_.load(std::memory_order_relaxed);
+    result.pending = pending_.load(std::memory_order_relaxed);
+    result.bytes = bytes_.load(std::memory_order_relaxed);
+    return result;
+}
+
+} // namespace bridge
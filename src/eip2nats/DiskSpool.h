@@ -0,0 +1,182 @@
+#ifndef DISK_SPOOL_H
+#define DISK_SPOOL_H
+
+#include <atomic>
+#include <cstddef>
+#include <cstdint>
+#include <deque>
+#include <string>
+
+namespace bridge {
+
+/**
+ * @brief What to do when the spool reaches its size cap
+ */
+enum class SpoolEviction {
+    DropOldest,  ///< Delete the oldest segment to make room (default)
+    DropNewest   ///< Refuse new messages until replay frees space
+};
+
+/**
+ * @brief Settings of the outage spool of a bridge
+ *
+ * While NATS is unreachable encoded messages are stored in directory and
+ * replayed after reconnecting, replayBatch at a time and at most replayRate
+ * per second. Each bridge needs its own directory: open() locks it.
+ */
+struct SpoolOptions {
+    std::string directory;                               ///< Where the segment files are kept; empty disables the spool
+    uint64_t maxBytes = uint64_t(1) << 30;               ///< Maximum disk space of all segments
+    uint32_t segmentBytes = 16u << 20;                   ///< Size of each segment file
+    SpoolEviction eviction = SpoolEviction::DropOldest;  ///< What to do when maxBytes is reached
+    uint32_t replayRate = 10000;                         ///< Maximum messages replayed per second; 0 = no limit
+    uint32_t replayBatch = 100;                          ///< Messages replayed per publisher pass
+};
+
+/**
+ * @brief Counters of a DiskSpool, in messages unless noted
+ */
+struct SpoolStats {
+    uint64_t spooled = 0;   ///< Written to disk
+    uint64_t replayed = 0;  ///< Read back and published
+    uint64_t dropped = 0;   ///< Lost to the size cap (evicted or refused)
+    uint64_t pending = 0;   ///< On disk, waiting for replay
+    uint64_t bytes = 0;     ///< Disk space taken by the segment files
+};
+
+/**
+ * @brief First-in first-out message store in memory-mapped segment files
+ *
+ * Messages are appended to fixed-size segment files (spool-<n>.seg) that are
+ * preallocated and mapped into memory, so an append is a memcpy and never a
+ * system call. When a segment is full the next one is created; once every
+ * message of a segment has been read it is deleted. The total size is capped
+ * at maxBytes, past which the eviction policy applies.
+ *
+ * Each segment starts with a header holding the offset of the first unread
+ * message, so segments left by a previous run are picked up again by open()
+ * (a message may be replayed twice after a crash, never lost).
+ *
+ * A record is: uint32 size of the rest (0 marks the end of the data),
+ * uint32 metadata size, metadata, payload. The size is written last, so a
+ * record interrupted by a crash is ignored.
+ *
+ * open() takes an exclusive lock on a spool.lock file in the directory, held
+ * until destruction, so a second spool (another bridge or process) given the
+ * same directory fails to open instead of overwriting its segments.
+ *
+ * Not thread-safe, except stats(): used only from the publisher thread.
+ */
+class DiskSpool {
+public:
+    /**
+     * @brief A message read back by front(); valid until pop()
+     */
+    struct Record {
+        const uint8_t* meta = nullptr;
+        size_t metaSize = 0;
+        const uint8_t* payload = nullptr;
+        size_t payloadSize = 0;
+    };
+
+    /**
+     * @param directory Where the segment files are kept (created if missing)
+     * @param segmentBytes Size of each segment file
+     * @param maxBytes Maximum disk space of all segments (at least two segments)
+     * @param eviction What to do when maxBytes is reached
+     */
+    DiskSpool(std::string directory, size_t segmentBytes, uint64_t maxBytes, SpoolEviction eviction);
+
+    /**
+     * @brief Unmaps every segment and releases the directory lock; unread
+     *        messages stay on disk for the next open()
+     */
+    ~DiskSpool();
+
+    DiskSpool(const DiskSpool&) = delete;
+    DiskSpool& operator=(const DiskSpool&) = delete;
+
+    /**
+     * @brief Create and lock the directory and recover segments left by a previous run
+     * @return false if the directory cannot be used or another spool holds it
+     */
+    bool open();
+
+    /**
+     * @brief Append a message
+     * @return false if it was dropped (cap reached with DropNewest, too large or I/O error)
+     */
+    bool append(const uint8_t* meta, size_t metaSize, const uint8_t* payload, size_t payloadSize);
+
+    /**
+     * @brief Oldest unread message
+     * @return false if the spool is empty
+     */
+    bool front(Record& record);
+
+    /**
+     * @brief Mark the message returned by front() as read
+     */
+    void pop();
+
+    /**
+     * @brief Check if there are no unread messages
+     */
+    bool empty() const;
+
+    /**
+     * @brief Counters since construction (thread-safe)
+     */
+    SpoolStats stats() const;
+
+private:
+    struct Segment {
+        uint64_t id = 0;
+        std::string path;
+        uint8_t* base = nullptr;
+        size_t size = 0;
+        size_t writeOffset = 0;
+        size_t readOffset = 0;
+        uint64_t records = 0;  // unread
+#ifdef _WIN32
+        void* file = nullptr;
+        void* mapping = nullptr;
+#else
+        int fd = -1;
+#endif
+    };
+
+    std::string directory_;
+#ifdef _WIN32
+    void* lockFile_ = nullptr;
+#else
+    int lockFd_ = -1;
+#endif
+    size_t segmentBytes_;
+    size_t maxSegments_;
+    SpoolEviction eviction_;
+
+    std::deque<Segment> segments_;  // oldest first; the last one is written
+    uint64_t nextId_;
+    bool sealed_;                   // the last segment is full or recovered
+
+    std::atomic<uint64_t> spooled_;
+    std::atomic<uint64_t> replayed_;
+    std::atomic<uint64_t> dropped_;
+    std::atomic<uint64_t> pending_;
+    std::atomic<uint64_t> bytes_;
+
+    std::string segmentPath(uint64_t id) const;
+    bool lockDirectory();
+    void unlockDirectory();
+    bool createSegment(Segment& segment);
+    bool mapSegment(Segment& segment, bool create);
+    void unmapSegment(Segment& segment);
+    void removeFront();
+    void scanSegment(Segment& segment);
+    void storeReadOffset(Segment& segment);
+};
+
+} // namespace bridge
+
+#endif // DISK_SPOOL_H
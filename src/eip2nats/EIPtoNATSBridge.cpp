@@ -4,6 +4,11 @@
 #include <sstream>
 #include <iomanip>
 #include <chrono>
+#include <algorithm>
+#include <charconv>
+#include <cstring>
+#include <set>
+#include <stdexcept>
 
 using namespace bridge;
 using namespace eipScanner;
@@ -11,6 +16,50 @@ using namespace eipScanner::cip;
 using namespace eipScanner::cip::connectionManager;
 using namespace eipScanner::utils;
 
+// Mirrors EIPScanner's global level (INFO by default), which it does not expose
+static std::atomic<LogLevel> currentLogLevel(LogLevel::INFO);
+
+static inline bool isLogEnabled(LogLevel level) {
+    return level <= currentLogLevel.load(std::memory_order_relaxed);
+}
+
+void bridge::setLogLevel(LogLevel level) {
+    Logger::setLogLevel(level);
+    currentLogLevel.store(level, std::memory_order_relaxed);
+}
+
+LogLevel bridge::getLogLevel() {
+    return currentLogLevel.load(std::memory_order_relaxed);
+}
+
+// NATS header names used with natsHeaders
+static constexpr char kHeaderSequence[]  = "Eip-Sequence";
+static constexpr char kHeaderRunIdle[]   = "Eip-Run-Idle";
+static constexpr char kHeaderTimestamp[] = "Eip-Timestamp-Ns";
+static constexpr char kHeaderPlc[]       = "Eip-Plc";
+
+// Receive times are taken from the steady clock; this maps them onto the
+// system clock
+static std::chrono::nanoseconds systemClockOffset() {
+    return std::chrono::duration_cast<std::chrono::nanoseconds>(
+        std::chrono::system_clock::now().time_since_epoch() -
+        std::chrono::steady_clock::now().time_since_epoch());
+}
+
+static const char* overflowPolicyName(OverflowPolicy policy) {
+    switch (policy) {
+        case OverflowPolicy::DropOldest: return "drop-oldest";
+        case OverflowPolicy::DropNewest: return "drop-newest";
+        case OverflowPolicy::Block:      return "block";
+    }
+    return "unknown";
+}
+
+// UDP ports of the running standalone point-to-point bridges. Each one binds
+// its own socket; of several sockets on one port only one gets unicast data.
+static std::mutex standalonePortsMutex;
+static std::multiset<uint16_t> standalonePorts;
+
 EIPtoNATSBridge::EIPtoNATSBridge(const std::string& plcAddress,
                                  const std::string& natsUrl,
                                  const std::string& natsSubject,
@@ -20,7 +69,26 @@ EIPtoNATSBridge::EIPtoNATSBridge(const std::string& plcAddress,
                                  uint8_t t2oAssembly,
                                  uint16_t t2oSize,
                                  uint32_t rpi,
-                                 uint16_t port)
+                                 uint16_t port,
+                                 size_t queueDepth,
+                                 OverflowPolicy overflowPolicy,
+                                 uint32_t batchMaxPackets,
+                                 uint32_t batchMaxDelayUs,
+                                 JsonEncoding jsonEncoding,
+                                 bool eventDriven,
+                                 bool changeOnly,
+                                 const std::vector<uint8_t>& changeMask,
+                                 uint32_t heartbeatMs,
+                                 bool tagSequence,
+                                 bool natsHeaders,
+                                 const JetStreamOptions& jetStreamOptions,
+                                 const SpoolOptions& spoolOptions,
+                                 const NatsOptions& natsOptions,
+                                 const ReconnectOptions& reconnectOptions,
+                                 ConnectionType connectionType,
+                                 const ThreadOptions& threadOptions,
+                                 const SocketOptions& socketOptions,
+                                 bool t2oRunIdleHeader)
     : plcAddress_(plcAddress)
     , natsUrl_(natsUrl)
     , natsSubject_(natsSubject)
@@ -31,36 +99,134 @@ EIPtoNATSBridge::EIPtoNATSBridge(const std::string& plcAddress,
     , t2oSize_(t2oSize)
     , rpi_(rpi)
     , port_(port)
+    , connectionType_(connectionType)
+    , queueDepth_(queueDepth)
+    , overflowPolicy_(overflowPolicy)
+    , batchMaxPackets_(batchMaxPackets)
+    , batchMaxDelayUs_(batchMaxDelayUs)
+    , jsonEncoding_(jsonEncoding)
+    , eventDriven_(eventDriven)
+    , changeOnly_(changeOnly)
+    , tagSequence_(tagSequence)
+    , natsHeaders_(natsHeaders)
+    , t2oRunIdleHeader_(t2oRunIdleHeader)
+    , useJetStream_(jetStreamOptions.enabled)
     , natsConn_(nullptr)
     , natsOpts_(nullptr)
+    , natsOptions_(natsOptions)
+    , natsEvents_(&ownNatsEvents_)
+    , threadOptions_(threadOptions)
+    , threadStatus_(&ownThreadStatus_)
+    , socketOptions_(socketOptions)
+    , socketStats_(&ownSocketStats_)
+    , jetStream_(jetStreamOptions.maxPending, std::chrono::milliseconds(jetStreamOptions.ackTimeoutMs))
+    , spoolReplayRate_(spoolOptions.replayRate)
+    , spoolReplayBatch_(std::max<uint32_t>(spoolOptions.replayBatch, 1))
     , connectionManager_(nullptr)
     , running_(false)
     , shouldStop_(false)
+    , hosted_(false)
+    , queue_(std::make_unique<PacketRing>(queueDepth,
+                                          std::max<size_t>(t2oSize, kDefaultSlotSize),
+                                          overflowPolicy))
+    , signal_(&ownSignal_)
+    , stopPublisher_(false)
+    , batchCount_(0)
     , publishedCount_(0)
     , receivedCount_(0)
+    , suppressedCount_(0)
+    , hasLastReceive_(false)
+    , publishPending_(false)
+    , localPending_(false)
+    , changeFilter_(changeMask, std::chrono::milliseconds(heartbeatMs),
+                    changeOnly ? std::max<size_t>(t2oSize, kDefaultSlotSize) : 0)
+    , localQueue_(nullptr)
+    , localAttached_(false)
+    , stopDelivery_(false)
     , needsReconnect_(false)
-    , reconnectCount_(0)
+    , reconnectOptions_(reconnectOptions)
+    , backoff_(reconnectOptions)
+    , pollTimeout_(1)
 {
+    popped_.data.reserve(std::max<size_t>(t2oSize_, kDefaultSlotSize));
+    batchPackets_.reserve(batchMaxPackets_);
+    replayPackets_.reserve(batchMaxPackets_);
+
+    if (eventDriven_) {
+        // select() returns as soon as a T2O packet arrives, so the timeout only
+        // bounds how late O2T heartbeats and timeout checks can run. Half the
+        // RPI keeps both well inside the connection timeout; the cap keeps
+        // stop() responsive.
+        const uint32_t halfRpiMs = rpi_ / 2000;
+        pollTimeout_ = std::chrono::milliseconds(
+            std::min<uint32_t>(std::max<uint32_t>(halfRpiMs, 1), kMaxPollTimeoutMs));
+    }
+
     Logger(LogLevel::INFO) << "EIPtoNATSBridge created - PLC: " << plcAddress
                            << " NATS: " << natsUrl
                            << " Subject: " << natsSubject
-                           << " Format: " << (useBinaryFormat ? "Binary" : "JSON")
+                           << " Format: " << (useBinaryFormat ? "Binary"
+                                              : jsonEncoding == JsonEncoding::Base64 ? "JSON/base64"
+                                              : "JSON/hex")
                            << " Assemblies: config=" << (int)configAssembly
                            << " o2t=" << (int)o2tAssembly
                            << " t2o=" << (int)t2oAssembly
                            << " t2oSize=" << t2oSize
                            << " rpi=" << rpi
-                           << " port=" << port;
+                           << " port=" << port
+                           << " queue=" << queueDepth
+                           << " overflow=" << overflowPolicyName(overflowPolicy)
+                           << " batch=" << batchMaxPackets
+                           << " batchDelayUs=" << batchMaxDelayUs
+                           << " poll=" << pollTimeout_.count() << "ms"
+                           << (eventDriven ? " (event-driven)" : "")
+                           << (changeOnly ? " change-only" : "")
+                           << (tagSequence ? " tag-sequence" : "")
+                           << (natsHeaders ? " nats-headers" : "")
+                           << (t2oRunIdleHeader ? " t2o-run-idle" : "");
+    if (jetStreamOptions.enabled) {
+        Logger(LogLevel::INFO) << "JetStream publishing - max pending: " << jetStreamOptions.maxPending
+                               << ", ack timeout: " << jetStreamOptions.ackTimeoutMs << "ms";
+    }
+    if (!spoolOptions.directory.empty()) {
+        // Opened here so messages left by a previous run are replayed on the
+        // first connection
+        spool_ = std::make_unique<DiskSpool>(spoolOptions.directory, spoolOptions.segmentBytes,
+                                             spoolOptions.maxBytes, spoolOptions.eviction);
+        if (spool_->open()) {
+            Logger(LogLevel::INFO) << "Outage spool - dir: " << spoolOptions.directory
+                                   << ", max: " << (spoolOptions.maxBytes >> 20) << "MiB"
+                                   << ", segment: " << (spoolOptions.segmentBytes >> 20) << "MiB"
+                                   << ", eviction: " << (spoolOptions.eviction == SpoolEviction::DropOldest
+                                                         ? "drop-oldest" : "drop-newest")
+                                   << ", replay: " << spoolOptions.replayRate << " msg/s";
+        } else {
+            Logger(LogLevel::ERROR) << "Outage spool disabled";
+            spool_.reset();
+        }
+    }
+    if (changeOnly) {
+        Logger(LogLevel::INFO) << "Change-only publishing - mask: " << changeMask.size()
+                               << " bytes, heartbeat: " << heartbeatMs << "ms";
+    }
 }
 
 EIPtoNATSBridge::~EIPtoNATSBridge() {
-    if (running_) {
+    // Hosted bridges are stopped by their BridgeGroup
+    if (running_ && !hosted_) {
         Logger(LogLevel::WARNING) << "Bridge destroyed while running - stopping...";
         stop();
     }
 }
 
 bool EIPtoNATSBridge::start() {
+    std::lock_guard<std::mutex> lifecycle(lifecycleMutex_);
+
+    if (hosted_) {
+        Logger(LogLevel::WARNING) << "Bridge " << plcAddress_ << " belongs to a BridgeGroup - start the group instead";
+        return false;
+    }
+
     if (running_) {
         Logger(LogLevel::WARNING) << "Bridge is already running";
         return false;
@@ -74,6 +240,21 @@ bool EIPtoNATSBridge::start() {
         return false;
     }
 
+    if (!openJetStream()) {
+        closeNATS();
+        return false;
+    }
+
+    const bool ownPort = connectionType_ == ConnectionType::PointToPoint;
+    if (ownPort) {
+        std::lock_guard<std::mutex> lock(standalonePortsMutex);
+        if (standalonePorts.count(port_)) {
+            Logger(LogLevel::WARNING) << "Another bridge of this process already receives on UDP port " << port_
+                                      << ", only one of them will get T2O data. Put the bridges in one "
+                                         "BridgeGroup, which shares the port, or give each its own port";
+        }
+    }
+
     // Initialize EIP
     if (!initEIP()) {
         Logger(LogLevel::ERROR) << "Failed to initialize EIP";
@@ -81,6 +262,18 @@ bool EIPtoNATSBridge::start() {
         return false;
     }
 
+    if (ownPort) {
+        std::lock_guard<std::mutex> lock(standalonePortsMutex);
+        standalonePorts.insert(port_);
+    }
+
+    lockMemory(threadOptions_, *threadStatus_);
+
+    // Start the publisher thread first so it is ready to drain the queue
+    stopPublisher_ = false;
+    publisherThread_ = std::thread(&EIPtoNATSBridge::publisherLoop, this);
+    startDelivery();
+
     // Start the worker thread
     shouldStop_ = false;
     needsReconnect_ = false;
@@ -92,6 +285,13 @@ bool EIPtoNATSBridge::start() {
 }
 
 void EIPtoNATSBridge::stop() {
+    std::lock_guard<std::mutex> lifecycle(lifecycleMutex_);
+
+    if (hosted_) {
+        Logger(LogLevel::WARNING) << "Bridge " << plcAddress_ << " belongs to a BridgeGroup - stop the group instead";
+        return;
+    }
+
     if (!running_) {
         Logger(LogLevel::WARNING) << "Bridge is already stopped";
         return;
@@ -101,27 +301,128 @@ void EIPtoNATSBridge::stop() {
 
     // Signal the thread to stop
     shouldStop_ = true;
+    roomSignal_.notify();
 
     // Wait for the thread to finish
     if (workerThread_.joinable()) {
         workerThread_.join();
     }
 
+    // Let the publisher drain what is still queued, then stop it
+    {
+        std::lock_guard<std::mutex> lock(signal_->mutex);
+        stopPublisher_ = true;
+    }
+    signal_->cv.notify_one();
+    if (publisherThread_.joinable()) {
+        publisherThread_.join();
+    }
+    stopDelivery();
+
     // Close connections
     closeEIP();
     closeNATS();
 
+    if (connectionType_ == ConnectionType::PointToPoint) {
+        std::lock_guard<std::mutex> lock(standalonePortsMutex);
+        auto it = standalonePorts.find(port_);
+        if (it != standalonePorts.end()) {
+            standalonePorts.erase(it);
+        }
+    }
+
     running_ = false;
 
     Logger(LogLevel::INFO) << "Bridge stopped - Messages received: "
                            << receivedCount_ << " - Messages published: "
-                           << publishedCount_;
+                           << publishedCount_ << " - Queue overflows: "
+                           << queue_->getOverflowCount();
 }
 
 bool EIPtoNATSBridge::isRunning() const {
     return running_;
 }
 
+const std::string& EIPtoNATSBridge::getPlcAddress() const {
+    return plcAddress_;
+}
+
+const std::string& EIPtoNATSBridge::getNatsSubject() const {
+    return natsSubject_;
+}
+
+ConnectionType EIPtoNATSBridge::getConnectionType() const {
+    return connectionType_;
+}
+
+const ThreadStatus& EIPtoNATSBridge::getThreadStatus() const {
+    return *threadStatus_;
+}
+
+void EIPtoNATSBridge::setupThread(const ThreadOptions& options, ThreadStatus& status,
+                                  bool worker, const std::string& name) {
+    if (options.nameThreads) {
+        nameCurrentThread(name);
+    }
+
+    std::string error;
+    const std::vector<int>& cpus = worker ? options.workerCpus : options.publisherCpus;
+    if (!cpus.empty()) {
+        if (pinCurrentThread(cpus, error)) {
+            (worker ? status.workerPinned : status.publisherPinned) = true;
+        } else {
+            Logger(LogLevel::WARNING) << "Thread " << name << " is not pinned: " << error;
+        }
+    }
+
+    if (worker && options.policy != SchedulingPolicy::Other) {
+        status.workerRealtime = setCurrentThreadScheduling(options.policy, options.priority, error);
+        if (status.workerRealtime) {
+            Logger(LogLevel::INFO) << "Thread " << name << " runs with real-time priority " << options.priority;
+        } else {
+            Logger(LogLevel::WARNING) << "Thread " << name << " keeps the normal scheduler: " << error;
+        }
+    }
+}
+
+const SocketStats& EIPtoNATSBridge::getSocketStats() const {
+    return *socketStats_;
+}
+
+void EIPtoNATSBridge::configureSockets(ConnectionManager& manager, const SocketOptions& options) {
+    std::lock_guard<std::mutex> lock(manager.mutex());
+    manager.setSocketOptions(options.receiveBufferBytes, options.busyPollUs, options.dscp,
+                             options.kernelTimestamps);
+}
+
+void EIPtoNATSBridge::collectSocketStats(ConnectionManager& manager, SocketStats& stats) {
+    std::unique_lock<std::mutex> lock(manager.mutex());
+    const uint64_t drops = manager.takeReceiveDrops();
+    const uint64_t malformed = manager.takeMalformedDatagrams();
+    stats.receiveBufferBytes = manager.getReceiveBufferBytes();
+    lock.unlock();
+
+    // EIPScanner logs the first one every 10 s; count them all
+    stats.malformed += malformed;
+
+    if (drops) {
+        stats.kernelDrops += drops;
+        Logger(LogLevel::DEBUG) << "Kernel dropped " << drops << " T2O datagrams on a full receive buffer";
+    }
+}
+
+void EIPtoNATSBridge::lockMemory(const ThreadOptions& options, ThreadStatus& status) {
+    if (!options.lockMemory || status.memoryLocked) {
+        return;
+    }
+
+    std::string error;
+    status.memoryLocked = lockProcessMemory(error);
+    if (!status.memoryLocked) {
+        Logger(LogLevel::WARNING) << "Memory is not locked: " << error;
+    }
+}
+
 uint64_t EIPtoNATSBridge::getPublishedCount() const {
     return publishedCount_;
 }
@@ -131,70 +432,333 @@ uint64_t EIPtoNATSBridge::getReceivedCount() const {
 }
 
 uint64_t EIPtoNATSBridge::getReconnectCount() const {
-    return reconnectCount_;
+    return reconnectTracker_.stats().reconnects;
+}
+
+ReconnectStats EIPtoNATSBridge::getReconnectStats() const {
+    return reconnectTracker_.stats();
+}
+
+uint64_t EIPtoNATSBridge::getOverflowCount() const {
+    return queue_->getOverflowCount();
+}
+
+size_t EIPtoNATSBridge::getQueueSize() const {
+    return queue_->size();
+}
+
+uint64_t EIPtoNATSBridge::getQueueHighWatermark() const {
+    return queue_->getHighWatermark();
+}
+
+uint64_t EIPtoNATSBridge::getSuppressedCount() const {
+    return suppressedCount_;
+}
+
+SequenceStats EIPtoNATSBridge::getSequenceStats() const {
+    return sequenceTracker_.stats();
+}
+
+HistogramSummary EIPtoNATSBridge::getLatencyStats() const {
+    return latencyHistogram_.summary();
+}
+
+HistogramSummary EIPtoNATSBridge::getJitterStats() const {
+    return jitterHistogram_.summary();
+}
+
+HistogramSummary EIPtoNATSBridge::getReceiveDelayStats() const {
+    return receiveDelayHistogram_.summary();
+}
+
+JetStreamStats EIPtoNATSBridge::getJetStreamStats() const {
+    return jetStream_.stats();
+}
+
+HistogramSummary EIPtoNATSBridge::getAckLatencyStats() const {
+    return jetStream_.ackLatency();
+}
+
+SpoolStats EIPtoNATSBridge::getSpoolStats() const {
+    return spool_ ? spool_->stats() : SpoolStats{};
+}
+
+NatsConnectionStats EIPtoNATSBridge::getNatsStats() const {
+    return natsEvents_->stats();
+}
+
+void EIPtoNATSBridge::resetStats() {
+    latencyHistogram_.reset();
+    jitterHistogram_.reset();
+    receiveDelayHistogram_.reset();
+    jetStream_.resetStats();
+}
+
+bool EIPtoNATSBridge::setDataCallback(DataCallback callback) {
+    // Not waiting: a stop() in progress may need the caller's GIL to join
+    // the delivery thread
+    std::unique_lock<std::mutex> lifecycle(lifecycleMutex_, std::try_to_lock);
+    if (!lifecycle.owns_lock() || running_) {
+        Logger(LogLevel::WARNING) << "Cannot change the data callback while the bridge is running";
+        return false;
+    }
+
+    std::lock_guard<std::mutex> lock(localMutex_);
+    dataCallback_ = std::move(callback);
+    if (dataCallback_) {
+        ensureLocalQueue();
+    } else {
+        // Stop copying packets for nobody; the worker is not running, so
+        // nothing is pushed while the leftovers are discarded
+        localAttached_.store(false, std::memory_order_release);
+        if (localQueueOwner_) {
+            localQueueOwner_->clear();
+        }
+    }
+    return true;
+}
+
+std::shared_ptr<PacketBatch> EIPtoNATSBridge::readBatch(size_t maxPackets,
+                                                       std::chrono::milliseconds timeout) {
+    std::lock_guard<std::mutex> lock(localMutex_);
+    if (dataCallback_) {
+        throw std::runtime_error("readBatch() cannot be used while a data callback is set");
+    }
+
+    PacketRing* queue = ensureLocalQueue();
+    auto batch = acquireBatch();
+    const auto deadline = std::chrono::steady_clock::now() + timeout;
+
+    while (true) {
+        fillBatch(*queue, *batch, maxPackets);
+        if (batch->size() > 0 || maxPackets == 0 || std::chrono::steady_clock::now() >= deadline) {
+            return batch;
+        }
+        localSignal_.waitUntil(deadline, [queue]() { return !queue->empty(); });
+    }
+}
+
+uint64_t EIPtoNATSBridge::getLocalOverflowCount() const {
+    const PacketRing* queue = localQueue_.load(std::memory_order_acquire);
+    return queue ? queue->getOverflowCount() : 0;
+}
+
+PacketRing* EIPtoNATSBridge::ensureLocalQueue() {
+    // Called with localMutex_ held
+    if (!localQueueOwner_) {
+        localQueueOwner_ = std::make_unique<PacketRing>(queueDepth_,
+                                                        std::max<size_t>(t2oSize_, kDefaultSlotSize),
+                                                        OverflowPolicy::DropOldest);
+        localQueue_.store(localQueueOwner_.get(), std::memory_order_release);
+    }
+    localAttached_.store(true, std::memory_order_release);
+    return localQueueOwner_.get();
+}
+
+std::shared_ptr<PacketBatch> EIPtoNATSBridge::acquireBatch() {
+    // A pooled batch is free once nobody but the pool holds it
+    for (auto& batch : batchPool_) {
+        if (batch.use_count() == 1) {
+            batch->clear();
+            return batch;
+        }
+    }
+
+    auto batch = std::make_shared<PacketBatch>();
+    if (batchPool_.size() < kBatchPoolSize) {
+        batchPool_.push_back(batch);
+    }
+    return batch;
+}
+
+void EIPtoNATSBridge::fillBatch(PacketRing& queue, PacketBatch& batch, size_t maxPackets) {
+    while (batch.size() < maxPackets && queue.popInto(batch)) {}
+}
+
+void EIPtoNATSBridge::startDelivery() {
+    if (!dataCallback_) return;
+
+    stopDelivery_ = false;
+    deliveryThread_ = std::thread(&EIPtoNATSBridge::deliveryLoop, this);
+}
+
+void EIPtoNATSBridge::stopDelivery() {
+    if (!deliveryThread_.joinable()) return;
+
+    {
+        std::lock_guard<std::mutex> lock(localSignal_.mutex);
+        stopDelivery_ = true;
+    }
+    localSignal_.cv.notify_one();
+    deliveryThread_.join();
+}
+
+void EIPtoNATSBridge::deliveryLoop() {
+    setupThread(threadOptions_, *threadStatus_, false, threadName("d", plcAddress_));
+    Logger(LogLevel::INFO) << "Delivery thread started";
+
+    PacketRing& queue = *localQueue_.load(std::memory_order_acquire);
+
+    while (true) {
+        auto batch = acquireBatch();
+        fillBatch(queue, *batch, kMaxDeliveryBatch);
+
+        if (batch->size() > 0) {
+            try {
+                dataCallback_(batch);
+            } catch (const std::exception& e) {
+                Logger(LogLevel::ERROR) << "Exception in data callback: " << e.what();
+            }
+            continue;
+        }
+
+        // Queue is empty: exit if asked to, otherwise wait for packets
+        if (stopDelivery_) break;
+
+        localSignal_.waitUntil(
+            std::chrono::steady_clock::now() + std::chrono::milliseconds(kPublisherIdleWaitMs),
+            [this, &queue]() { return stopDelivery_ || !queue.empty(); });
+    }
+
+    Logger(LogLevel::INFO) << "Delivery thread finishing";
 }
 
 bool EIPtoNATSBridge::initNATS() {
-    Logger(LogLevel::INFO) << "Connecting to NATS: " << natsUrl_;
+    return connectNATS(natsUrl_, natsOptions_, *natsEvents_, natsConn_, natsOpts_, spool_ != nullptr);
+}
+
+bool EIPtoNATSBridge::connectNATS(const std::string& url, const NatsOptions& options,
+                                  NatsConnectionEvents& events,
+                                  natsConnection*& conn, natsOptions*& opts,
+                                  bool keepTrying) {
+    Logger(LogLevel::INFO) << "Connecting to NATS: " << url
+                           << (options.servers.empty() ? "" : " (+" + std::to_string(options.servers.size()) + " servers)")
+                           << (options.sendAsap ? " send-asap" : "");
 
     natsStatus s;
 
     // Create options
-    s = natsOptions_Create(&natsOpts_);
+    s = natsOptions_Create(&opts);
     if (s != NATS_OK) {
         Logger(LogLevel::ERROR) << "Error creating NATS options: " << natsStatus_GetText(s);
         return false;
     }
 
-    // Set URL
-    s = natsOptions_SetURL(natsOpts_, natsUrl_.c_str());
-    if (s != NATS_OK) {
-        Logger(LogLevel::ERROR) << "Error setting NATS URL: " << natsStatus_GetText(s);
-        natsOptions_Destroy(natsOpts_);
-        natsOpts_ = nullptr;
-        return false;
+    // Servers, timeouts, reconnect and buffering, and the connection callbacks
+    s = applyNatsOptions(opts, url, options);
+    if (s == NATS_OK) {
+        s = events.attach(opts);
+    }
+
+    // Reconnect forever, and connect in the background if the server is down
+    if (s == NATS_OK && keepTrying) {
+        s = natsOptions_SetAllowReconnect(opts, true);
+        if (s == NATS_OK) s = natsOptions_SetMaxReconnect(opts, -1);
+        if (s == NATS_OK) {
+            s = natsOptions_SetRetryOnFailedConnect(opts, true, &NatsConnectionEvents::onConnected, &events);
+        }
     }
 
-    // Set timeout
-    s = natsOptions_SetTimeout(natsOpts_, 5000);
     if (s != NATS_OK) {
-        Logger(LogLevel::ERROR) << "Error setting NATS timeout: " << natsStatus_GetText(s);
-        natsOptions_Destroy(natsOpts_);
-        natsOpts_ = nullptr;
+        Logger(LogLevel::ERROR) << "Error setting NATS options: " << natsStatus_GetText(s);
+        natsOptions_Destroy(opts);
+        opts = nullptr;
         return false;
     }
 
     // Connect
-    s = natsConnection_Connect(&natsConn_, natsOpts_);
+    s = natsConnection_Connect(&conn, opts);
+    if (s == NATS_NOT_YET_CONNECTED) {
+        Logger(LogLevel::WARNING) << "NATS not reachable yet - spooling until connected";
+        return true;
+    }
     if (s != NATS_OK) {
         Logger(LogLevel::ERROR) << "Error connecting to NATS: " << natsStatus_GetText(s);
-        natsOptions_Destroy(natsOpts_);
-        natsOpts_ = nullptr;
+        natsOptions_Destroy(opts);
+        opts = nullptr;
         return false;
     }
 
+    events.setConnected(true);
     Logger(LogLevel::INFO) << "Connected to NATS successfully";
     return true;
 }
 
+bool EIPtoNATSBridge::openJetStream() {
+    if (!useJetStream_) return true;
+
+    std::lock_guard<std::mutex> lock(natsMutex_);
+    natsStatus s = jetStream_.open(natsConn_);
+    if (s != NATS_OK) {
+        Logger(LogLevel::ERROR) << "Error creating JetStream context: " << natsStatus_GetText(s);
+        return false;
+    }
+    return true;
+}
+
 bool EIPtoNATSBridge::initEIP() {
     Logger(LogLevel::INFO) << "Connecting to EIP PLC: " << plcAddress_;
 
     try {
-        // Create SessionInfo
-        sessionInfo_ = std::make_shared<SessionInfo>(plcAddress_, 0xAF12);
+        sessionInfo_ = openSession(plcAddress_);
+    } catch (const std::exception& e) {
+        Logger(LogLevel::ERROR) << "Exception opening the EIP session: " << e.what();
+        return false;
+    }
+
+    if (!openIOConnection()) {
+        sessionInfo_.reset();
+        return false;
+    }
+    return true;
+}
+
+std::shared_ptr<SessionInfo> EIPtoNATSBridge::openSession(const std::string& plcAddress) {
+    return std::make_shared<SessionInfo>(plcAddress, 0xAF12);
+}
+
+bool EIPtoNATSBridge::reuseSession() {
+    if (!sessionInfo_) {
+        return false;
+    }
 
-        // Create ConnectionManager
-        connectionManager_ = std::make_unique<ConnectionManager>();
+    Logger(LogLevel::INFO) << "Reopening the I/O connection on the existing session to " << plcAddress_;
+    if (openIOConnection()) {
+        return true;
+    }
+
+    Logger(LogLevel::INFO) << "Session to " << plcAddress_ << " is no longer usable";
+    sessionInfo_.reset();
+    return false;
+}
+
+bool EIPtoNATSBridge::openIOConnection() {
+    try {
+        // The gap across a reconnect is not jitter or loss, and the first
+        // packet after it is always published
+        hasLastReceive_ = false;
+        changeFilter_.reset();
+        sequenceTracker_.restart();
+
+        // Create ConnectionManager (a BridgeGroup provides a shared one)
+        if (!connectionManager_) {
+            connectionManager_ = std::make_shared<ConnectionManager>();
+            configureSockets(*connectionManager_, socketOptions_);
+        }
 
         // Configure connection parameters
         ConnectionParameters parameters;
         parameters.connectionPath = {0x20, 0x04, 0x24, configAssembly_, 0x2C, o2tAssembly_, 0x2C, t2oAssembly_};
         parameters.o2tRealTimeFormat = true;
+        parameters.t2oRealTimeFormat = t2oRunIdleHeader_;
         parameters.originatorVendorId = 342;
         parameters.originatorSerialNumber = 0x12345;
 
-        parameters.t2oNetworkConnectionParams |= NetworkConnectionParams::P2P;
+        // Multicast T2O: the target picks the group and port and reports them
+        // in the Forward Open reply, where the patched EIPScanner joins it
+        parameters.t2oNetworkConnectionParams |= connectionType_ == ConnectionType::PointToPoint
+            ? NetworkConnectionParams::P2P
+            : NetworkConnectionParams::MULTICAST;
         parameters.t2oNetworkConnectionParams |= NetworkConnectionParams::SCHEDULED_PRIORITY;
         parameters.t2oNetworkConnectionParams |= t2oSize_;
 
@@ -208,18 +772,23 @@ bool EIPtoNATSBridge::initEIP() {
         parameters.connectionTimeoutMultiplier = 3; // timeout = (4 << 3) × RPI = 32 × 2ms = 64ms
         parameters.transportTypeTrigger |= NetworkConnectionParams::CLASS1 | NetworkConnectionParams::TRIG_CYCLIC;
 
-        // Open connection
+        // Open connection; in a BridgeGroup the worker keeps handling the other
+        // connections meanwhile, but not this one before its listeners are set
+        std::lock_guard<std::mutex> lock(connectionManager_->mutex());
         ioConnection_ = connectionManager_->forwardOpen(sessionInfo_, parameters);
 
         if (auto ptr = ioConnection_.lock()) {
             // Set up listener for received data
-            ptr->setReceiveDataListener([this](auto realTimeHeader, auto sequence, auto data) {
-                this->onEIPDataReceived(realTimeHeader, sequence, data);
+            // By reference: EIPScanner hands over its own buffer, no copy per packet
+            ptr->setReceiveDataListener([this](cip::CipUdint realTimeHeader,
+                                               cip::CipUint sequence,
+                                               const std::vector<uint8_t>& data) {
+                this->receivePacket(realTimeHeader, sequence, data.data(), data.size());
             });
 
             // Set up listener for connection close — trigger reconnection
             ptr->setCloseListener([this]() {
-                Logger(LogLevel::WARNING) << "EIP connection closed by the PLC";
+                Logger(LogLevel::WARNING) << "EIP connection closed by the PLC " << plcAddress_;
                 needsReconnect_ = true;
             });
 
@@ -227,87 +796,128 @@ bool EIPtoNATSBridge::initEIP() {
             return true;
         } else {
             Logger(LogLevel::ERROR) << "Error: Could not obtain IOConnection pointer";
+            if (connectionType_ == ConnectionType::ListenOnly) {
+                Logger(LogLevel::ERROR) << "A listen-only connection can only be opened while another "
+                                           "scanner owns a multicast connection to the same assembly of "
+                                        << plcAddress_;
+            }
             return false;
         }
 
     } catch (const std::exception& e) {
-        Logger(LogLevel::ERROR) << "Exception initializing EIP: " << e.what();
+        Logger(LogLevel::ERROR) << "Exception opening the EIP I/O connection: " << e.what();
         return false;
     }
 }
 
 void EIPtoNATSBridge::closeNATS() {
+    // Wait for outstanding acks while the connection is still up
+    jetStream_.close();
+
     std::lock_guard<std::mutex> lock(natsMutex_);
+    disconnectNATS(natsConn_, natsOpts_, *natsEvents_);
+}
 
-    if (natsConn_ != nullptr) {
+void EIPtoNATSBridge::disconnectNATS(natsConnection*& conn, natsOptions*& opts, NatsConnectionEvents& events) {
+    if (conn != nullptr) {
         Logger(LogLevel::INFO) << "Closing NATS connection...";
-        natsConnection_Destroy(natsConn_);
-        natsConn_ = nullptr;
+        events.setConnected(false);
+        natsConnection_Destroy(conn);
+        conn = nullptr;
+        // The callbacks still queued point at events
+        events.waitClosed(std::chrono::milliseconds(kNatsCloseWaitMs));
     }
 
-    if (natsOpts_ != nullptr) {
-        natsOptions_Destroy(natsOpts_);
-        natsOpts_ = nullptr;
+    if (opts != nullptr) {
+        natsOptions_Destroy(opts);
+        opts = nullptr;
     }
 }
 
-void EIPtoNATSBridge::closeEIP() {
+void EIPtoNATSBridge::closeEIP(bool keepSession) {
     Logger(LogLevel::INFO) << "Closing EIP connection...";
 
     if (connectionManager_ && sessionInfo_) {
         try {
+            std::lock_guard<std::mutex> lock(connectionManager_->mutex());
             connectionManager_->forwardClose(sessionInfo_, ioConnection_);
             Logger(LogLevel::INFO) << "Forward Close sent";
         } catch (const std::exception& e) {
             Logger(LogLevel::ERROR) << "Error in forward close: " << e.what();
+            keepSession = false;
         }
     }
 
     ioConnection_.reset();
-    connectionManager_.reset();
+    if (keepSession) {
+        return;
+    }
+    if (!hosted_) {
+        connectionManager_.reset();
+    }
     sessionInfo_.reset();
 }
 
 void EIPtoNATSBridge::workerLoop() {
+    setupThread(threadOptions_, *threadStatus_, true, threadName("w", plcAddress_));
     Logger(LogLevel::INFO) << "Worker thread started";
 
     while (!shouldStop_) {
         // Normal operation: process EIP data
+        std::unique_lock<std::mutex> lock(connectionManager_->mutex());
         if (connectionManager_->hasOpenConnections() && !needsReconnect_) {
-            connectionManager_->handleConnections(std::chrono::milliseconds(1));
+            // Drains every pending datagram per wakeup (recvmmsg), then one
+            // wakeup of the publisher for all of them
+            connectionManager_->handleConnectionsBatched(pollTimeout_);
+            lock.unlock();
+            notifyReceived();
+            collectSocketStats(*connectionManager_, *socketStats_);
             continue;
         }
+        lock.unlock();
 
         if (shouldStop_) break;
 
         // Connection lost — attempt reconnect
         needsReconnect_ = false;
+        reconnectTracker_.lost(std::chrono::steady_clock::now());
         Logger(LogLevel::WARNING) << "EIP connection lost, attempting reconnection...";
 
-        // Clean up old EIP connection (keep NATS alive)
-        closeEIP();
+        // Clean up old EIP connection (keep NATS alive, and the TCP session
+        // if it may still be good)
+        closeEIP(reconnectOptions_.reuseSession);
 
-        // Retry loop with delay
+        // Retry loop with exponential backoff
+        backoff_.reset();
         bool reconnected = false;
         int attempt = 0;
         while (!shouldStop_) {
+            const auto delay = backoff_.next();
+            if (delay.count() > 0) {
+                Logger(LogLevel::INFO) << "Retrying in " << delay.count() << " ms...";
+            }
+
+            // Sleep in small increments so stop() remains responsive
+            const auto retryAt = std::chrono::steady_clock::now() + delay;
+            while (!shouldStop_ && std::chrono::steady_clock::now() < retryAt) {
+                std::this_thread::sleep_for(std::min<std::chrono::steady_clock::duration>(
+                    retryAt - std::chrono::steady_clock::now(), std::chrono::milliseconds(100)));
+            }
+            if (shouldStop_) break;
+
             attempt++;
+            reconnectTracker_.attempt();
             Logger(LogLevel::INFO) << "Reconnect attempt " << attempt << "...";
 
-            if (initEIP()) {
-                reconnectCount_++;
+            const bool sessionReused = reuseSession();
+            if (sessionReused || initEIP()) {
+                reconnectTracker_.reconnected(sessionReused);
                 reconnected = true;
                 Logger(LogLevel::INFO) << "Reconnected successfully (attempt " << attempt << ")";
                 break;
             }
 
-            Logger(LogLevel::WARNING) << "Reconnect attempt " << attempt
-                                      << " failed, retrying in " << kReconnectDelayMs / 1000 << "s...";
-
-            // Sleep in small increments so stop() remains responsive
-            for (int i = 0; i < kReconnectDelayMs / 100 && !shouldStop_; i++) {
-                std::this_thread::sleep_for(std::chrono::milliseconds(100));
-            }
+            Logger(LogLevel::WARNING) << "Reconnect attempt " << attempt << " failed";
         }
 
         if (!reconnected) break;
@@ -316,70 +926,453 @@ void EIPtoNATSBridge::workerLoop() {
     Logger(LogLevel::INFO) << "Worker thread finishing";
 }
 
-bool EIPtoNATSBridge::publishToNATS(const std::vector<uint8_t>& data) {
-    std::lock_guard<std::mutex> lock(natsMutex_);
+void EIPtoNATSBridge::publisherLoop() {
+    setupThread(threadOptions_, *threadStatus_, false, threadName("p", plcAddress_));
+    Logger(LogLevel::INFO) << "Publisher thread started";
 
-    if (natsConn_ == nullptr) {
-        Logger(LogLevel::ERROR) << "No active NATS connection";
+    while (true) {
+        if (drainQueue()) continue;
+
+        // Queue is empty: close a pending batch if its time is up
+        if (flushDueBatch(stopPublisher_)) continue;
+
+        // Exit if asked to (unreplayed messages stay on disk)
+        if (stopPublisher_) break;
+
+        // Live traffic is all out: catch up on the spool
+        if (replaySpool()) continue;
+
+        // Sleep until notified, the batch is due or the next replay batch
+        auto wakeAt = batchCount_ > 0
+            ? batchDeadline_
+            : std::chrono::steady_clock::now() + std::chrono::milliseconds(kPublisherIdleWaitMs);
+        wakeAt = std::min(wakeAt, replayDueAt());
+
+        signal_->waitUntil(wakeAt, [this]() {
+            return stopPublisher_ || !queue_->empty();
+        });
+    }
+
+    Logger(LogLevel::INFO) << "Publisher thread finishing";
+}
+
+bool EIPtoNATSBridge::drainQueue() {
+    // Bounded so a BridgeGroup publisher also gets to the other bridges
+    size_t drained = 0;
+    while (drained < queue_->capacity() && queue_->pop(popped_)) {
+        drained++;
+        if (overflowPolicy_ == OverflowPolicy::Block) {
+            roomSignal_.notify();
+        }
+
+        if (batchMaxPackets_ <= 1) {
+            if (!publishPacket(popped_)) {
+                Logger(LogLevel::WARNING) << "Failed to publish data to NATS";
+            }
+            continue;
+        }
+
+        addToBatch(popped_);
+        if (batchCount_ >= batchMaxPackets_ ||
+            (batchMaxDelayUs_ > 0 && std::chrono::steady_clock::now() >= batchDeadline_)) {
+            flushBatch();
+        }
+    }
+    return drained > 0;
+}
+
+bool EIPtoNATSBridge::flushDueBatch(bool force) {
+    if (batchCount_ == 0) return false;
+
+    if (!force && batchMaxDelayUs_ > 0 && std::chrono::steady_clock::now() < batchDeadline_) {
         return false;
     }
 
-    natsStatus s;
+    flushBatch();
+    return true;
+}
 
-    if (useBinaryFormat_) {
+bool EIPtoNATSBridge::publishPacket(const Packet& packet) {
+    const PacketInfo info{packet.receivedAt, packet.sequence, packet.realTimeHeader};
+
+    bool published;
+    if (useBinaryFormat_ && !tagSequence_) {
         // Publish binary data directly (more efficient)
-        s = natsConnection_Publish(natsConn_,
-                                   natsSubject_.c_str(),
-                                   data.data(),
-                                   data.size());
+        published = publishToNATS(packet.data.data(), packet.data.size(), &info, 1);
+    } else if (useBinaryFormat_) {
+        // Sequence count (uint16 little-endian) + payload
+        publishBuffer_.clear();
+        appendSequence(packet.sequence, publishBuffer_);
+        publishBuffer_.insert(publishBuffer_.end(), packet.data.begin(), packet.data.end());
+        published = publishToNATS(publishBuffer_.data(), publishBuffer_.size(), &info, 1);
     } else {
         // Publish as JSON (for debugging or interoperability)
-        std::ostringstream jsonStream;
-        jsonStream << "{\"timestamp\":" << time(nullptr)
-                   << ",\"sequence\":" << receivedCount_
-                   << ",\"size\":" << data.size()
-                   << ",\"data\":\"";
-
-        // Convert bytes to hexadecimal
-        for (const auto& byte : data) {
-            jsonStream << std::hex << std::setfill('0') << std::setw(2) << (int)byte;
+        publishBuffer_.clear();
+        appendJson(packet, publishBuffer_);
+        published = publishToNATS(publishBuffer_.data(), publishBuffer_.size(), &info, 1);
+    }
+    return published;
+}
+
+void EIPtoNATSBridge::recordLatency(std::chrono::steady_clock::time_point receivedAt,
+                                    std::chrono::steady_clock::time_point publishedAt) {
+    const auto latency = std::chrono::duration_cast<std::chrono::nanoseconds>(publishedAt - receivedAt);
+    latencyHistogram_.record(static_cast<uint64_t>(std::max<int64_t>(latency.count(), 0)));
+}
+
+void EIPtoNATSBridge::addToBatch(const Packet& packet) {
+    if (batchCount_ == 0) {
+        publishBuffer_.clear();
+        batchDeadline_ = packet.receivedAt + std::chrono::microseconds(batchMaxDelayUs_);
+        if (!useBinaryFormat_) {
+            publishBuffer_.push_back('[');
         }
+    } else if (!useBinaryFormat_) {
+        publishBuffer_.push_back(',');
+    }
+
+    if (useBinaryFormat_) {
+        // Frame: uint16 little-endian length [+ uint16 sequence count] + payload
+        const uint16_t size = static_cast<uint16_t>(packet.data.size());
+        publishBuffer_.push_back(static_cast<uint8_t>(size & 0xFF));
+        publishBuffer_.push_back(static_cast<uint8_t>(size >> 8));
+        if (tagSequence_) {
+            appendSequence(packet.sequence, publishBuffer_);
+        }
+        publishBuffer_.insert(publishBuffer_.end(), packet.data.begin(), packet.data.end());
+    } else {
+        appendJson(packet, publishBuffer_);
+    }
+
+    batchPackets_.push_back({packet.receivedAt, packet.sequence, packet.realTimeHeader});
+    batchCount_++;
+}
+
+void EIPtoNATSBridge::flushBatch() {
+    if (batchCount_ == 0) return;
+
+    if (!useBinaryFormat_) {
+        publishBuffer_.push_back(']');
+    }
+
+    if (!publishToNATS(publishBuffer_.data(), publishBuffer_.size(), batchPackets_.data(), batchCount_)) {
+        Logger(LogLevel::WARNING) << "Failed to publish batch of " << batchCount_ << " packets to NATS";
+    }
+
+    batchPackets_.clear();
+    batchCount_ = 0;
+}
+
+void EIPtoNATSBridge::appendJson(const Packet& packet, std::vector<uint8_t>& out) const {
+    // Receive time in seconds since the epoch, the same clock as Eip-Timestamp-Ns
+    const auto receivedAt = std::chrono::duration_cast<std::chrono::nanoseconds>(
+        packet.receivedAt.time_since_epoch()) + systemClockOffset();
+    encoder::appendJsonPacket(out,
+                              std::chrono::duration_cast<std::chrono::seconds>(receivedAt).count(),
+                              packet.receiveIndex,
+                              packet.data.data(),
+                              packet.data.size(),
+                              jsonEncoding_,
+                              tagSequence_ ? &packet.sequence : nullptr);
+}
+
+void EIPtoNATSBridge::appendSequence(uint16_t sequence, std::vector<uint8_t>& out) {
+    out.push_back(static_cast<uint8_t>(sequence & 0xFF));
+    out.push_back(static_cast<uint8_t>(sequence >> 8));
+}
 
-        jsonStream << "\"}";
-        std::string jsonStr = jsonStream.str();
+bool EIPtoNATSBridge::publishToNATS(const uint8_t* payload, size_t size,
+                                    const PacketInfo* packets, size_t count) {
+    std::lock_guard<std::mutex> lock(natsMutex_);
 
-        s = natsConnection_PublishString(natsConn_, natsSubject_.c_str(), jsonStr.c_str());
+    if (natsConn_ == nullptr) {
+        Logger(LogLevel::ERROR) << "No active NATS connection";
+        return false;
+    }
+
+    // While nats.c is reconnecting it would only buffer the message in memory
+    if (spool_ && !natsConnected()) {
+        return spoolMessage(payload, size, packets, count);
     }
 
+    const natsStatus s = sendToNATS(payload, size, packets, count);
     if (s == NATS_OK) {
-        publishedCount_++;
-        Logger(LogLevel::DEBUG) << "Published to NATS [" << publishedCount_ << "]: "
-                               << data.size() << " bytes ("
-                               << (useBinaryFormat_ ? "binary" : "JSON") << ")";
+        publishedCount_ += count;
+        const auto now = std::chrono::steady_clock::now();
+        for (size_t i = 0; i < count; i++) {
+            recordLatency(packets[i].receivedAt, now);
+        }
+        if (isLogEnabled(LogLevel::DEBUG)) {
+            Logger(LogLevel::DEBUG) << "Published to NATS [" << publishedCount_ << "]: "
+                                   << size << " bytes, " << count << " packet(s) ("
+                                   << (useBinaryFormat_ ? "binary" : "JSON") << ")";
+        }
         return true;
-    } else {
-        Logger(LogLevel::ERROR) << "Error publishing to NATS: " << natsStatus_GetText(s);
+    }
+
+    if (spool_) {
+        Logger(LogLevel::DEBUG) << "Error publishing to NATS, spooling: " << natsStatus_GetText(s);
+        return spoolMessage(payload, size, packets, count);
+    }
+
+    Logger(LogLevel::ERROR) << "Error publishing to NATS: " << natsStatus_GetText(s);
+    return false;
+}
+
+natsStatus EIPtoNATSBridge::sendToNATS(const uint8_t* payload, size_t size,
+                                       const PacketInfo* packets, size_t count) {
+    if (!natsHeaders_ && !useJetStream_) {
+        return natsConnection_Publish(natsConn_,
+                                      natsSubject_.c_str(),
+                                      payload,
+                                      static_cast<int>(size));
+    }
+
+    natsMsg* msg = nullptr;
+    natsStatus s = createMessage(&msg, payload, size, packets, count);
+    if (s == NATS_OK) {
+        // JetStream takes ownership of the message on success. A full window
+        // is waited out until the bridge stops, or the connection drops with a
+        // spool to take the message
+        s = useJetStream_
+            ? jetStream_.publish(msg, [this]() { return !shouldStop_ && !(spool_ && !natsConnected()); })
+            : natsConnection_PublishMsg(natsConn_, msg);
+    }
+    if (msg != nullptr) {
+        natsMsg_Destroy(msg);
+    }
+    return s;
+}
+
+bool EIPtoNATSBridge::natsConnected() const {
+    return natsConn_ != nullptr && natsConnection_Status(natsConn_) == NATS_CONN_STATUS_CONNECTED;
+}
+
+bool EIPtoNATSBridge::spoolMessage(const uint8_t* payload, size_t size,
+                                   const PacketInfo* packets, size_t count) {
+    // Receive times are stored on the system clock so they survive a restart
+    const auto systemOffset = systemClockOffset();
+
+    spoolMeta_.resize(count * kSpoolPacketSize);
+    uint8_t* meta = spoolMeta_.data();
+    for (size_t i = 0; i < count; i++, meta += kSpoolPacketSize) {
+        const int64_t timestampNs = (std::chrono::duration_cast<std::chrono::nanoseconds>(
+            packets[i].receivedAt.time_since_epoch()) + systemOffset).count();
+        const uint16_t padding = 0;
+        std::memcpy(meta, &timestampNs, 8);
+        std::memcpy(meta + 8, &packets[i].sequence, 2);
+        std::memcpy(meta + 10, &padding, 2);
+        std::memcpy(meta + 12, &packets[i].realTimeHeader, 4);
+    }
+
+    if (!spool_->append(spoolMeta_.data(), spoolMeta_.size(), payload, size)) {
+        Logger(LogLevel::DEBUG) << "Spool dropped a message of " << count << " packet(s)";
         return false;
     }
+    return true;
+}
+
+bool EIPtoNATSBridge::replaySpool() {
+    if (!spool_ || spool_->empty()) return false;
+
+    const auto now = std::chrono::steady_clock::now();
+    if (now < nextReplayAt_) return false;
+
+    // Pace batches so that replaying stays under spoolReplayRate_
+    const auto pace = spoolReplayRate_ > 0
+        ? std::chrono::duration_cast<std::chrono::steady_clock::duration>(
+              std::chrono::microseconds(uint64_t(spoolReplayBatch_) * 1000000 / spoolReplayRate_))
+        : std::chrono::steady_clock::duration::zero();
+
+    std::lock_guard<std::mutex> lock(natsMutex_);
+    if (!natsConnected()) {
+        nextReplayAt_ = now + std::chrono::milliseconds(kPublisherIdleWaitMs);
+        return false;
+    }
+
+    const auto systemOffset = systemClockOffset();
+    uint32_t replayed = 0;
+    DiskSpool::Record record;
+    while (replayed < spoolReplayBatch_ && spool_->front(record)) {
+        const size_t count = record.metaSize / kSpoolPacketSize;
+        replayPackets_.resize(count);
+        const uint8_t* meta = record.meta;
+        for (size_t i = 0; i < count; i++, meta += kSpoolPacketSize) {
+            int64_t timestampNs;
+            std::memcpy(&timestampNs, meta, 8);
+            std::memcpy(&replayPackets_[i].sequence, meta + 8, 2);
+            std::memcpy(&replayPackets_[i].realTimeHeader, meta + 12, 4);
+            replayPackets_[i].receivedAt = std::chrono::steady_clock::time_point(
+                std::chrono::duration_cast<std::chrono::steady_clock::duration>(
+                    std::chrono::nanoseconds(timestampNs) - systemOffset));
+        }
+
+        const natsStatus s = sendToNATS(record.payload, record.payloadSize, replayPackets_.data(), count);
+        if (s != NATS_OK) {
+            // Keep it for the next batch
+            Logger(LogLevel::DEBUG) << "Error replaying spooled message: " << natsStatus_GetText(s);
+            break;
+        }
+
+        // Not timed: the outage would swamp the latency histogram
+        spool_->pop();
+        publishedCount_ += count;
+        replayed++;
+    }
+
+    nextReplayAt_ = replayed > 0 || spoolReplayRate_ > 0
+        ? now + pace
+        : now + std::chrono::milliseconds(kPublisherIdleWaitMs);
+
+    if (replayed > 0 && spool_->empty()) {
+        Logger(LogLevel::INFO) << "Spool replayed - " << spool_->stats().replayed << " messages so far";
+    }
+    return replayed > 0;
+}
+
+std::chrono::steady_clock::time_point EIPtoNATSBridge::replayDueAt() const {
+    return spool_ && !spool_->empty() ? nextReplayAt_ : std::chrono::steady_clock::time_point::max();
 }
 
-void EIPtoNATSBridge::onEIPDataReceived(uint32_t realTimeHeader,
-                                        uint16_t sequence,
-                                        const std::vector<uint8_t>& data) {
-    receivedCount_++;
+natsStatus EIPtoNATSBridge::createMessage(natsMsg** msg, const uint8_t* payload, size_t size,
+                                         const PacketInfo* packets, size_t count) {
+    natsStatus s = natsMsg_Create(msg, natsSubject_.c_str(), nullptr,
+                                  reinterpret_cast<const char*>(payload), static_cast<int>(size));
+    if (s != NATS_OK || !natsHeaders_) {
+        return s;
+    }
+
+    // Map receive times onto the system clock once per message
+    const auto systemOffset = systemClockOffset();
+
+    char value[24];
+    for (size_t i = 0; i < count && s == NATS_OK; i++) {
+        // Set the first value, add one more per packet of a batch
+        auto header = i == 0 ? natsMsgHeader_Set : natsMsgHeader_Add;
+
+        *std::to_chars(value, value + sizeof(value) - 1, packets[i].sequence).ptr = '\0';
+        s = header(*msg, kHeaderSequence, value);
+
+        if (s == NATS_OK && t2oRunIdleHeader_) {
+            // Bit 0 of the 32-bit real-time header: 1 = run, 0 = idle
+            s = header(*msg, kHeaderRunIdle, (packets[i].realTimeHeader & 0x1) ? "run" : "idle");
+        }
 
-    // Detailed log of received data
-    std::ostringstream ss;
-    ss << "EIP RX [" << receivedCount_ << "] seq=" << sequence
-       << " size=" << data.size() << " data=";
-    for (const auto& byte : data) {
-        ss << std::hex << std::setfill('0') << std::setw(2) << (int)byte << " ";
+        if (s == NATS_OK) {
+            const auto timestampNs = std::chrono::duration_cast<std::chrono::nanoseconds>(
+                packets[i].receivedAt.time_since_epoch()) + systemOffset;
+            *std::to_chars(value, value + sizeof(value) - 1, timestampNs.count()).ptr = '\0';
+            s = header(*msg, kHeaderTimestamp, value);
+        }
     }
 
-    Logger(LogLevel::DEBUG) << ss.str();
+    if (s == NATS_OK) {
+        s = natsMsgHeader_Set(*msg, kHeaderPlc, plcAddress_.c_str());
+    }
 
-    // Publish to NATS
-    if (!publishToNATS(data)) {
-        Logger(LogLevel::WARNING) << "Failed to publish data to NATS";
+    if (s != NATS_OK) {
+        natsMsg_Destroy(*msg);
+        *msg = nullptr;
+    }
+    return s;
+}
+
+std::chrono::steady_clock::time_point EIPtoNATSBridge::receiveTime() {
+    const auto now = std::chrono::steady_clock::now();
+    const int64_t kernelNs = ConnectionManager::receiveTimestampNs();
+    if (kernelNs == 0) {
+        return now;
+    }
+
+    const int64_t delayNs = std::chrono::duration_cast<std::chrono::nanoseconds>(
+        std::chrono::system_clock::now().time_since_epoch()).count() - kernelNs;
+    // A step of the system clock makes the delay meaningless
+    if (delayNs < 0 || delayNs > kMaxReceiveDelayNs) {
+        return now;
+    }
+    receiveDelayHistogram_.record(static_cast<uint64_t>(delayNs));
+    return now - std::chrono::nanoseconds(delayNs);
+}
+
+void EIPtoNATSBridge::receivePacket(uint32_t realTimeHeader,
+                                    uint16_t sequence,
+                                    const uint8_t* data,
+                                    size_t size) {
+    const auto now = receiveTime();
+    const uint64_t receiveIndex = ++receivedCount_;
+    reconnectTracker_.packetReceived(now);
+
+    const auto order = sequenceTracker_.observe(sequence);
+    if (order != SequenceTracker::Result::InOrder && order != SequenceTracker::Result::First &&
+        isLogEnabled(LogLevel::DEBUG)) {
+        Logger(LogLevel::DEBUG) << "EIP RX seq=" << sequence << " from " << plcAddress_ << ": "
+                                << (order == SequenceTracker::Result::Gap ? "gap"
+                                    : order == SequenceTracker::Result::Duplicate ? "duplicate"
+                                    : "out of order");
+    }
+
+    // Deviation of the inter-arrival time from the RPI (microseconds)
+    if (hasLastReceive_) {
+        const int64_t intervalNs = std::chrono::duration_cast<std::chrono::nanoseconds>(
+            now - lastReceivedAt_).count();
+        const int64_t deviationNs = intervalNs - static_cast<int64_t>(rpi_) * 1000;
+        jitterHistogram_.record(static_cast<uint64_t>(deviationNs < 0 ? -deviationNs : deviationNs));
+    }
+    lastReceivedAt_ = now;
+    hasLastReceive_ = true;
+
+    // Local consumers see every packet, before change-only filtering
+    PacketRing* local = localQueue_.load(std::memory_order_acquire);
+    if (local && localAttached_.load(std::memory_order_acquire)) {
+        if (local->push(realTimeHeader, sequence, receiveIndex, now, data, size)) {
+            localPending_ = true;
+        }
+    }
+
+    // Detailed log of received data (only built when it will be printed)
+    if (isLogEnabled(LogLevel::DEBUG)) {
+        std::ostringstream ss;
+        ss << "EIP RX [" << receiveIndex << "] seq=" << sequence
+           << " size=" << size << " data=";
+        for (size_t i = 0; i < size; i++) {
+            ss << std::hex << std::setfill('0') << std::setw(2) << (int)data[i] << " ";
+        }
+
+        Logger(LogLevel::DEBUG) << ss.str();
+    }
+
+    // Change-only mode: drop frames identical to the last published one
+    if (changeOnly_ && !changeFilter_.pass(data, size, now)) {
+        suppressedCount_++;
+        return;
+    }
+
+    // Hand off to the publisher thread; never touch NATS from here
+    while (!queue_->push(realTimeHeader, sequence, receiveIndex, now, data, size)) {
+        // Nothing drains the queue of a stopped bridge
+        if (overflowPolicy_ != OverflowPolicy::Block || shouldStop_ || !running_) {
+            return;
+        }
+        // The publisher may be asleep on packets it has not been told about
+        notifyReceived();
+        // Sleep until it pops one: a real-time worker spinning here would keep
+        // a publisher on the same CPU from ever running
+        roomSignal_.waitUntil(
+            std::chrono::steady_clock::now() + std::chrono::milliseconds(kPublisherIdleWaitMs),
+            [this]() { return queue_->size() < queue_->capacity() || shouldStop_; });
+    }
+
+    // Woken once per burst by notifyReceived(), not once per packet
+    publishPending_ = true;
+}
+
+void EIPtoNATSBridge::notifyReceived() {
+    if (publishPending_) {
+        publishPending_ = false;
+        signal_->notify();
+    }
+    if (localPending_) {
+        localPending_ = false;
+        localSignal_.notify();
     }
 }
@@ -2,6 +2,7 @@
 #define EIP_TO_NATS_BRIDGE_H
 
 #include <memory>
+#include <functional>
 #include <thread>
 #include <atomic>
 #include <mutex>
@@ -11,6 +12,18 @@
 #include <cip/connectionManager/NetworkConnectionParams.h>
 #include "SessionInfo.h"
 #include "ConnectionManager.h"
+#include "PacketRing.h"
+#include "LatencyHistogram.h"
+#include "ChangeFilter.h"
+#include "SequenceTracker.h"
+#include "JetStreamPublisher.h"
+#include "DiskSpool.h"
+#include "NatsOptions.h"
+#include "ReconnectBackoff.h"
+#include "SocketOptions.h"
+#include "ThreadOptions.h"
+#include "PayloadEncoder.h"
+#include "utils/Logger.h"
 
 namespace bridge {
 
@@ -31,20 +44,135 @@ struct ClipX {
 
 } // namespace devices
 
+/**
+ * @brief How the T2O (PLC -> bridge) data of the I/O connection is delivered
+ *
+ * With Multicast the PLC produces one stream for every consumer of the same
+ * assembly, so redundant bridges or diagnostic tools do not add packet load.
+ * The multicast group and port (normally 2222) come from the Forward Open
+ * reply; the bridge's port setting only applies to point-to-point.
+ */
+enum class ConnectionType {
+    PointToPoint,  ///< Exclusive-owner connection, unicast T2O (default)
+    Multicast,     ///< Owning connection, multicast T2O that other consumers may join
+    ListenOnly     ///< Joins the multicast T2O of a connection owned by someone else;
+                   ///< o2tAssembly must be the device's listen-only connection point
+};
+
+class BridgeGroup;
+
+/**
+ * @brief Set the log level used by EIPScanner's Logger and by the bridge
+ *
+ * The bridge keeps its own copy of the level so hot paths can skip building
+ * DEBUG messages (hex dumps, per-publish lines) unless they will be printed.
+ */
+void setLogLevel(eipScanner::utils::LogLevel level);
+
+/**
+ * @brief Get the current log level
+ */
+eipScanner::utils::LogLevel getLogLevel();
+
 /**
  * @brief Bridge between EtherNet/IP (using EIPScanner) and NATS
  *
  * This class manages an implicit EIP connection and publishes received
  * data to a NATS server in a separate thread.
+ *
+ * The EIP worker thread only copies each T2O packet into a preallocated
+ * ring; a dedicated publisher thread drains the ring and talks to NATS, so a
+ * slow broker never delays EIP processing.
+ *
+ * With batching enabled (batchMaxPackets > 1) several packets are sent as one
+ * NATS message. In binary format each packet is framed as a 2-byte
+ * little-endian length followed by the payload; in JSON format the message is
+ * an array of the per-packet objects.
+ *
+ * Every packet is timestamped when it is received (by the kernel with
+ * SocketOptions::kernelTimestamps); the time until its NATS
+ * publish call returns and the deviation of its inter-arrival time from the
+ * RPI are recorded in lock-free histograms (see getLatencyStats()).
+ *
+ * The 16-bit CIP sequence count of every T2O packet is followed to count
+ * gaps, duplicates and out-of-order frames (see getSequenceStats()); with
+ * tagSequence it is also published so subscribers can detect loss themselves.
+ *
+ * With natsHeaders every message carries the packet metadata as NATS headers
+ * (CIP sequence count, receive time in ns since the epoch and PLC address)
+ * while the payload stays as it is; a batch repeats each per-packet header
+ * once per packet, in order. The run/idle bit is added only with
+ * t2oRunIdleHeader, which asks for the 32-bit header on the T2O connection;
+ * modeless T2O data carries no run/idle state to report.
+ *
+ * With JetStream enabled (see JetStreamOptions) messages are published to
+ * JetStream asynchronously: up to maxPending messages wait for their
+ * acknowledgement at a time, and acks, nacks, timeouts and ack latency are
+ * counted (see getJetStreamStats()).
+ *
+ * With a spool directory (see SpoolOptions) the bridge stores and forwards: while NATS is
+ * unreachable (or a publish fails) encoded messages are appended to
+ * memory-mapped segment files instead of being dropped, and once the
+ * connection is back they are replayed in batches at a capped rate, after the
+ * live traffic of each publisher pass (see DiskSpool and getSpoolStats()).
+ *
+ * Packets can also be consumed in-process, either pushed to a callback
+ * (setDataCallback()) or pulled with readBatch(), without going through NATS.
  */
 class EIPtoNATSBridge {
 public:
+    /**
+     * @brief Receives batches of T2O packets on the bridge's delivery thread
+     *
+     * The batch comes from a small pool and is reused once the callee has
+     * released every reference to it.
+     */
+    using DataCallback = std::function<void(const std::shared_ptr<PacketBatch>&)>;
+
     /**
      * @brief Constructor
      * @param plcAddress PLC IP address
      * @param natsUrl NATS server URL (e.g. "nats://192.168.17.138:4222")
      * @param natsSubject Subject/topic where data will be published
      * @param useBinaryFormat If true uses binary, if false uses JSON (default: true)
+     * @param queueDepth Number of packets buffered between EIP and NATS (default: 1024)
+     * @param overflowPolicy What to do when the queue is full (default: DropOldest)
+     * @param batchMaxPackets Packets grouped into one NATS message; 1 disables batching (default: 1)
+     * @param batchMaxDelayUs Maximum time a packet waits in an open batch, in microseconds;
+     *        0 publishes whatever is queued as soon as the queue runs empty (default: 0)
+     * @param jsonEncoding Encoding of the "data" field in JSON format (default: Hex)
+     * @param eventDriven If true the worker blocks on the UDP socket for up to half
+     *        the RPI instead of waking up every millisecond (default: false)
+     * @param changeOnly If true only packets that differ from the last published one
+     *        are queued for NATS (default: false)
+     * @param changeMask Per-byte compare mask for changeOnly; 0x00 ignores a byte, bytes
+     *        past the end of the mask are compared in full (default: empty, compare all)
+     * @param heartbeatMs With changeOnly, publish an unchanged packet when nothing was
+     *        published for this long; 0 disables it (default: 0)
+     * @param tagSequence If true every published packet carries its CIP sequence count:
+     *        binary packets are prefixed with it as a 2-byte little-endian value, JSON
+     *        objects get a "cip_sequence" field (default: false)
+     * @param natsHeaders If true every message carries Eip-Sequence, Eip-Timestamp-Ns
+     *        and Eip-Plc headers, plus Eip-Run-Idle with t2oRunIdleHeader (requires
+     *        NATS server 2.2+) (default: false)
+     * @param jetStreamOptions JetStream publishing with async acks, its in-flight
+     *        window and ack timeout; a stream must capture natsSubject
+     *        (default: disabled, see JetStreamOptions)
+     * @param spoolOptions Directory, size cap, eviction and replay rate of the
+     *        outage spool; an empty directory disables it (default: see SpoolOptions)
+     * @param natsOptions nats.c connection settings: cluster servers, reconnect, buffering
+     *        and send-asap (default: nats.c defaults, see NatsOptions)
+     * @param reconnectOptions Backoff and session reuse when the EIP connection is
+     *        lost (default: see ReconnectOptions)
+     * @param connectionType Point-to-point, multicast or listen-only T2O
+     *        (default: PointToPoint, see ConnectionType)
+     * @param threadOptions CPU affinity, real-time priority, memory locking and
+     *        names of the bridge threads (default: see ThreadOptions)
+     * @param socketOptions Receive buffer, busy polling, DSCP and kernel receive
+     *        timestamps of the UDP socket (default: see SocketOptions)
+     * @param t2oRunIdleHeader If true the T2O connection uses the 32-bit run/idle
+     *        header format, which the adapter must support; with natsHeaders its
+     *        run bit is published as Eip-Run-Idle (default: false)
      */
     EIPtoNATSBridge(const std::string& plcAddress,
                     const std::string& natsUrl,
@@ -55,7 +183,26 @@ public:
                     uint8_t t2oAssembly = devices::RM75E::T2O_ASSEMBLY,
                     uint16_t t2oSize = 0,
                     uint32_t rpi = 2000,
-                    uint16_t port = 2222);
+                    uint16_t port = 2222,
+                    size_t queueDepth = 1024,
+                    OverflowPolicy overflowPolicy = OverflowPolicy::DropOldest,
+                    uint32_t batchMaxPackets = 1,
+                    uint32_t batchMaxDelayUs = 0,
+                    JsonEncoding jsonEncoding = JsonEncoding::Hex,
+                    bool eventDriven = false,
+                    bool changeOnly = false,
+                    const std::vector<uint8_t>& changeMask = {},
+                    uint32_t heartbeatMs = 0,
+                    bool tagSequence = false,
+                    bool natsHeaders = false,
+                    const JetStreamOptions& jetStreamOptions = JetStreamOptions(),
+                    const SpoolOptions& spoolOptions = SpoolOptions(),
+                    const NatsOptions& natsOptions = NatsOptions(),
+                    const ReconnectOptions& reconnectOptions = ReconnectOptions(),
+                    ConnectionType connectionType = ConnectionType::PointToPoint,
+                    const ThreadOptions& threadOptions = ThreadOptions(),
+                    const SocketOptions& socketOptions = SocketOptions(),
+                    bool t2oRunIdleHeader = false);
 
     /**
      * @brief Destructor - ensures everything is cleanly closed
@@ -64,6 +211,10 @@ public:
 
     /**
      * @brief Start the bridge: connect to NATS, open EIP connection and start the thread
+     *
+     * Blocks while connecting. start() and stop() may be called from any
+     * thread; concurrent calls are serialized.
+     *
      * @return true if started successfully, false on error
      */
     bool start();
@@ -80,8 +231,23 @@ public:
     bool isRunning() const;
 
     /**
-     * @brief Get the number of published messages
-     * @return Count of messages sent to NATS
+     * @brief PLC IP address given to the constructor
+     */
+    const std::string& getPlcAddress() const;
+
+    /**
+     * @brief NATS subject the packets are published to
+     */
+    const std::string& getNatsSubject() const;
+
+    /**
+     * @brief How the T2O data is delivered
+     */
+    ConnectionType getConnectionType() const;
+
+    /**
+     * @brief Get the number of published packets
+     * @return Count of packets sent to NATS (a batch counts every packet it carries)
      */
     uint64_t getPublishedCount() const;
 
@@ -97,7 +263,175 @@ public:
      */
     uint64_t getReconnectCount() const;
 
+    /**
+     * @brief EIP reconnection counters and time-to-recover
+     * @return Counters since the bridge was created
+     */
+    ReconnectStats getReconnectStats() const;
+
+    /**
+     * @brief Get the number of packets dropped because the queue was full
+     * @return Count of overflowed packets
+     */
+    uint64_t getOverflowCount() const;
+
+    /**
+     * @brief Get the number of packets waiting to be published
+     * @return Current queue occupancy
+     */
+    size_t getQueueSize() const;
+
+    /**
+     * @brief Get the highest queue occupancy seen so far
+     * @return Queue high watermark
+     */
+    uint64_t getQueueHighWatermark() const;
+
+    /**
+     * @brief Get the number of packets skipped because they had not changed
+     * @return Count of suppressed packets (always 0 unless changeOnly)
+     */
+    uint64_t getSuppressedCount() const;
+
+    /**
+     * @brief Gaps, duplicates and out-of-order frames in the T2O sequence count
+     * @return Counters since the bridge was created
+     */
+    SequenceStats getSequenceStats() const;
+
+    /**
+     * @brief Latency from EIP receive until the NATS publish call returned
+     * @return Percentiles in nanoseconds
+     */
+    HistogramSummary getLatencyStats() const;
+
+    /**
+     * @brief Jitter: |inter-arrival time - RPI| of consecutive T2O packets
+     * @return Percentiles in nanoseconds
+     */
+    HistogramSummary getJitterStats() const;
+
+    /**
+     * @brief Time from the kernel receiving a T2O packet until the worker
+     *        handled it (only recorded with SocketOptions::kernelTimestamps)
+     * @return Percentiles in nanoseconds
+     */
+    HistogramSummary getReceiveDelayStats() const;
+
+    /**
+     * @brief JetStream acknowledgement counters
+     * @return Acked, nacked, timed out and pending messages (all 0 unless JetStream is enabled)
+     */
+    JetStreamStats getJetStreamStats() const;
+
+    /**
+     * @brief Time from JetStream publish until its ack arrived
+     * @return Percentiles in nanoseconds
+     */
+    HistogramSummary getAckLatencyStats() const;
+
+    /**
+     * @brief Outage spool counters
+     * @return Spooled, replayed, dropped and pending messages (all 0 without a spool)
+     */
+    SpoolStats getSpoolStats() const;
+
+    /**
+     * @brief NATS connection state and disconnect/reconnect counters
+     * @return The connection shared with the group for bridges in a BridgeGroup
+     */
+    NatsConnectionStats getNatsStats() const;
+
+    /**
+     * @brief Which ThreadOptions took effect when the threads last started
+     * @return The group's for bridges in a BridgeGroup
+     */
+    const ThreadStatus& getThreadStatus() const;
+
+    /**
+     * @brief Kernel drops and granted buffer size of the receive socket
+     * @return The group's for bridges in a BridgeGroup, whose socket is shared
+     */
+    const SocketStats& getSocketStats() const;
+
+    /**
+     * @brief Clear the latency, jitter, receive delay and ack latency histograms
+     */
+    void resetStats();
+
+    /**
+     * @brief Deliver received packets to a local callback (only while stopped)
+     *
+     * Every packet is also copied into a second queue (queueDepth deep, oldest
+     * dropped when full) that a dedicated thread drains into `callback`, so a
+     * slow callback never delays EIP or NATS. Change-only filtering does not
+     * apply. An empty callback disables delivery and stops filling that
+     * queue, also when readBatch() started it, until the next readBatch().
+     *
+     * @return false if the bridge is running
+     */
+    bool setDataCallback(DataCallback callback);
+
+    /**
+     * @brief Pull received packets (alternative to setDataCallback)
+     *
+     * The first call starts copying packets into the local queue; packets
+     * received before it are not returned.
+     *
+     * @param maxPackets Maximum packets in the returned batch
+     * @param timeout How long to wait for the first packet
+     * @return A batch with 0 to maxPackets packets
+     * @throws std::runtime_error if a data callback is set
+     */
+    std::shared_ptr<PacketBatch> readBatch(size_t maxPackets, std::chrono::milliseconds timeout);
+
+    /**
+     * @brief Get the number of packets dropped because the local queue was full
+     * @return Count of overflowed packets in the callback/readBatch queue
+     */
+    uint64_t getLocalOverflowCount() const;
+
+    /**
+     * @brief Handle one T2O frame as if it had arrived from the PLC
+     *
+     * This is what the EIPScanner receive listener calls. The frame is copied
+     * into preallocated queue slots, so once every buffer has grown to the
+     * largest frame seen no heap allocation happens here (with DEBUG logging
+     * off). Public so benchmarks, and tests through receive_packet() in
+     * Python, can drive the receive path without a PLC.
+     *
+     * The publisher and local consumers are not woken here: call
+     * notifyReceived() after a burst of packets.
+     *
+     * Single producer: call it from one thread only, and not from any thread
+     * but the EIP worker while the bridge is running.
+     */
+    void receivePacket(uint32_t realTimeHeader,
+                       uint16_t sequence,
+                       const uint8_t* data,
+                       size_t size);
+
+    /**
+     * @brief Wake the publisher and local consumers for the packets received
+     *        since the last call
+     *
+     * The worker calls it once per handleConnectionsBatched() pass, so a
+     * burst of datagrams costs one wakeup. Same thread rules as receivePacket().
+     */
+    void notifyReceived();
+
 private:
+    friend class BridgeGroup;
+
+    /**
+     * @brief What the publisher keeps of a packet after encoding it
+     */
+    struct PacketInfo {
+        std::chrono::steady_clock::time_point receivedAt;
+        uint16_t sequence;
+        uint32_t realTimeHeader;
+    };
+
     // Configuration
     std::string plcAddress_;
     std::string natsUrl_;
@@ -109,36 +443,177 @@ private:
     uint16_t t2oSize_;
     uint32_t rpi_;
     uint16_t port_;
+    ConnectionType connectionType_;
+    size_t queueDepth_;
+    OverflowPolicy overflowPolicy_;
+    uint32_t batchMaxPackets_;
+    uint32_t batchMaxDelayUs_;
+    JsonEncoding jsonEncoding_;
+    bool eventDriven_;
+    bool changeOnly_;
+    bool tagSequence_;
+    bool natsHeaders_;
+    bool t2oRunIdleHeader_;
+    bool useJetStream_;
 
     // NATS
     natsConnection* natsConn_;
     natsOptions* natsOpts_;
+    NatsOptions natsOptions_;
+    NatsConnectionEvents ownNatsEvents_;
+    NatsConnectionEvents* natsEvents_;  // the group's in a BridgeGroup
+
+    // Thread placement and priority (the group's in a BridgeGroup)
+    ThreadOptions threadOptions_;
+    ThreadStatus ownThreadStatus_;
+    ThreadStatus* threadStatus_;
+
+    // Receive socket options and counters (the group's in a BridgeGroup)
+    SocketOptions socketOptions_;
+    SocketStats ownSocketStats_;
+    SocketStats* socketStats_;
+
+    static constexpr int kNatsCloseWaitMs = 1000;
     std::mutex natsMutex_;
+    JetStreamPublisher jetStream_;
+
+    // Store-and-forward while NATS is down (publisher thread)
+    std::unique_ptr<DiskSpool> spool_;
+    uint32_t spoolReplayRate_;
+    uint32_t spoolReplayBatch_;
+    std::chrono::steady_clock::time_point nextReplayAt_;
+    std::vector<uint8_t> spoolMeta_;
+    std::vector<PacketInfo> replayPackets_;
+    static constexpr size_t kSpoolPacketSize = 16;  // int64 time, uint16 seq, pad, uint32 header
 
     // EIP Scanner
     std::shared_ptr<eipScanner::SessionInfo> sessionInfo_;
-    std::unique_ptr<eipScanner::ConnectionManager> connectionManager_;
+    std::shared_ptr<eipScanner::ConnectionManager> connectionManager_;
     std::weak_ptr<eipScanner::IOConnection> ioConnection_;
 
     // Thread control
     std::thread workerThread_;
     std::atomic<bool> running_;
     std::atomic<bool> shouldStop_;
+    std::mutex lifecycleMutex_;           // serializes start()/stop()/setDataCallback()
+
+    // Set when a BridgeGroup owns the threads, the NATS connection and the
+    // ConnectionManager; start()/stop() are then driven by the group
+    bool hosted_;
+
+    // EIP -> NATS hand-off
+    std::unique_ptr<PacketRing> queue_;
+    std::thread publisherThread_;
+    QueueSignal ownSignal_;
+    QueueSignal* signal_;
+    QueueSignal roomSignal_;  // Block policy: the publisher freed a slot
+    std::atomic<bool> stopPublisher_;
+    static constexpr size_t kDefaultSlotSize = 512;
+    static constexpr int kPublisherIdleWaitMs = 100;
+
+    // Publisher-thread state: popped packet, encoding buffer and open batch
+    Packet popped_;
+    std::vector<uint8_t> publishBuffer_;
+    size_t batchCount_;
+    std::chrono::steady_clock::time_point batchDeadline_;
 
     // Statistics
     std::atomic<uint64_t> publishedCount_;
     std::atomic<uint64_t> receivedCount_;
+    std::atomic<uint64_t> suppressedCount_;
+    LatencyHistogram latencyHistogram_;
+    LatencyHistogram jitterHistogram_;
+    LatencyHistogram receiveDelayHistogram_;
+    std::vector<PacketInfo> batchPackets_;                                // publisher thread
+    std::chrono::steady_clock::time_point lastReceivedAt_;               // worker thread
+    bool hasLastReceive_;
+    bool publishPending_;    // worker thread: queued for NATS since the last notifyReceived()
+    bool localPending_;      // worker thread: queued for local consumers since then
+
+    // Change-only publishing (worker thread)
+    ChangeFilter changeFilter_;
+
+    // T2O sequence count tracking (worker thread)
+    SequenceTracker sequenceTracker_;
+
+    // Local consumers: data callback or readBatch(). The queue is created on
+    // first use and never replaced, so the worker only needs an atomic load;
+    // clearing the callback detaches it until the next readBatch().
+    std::unique_ptr<PacketRing> localQueueOwner_;
+    std::atomic<PacketRing*> localQueue_;
+    std::atomic<bool> localAttached_;     // the worker copies packets into localQueue_
+    std::mutex localMutex_;               // guards queue creation and readBatch()
+    QueueSignal localSignal_;
+    DataCallback dataCallback_;
+    std::thread deliveryThread_;
+    std::atomic<bool> stopDelivery_;
+    std::vector<std::shared_ptr<PacketBatch>> batchPool_;
+    static constexpr size_t kBatchPoolSize = 4;
+    static constexpr size_t kMaxDeliveryBatch = 256;
 
-    // Reconnection
+    // Reconnection (backoff: worker thread)
     std::atomic<bool> needsReconnect_;
-    std::atomic<uint64_t> reconnectCount_;
-    static constexpr int kReconnectDelayMs = 3000;
+    ReconnectOptions reconnectOptions_;
+    ReconnectBackoff backoff_;
+    ReconnectTracker reconnectTracker_;
+
+    // Worker wait per handleConnections() call
+    std::chrono::milliseconds pollTimeout_;
+    static constexpr int kMaxPollTimeoutMs = 100;
 
     /**
      * @brief Main worker thread function
      */
     void workerLoop();
 
+    /**
+     * @brief Publisher thread function: drains the queue into NATS
+     */
+    void publisherLoop();
+
+    /**
+     * @brief Publish everything currently queued (publisher thread)
+     * @return true if at least one packet was taken from the queue
+     */
+    bool drainQueue();
+
+    /**
+     * @brief Publish the open batch if its deadline has passed
+     * @param force Publish it regardless of the deadline (shutdown)
+     * @return true if a batch was published
+     */
+    bool flushDueBatch(bool force);
+
+    /**
+     * @brief Start the delivery thread if a data callback is set
+     */
+    void startDelivery();
+
+    /**
+     * @brief Deliver what is still queued and stop the delivery thread
+     */
+    void stopDelivery();
+
+    /**
+     * @brief Delivery thread function: drains the local queue into the callback
+     */
+    void deliveryLoop();
+
+    /**
+     * @brief Create the local queue if needed and have the worker fill it
+     */
+    PacketRing* ensureLocalQueue();
+
+    /**
+     * @brief Get an empty batch from the pool (or a new one if all are in use)
+     */
+    std::shared_ptr<PacketBatch> acquireBatch();
+
+    /**
+     * @brief Move up to maxPackets packets from the local queue into a batch
+     */
+    void fillBatch(PacketRing& queue, PacketBatch& batch, size_t maxPackets);
+
     /**
      * @brief Initialize the NATS connection
      * @return true if connected successfully
@@ -146,11 +621,82 @@ private:
     bool initNATS();
 
     /**
-     * @brief Initialize the EIP connection
+     * @brief Name, pin and (for the EIP worker) reschedule the calling thread
+     *        (shared with BridgeGroup)
+     *
+     * What cannot be applied is logged as a warning; the thread keeps running.
+     */
+    static void setupThread(const ThreadOptions& options, ThreadStatus& status,
+                            bool worker, const std::string& name);
+
+    /**
+     * @brief mlockall() the process if the options ask for it (shared with BridgeGroup)
+     */
+    static void lockMemory(const ThreadOptions& options, ThreadStatus& status);
+
+    /**
+     * @brief Apply the SocketOptions to a new ConnectionManager (shared with BridgeGroup)
+     */
+    static void configureSockets(eipScanner::ConnectionManager& manager, const SocketOptions& options);
+
+    /**
+     * @brief Add the kernel drops seen by the last handleConnectionsBatched()
+     *        (worker thread, shared with BridgeGroup)
+     */
+    static void collectSocketStats(eipScanner::ConnectionManager& manager, SocketStats& stats);
+
+    /**
+     * @brief Connect to a NATS server (shared with BridgeGroup)
+     * @param events Receives the connection callbacks
+     * @param keepTrying Never give up reconnecting, and succeed even if the server
+     *        is not reachable yet (the connection is then made in the background)
+     * @return true if connected; on failure conn and opts are left null
+     */
+    static bool connectNATS(const std::string& url, const NatsOptions& options,
+                            NatsConnectionEvents& events,
+                            natsConnection*& conn, natsOptions*& opts,
+                            bool keepTrying = false);
+
+    /**
+     * @brief Destroy a connection created by connectNATS()
+     */
+    static void disconnectNATS(natsConnection*& conn, natsOptions*& opts, NatsConnectionEvents& events);
+
+    /**
+     * @brief Open a new TCP session and the EIP I/O connection on it
+     *
+     * A BridgeGroup runs it, like reuseSession(), on a helper thread while
+     * the worker keeps handling the other PLCs.
+     *
      * @return true if connected successfully
      */
     bool initEIP();
 
+    /**
+     * @brief Open the TCP session (RegisterSession) to a PLC
+     *
+     * Blocks until the PLC answers or the connect times out.
+     *
+     * @throws std::exception if the PLC cannot be reached
+     */
+    static std::shared_ptr<eipScanner::SessionInfo> openSession(const std::string& plcAddress);
+
+    /**
+     * @brief Forward Open the I/O connection on sessionInfo_
+     *
+     * Holds the ConnectionManager lock except while the request is on the
+     * wire, so it may run next to the worker of a BridgeGroup.
+     *
+     * @return true if the connection is open
+     */
+    bool openIOConnection();
+
+    /**
+     * @brief Open a new I/O connection on the TCP session kept from the lost one
+     * @return false, dropping the session, if there is none or it is no longer usable
+     */
+    bool reuseSession();
+
     /**
      * @brief Close the NATS connection
      */
@@ -158,22 +704,101 @@ private:
 
     /**
      * @brief Close the EIP connection
+     * @param keepSession Keep the TCP session for reuseSession()
+     */
+    void closeEIP(bool keepSession = false);
+
+    /**
+     * @brief Publish an already encoded message to NATS
+     * @param payload Message bytes
+     * @param size Message size in bytes
+     * @param packets The EIP packets carried by the message
+     * @param count Number of packets
+     * @return true if published, or spooled while NATS is down
      */
-    void closeEIP();
+    bool publishToNATS(const uint8_t* payload, size_t size, const PacketInfo* packets, size_t count);
 
     /**
-     * @brief Publish data to NATS
-     * @param data Vector of bytes to publish
+     * @brief Send a message on the connection (natsMutex_ held)
+     */
+    natsStatus sendToNATS(const uint8_t* payload, size_t size, const PacketInfo* packets, size_t count);
+
+    /**
+     * @brief Check if NATS can take messages now (natsMutex_ held)
+     */
+    bool natsConnected() const;
+
+    /**
+     * @brief Append a message to the spool (natsMutex_ held)
+     * @return false if the spool dropped it
+     */
+    bool spoolMessage(const uint8_t* payload, size_t size, const PacketInfo* packets, size_t count);
+
+    /**
+     * @brief Publish the next batch of spooled messages if NATS is up and the rate allows
+     * @return true if something was replayed
+     */
+    bool replaySpool();
+
+    /**
+     * @brief When the publisher has to wake up for the next replay batch
+     */
+    std::chrono::steady_clock::time_point replayDueAt() const;
+
+    /**
+     * @brief Build a NATS message, with the packet metadata as headers if natsHeaders
+     * @return NATS_OK with *msg set, or an error with *msg null
+     */
+    natsStatus createMessage(natsMsg** msg, const uint8_t* payload, size_t size,
+                             const PacketInfo* packets, size_t count);
+
+    /**
+     * @brief Create the JetStream context on the current NATS connection
+     * @return true if created (or JetStream is not used)
+     */
+    bool openJetStream();
+
+    /**
+     * @brief Encode and publish a single packet (batching disabled)
      * @return true if published successfully
      */
-    bool publishToNATS(const std::vector<uint8_t>& data);
+    bool publishPacket(const Packet& packet);
+
+    /**
+     * @brief Add one receive -> publish sample to the latency histogram
+     */
+    void recordLatency(std::chrono::steady_clock::time_point receivedAt,
+                       std::chrono::steady_clock::time_point publishedAt);
 
     /**
-     * @brief Callback for data received from the PLC
+     * @brief Receive time of the packet being dispatched: its kernel timestamp
+     *        on the steady clock, or now without one (worker thread)
      */
-    void onEIPDataReceived(uint32_t realTimeHeader,
-                          uint16_t sequence,
-                          const std::vector<uint8_t>& data);
+    std::chrono::steady_clock::time_point receiveTime();
+
+    // Longer kernel -> worker delays mean the system clock was stepped
+    static constexpr int64_t kMaxReceiveDelayNs = 10'000'000'000;
+
+    /**
+     * @brief Append a packet to the batch being built
+     */
+    void addToBatch(const Packet& packet);
+
+    /**
+     * @brief Publish the current batch, if any
+     */
+    void flushBatch();
+
+    /**
+     * @brief Append the JSON representation of a packet to a buffer
+     */
+    void appendJson(const Packet& packet, std::vector<uint8_t>& out) const;
+
+    /**
+     * @brief Append a CIP sequence count as uint16 little-endian
+     */
+    static void appendSequence(uint16_t sequence, std::vector<uint8_t>& out);
+
 };
 
 } // namespace bridge
@@ -0,0 +1,303 @@
+#ifndef JET_STREAM_PUBLISHER_H
+#define JET_STREAM_PUBLISHER_H
+
+#include <algorithm>
+#include <atomic>
+#include <chrono>
+#include <cstdint>
+#include <mutex>
+#include <vector>
+#include <nats.h>
+#include "LatencyHistogram.h"
+#include "utils/Logger.h"
+
+namespace bridge {
+
+/**
+ * @brief JetStream publishing of a bridge
+ *
+ * When enabled, messages are published with asynchronous acks; a stream must
+ * capture the bridge's subject. At most maxPending messages are unacknowledged;
+ * when the window is full publishing waits for acks until the bridge stops.
+ */
+struct JetStreamOptions {
+    bool enabled = false;         ///< Publish to JetStream instead of core NATS
+    uint32_t maxPending = 256;    ///< Maximum unacknowledged messages
+    uint32_t ackTimeoutMs = 5000; ///< How long to wait for each ack, and between warnings while the window is full
+};
+
+/**
+ * @brief Counters of a JetStreamPublisher, in messages
+ */
+struct JetStreamStats {
+    uint64_t acked = 0;     ///< Stored by the stream
+    uint64_t nacked = 0;    ///< Rejected (no stream for the subject, limits, ...)
+    uint64_t timeouts = 0;  ///< No acknowledgement within the ack timeout
+    uint64_t pending = 0;   ///< Published and waiting for their acknowledgement
+};
+
+/**
+ * @brief Asynchronous JetStream publishing with a bounded in-flight window
+ *
+ * Messages go out with js_PublishMsgAsync() and are acknowledged on a nats.c
+ * thread, so the publisher thread never waits a round trip per message. At
+ * most maxPending messages are unacknowledged; past that js_PublishMsgAsync()
+ * stalls the caller for up to the ack timeout at a time, and publish() keeps
+ * waiting for as long as the caller lets it, which backs up into the packet
+ * queue instead of losing data.
+ *
+ * Each message is remembered with its send time until its ack arrives, in a
+ * ring sized for the window (acks normally come back in order, so the lookup
+ * is O(1)); the send-to-ack time goes into a histogram.
+ */
+class JetStreamPublisher {
+public:
+    /**
+     * @param maxPending Maximum unacknowledged messages
+     * @param ackTimeout How long to wait for each ack, and for room in the window
+     */
+    JetStreamPublisher(uint32_t maxPending, std::chrono::milliseconds ackTimeout)
+        : maxPending_(std::max<uint32_t>(maxPending, 1))
+        , ackTimeout_(ackTimeout)
+        , js_(nullptr)
+        , inflight_(maxPending_ + kSpareSlots)
+        , head_(0)
+        , count_(0)
+        , acked_(0)
+        , nacked_(0)
+        , timeouts_(0)
+        , pending_(0)
+        , stalled_(false)
+    {
+        jsPubOptions_Init(&pubOptions_);
+        pubOptions_.MaxWait = ackTimeout_.count();
+    }
+
+    ~JetStreamPublisher() {
+        close();
+    }
+
+    JetStreamPublisher(const JetStreamPublisher&) = delete;
+    JetStreamPublisher& operator=(const JetStreamPublisher&) = delete;
+
+    /**
+     * @brief Create the JetStream context on a connection
+     */
+    natsStatus open(natsConnection* conn) {
+        jsOptions options;
+        natsStatus s = jsOptions_Init(&options);
+        if (s != NATS_OK) return s;
+
+        options.PublishAsync.MaxPending = maxPending_;
+        options.PublishAsync.StallWait = ackTimeout_.count();
+        options.PublishAsync.AckHandler = &JetStreamPublisher::onAck;
+        options.PublishAsync.AckHandlerClosure = this;
+
+        return natsConnection_JetStream(&js_, conn, &options);
+    }
+
+    /**
+     * @brief Wait for outstanding acks (up to the ack timeout) and destroy the context
+     *
+     * Messages still unacknowledged after that are counted as timeouts.
+     */
+    void close() {
+        if (js_ == nullptr) return;
+
+        jsPubOptions options;
+        jsPubOptions_Init(&options);
+        options.MaxWait = ackTimeout_.count();
+        if (js_PublishAsyncComplete(js_, &options) != NATS_OK) {
+            // Take the leftovers back so no ack handler runs after this
+            natsMsgList leftovers;
+            if (js_PublishAsyncGetPendingList(&leftovers, js_) == NATS_OK) {
+                eipScanner::utils::Logger(eipScanner::utils::LogLevel::WARNING)
+                    << leftovers.Count << " JetStream messages were not acknowledged";
+                timeouts_.fetch_add(leftovers.Count, std::memory_order_relaxed);
+                natsMsgList_Destroy(&leftovers);
+            }
+        }
+
+        jsCtx_Destroy(js_);
+        js_ = nullptr;
+        pending_ = 0;
+        stalled_ = false;
+
+        std::lock_guard<std::mutex> lock(inflightMutex_);
+        count_ = 0;
+    }
+
+    /**
+     * @brief Publish a message; on success the library owns it and msg is set to null
+     *
+     * While the window is full the message is offered again after every
+     * ack timeout, as long as keepWaiting() returns true. Once it has given
+     * up, later messages fail at once while the window stays full and
+     * keepWaiting() is false, so draining the queue at stop does not take a
+     * timeout per message.
+     *
+     * @return NATS_TIMEOUT if the window was still full when keepWaiting() gave up
+     */
+    template <typename KeepWaiting>
+    natsStatus publish(natsMsg*& msg, KeepWaiting keepWaiting) {
+        // Given up once already and still full: do not wait a timeout per message
+        if (stalled_ && pending_.load(std::memory_order_relaxed) >= maxPending_ && !keepWaiting()) {
+            return NATS_TIMEOUT;
+        }
+
+        natsStatus s = publishOnce(msg);
+        // A stall leaves the message with the caller, so it can be offered again
+        while (s == NATS_TIMEOUT && keepWaiting()) {
+            eipScanner::utils::Logger(eipScanner::utils::LogLevel::WARNING)
+                << "JetStream window of " << maxPending_ << " messages still full after "
+                << ackTimeout_.count() << "ms - waiting for acks";
+            s = publishOnce(msg);
+        }
+        stalled_ = s == NATS_TIMEOUT;
+        return s;
+    }
+
+    /**
+     * @brief Counters since construction
+     */
+    JetStreamStats stats() const {
+        JetStreamStats result;
+        result.acked = acked_.load(std::memory_order_relaxed);
+        result.nacked = nacked_.load(std::memory_order_relaxed);
+        result.timeouts = timeouts_.load(std::memory_order_relaxed);
+        result.pending = pending_.load(std::memory_order_relaxed);
+        return result;
+    }
+
+    /**
+     * @brief Time from publish until the ack arrived, in nanoseconds
+     */
+    HistogramSummary ackLatency() const {
+        return ackLatency_.summary();
+    }
+
+    /**
+     * @brief Clear the ack latency histogram
+     */
+    void resetStats() {
+        ackLatency_.reset();
+    }
+
+private:
+    // The ack of a message may be handled just after nats.c lets the next one
+    // into its window
+    static constexpr size_t kSpareSlots = 16;
+
+    struct InFlight {
+        const natsMsg* msg;
+        std::chrono::steady_clock::time_point sentAt;
+    };
+
+    uint32_t maxPending_;
+    std::chrono::milliseconds ackTimeout_;
+    jsCtx* js_;
+    jsPubOptions pubOptions_;
+
+    std::mutex inflightMutex_;
+    std::vector<InFlight> inflight_;  // ring: count_ entries ending before head_
+    size_t head_;
+    size_t count_;
+
+    std::atomic<uint64_t> acked_;
+    std::atomic<uint64_t> nacked_;
+    std::atomic<uint64_t> timeouts_;
+    std::atomic<uint64_t> pending_;
+    bool stalled_;  // the last publish gave up on a full window (publisher thread)
+    LatencyHistogram ackLatency_;
+
+    natsStatus publishOnce(natsMsg*& msg) {
+        // Remember it before publishing: the ack may arrive before the call returns
+        const natsMsg* const sent = msg;
+        const bool tracked = track(sent);
+        pending_.fetch_add(1, std::memory_order_relaxed);
+
+        const natsStatus s = js_PublishMsgAsync(js_, &msg, &pubOptions_);
+        if (s != NATS_OK) {
+            pending_.fetch_sub(1, std::memory_order_relaxed);
+            if (tracked) {
+                untrack(sent);
+            }
+        }
+        return s;
+    }
+
+    bool track(const natsMsg* msg) {
+        std::lock_guard<std::mutex> lock(inflightMutex_);
+        if (count_ == inflight_.size()) {
+            return false;  // not timed, but still counted when acked
+        }
+        inflight_[head_] = {msg, std::chrono::steady_clock::now()};
+        head_ = (head_ + 1) % inflight_.size();
+        count_++;
+        return true;
+    }
+
+    /**
+     * @brief Forget a message; return when it was sent, or nothing if untracked
+     */
+    bool untrack(const natsMsg* msg, std::chrono::steady_clock::time_point* sentAt = nullptr) {
+        std::lock_guard<std::mutex> lock(inflightMutex_);
+
+        const size_t size = inflight_.size();
+        const size_t tail = (head_ + size - count_) % size;
+        bool found = false;
+        for (size_t i = 0; i < count_; i++) {
+            InFlight& entry = inflight_[(tail + i) % size];
+            if (entry.msg == msg) {
+                if (sentAt) *sentAt = entry.sentAt;
+                entry.msg = nullptr;
+                found = true;
+                break;
+            }
+        }
+
+        // Drop acknowledged entries from both ends
+        while (count_ > 0 && inflight_[(head_ + size - count_) % size].msg == nullptr) {
+            count_--;
+        }
+        while (count_ > 0 && inflight_[(head_ + size - 1) % size].msg == nullptr) {
+            head_ = (head_ + size - 1) % size;
+            count_--;
+        }
+        return found;
+    }
+
+    static void onAck(jsCtx*, natsMsg* msg, jsPubAck* pa, jsPubAckErr* pae, void* closure) {
+        static_cast<JetStreamPublisher*>(closure)->handleAck(msg, pa, pae);
+    }
+
+    void handleAck(natsMsg* msg, jsPubAck* pa, jsPubAckErr* pae) {
+        std::chrono::steady_clock::time_point sentAt;
+        const bool timed = untrack(msg, &sentAt);
+        pending_.fetch_sub(1, std::memory_order_relaxed);
+
+        if (pa != nullptr && pae == nullptr) {
+            acked_.fetch_add(1, std::memory_order_relaxed);
+            if (timed) {
+                const auto latency = std::chrono::steady_clock::now() - sentAt;
+                ackLatency_.record(static_cast<uint64_t>(
+                    std::chrono::duration_cast<std::chrono::nanoseconds>(latency).count()));
+            }
+            return;
+        }
+
+        if (pae != nullptr && pae->Err == NATS_TIMEOUT) {
+            timeouts_.fetch_add(1, std::memory_order_relaxed);
+        } else {
+            nacked_.fetch_add(1, std::memory_order_relaxed);
+        }
+
+        eipScanner::utils::Logger(eipScanner::utils::LogLevel::DEBUG)
+            << "JetStream publish failed: "
+            << (pae && pae->ErrText ? pae->ErrText : natsStatus_GetText(pae ? pae->Err : NATS_ERR));
+    }
+};
+
+} // namespace bridge
+
+#endif // JET_STREAM_PUBLISHER_H
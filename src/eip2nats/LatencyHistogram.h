@@ -0,0 +1,163 @@
+#ifndef LATENCY_HISTOGRAM_H
+#define LATENCY_HISTOGRAM_H
+
+#include <algorithm>
+#include <array>
+#include <atomic>
+#include <cstddef>
+#include <cstdint>
+
+namespace bridge {
+
+/**
+ * @brief Percentiles of a LatencyHistogram, all values in nanoseconds
+ */
+struct HistogramSummary {
+    uint64_t count = 0;
+    uint64_t min = 0;
+    uint64_t p50 = 0;
+    uint64_t p99 = 0;
+    uint64_t p999 = 0;
+    uint64_t max = 0;
+    double mean = 0.0;
+};
+
+/**
+ * @brief Lock-free log-linear histogram of nanosecond durations (HDR-style)
+ *
+ * Values below 64 ns get one bucket each; above that every power of two is
+ * split into 32 linear sub-buckets, so a reported percentile is at most ~3%
+ * above the true value. Values are clamped at 2^48 ns (~3 days).
+ *
+ * record() is a couple of relaxed atomic increments and never blocks, so it is
+ * safe on the EIP and publisher threads while another thread reads a summary.
+ * A summary taken during recording, or a reset() racing with it, can be off
+ * by the few in-flight samples.
+ */
+class LatencyHistogram {
+public:
+    LatencyHistogram() { reset(); }
+
+    LatencyHistogram(const LatencyHistogram&) = delete;
+    LatencyHistogram& operator=(const LatencyHistogram&) = delete;
+
+    /**
+     * @brief Add one sample
+     */
+    void record(uint64_t valueNs) {
+        if (valueNs > kMaxValue) {
+            valueNs = kMaxValue;
+        }
+        counts_[indexOf(valueNs)].fetch_add(1, std::memory_order_relaxed);
+        count_.fetch_add(1, std::memory_order_relaxed);
+        sum_.fetch_add(valueNs, std::memory_order_relaxed);
+
+        uint64_t current = min_.load(std::memory_order_relaxed);
+        while (valueNs < current &&
+               !min_.compare_exchange_weak(current, valueNs, std::memory_order_relaxed)) {
+        }
+        current = max_.load(std::memory_order_relaxed);
+        while (valueNs > current &&
+               !max_.compare_exchange_weak(current, valueNs, std::memory_order_relaxed)) {
+        }
+    }
+
+    /**
+     * @brief Compute count, min, p50, p99, p99.9, max and mean
+     */
+    HistogramSummary summary() const {
+        HistogramSummary result;
+        result.count = count_.load(std::memory_order_relaxed);
+        if (result.count == 0) {
+            return result;
+        }
+
+        result.min = min_.load(std::memory_order_relaxed);
+        result.max = max_.load(std::memory_order_relaxed);
+        result.mean = static_cast<double>(sum_.load(std::memory_order_relaxed)) / result.count;
+
+        // Ranks of the requested percentiles (1-based, rounded up)
+        const uint64_t rank50 = (result.count * 500 + 999) / 1000;
+        const uint64_t rank99 = (result.count * 990 + 999) / 1000;
+        const uint64_t rank999 = (result.count * 999 + 999) / 1000;
+
+        // Samples recorded while scanning may leave the highest ranks unreached
+        result.p50 = result.p99 = result.p999 = result.max;
+
+        uint64_t seen = 0;
+        for (size_t i = 0; i < kBucketCount && seen < rank999; i++) {
+            const uint64_t n = counts_[i].load(std::memory_order_relaxed);
+            if (n == 0) continue;
+
+            const uint64_t value = std::min(std::max(upperBoundOf(i), result.min), result.max);
+            if (seen < rank50 && seen + n >= rank50) result.p50 = value;
+            if (seen < rank99 && seen + n >= rank99) result.p99 = value;
+            if (seen + n >= rank999) result.p999 = value;
+            seen += n;
+        }
+        return result;
+    }
+
+    /**
+     * @brief Discard every sample
+     */
+    void reset() {
+        for (auto& bucket : counts_) {
+            bucket.store(0, std::memory_order_relaxed);
+        }
+        count_.store(0, std::memory_order_relaxed);
+        sum_.store(0, std::memory_order_relaxed);
+        min_.store(UINT64_MAX, std::memory_order_relaxed);
+        max_.store(0, std::memory_order_relaxed);
+    }
+
+private:
+    static constexpr unsigned kSubBucketBits = 6;                        // 64 exact values
+    static constexpr uint64_t kSubBucketCount = uint64_t(1) << kSubBucketBits;
+    static constexpr uint64_t kHalfSubBucketCount = kSubBucketCount / 2;
+    static constexpr unsigned kMaxValueBits = 48;
+    static constexpr uint64_t kMaxValue = (uint64_t(1) << kMaxValueBits) - 1;
+    static constexpr size_t kBucketCount =
+        kSubBucketCount + (kMaxValueBits - kSubBucketBits) * kHalfSubBucketCount;
+
+    static unsigned highestBit(uint64_t value) {
+        unsigned bit = 0;
+        for (unsigned step = 32; step > 0; step >>= 1) {
+            if (value >> step) {
+                value >>= step;
+                bit += step;
+            }
+        }
+        return bit;
+    }
+
+    static size_t indexOf(uint64_t value) {
+        if (value < kSubBucketCount) {
+            return static_cast<size_t>(value);
+        }
+        // Keep the top kSubBucketBits bits: value >> shift is in [32, 64)
+        const unsigned shift = highestBit(value) - (kSubBucketBits - 1);
+        return static_cast<size_t>(kSubBucketCount + (shift - 1) * kHalfSubBucketCount
+                                   + ((value >> shift) - kHalfSubBucketCount));
+    }
+
+    static uint64_t upperBoundOf(size_t index) {
+        if (index < kSubBucketCount) {
+            return index;
+        }
+        const size_t offset = index - kSubBucketCount;
+        const unsigned shift = static_cast<unsigned>(offset / kHalfSubBucketCount) + 1;
+        const uint64_t top = kHalfSubBucketCount + offset % kHalfSubBucketCount;
+        return ((top + 1) << shift) - 1;
+    }
+
+    std::array<std::atomic<uint64_t>, kBucketCount> counts_;
+    std::atomic<uint64_t> count_;
+    std::atomic<uint64_t> sum_;
+    std::atomic<uint64_t> min_;
+    std::atomic<uint64_t> max_;
+};
+
+} // namespace bridge
+
+#endif // LATENCY_HISTOGRAM_H
@@ -0,0 +1,189 @@
+#ifndef NATS_OPTIONS_H
+#define NATS_OPTIONS_H
+
+#include <atomic>
+#include <chrono>
+#include <condition_variable>
+#include <cstdint>
+#include <mutex>
+#include <string>
+#include <vector>
+#include <nats.h>
+#include "utils/Logger.h"
+
+namespace bridge {
+
+/**
+ * @brief nats.c connection settings
+ *
+ * Defaults are those of nats.c, except the 5 s connect timeout.
+ *
+ * For high packet rates the two that matter most are sendAsap and
+ * ioBufSize. By default nats.c collects published messages in a buffer of
+ * ioBufSize bytes that its flusher thread writes out, so many small messages
+ * share one write() call. sendAsap writes each message as it is published:
+ * lowest latency, one system call per message.
+ */
+struct NatsOptions {
+    std::vector<std::string> servers;          ///< More servers of the cluster, for failover
+    std::string name;                          ///< Connection name shown by the server (default: none)
+    int64_t connectTimeoutMs = 5000;           ///< Timeout of each connection attempt
+    bool allowReconnect = true;                ///< Reconnect when the connection is lost
+    int maxReconnect = 60;                     ///< Attempts per server before giving up; -1 = forever
+    int64_t reconnectWaitMs = 2000;            ///< Wait between attempts to the same server
+    int64_t reconnectJitterMs = 100;           ///< Random extra wait, so clients do not reconnect in sync
+    int reconnectBufSize = 8 * 1024 * 1024;    ///< Bytes kept from publishes while reconnecting
+    int64_t writeDeadlineMs = 0;               ///< Fail a blocked socket write after this long; 0 = never
+    bool sendAsap = false;                     ///< Write every publish immediately instead of buffering
+    int ioBufSize = 32 * 1024;                 ///< Size of the socket read/write buffers
+    bool noRandomize = false;                  ///< Try the servers in order instead of shuffled
+    int64_t pingIntervalMs = 120000;           ///< Interval of the server liveness check
+    int maxPingsOut = 2;                       ///< Unanswered pings before the connection is dropped
+};
+
+/**
+ * @brief Apply the URL and every NatsOptions setting to nats.c options
+ *
+ * With extra servers, url is the first one in the pool.
+ */
+inline natsStatus applyNatsOptions(natsOptions* opts, const std::string& url, const NatsOptions& options) {
+    natsStatus s;
+    if (options.servers.empty()) {
+        s = natsOptions_SetURL(opts, url.c_str());
+    } else {
+        std::vector<const char*> servers;
+        servers.reserve(options.servers.size() + 1);
+        servers.push_back(url.c_str());
+        for (const auto& server : options.servers) {
+            servers.push_back(server.c_str());
+        }
+        s = natsOptions_SetServers(opts, servers.data(), static_cast<int>(servers.size()));
+    }
+
+    if (s == NATS_OK && !options.name.empty()) s = natsOptions_SetName(opts, options.name.c_str());
+    if (s == NATS_OK) s = natsOptions_SetTimeout(opts, options.connectTimeoutMs);
+    if (s == NATS_OK) s = natsOptions_SetAllowReconnect(opts, options.allowReconnect);
+    if (s == NATS_OK) s = natsOptions_SetMaxReconnect(opts, options.maxReconnect);
+    if (s == NATS_OK) s = natsOptions_SetReconnectWait(opts, options.reconnectWaitMs);
+    if (s == NATS_OK) s = natsOptions_SetReconnectJitter(opts, options.reconnectJitterMs, options.reconnectJitterMs);
+    if (s == NATS_OK) s = natsOptions_SetReconnectBufSize(opts, options.reconnectBufSize);
+    if (s == NATS_OK) s = natsOptions_SetWriteDeadline(opts, options.writeDeadlineMs);
+    if (s == NATS_OK) s = natsOptions_SetSendAsap(opts, options.sendAsap);
+    if (s == NATS_OK) s = natsOptions_SetIOBufSize(opts, options.ioBufSize);
+    if (s == NATS_OK) s = natsOptions_SetNoRandomize(opts, options.noRandomize);
+    if (s == NATS_OK) s = natsOptions_SetPingInterval(opts, options.pingIntervalMs);
+    if (s == NATS_OK) s = natsOptions_SetMaxPingsOut(opts, options.maxPingsOut);
+    return s;
+}
+
+/**
+ * @brief Counters of the NATS connection state changes
+ */
+struct NatsConnectionStats {
+    bool connected = false;   ///< Connected right now
+    uint64_t disconnects = 0; ///< Connection lost
+    uint64_t reconnects = 0;  ///< Connection restored
+};
+
+/**
+ * @brief Receives the nats.c connection callbacks and counts them
+ *
+ * The callbacks run on a nats.c thread, also after the connection has been
+ * destroyed; waitClosed() makes sure the last one has run. stats() can be
+ * read from any thread.
+ */
+class NatsConnectionEvents {
+public:
+    NatsConnectionEvents()
+        : connected_(false)
+        , disconnects_(0)
+        , reconnects_(0)
+        , closed_(true)
+    {
+    }
+
+    NatsConnectionEvents(const NatsConnectionEvents&) = delete;
+    NatsConnectionEvents& operator=(const NatsConnectionEvents&) = delete;
+
+    /**
+     * @brief Register the callbacks for the connection about to be made
+     */
+    natsStatus attach(natsOptions* opts) {
+        {
+            std::lock_guard<std::mutex> lock(closedMutex_);
+            closed_ = false;
+        }
+        natsStatus s = natsOptions_SetDisconnectedCB(opts, &NatsConnectionEvents::onDisconnected, this);
+        if (s == NATS_OK) s = natsOptions_SetReconnectedCB(opts, &NatsConnectionEvents::onReconnected, this);
+        if (s == NATS_OK) s = natsOptions_SetClosedCB(opts, &NatsConnectionEvents::onClosed, this);
+        return s;
+    }
+
+    /**
+     * @brief Wait until the closed callback of a destroyed connection has run
+     */
+    void waitClosed(std::chrono::milliseconds timeout) {
+        std::unique_lock<std::mutex> lock(closedMutex_);
+        closedCv_.wait_for(lock, timeout, [this]() { return closed_; });
+    }
+
+    /**
+     * @brief Record the outcome of natsConnection_Connect() or a disconnect by us
+     */
+    void setConnected(bool connected) {
+        connected_.store(connected, std::memory_order_relaxed);
+    }
+
+    /**
+     * @brief For natsOptions_SetRetryOnFailedConnect(): the background connect succeeded
+     */
+    static void onConnected(natsConnection*, void* closure) {
+        static_cast<NatsConnectionEvents*>(closure)->setConnected(true);
+        eipScanner::utils::Logger(eipScanner::utils::LogLevel::INFO) << "Connected to NATS successfully";
+    }
+
+    /**
+     * @brief Counters since construction
+     */
+    NatsConnectionStats stats() const {
+        NatsConnectionStats result;
+        result.connected = connected_.load(std::memory_order_relaxed);
+        result.disconnects = disconnects_.load(std::memory_order_relaxed);
+        result.reconnects = reconnects_.load(std::memory_order_relaxed);
+        return result;
+    }
+
+private:
+    std::atomic<bool> connected_;
+    std::atomic<uint64_t> disconnects_;
+    std::atomic<uint64_t> reconnects_;
+    std::mutex closedMutex_;
+    std::condition_variable closedCv_;
+    bool closed_;
+
+    static void onDisconnected(natsConnection*, void* closure) {
+        auto* self = static_cast<NatsConnectionEvents*>(closure);
+        // Also called when we close the connection, after setConnected(false)
+        if (!self->connected_.exchange(false, std::memory_order_relaxed)) return;
+        self->disconnects_.fetch_add(1, std::memory_order_relaxed);
+        eipScanner::utils::Logger(eipScanner::utils::LogLevel::WARNING) << "NATS connection lost, reconnecting...";
+    }
+
+    static void onReconnected(natsConnection*, void* closure) {
+        auto* self = static_cast<NatsConnectionEvents*>(closure);
+        self->connected_.store(true, std::memory_order_relaxed);
+        self->reconnects_.fetch_add(1, std::memory_order_relaxed);
+        eipScanner::utils::Logger(eipScanner::utils::LogLevel::INFO) << "Reconnected to NATS";
+    }
+
+    static void onClosed(natsConnection*, void* closure) {
+        auto* self = static_cast<NatsConnectionEvents*>(closure);
+        std::lock_guard<std::mutex> lock(self->closedMutex_);
+        self->closed_ = true;
+        self->closedCv_.notify_all();
+    }
+};
+
+} // namespace bridge
+
+#endif // NATS_OPTIONS_H
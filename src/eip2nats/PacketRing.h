@@ -0,0 +1,309 @@
+#ifndef PACKET_RING_H
+#define PACKET_RING_H
+
+#include <atomic>
+#include <chrono>
+#include <condition_variable>
+#include <cstddef>
+#include <cstdint>
+#include <mutex>
+#include <utility>
+#include <vector>
+
+namespace bridge {
+
+/**
+ * @brief What to do with a new packet when the ring is full
+ */
+enum class OverflowPolicy {
+    DropOldest,  ///< Discard the oldest queued packet to make room (default)
+    DropNewest,  ///< Discard the incoming packet
+    Block        ///< Wait until the consumer frees a slot
+};
+
+/**
+ * @brief One T2O packet as received from the PLC
+ */
+struct Packet {
+    uint32_t realTimeHeader = 0;
+    uint16_t sequence = 0;
+    uint64_t receiveIndex = 0;  ///< Packets received by the bridge up to and including this one
+    std::chrono::steady_clock::time_point receivedAt;
+    std::vector<uint8_t> data;
+};
+
+/**
+ * @brief Several packets stored back to back in one reusable buffer
+ *
+ * Used to hand packets to local consumers (callbacks, Python) in one go. Once
+ * the buffers have grown to the usual batch size, clear() + append() do not
+ * allocate.
+ */
+struct PacketBatch {
+    struct Entry {
+        size_t offset;
+        size_t size;
+        uint32_t realTimeHeader;
+        uint16_t sequence;
+        std::chrono::steady_clock::time_point receivedAt;
+    };
+
+    std::vector<uint8_t> buffer;
+    std::vector<Entry> packets;
+
+    void clear() {
+        buffer.clear();
+        packets.clear();
+    }
+
+    void append(const Packet& packet) {
+        packets.push_back({buffer.size(), packet.data.size(), packet.realTimeHeader,
+                           packet.sequence, packet.receivedAt});
+        buffer.insert(buffer.end(), packet.data.begin(), packet.data.end());
+    }
+
+    size_t size() const { return packets.size(); }
+
+    const uint8_t* data(size_t index) const { return buffer.data() + packets[index].offset; }
+};
+
+/**
+ * @brief Lock-free single-producer/single-consumer ring of preallocated packets
+ *
+ * The producer is the EIP worker thread, the consumer is the publisher thread.
+ * Every slot reserves its payload buffer up front, so push()/pop() do not
+ * allocate as long as packets fit in the slot size.
+ *
+ * Indices grow monotonically and are mapped to slots modulo the slot count.
+ * To support OverflowPolicy::DropOldest the producer may also advance the read
+ * index, so the consumer announces the slot it is about to read in `busy_` and
+ * claims it with a CAS. The producer never writes into the busy slot; the
+ * spare slot makes that collision rare (it needs two drops during one pop).
+ */
+class PacketRing {
+public:
+    /**
+     * @param capacity Maximum number of queued packets
+     * @param slotSize Payload bytes reserved per slot
+     * @param policy Behaviour when a packet arrives and the ring is full
+     */
+    PacketRing(size_t capacity, size_t slotSize, OverflowPolicy policy)
+        : capacity_(capacity > 0 ? capacity : 1)
+        , policy_(policy)
+        , slots_(capacity_ + 1)
+        , write_(0)
+        , read_(0)
+        , busy_(0)
+        , overflowCount_(0)
+        , highWatermark_(0)
+    {
+        for (auto& slot : slots_) {
+            slot.data.reserve(slotSize);
+        }
+    }
+
+    PacketRing(const PacketRing&) = delete;
+    PacketRing& operator=(const PacketRing&) = delete;
+
+    /**
+     * @brief Copy a packet into the next free slot (producer side)
+     * @return false if the packet was not queued: the ring is full and the
+     *         policy is DropNewest or Block (Block callers retry)
+     */
+    bool push(uint32_t realTimeHeader,
+              uint16_t sequence,
+              uint64_t receiveIndex,
+              std::chrono::steady_clock::time_point receivedAt,
+              const uint8_t* data,
+              size_t size) {
+        const uint64_t w = write_.load(std::memory_order_relaxed);
+
+        uint64_t r = read_.load(std::memory_order_acquire);
+        while (w - r >= capacity_) {
+            if (policy_ != OverflowPolicy::DropOldest) {
+                if (policy_ == OverflowPolicy::DropNewest) {
+                    overflowCount_.fetch_add(1, std::memory_order_relaxed);
+                }
+                return false;
+            }
+            // Drop the oldest queued packet; on failure r holds the new read index
+            if (read_.compare_exchange_weak(r, r + 1,
+                                            std::memory_order_acq_rel,
+                                            std::memory_order_acquire)) {
+                overflowCount_.fetch_add(1, std::memory_order_relaxed);
+                r++;
+            }
+        }
+
+        // The consumer may still be copying out an older slot that maps here
+        const uint64_t busy = busy_.load(std::memory_order_acquire);
+        if (busy != 0 && (busy - 1) % slots_.size() == w % slots_.size()) {
+            overflowCount_.fetch_add(1, std::memory_order_relaxed);
+            return false;
+        }
+
+        Packet& slot = slots_[w % slots_.size()];
+        slot.realTimeHeader = realTimeHeader;
+        slot.sequence = sequence;
+        slot.receiveIndex = receiveIndex;
+        slot.receivedAt = receivedAt;
+        slot.data.assign(data, data + size);
+
+        write_.store(w + 1, std::memory_order_release);
+
+        const uint64_t depth = w + 1 - r;
+        if (depth > highWatermark_.load(std::memory_order_relaxed)) {
+            highWatermark_.store(depth, std::memory_order_relaxed);
+        }
+        return true;
+    }
+
+    /**
+     * @brief Take the oldest packet (consumer side)
+     *
+     * The slot contents are swapped into `out`, so `out` should own a buffer
+     * with the same reserved size to keep the ring allocation-free.
+     *
+     * @return false if the ring is empty
+     */
+    bool pop(Packet& out) {
+        uint64_t r = read_.load(std::memory_order_acquire);
+        do {
+            if (r == write_.load(std::memory_order_acquire)) {
+                busy_.store(0, std::memory_order_release);
+                return false;
+            }
+            busy_.store(r + 1, std::memory_order_relaxed);
+        } while (!read_.compare_exchange_weak(r, r + 1,
+                                              std::memory_order_acq_rel,
+                                              std::memory_order_acquire));
+
+        std::swap(out, slots_[r % slots_.size()]);
+        busy_.store(0, std::memory_order_release);
+        return true;
+    }
+
+    /**
+     * @brief Append the oldest packet to a batch (consumer side)
+     *
+     * Copies the payload straight from the slot into the batch buffer, while
+     * the slot is claimed, instead of swapping it out first.
+     *
+     * @return false if the ring is empty
+     */
+    bool popInto(PacketBatch& batch) {
+        uint64_t r = read_.load(std::memory_order_acquire);
+        do {
+            if (r == write_.load(std::memory_order_acquire)) {
+                busy_.store(0, std::memory_order_release);
+                return false;
+            }
+            busy_.store(r + 1, std::memory_order_relaxed);
+        } while (!read_.compare_exchange_weak(r, r + 1,
+                                              std::memory_order_acq_rel,
+                                              std::memory_order_acquire));
+
+        batch.append(slots_[r % slots_.size()]);
+        busy_.store(0, std::memory_order_release);
+        return true;
+    }
+
+    /**
+     * @brief Discard every queued packet (consumer side)
+     */
+    void clear() {
+        uint64_t r = read_.load(std::memory_order_acquire);
+        const uint64_t w = write_.load(std::memory_order_acquire);
+        while (r < w && !read_.compare_exchange_weak(r, w,
+                                                     std::memory_order_acq_rel,
+                                                     std::memory_order_acquire)) {}
+    }
+
+    /**
+     * @brief Check whether there is nothing to pop
+     */
+    bool empty() const {
+        return read_.load(std::memory_order_acquire) == write_.load(std::memory_order_acquire);
+    }
+
+    /**
+     * @brief Number of packets currently queued
+     */
+    size_t size() const {
+        const uint64_t w = write_.load(std::memory_order_acquire);
+        const uint64_t r = read_.load(std::memory_order_acquire);
+        return w > r ? static_cast<size_t>(w - r) : 0;
+    }
+
+    size_t capacity() const { return capacity_; }
+
+    OverflowPolicy policy() const { return policy_; }
+
+    /**
+     * @brief Packets dropped because the ring was full
+     */
+    uint64_t getOverflowCount() const {
+        return overflowCount_.load(std::memory_order_relaxed);
+    }
+
+    /**
+     * @brief Highest queue depth observed since construction
+     */
+    uint64_t getHighWatermark() const {
+        return highWatermark_.load(std::memory_order_relaxed);
+    }
+
+private:
+    const size_t capacity_;
+    const OverflowPolicy policy_;
+    std::vector<Packet> slots_;
+
+    // Producer and consumer indices on separate cache lines
+    alignas(64) std::atomic<uint64_t> write_;
+    alignas(64) std::atomic<uint64_t> read_;
+    alignas(64) std::atomic<uint64_t> busy_;  // index + 1 of the slot being popped, 0 if none
+
+    std::atomic<uint64_t> overflowCount_;
+    std::atomic<uint64_t> highWatermark_;
+};
+
+/**
+ * @brief Wake-up channel between ring producers and the thread consuming them
+ *
+ * The consumer raises `waiting` before it sleeps and producers only take the
+ * mutex when it is raised, so a push normally costs a fence and a load. The
+ * fences on both sides make sure either the consumer sees the new packet or
+ * the producer sees `waiting`.
+ */
+struct QueueSignal {
+    std::mutex mutex;
+    std::condition_variable cv;
+    std::atomic<bool> waiting{false};
+
+    /**
+     * @brief Producer side: wake the consumer if it is sleeping
+     */
+    void notify() {
+        std::atomic_thread_fence(std::memory_order_seq_cst);
+        if (waiting.load(std::memory_order_relaxed)) {
+            std::lock_guard<std::mutex> lock(mutex);
+            cv.notify_one();
+        }
+    }
+
+    /**
+     * @brief Consumer side: sleep until `ready()` holds or `deadline` passes
+     */
+    template <typename Predicate>
+    void waitUntil(std::chrono::steady_clock::time_point deadline, Predicate ready) {
+        std::unique_lock<std::mutex> lock(mutex);
+        waiting.store(true, std::memory_order_relaxed);
+        std::atomic_thread_fence(std::memory_order_seq_cst);
+        cv.wait_until(lock, deadline, ready);
+        waiting.store(false, std::memory_order_relaxed);
+    }
+};
+
+} // namespace bridge
+
+#endif // PACKET_RING_H
@@ -0,0 +1,165 @@
+#ifndef PAYLOAD_ENCODER_H
+#define PAYLOAD_ENCODER_H
+
+#include <charconv>
+#include <cstddef>
+#include <cstdint>
+#include <cstring>
+#include <vector>
+
+namespace bridge {
+
+/**
+ * @brief How the payload bytes are written in the JSON "data" field
+ */
+enum class JsonEncoding {
+    Hex,     ///< Two lowercase hex digits per byte (default)
+    Base64   ///< Standard base64 with padding (~33% smaller than hex)
+};
+
+/**
+ * @brief Allocation-free encoders that append to a reusable byte buffer
+ *
+ * The buffer only grows, so once it has reached the size of the largest
+ * message encoding does not allocate. Writers reserve their worst-case output
+ * with one resize(), write through a raw cursor and trim the unused tail.
+ */
+namespace encoder {
+
+static constexpr char kHexDigits[] = "0123456789abcdef";
+
+static constexpr char kBase64Alphabet[] =
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/";
+
+/**
+ * @brief Both hex digits of every byte value, built from the nibble table
+ */
+struct HexPairTable {
+    char pairs[256][2];
+
+    constexpr HexPairTable() : pairs() {
+        for (int i = 0; i < 256; i++) {
+            pairs[i][0] = kHexDigits[i >> 4];
+            pairs[i][1] = kHexDigits[i & 0x0F];
+        }
+    }
+};
+
+static constexpr HexPairTable kHexPairs{};
+
+inline char* writeLiteral(char* dst, const char* text, size_t size) {
+    std::memcpy(dst, text, size);
+    return dst + size;
+}
+
+inline char* writeUInt(char* dst, uint64_t value) {
+    return std::to_chars(dst, dst + 20, value).ptr;
+}
+
+inline char* writeInt(char* dst, int64_t value) {
+    return std::to_chars(dst, dst + 21, value).ptr;
+}
+
+/**
+ * @brief Write `size` bytes as lowercase hex (2 * size chars)
+ */
+inline char* writeHex(char* dst, const uint8_t* data, size_t size) {
+    for (size_t i = 0; i < size; i++) {
+        std::memcpy(dst, kHexPairs.pairs[data[i]], 2);
+        dst += 2;
+    }
+    return dst;
+}
+
+/**
+ * @brief Write `size` bytes as padded base64 (4 * ceil(size / 3) chars)
+ */
+inline char* writeBase64(char* dst, const uint8_t* data, size_t size) {
+    size_t i = 0;
+    for (; i + 3 <= size; i += 3) {
+        const uint32_t triple = (uint32_t(data[i]) << 16) | (uint32_t(data[i + 1]) << 8) | data[i + 2];
+        const char quad[4] = {
+            kBase64Alphabet[(triple >> 18) & 0x3F],
+            kBase64Alphabet[(triple >> 12) & 0x3F],
+            kBase64Alphabet[(triple >> 6) & 0x3F],
+            kBase64Alphabet[triple & 0x3F],
+        };
+        std::memcpy(dst, quad, 4);
+        dst += 4;
+    }
+
+    const size_t remaining = size - i;
+    if (remaining > 0) {
+        uint32_t triple = uint32_t(data[i]) << 16;
+        if (remaining == 2) {
+            triple |= uint32_t(data[i + 1]) << 8;
+        }
+        const char quad[4] = {
+            kBase64Alphabet[(triple >> 18) & 0x3F],
+            kBase64Alphabet[(triple >> 12) & 0x3F],
+            remaining == 2 ? kBase64Alphabet[(triple >> 6) & 0x3F] : '=',
+            '=',
+        };
+        std::memcpy(dst, quad, 4);
+        dst += 4;
+    }
+    return dst;
+}
+
+/**
+ * @brief Upper bound of the encoded size of `size` payload bytes
+ */
+inline size_t encodedSize(size_t size, JsonEncoding encoding) {
+    return encoding == JsonEncoding::Base64 ? ((size + 2) / 3) * 4 : size * 2;
+}
+
+/**
+ * @brief Append one packet as a JSON object:
+ *        {"timestamp":T,"sequence":S,"size":N,"data":"..."}
+ *
+ * With cipSequence a "cip_sequence" field follows "sequence".
+ */
+inline void appendJsonPacket(std::vector<uint8_t>& out,
+                             int64_t timestamp,
+                             uint64_t sequence,
+                             const uint8_t* data,
+                             size_t size,
+                             JsonEncoding encoding,
+                             const uint16_t* cipSequence = nullptr) {
+    static constexpr char kTimestamp[]   = "{\"timestamp\":";
+    static constexpr char kSequence[]    = ",\"sequence\":";
+    static constexpr char kCipSequence[] = ",\"cip_sequence\":";
+    static constexpr char kSize[]        = ",\"size\":";
+    static constexpr char kData[]        = ",\"data\":\"";
+    static constexpr char kEnd[]         = "\"}";
+    static constexpr size_t kFixedSize = sizeof(kTimestamp) + sizeof(kSequence) + sizeof(kCipSequence)
+                                       + sizeof(kSize) + sizeof(kData) + sizeof(kEnd) + 21 + 20 + 5 + 20;
+
+    const size_t offset = out.size();
+    out.resize(offset + kFixedSize + encodedSize(size, encoding));
+    char* const begin = reinterpret_cast<char*>(out.data() + offset);
+
+    char* dst = begin;
+    dst = writeLiteral(dst, kTimestamp, sizeof(kTimestamp) - 1);
+    dst = writeInt(dst, timestamp);
+    dst = writeLiteral(dst, kSequence, sizeof(kSequence) - 1);
+    dst = writeUInt(dst, sequence);
+    if (cipSequence != nullptr) {
+        dst = writeLiteral(dst, kCipSequence, sizeof(kCipSequence) - 1);
+        dst = writeUInt(dst, *cipSequence);
+    }
+    dst = writeLiteral(dst, kSize, sizeof(kSize) - 1);
+    dst = writeUInt(dst, size);
+    dst = writeLiteral(dst, kData, sizeof(kData) - 1);
+    dst = encoding == JsonEncoding::Base64 ? writeBase64(dst, data, size)
+                                           : writeHex(dst, data, size);
+    dst = writeLiteral(dst, kEnd, sizeof(kEnd) - 1);
+
+    out.resize(offset + static_cast<size_t>(dst - begin));
+}
+
+} // namespace encoder
+
+} // namespace bridge
+
+#endif // PAYLOAD_ENCODER_H
@@ -0,0 +1,187 @@
+#ifndef RECONNECT_BACKOFF_H
+#define RECONNECT_BACKOFF_H
+
+#include <algorithm>
+#include <atomic>
+#include <chrono>
+#include <cmath>
+#include <cstdint>
+#include <random>
+
+namespace bridge {
+
+/**
+ * @brief How a lost EIP connection is re-established
+ *
+ * The first attempt is made as soon as the loss is detected, then the wait
+ * between attempts grows from initialDelayMs by multiplier up to maxDelayMs.
+ * A PLC that power-cycles in under a second is usually back on the first or
+ * second retry instead of after a fixed delay.
+ */
+struct ReconnectOptions {
+    uint32_t initialDelayMs = 100;     ///< Wait after the first failed retry
+    uint32_t maxDelayMs = 3000;        ///< Longest wait between attempts
+    double multiplier = 2.0;           ///< Growth of the wait per failed attempt
+    double jitter = 0.2;               ///< Random extra wait, as a fraction of the wait
+    bool immediateFirstRetry = true;   ///< Retry without waiting right after the loss
+    bool reuseSession = true;          ///< Keep the TCP session when only the I/O connection dropped
+};
+
+/**
+ * @brief Exponential backoff between reconnect attempts
+ *
+ * Not thread-safe: used only from the EIP worker thread.
+ */
+class ReconnectBackoff {
+public:
+    explicit ReconnectBackoff(const ReconnectOptions& options)
+        : options_(options)
+        , attempt_(0)
+        , rng_(std::random_device{}())
+    {}
+
+    /**
+     * @brief Start over after a successful connection
+     */
+    void reset() {
+        attempt_ = 0;
+    }
+
+    /**
+     * @brief Wait before the next attempt
+     */
+    std::chrono::milliseconds next() {
+        uint32_t n = attempt_;
+        attempt_ = std::min<uint32_t>(attempt_ + 1, 64);
+        if (options_.immediateFirstRetry) {
+            if (n == 0) {
+                return std::chrono::milliseconds(0);
+            }
+            n--;
+        }
+
+        double delay = options_.initialDelayMs * std::pow(std::max(options_.multiplier, 1.0), n);
+        delay = std::min(delay, static_cast<double>(options_.maxDelayMs));
+        if (options_.jitter > 0) {
+            delay += delay * options_.jitter * std::uniform_real_distribution<double>(0.0, 1.0)(rng_);
+        }
+        return std::chrono::milliseconds(static_cast<int64_t>(delay));
+    }
+
+private:
+    ReconnectOptions options_;
+    uint32_t attempt_;
+    std::minstd_rand rng_;
+};
+
+/**
+ * @brief Reconnection counters and time-to-recover
+ */
+struct ReconnectStats {
+    uint64_t reconnects = 0;       ///< Successful reconnections
+    uint64_t attempts = 0;         ///< Reconnect attempts, successful or not
+    uint64_t sessionReuses = 0;    ///< Reconnections that kept the TCP session
+    uint64_t recoveries = 0;       ///< Losses followed by data again
+    uint64_t lastRecoveryUs = 0;   ///< Loss detected to first packet, last time
+    uint64_t maxRecoveryUs = 0;    ///< Loss detected to first packet, longest
+    uint64_t totalRecoveryUs = 0;  ///< Sum of all recovery times
+};
+
+/**
+ * @brief Counts reconnections and measures how long data stopped flowing
+ *
+ * The recovery time runs from the moment the loss is detected (the
+ * connection timeout has already passed by then) until the first packet
+ * after reconnecting. The other methods are called from the EIP worker
+ * thread; stats() can be read from any thread.
+ */
+class ReconnectTracker {
+public:
+    ReconnectTracker()
+        : reconnects_(0)
+        , attempts_(0)
+        , sessionReuses_(0)
+        , recoveries_(0)
+        , lastRecoveryUs_(0)
+        , maxRecoveryUs_(0)
+        , totalRecoveryUs_(0)
+        , pending_(false)
+    {}
+
+    ReconnectTracker(const ReconnectTracker&) = delete;
+    ReconnectTracker& operator=(const ReconnectTracker&) = delete;
+
+    /**
+     * @brief The connection was found lost
+     */
+    void lost(std::chrono::steady_clock::time_point now) {
+        lostAt_ = now;
+        pending_ = true;
+    }
+
+    /**
+     * @brief A reconnect attempt is about to be made
+     */
+    void attempt() {
+        attempts_.fetch_add(1, std::memory_order_relaxed);
+    }
+
+    /**
+     * @brief A reconnect attempt succeeded
+     */
+    void reconnected(bool sessionReused) {
+        reconnects_.fetch_add(1, std::memory_order_relaxed);
+        if (sessionReused) {
+            sessionReuses_.fetch_add(1, std::memory_order_relaxed);
+        }
+    }
+
+    /**
+     * @brief Called for every received packet; ends a pending recovery
+     */
+    void packetReceived(std::chrono::steady_clock::time_point now) {
+        if (!pending_) {
+            return;
+        }
+        pending_ = false;
+
+        const uint64_t us = static_cast<uint64_t>(
+            std::chrono::duration_cast<std::chrono::microseconds>(now - lostAt_).count());
+        recoveries_.fetch_add(1, std::memory_order_relaxed);
+        lastRecoveryUs_.store(us, std::memory_order_relaxed);
+        totalRecoveryUs_.fetch_add(us, std::memory_order_relaxed);
+        if (us > maxRecoveryUs_.load(std::memory_order_relaxed)) {
+            maxRecoveryUs_.store(us, std::memory_order_relaxed);
+        }
+    }
+
+    /**
+     * @brief Counters since construction
+     */
+    ReconnectStats stats() const {
+        ReconnectStats result;
+        result.reconnects = reconnects_.load(std::memory_order_relaxed);
+        result.attempts = attempts_.load(std::memory_order_relaxed);
+        result.sessionReuses = sessionReuses_.load(std::memory_order_relaxed);
+        result.recoveries = recoveries_.load(std::memory_order_relaxed);
+        result.lastRecoveryUs = lastRecoveryUs_.load(std::memory_order_relaxed);
+        result.maxRecoveryUs = maxRecoveryUs_.load(std::memory_order_relaxed);
+        result.totalRecoveryUs = totalRecoveryUs_.load(std::memory_order_relaxed);
+        return result;
+    }
+
+private:
+    std::atomic<uint64_t> reconnects_;
+    std::atomic<uint64_t> attempts_;
+    std::atomic<uint64_t> sessionReuses_;
+    std::atomic<uint64_t> recoveries_;
+    std::atomic<uint64_t> lastRecoveryUs_;
+    std::atomic<uint64_t> maxRecoveryUs_;
+    std::atomic<uint64_t> totalRecoveryUs_;
+    std::chrono::steady_clock::time_point lostAt_;
+    bool pending_;
+};
+
+} // namespace bridge
+
+#endif // RECONNECT_BACKOFF_H
@@ -0,0 +1,133 @@
+#ifndef SEQUENCE_TRACKER_H
+#define SEQUENCE_TRACKER_H
+
+#include <atomic>
+#include <cstdint>
+
+namespace bridge {
+
+/**
+ * @brief Loss counters of a T2O stream
+ */
+struct SequenceStats {
+    uint64_t gaps = 0;        ///< Times one or more sequence numbers were skipped
+    uint64_t lost = 0;        ///< Sequence numbers skipped and never received late
+    uint64_t duplicates = 0;  ///< Frames that repeated the previous sequence number
+    uint64_t outOfOrder = 0;  ///< Frames older than the newest one already received
+};
+
+/**
+ * @brief Follows the 16-bit CIP sequence count of a Class 1 T2O connection
+ *
+ * Sequence numbers are compared modulo 2^16: a frame up to 32767 ahead of the
+ * newest one is new (anything past +1 is a gap), anything behind it is late.
+ * The numbers skipped among the last 64 are remembered, so a late frame that
+ * fills one of them is taken off the lost count; a late frame that was
+ * already received, or is older than that window, is not.
+ *
+ * A Class 1 producer only advances the count when it sends new data, so
+ * duplicates are normal for adapters that repeat unchanged frames; they point
+ * at the network only if the adapter always advances it.
+ *
+ * observe() runs on the EIP worker thread; the counters are relaxed atomics
+ * so stats() can be read from any thread.
+ */
+class SequenceTracker {
+public:
+    /**
+     * @brief What observe() found
+     */
+    enum class Result {
+        First,       ///< First frame since reset()
+        InOrder,     ///< Exactly one past the previous frame
+        Gap,         ///< Some sequence numbers were skipped
+        Duplicate,   ///< Same sequence number as the previous frame
+        OutOfOrder   ///< Older than the newest frame
+    };
+
+    SequenceTracker()
+        : hasLast_(false)
+        , last_(0)
+        , missing_(0)
+        , gaps_(0)
+        , lost_(0)
+        , duplicates_(0)
+        , outOfOrder_(0)
+    {}
+
+    /**
+     * @brief Account for one received frame
+     */
+    Result observe(uint16_t sequence) {
+        if (!hasLast_) {
+            hasLast_ = true;
+            last_ = sequence;
+            missing_ = 0;
+            return Result::First;
+        }
+
+        const uint16_t delta = static_cast<uint16_t>(sequence - last_);
+        if (delta == 1) {
+            last_ = sequence;
+            missing_ <<= 1;
+            return Result::InOrder;
+        }
+        if (delta == 0) {
+            duplicates_.fetch_add(1, std::memory_order_relaxed);
+            return Result::Duplicate;
+        }
+        if (delta < 0x8000) {
+            gaps_.fetch_add(1, std::memory_order_relaxed);
+            lost_.fetch_add(delta - 1, std::memory_order_relaxed);
+            last_ = sequence;
+            // The skipped numbers are the delta - 1 bits below the old newest one
+            const unsigned skipped = delta - 1u;
+            missing_ = (delta >= kWindow ? 0 : missing_ << delta)
+                     | (skipped >= kWindow ? ~uint64_t(0) : (uint64_t(1) << skipped) - 1);
+            return Result::Gap;
+        }
+
+        outOfOrder_.fetch_add(1, std::memory_order_relaxed);
+        const uint16_t behind = static_cast<uint16_t>(last_ - sequence);
+        const uint64_t bit = behind <= kWindow ? uint64_t(1) << (behind - 1) : 0;
+        if (missing_ & bit) {
+            missing_ &= ~bit;
+            lost_.fetch_sub(1, std::memory_order_relaxed);
+        }
+        return Result::OutOfOrder;
+    }
+
+    /**
+     * @brief Forget the last sequence number (new connection); counters are kept
+     */
+    void restart() {
+        hasLast_ = false;
+    }
+
+    /**
+     * @brief Counters since construction
+     */
+    SequenceStats stats() const {
+        SequenceStats result;
+        result.gaps = gaps_.load(std::memory_order_relaxed);
+        result.lost = lost_.load(std::memory_order_relaxed);
+        result.duplicates = duplicates_.load(std::memory_order_relaxed);
+        result.outOfOrder = outOfOrder_.load(std::memory_order_relaxed);
+        return result;
+    }
+
+private:
+    static constexpr unsigned kWindow = 64;
+
+    bool hasLast_;
+    uint16_t last_;
+    uint64_t missing_;  // bit i: last_ - 1 - i was skipped and has not arrived yet
+    std::atomic<uint64_t> gaps_;
+    std::atomic<uint64_t> lost_;
+    std::atomic<uint64_t> duplicates_;
+    std::atomic<uint64_t> outOfOrder_;
+};
+
+} // namespace bridge
+
+#endif // SEQUENCE_TRACKER_H
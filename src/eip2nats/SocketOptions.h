@@ -0,0 +1,42 @@
+#ifndef SOCKET_OPTIONS_H
+#define SOCKET_OPTIONS_H
+
+#include <atomic>
+#include <cstdint>
+
+namespace bridge {
+
+/**
+ * @brief Options of the UDP socket the T2O packets arrive on
+ *
+ * A larger receive buffer lets the kernel hold a burst (many PLCs sending at
+ * once, or the worker descheduled for a moment) instead of dropping it;
+ * without CAP_NET_ADMIN it is capped at net.core.rmem_max. Busy polling makes
+ * the kernel spin on the NIC queue for a while before putting the worker to
+ * sleep; with the poll() of the worker loop it also needs the
+ * net.core.busy_poll sysctl. DSCP marks the packets the bridge sends (the O2T
+ * heartbeats); the T2O marking is configured on the PLC. Kernel timestamps
+ * replace the user-space receive time of every packet, so latency and jitter
+ * include the time it waited in the socket. Linux only; ignored elsewhere.
+ */
+struct SocketOptions {
+    int receiveBufferBytes = 0;     ///< SO_RCVBUF in bytes; 0 = system default
+    int busyPollUs = 0;             ///< SO_BUSY_POLL in microseconds; 0 = off
+    int dscp = -1;                  ///< DSCP of the packets sent (0..63, e.g. 55 for CIP I/O); -1 = unchanged
+    bool kernelTimestamps = false;  ///< Take receive times from SO_TIMESTAMPNS
+};
+
+/**
+ * @brief Counters of the receive socket
+ *
+ * Updated by the EIP worker, readable from any thread.
+ */
+struct SocketStats {
+    std::atomic<uint64_t> kernelDrops{0};        ///< Datagrams dropped on a full receive buffer
+    std::atomic<uint64_t> malformed{0};          ///< Datagrams dropped for invalid CPF framing
+    std::atomic<int> receiveBufferBytes{0};      ///< Receive buffer granted by the kernel
+};
+
+} // namespace bridge
+
+#endif // SOCKET_OPTIONS_H
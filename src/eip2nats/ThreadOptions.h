@@ -0,0 +1,172 @@
+#ifndef THREAD_OPTIONS_H
+#define THREAD_OPTIONS_H
+
+#include <atomic>
+#include <cerrno>
+#include <cstring>
+#include <string>
+#include <vector>
+
+#ifdef __linux__
+#include <pthread.h>
+#include <sched.h>
+#include <sys/mman.h>
+#endif
+
+namespace bridge {
+
+/**
+ * @brief Scheduling policy of the EIP worker thread
+ */
+enum class SchedulingPolicy {
+    Other,       ///< Normal time-sharing scheduler (default)
+    Fifo,        ///< SCHED_FIFO: runs until it blocks, ahead of every normal thread
+    RoundRobin   ///< SCHED_RR: like Fifo, time-sliced among threads of equal priority
+};
+
+/**
+ * @brief Placement and priority of the bridge threads
+ *
+ * The EIP worker receives the T2O packets, so it is the thread whose wakeup
+ * latency shows up as RPI jitter. Pinning it to a CPU that nothing else
+ * uses (isolcpus, or just kept free) and giving it a real-time policy keeps
+ * other processes from delaying it. The publisher and delivery threads only
+ * get the affinity. Real-time scheduling and memory locking need
+ * CAP_SYS_NICE / CAP_IPC_LOCK or matching rtprio/memlock limits; without
+ * them the bridge logs a warning and runs as before. Linux only; ignored
+ * elsewhere.
+ */
+struct ThreadOptions {
+    std::vector<int> workerCpus;                        ///< CPUs the EIP worker may run on; empty = any
+    std::vector<int> publisherCpus;                     ///< CPUs of the publisher and delivery threads; empty = any
+    SchedulingPolicy policy = SchedulingPolicy::Other;  ///< Scheduling policy of the EIP worker
+    int priority = 0;                                   ///< Real-time priority (1..99) with Fifo/RoundRobin
+    bool lockMemory = false;                            ///< mlockall() the process, so no page fault can stall it
+    bool nameThreads = true;                            ///< Name the threads eip2nats-<role>-<PLC> (top -H, ps -L)
+};
+
+/**
+ * @brief Which of the ThreadOptions actually took effect
+ *
+ * Written by the threads as they start, readable from any thread.
+ */
+struct ThreadStatus {
+    std::atomic<bool> workerRealtime{false};    ///< The worker runs with the requested real-time policy
+    std::atomic<bool> workerPinned{false};      ///< The worker affinity was applied
+    std::atomic<bool> publisherPinned{false};   ///< The publisher affinity was applied
+    std::atomic<bool> memoryLocked{false};      ///< mlockall() succeeded
+};
+
+/**
+ * @brief Thread name: "eip2nats-<role>-<last part of the PLC address>"
+ *
+ * Linux keeps 15 characters of a thread name.
+ */
+inline std::string threadName(const char* role, const std::string& plcAddress = "") {
+    std::string name = std::string("eip2nats-") + role;
+    if (!plcAddress.empty()) {
+        const size_t dot = plcAddress.find_last_of('.');
+        name += "-" + (dot == std::string::npos ? plcAddress : plcAddress.substr(dot + 1));
+    }
+    return name.substr(0, 15);
+}
+
+/**
+ * @brief Name the calling thread
+ */
+inline void nameCurrentThread(const std::string& name) {
+#ifdef __linux__
+    pthread_setname_np(pthread_self(), name.substr(0, 15).c_str());
+#else
+    (void)name;
+#endif
+}
+
+/**
+ * @brief Restrict the calling thread to the given CPUs
+ * @param error Set to the reason on failure
+ * @return true on success (or with an empty CPU list)
+ */
+inline bool pinCurrentThread(const std::vector<int>& cpus, std::string& error) {
+    if (cpus.empty()) {
+        return true;
+    }
+#ifdef __linux__
+    cpu_set_t set;
+    CPU_ZERO(&set);
+    for (int cpu : cpus) {
+        if (cpu < 0 || cpu >= CPU_SETSIZE) {
+            error = "invalid CPU " + std::to_string(cpu);
+            return false;
+        }
+        CPU_SET(cpu, &set);
+    }
+    const int rc = pthread_setaffinity_np(pthread_self(), sizeof(set), &set);
+    if (rc != 0) {
+        error = std::strerror(rc);
+        return false;
+    }
+    return true;
+#else
+    error = "CPU affinity is only supported on Linux";
+    return false;
+#endif
+}
+
+/**
+ * @brief Give the calling thread a real-time scheduling policy
+ * @param error Set to the reason on failure
+ * @return true on success (or with SchedulingPolicy::Other)
+ */
+inline bool setCurrentThreadScheduling(SchedulingPolicy policy, int priority, std::string& error) {
+    if (policy == SchedulingPolicy::Other) {
+        return true;
+    }
+#ifdef __linux__
+    const int native = policy == SchedulingPolicy::Fifo ? SCHED_FIFO : SCHED_RR;
+    const int lowest = sched_get_priority_min(native);
+    const int highest = sched_get_priority_max(native);
+    if (priority < lowest || priority > highest) {
+        error = "priority " + std::to_string(priority) + " is outside " +
+                std::to_string(lowest) + ".." + std::to_string(highest);
+        return false;
+    }
+
+    sched_param param{};
+    param.sched_priority = priority;
+    const int rc = pthread_setschedparam(pthread_self(), native, &param);
+    if (rc != 0) {
+        error = rc == EPERM ? "not permitted (needs CAP_SYS_NICE or an rtprio limit)" : std::strerror(rc);
+        return false;
+    }
+    return true;
+#else
+    (void)priority;
+    error = "real-time scheduling is only supported on Linux";
+    return false;
+#endif
+}
+
+/**
+ * @brief Lock every current and future page of the process in memory
+ * @param error Set to the reason on failure
+ */
+inline bool lockProcessMemory(std::string& error) {
+#ifdef __linux__
+    if (mlockall(MCL_CURRENT | MCL_FUTURE) != 0) {
+        const int err = errno;
+        error = err == EPERM || err == ENOMEM
+            ? std::string(std::strerror(err)) + " (needs CAP_IPC_LOCK or a larger memlock limit)"
+            : std::strerror(err);
+        return false;
+    }
+    return true;
+#else
+    error = "memory locking is only supported on Linux";
+    return false;
+#endif
+}
+
+} // namespace bridge
+
+#endif // THREAD_OPTIONS_H
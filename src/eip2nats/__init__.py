@@ -9,6 +9,10 @@ import os
 import sys
 from pathlib import Path
 
+from .aio import add_async_methods as _add_async_methods
+from .layout import Field, Layout, decode
+from .metrics import MetricsExporter
+
 # Add lib directory to library search path
 _lib_dir = Path(__file__).parent / "lib"
 if _lib_dir.exists():
@@ -40,6 +44,23 @@ try:
                     module = importlib.util.module_from_spec(spec)
                     spec.loader.exec_module(module)
                     EIPtoNATSBridge = module.EIPtoNATSBridge
+                    BridgeGroup = module.BridgeGroup
+                    PacketBatch = module.PacketBatch
+                    OverflowPolicy = module.OverflowPolicy
+                    JsonEncoding = module.JsonEncoding
+                    JetStreamOptions = module.JetStreamOptions
+                    SpoolEviction = module.SpoolEviction
+                    SpoolOptions = module.SpoolOptions
+                    DiskSpool = module.DiskSpool
+                    ConnectionType = module.ConnectionType
+                    NatsOptions = module.NatsOptions
+                    ReconnectOptions = module.ReconnectOptions
+                    ThreadOptions = module.ThreadOptions
+                    SchedulingPolicy = module.SchedulingPolicy
+                    SocketOptions = module.SocketOptions
+                    LogLevel = module.LogLevel
+                    set_log_level = module.set_log_level
+                    get_log_level = module.get_log_level
                     devices = module.devices
                     _found = True
                     break
@@ -53,10 +74,37 @@ try:
 except ImportError as e:
     raise ImportError(f"Error loading eip2nats module: {e}")
 
+# start_async()/stop_async() on the native classes, now that they are loaded
+_add_async_methods(EIPtoNATSBridge, BridgeGroup)
+
 from importlib.metadata import version as _get_version, PackageNotFoundError
 try:
     __version__ = _get_version("eip2nats")
 except PackageNotFoundError:
     __version__ = "0.0.0"  # Not installed as a package (dev mode)
 
-__all__ = ["EIPtoNATSBridge", "devices"]
+__all__ = [
+    "EIPtoNATSBridge",
+    "BridgeGroup",
+    "PacketBatch",
+    "OverflowPolicy",
+    "JsonEncoding",
+    "JetStreamOptions",
+    "SpoolEviction",
+    "SpoolOptions",
+    "DiskSpool",
+    "ConnectionType",
+    "NatsOptions",
+    "ReconnectOptions",
+    "ThreadOptions",
+    "SchedulingPolicy",
+    "SocketOptions",
+    "LogLevel",
+    "set_log_level",
+    "get_log_level",
+    "devices",
+    "Field",
+    "Layout",
+    "decode",
+    "MetricsExporter",
+]
@@ -0,0 +1,66 @@
+"""
+asyncio support: start_async() and stop_async() on EIPtoNATSBridge and BridgeGroup
+
+start() and stop() release the GIL but block the calling thread while they
+connect or join threads. The coroutines run them on a thread of their own, so
+many bridges can be brought up concurrently:
+
+    await asyncio.gather(*(bridge.start_async() for bridge in bridges))
+"""
+
+import asyncio
+import threading
+
+
+def _run_in_thread(func):
+    """Run func on a new thread and return an asyncio future for its result
+
+    A thread per call instead of the loop's default executor: its few workers
+    would queue the calls, and a PLC that is down holds one for the whole
+    connect timeout.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def resolve(result, error):
+        if future.cancelled():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def run():
+        try:
+            result = func()
+        except BaseException as error:
+            loop.call_soon_threadsafe(resolve, None, error)
+        else:
+            loop.call_soon_threadsafe(resolve, result, None)
+
+    threading.Thread(target=run, name=f"eip2nats-{func.__name__}", daemon=True).start()
+    return future
+
+
+async def start_async(self):
+    """Start without blocking the event loop
+
+    Cancelling the coroutine does not cancel the start; call stop_async()
+    afterwards if needed.
+
+    Returns:
+        bool: Same as start()
+    """
+    return await _run_in_thread(self.start)
+
+
+async def stop_async(self):
+    """Stop without blocking the event loop"""
+    await _run_in_thread(self.stop)
+
+
+def add_async_methods(*classes):
+    """Add start_async() and stop_async() to the native classes"""
+    for cls in classes:
+        cls.start_async = start_async
+        cls.stop_async = stop_async
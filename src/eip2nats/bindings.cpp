@@ -1,9 +1,102 @@
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 #include "EIPtoNATSBridge.h"
+#include "BridgeGroup.h"
+#include "utils/Logger.h"
 
 namespace py = pybind11;
 
+// Histogram percentiles as a dict in microseconds
+static py::dict summaryToDict(const bridge::HistogramSummary& summary) {
+    py::dict result;
+    result["count"] = summary.count;
+    result["min"] = summary.min / 1000.0;
+    result["p50"] = summary.p50 / 1000.0;
+    result["p99"] = summary.p99 / 1000.0;
+    result["p999"] = summary.p999 / 1000.0;
+    result["max"] = summary.max / 1000.0;
+    result["mean"] = summary.mean / 1000.0;
+    return result;
+}
+
+static py::dict sequenceToDict(const bridge::SequenceStats& stats) {
+    py::dict result;
+    result["gaps"] = stats.gaps;
+    result["lost"] = stats.lost;
+    result["duplicates"] = stats.duplicates;
+    result["out_of_order"] = stats.outOfOrder;
+    return result;
+}
+
+static py::dict spoolToDict(const bridge::SpoolStats& stats) {
+    py::dict result;
+    result["spooled"] = stats.spooled;
+    result["replayed"] = stats.replayed;
+    result["dropped"] = stats.dropped;
+    result["pending"] = stats.pending;
+    result["bytes"] = stats.bytes;
+    return result;
+}
+
+static py::dict natsToDict(const bridge::NatsConnectionStats& stats) {
+    py::dict result;
+    result["connected"] = stats.connected;
+    result["disconnects"] = stats.disconnects;
+    result["reconnects"] = stats.reconnects;
+    return result;
+}
+
+static py::dict threadsToDict(const bridge::ThreadStatus& status) {
+    py::dict result;
+    result["worker_realtime"] = status.workerRealtime.load();
+    result["worker_pinned"] = status.workerPinned.load();
+    result["publisher_pinned"] = status.publisherPinned.load();
+    result["memory_locked"] = status.memoryLocked.load();
+    return result;
+}
+
+static py::dict socketToDict(const bridge::SocketStats& stats) {
+    py::dict result;
+    result["kernel_drops"] = stats.kernelDrops.load();
+    result["malformed"] = stats.malformed.load();
+    result["receive_buffer_bytes"] = stats.receiveBufferBytes.load();
+    return result;
+}
+
+static py::dict reconnectToDict(const bridge::ReconnectStats& stats) {
+    py::dict result;
+    result["reconnects"] = stats.reconnects;
+    result["attempts"] = stats.attempts;
+    result["session_reuses"] = stats.sessionReuses;
+    result["recoveries"] = stats.recoveries;
+    result["last_recovery_ms"] = stats.lastRecoveryUs / 1000.0;
+    result["max_recovery_ms"] = stats.maxRecoveryUs / 1000.0;
+    result["mean_recovery_ms"] = stats.recoveries ? stats.totalRecoveryUs / 1000.0 / stats.recoveries : 0.0;
+    return result;
+}
+
+static py::dict jetStreamToDict(const bridge::JetStreamStats& stats) {
+    py::dict result;
+    result["acked"] = stats.acked;
+    result["nacked"] = stats.nacked;
+    result["timeouts"] = stats.timeouts;
+    result["pending"] = stats.pending;
+    return result;
+}
+
+// Native objects are destroyed with the GIL released: stopping a running
+// bridge joins its delivery thread, which may be waiting for the GIL
+template <typename T>
+struct GilReleasingDelete {
+    void operator()(T* ptr) const {
+        py::gil_scoped_release release;
+        delete ptr;
+    }
+};
+
+template <typename T>
+using GilReleasingPtr = std::unique_ptr<T, GilReleasingDelete<T>>;
+
 #ifndef EIP2NATS_VERSION
 #define EIP2NATS_VERSION "0.0.0"
 #endif
@@ -11,8 +104,457 @@ namespace py = pybind11;
 PYBIND11_MODULE(eip_nats_bridge, m) {
     m.doc() = "EIP to NATS Bridge - Bridge between EtherNet/IP and NATS";
 
-    py::class_<bridge::EIPtoNATSBridge>(m, "EIPtoNATSBridge")
-        .def(py::init<const std::string&, const std::string&, const std::string&, bool, uint8_t, uint8_t, uint8_t, uint16_t, uint32_t, uint16_t>(),
+    py::enum_<eipScanner::utils::LogLevel>(m, "LogLevel",
+             "Log levels of the native logger (EIPScanner Logger)")
+        .value("OFF", eipScanner::utils::LogLevel::OFF)
+        .value("ERROR", eipScanner::utils::LogLevel::ERROR)
+        .value("WARNING", eipScanner::utils::LogLevel::WARNING)
+        .value("INFO", eipScanner::utils::LogLevel::INFO)
+        .value("DEBUG", eipScanner::utils::LogLevel::DEBUG)
+        .value("TRACE", eipScanner::utils::LogLevel::TRACE);
+
+    m.def("set_log_level", &bridge::setLogLevel,
+          py::arg("level"),
+          "Set the native log level at runtime\n\n"
+          "DEBUG output (per-packet hex dumps, per-publish lines) is only built\n"
+          "when the level is DEBUG or higher, so it costs nothing otherwise.\n\n"
+          "Args:\n"
+          "    level (LogLevel): New log level (default at import: INFO)");
+
+    m.def("get_log_level", &bridge::getLogLevel,
+          "Get the native log level\n\n"
+          "Returns:\n"
+          "    LogLevel: Current log level");
+
+    py::enum_<bridge::OverflowPolicy>(m, "OverflowPolicy",
+             "What to do with a new packet when the EIP -> NATS queue is full")
+        .value("DROP_OLDEST", bridge::OverflowPolicy::DropOldest,
+             "Discard the oldest queued packet to make room")
+        .value("DROP_NEWEST", bridge::OverflowPolicy::DropNewest,
+             "Discard the incoming packet")
+        .value("BLOCK", bridge::OverflowPolicy::Block,
+             "Stall the EIP thread until the publisher frees a slot");
+
+    py::enum_<bridge::JsonEncoding>(m, "JsonEncoding",
+             "Encoding of the payload in the JSON \"data\" field")
+        .value("HEX", bridge::JsonEncoding::Hex,
+             "Two lowercase hex digits per byte")
+        .value("BASE64", bridge::JsonEncoding::Base64,
+             "Standard padded base64");
+
+    py::enum_<bridge::SpoolEviction>(m, "SpoolEviction",
+             "What to do with new messages when the outage spool is full")
+        .value("DROP_OLDEST", bridge::SpoolEviction::DropOldest,
+             "Delete the oldest spool segment to make room")
+        .value("DROP_NEWEST", bridge::SpoolEviction::DropNewest,
+             "Discard new messages until replay frees space");
+
+    py::enum_<bridge::ConnectionType>(m, "ConnectionType",
+             "How the T2O (PLC -> bridge) data of the I/O connection is delivered")
+        .value("POINT_TO_POINT", bridge::ConnectionType::PointToPoint,
+             "Exclusive-owner connection with unicast T2O to the bridge's port")
+        .value("MULTICAST", bridge::ConnectionType::Multicast,
+             "Owning connection with multicast T2O that other consumers may join")
+        .value("LISTEN_ONLY", bridge::ConnectionType::ListenOnly,
+             "Join the multicast T2O of a connection owned by another scanner; o2t_assembly\n"
+             "must be the device's listen-only connection point");
+
+    py::enum_<bridge::SchedulingPolicy>(m, "SchedulingPolicy",
+             "Scheduling policy of the EIP worker thread (see ThreadOptions)")
+        .value("OTHER", bridge::SchedulingPolicy::Other,
+             "Normal time-sharing scheduler")
+        .value("FIFO", bridge::SchedulingPolicy::Fifo,
+             "SCHED_FIFO: runs until it blocks, ahead of every normal thread")
+        .value("ROUND_ROBIN", bridge::SchedulingPolicy::RoundRobin,
+             "SCHED_RR: like FIFO, time-sliced among threads of equal priority");
+
+    const bridge::NatsOptions natsDefaults;
+    py::class_<bridge::NatsOptions>(m, "NatsOptions",
+             "nats.c connection settings, passed as nats_options to EIPtoNATSBridge or BridgeGroup\n\n"
+             "Defaults are those of nats.c, except the 5 s connect timeout. Every argument is also a\n"
+             "read/write attribute.")
+        .def(py::init([](const std::vector<std::string>& servers, const std::string& name,
+                         int64_t connectTimeoutMs, bool allowReconnect, int maxReconnect,
+                         int64_t reconnectWaitMs, int64_t reconnectJitterMs, int reconnectBufSize,
+                         int64_t writeDeadlineMs, bool sendAsap, int ioBufSize, bool noRandomize,
+                         int64_t pingIntervalMs, int maxPingsOut) {
+                 bridge::NatsOptions options;
+                 options.servers = servers;
+                 options.name = name;
+                 options.connectTimeoutMs = connectTimeoutMs;
+                 options.allowReconnect = allowReconnect;
+                 options.maxReconnect = maxReconnect;
+                 options.reconnectWaitMs = reconnectWaitMs;
+                 options.reconnectJitterMs = reconnectJitterMs;
+                 options.reconnectBufSize = reconnectBufSize;
+                 options.writeDeadlineMs = writeDeadlineMs;
+                 options.sendAsap = sendAsap;
+                 options.ioBufSize = ioBufSize;
+                 options.noRandomize = noRandomize;
+                 options.pingIntervalMs = pingIntervalMs;
+                 options.maxPingsOut = maxPingsOut;
+                 return options;
+             }),
+             py::arg("servers") = natsDefaults.servers,
+             py::arg("name") = natsDefaults.name,
+             py::arg("connect_timeout_ms") = natsDefaults.connectTimeoutMs,
+             py::arg("allow_reconnect") = natsDefaults.allowReconnect,
+             py::arg("max_reconnect") = natsDefaults.maxReconnect,
+             py::arg("reconnect_wait_ms") = natsDefaults.reconnectWaitMs,
+             py::arg("reconnect_jitter_ms") = natsDefaults.reconnectJitterMs,
+             py::arg("reconnect_buf_size") = natsDefaults.reconnectBufSize,
+             py::arg("write_deadline_ms") = natsDefaults.writeDeadlineMs,
+             py::arg("send_asap") = natsDefaults.sendAsap,
+             py::arg("io_buf_size") = natsDefaults.ioBufSize,
+             py::arg("no_randomize") = natsDefaults.noRandomize,
+             py::arg("ping_interval_ms") = natsDefaults.pingIntervalMs,
+             py::arg("max_pings_out") = natsDefaults.maxPingsOut,
+             "Args:\n"
+             "    servers (list[str]): More servers of the cluster, tried after nats_url on failover (default: [])\n"
+             "    name (str): Connection name shown by the server (default: '')\n"
+             "    connect_timeout_ms (int): Timeout of each connection attempt (default: 5000)\n"
+             "    allow_reconnect (bool): Reconnect when the connection is lost (default: True)\n"
+             "    max_reconnect (int): Attempts per server before giving up, -1 = forever (default: 60)\n"
+             "    reconnect_wait_ms (int): Wait between attempts to the same server (default: 2000)\n"
+             "    reconnect_jitter_ms (int): Random extra wait between attempts (default: 100)\n"
+             "    reconnect_buf_size (int): Bytes of publishes kept while reconnecting (default: 8 MiB)\n"
+             "    write_deadline_ms (int): Fail a blocked socket write after this long, 0 = never (default: 0)\n"
+             "    send_asap (bool): Write every publish to the socket immediately instead of letting\n"
+             "        the flusher thread coalesce them (default: False)\n"
+             "    io_buf_size (int): Size of the socket read/write buffers (default: 32 KiB)\n"
+             "    no_randomize (bool): Try the servers in order instead of shuffled (default: False)\n"
+             "    ping_interval_ms (int): Interval of the server liveness check (default: 120000)\n"
+             "    max_pings_out (int): Unanswered pings before the connection is dropped (default: 2)")
+        .def_readwrite("servers", &bridge::NatsOptions::servers)
+        .def_readwrite("name", &bridge::NatsOptions::name)
+        .def_readwrite("connect_timeout_ms", &bridge::NatsOptions::connectTimeoutMs)
+        .def_readwrite("allow_reconnect", &bridge::NatsOptions::allowReconnect)
+        .def_readwrite("max_reconnect", &bridge::NatsOptions::maxReconnect)
+        .def_readwrite("reconnect_wait_ms", &bridge::NatsOptions::reconnectWaitMs)
+        .def_readwrite("reconnect_jitter_ms", &bridge::NatsOptions::reconnectJitterMs)
+        .def_readwrite("reconnect_buf_size", &bridge::NatsOptions::reconnectBufSize)
+        .def_readwrite("write_deadline_ms", &bridge::NatsOptions::writeDeadlineMs)
+        .def_readwrite("send_asap", &bridge::NatsOptions::sendAsap)
+        .def_readwrite("io_buf_size", &bridge::NatsOptions::ioBufSize)
+        .def_readwrite("no_randomize", &bridge::NatsOptions::noRandomize)
+        .def_readwrite("ping_interval_ms", &bridge::NatsOptions::pingIntervalMs)
+        .def_readwrite("max_pings_out", &bridge::NatsOptions::maxPingsOut)
+        .def("__repr__", [](const bridge::NatsOptions &options) {
+            return "<NatsOptions servers=" + std::to_string(options.servers.size() + 1) +
+                   " send_asap=" + std::string(options.sendAsap ? "True" : "False") +
+                   " io_buf_size=" + std::to_string(options.ioBufSize) +
+                   " max_reconnect=" + std::to_string(options.maxReconnect) + ">";
+        });
+
+    const bridge::ReconnectOptions reconnectDefaults;
+    py::class_<bridge::ReconnectOptions>(m, "ReconnectOptions",
+             "How a lost EIP connection is re-established, passed as reconnect_options\n\n"
+             "The first attempt is made as soon as the loss is detected, then the wait grows from\n"
+             "initial_delay_ms by multiplier up to max_delay_ms. Every argument is also a read/write\n"
+             "attribute.")
+        .def(py::init([](uint32_t initialDelayMs, uint32_t maxDelayMs, double multiplier, double jitter,
+                         bool immediateFirstRetry, bool reuseSession) {
+                 bridge::ReconnectOptions options;
+                 options.initialDelayMs = initialDelayMs;
+                 options.maxDelayMs = maxDelayMs;
+                 options.multiplier = multiplier;
+                 options.jitter = jitter;
+                 options.immediateFirstRetry = immediateFirstRetry;
+                 options.reuseSession = reuseSession;
+                 return options;
+             }),
+             py::arg("initial_delay_ms") = reconnectDefaults.initialDelayMs,
+             py::arg("max_delay_ms") = reconnectDefaults.maxDelayMs,
+             py::arg("multiplier") = reconnectDefaults.multiplier,
+             py::arg("jitter") = reconnectDefaults.jitter,
+             py::arg("immediate_first_retry") = reconnectDefaults.immediateFirstRetry,
+             py::arg("reuse_session") = reconnectDefaults.reuseSession,
+             "Args:\n"
+             "    initial_delay_ms (int): Wait after the first failed retry (default: 100)\n"
+             "    max_delay_ms (int): Longest wait between attempts (default: 3000)\n"
+             "    multiplier (float): Growth of the wait per failed attempt (default: 2.0)\n"
+             "    jitter (float): Random extra wait, as a fraction of the wait (default: 0.2)\n"
+             "    immediate_first_retry (bool): Retry without waiting right after the loss (default: True)\n"
+             "    reuse_session (bool): Keep the TCP session when only the I/O connection dropped\n"
+             "        and Forward Open on it again (default: True)")
+        .def_readwrite("initial_delay_ms", &bridge::ReconnectOptions::initialDelayMs)
+        .def_readwrite("max_delay_ms", &bridge::ReconnectOptions::maxDelayMs)
+        .def_readwrite("multiplier", &bridge::ReconnectOptions::multiplier)
+        .def_readwrite("jitter", &bridge::ReconnectOptions::jitter)
+        .def_readwrite("immediate_first_retry", &bridge::ReconnectOptions::immediateFirstRetry)
+        .def_readwrite("reuse_session", &bridge::ReconnectOptions::reuseSession)
+        .def("__repr__", [](const bridge::ReconnectOptions &options) {
+            return "<ReconnectOptions initial_delay_ms=" + std::to_string(options.initialDelayMs) +
+                   " max_delay_ms=" + std::to_string(options.maxDelayMs) +
+                   " reuse_session=" + std::string(options.reuseSession ? "True" : "False") + ">";
+        });
+
+    const bridge::ThreadOptions threadDefaults;
+    py::class_<bridge::ThreadOptions>(m, "ThreadOptions",
+             "Placement and priority of the bridge threads, passed as thread_options\n\n"
+             "The EIP worker receives the T2O packets, so its wakeup latency is the RPI jitter\n"
+             "the bridge adds. Pin it to a CPU nothing else uses and give it a real-time policy\n"
+             "to keep other processes from delaying it. Real-time scheduling and lock_memory need\n"
+             "CAP_SYS_NICE / CAP_IPC_LOCK or matching rtprio/memlock limits; without them a warning\n"
+             "is logged and the thread runs as before (see get_thread_status()). Linux only. Every\n"
+             "argument is also a read/write attribute.")
+        .def(py::init([](const std::vector<int>& workerCpus, const std::vector<int>& publisherCpus,
+                         bridge::SchedulingPolicy policy, int priority, bool lockMemory, bool nameThreads) {
+                 bridge::ThreadOptions options;
+                 options.workerCpus = workerCpus;
+                 options.publisherCpus = publisherCpus;
+                 options.policy = policy;
+                 options.priority = priority;
+                 options.lockMemory = lockMemory;
+                 options.nameThreads = nameThreads;
+                 return options;
+             }),
+             py::arg("worker_cpus") = threadDefaults.workerCpus,
+             py::arg("publisher_cpus") = threadDefaults.publisherCpus,
+             py::arg("policy") = threadDefaults.policy,
+             py::arg("priority") = threadDefaults.priority,
+             py::arg("lock_memory") = threadDefaults.lockMemory,
+             py::arg("name_threads") = threadDefaults.nameThreads,
+             "Args:\n"
+             "    worker_cpus (list[int]): CPUs the EIP worker thread may run on (default: [], any)\n"
+             "    publisher_cpus (list[int]): CPUs of the publisher and delivery threads (default: [], any)\n"
+             "    policy (SchedulingPolicy): Scheduling policy of the EIP worker (default: OTHER)\n"
+             "    priority (int): Real-time priority 1..99 with FIFO or ROUND_ROBIN (default: 0)\n"
+             "    lock_memory (bool): mlockall() the process so no page fault stalls a thread\n"
+             "        (default: False)\n"
+             "    name_threads (bool): Name the threads eip2nats-<role>-<PLC>, as shown by top -H\n"
+             "        (default: True)")
+        .def_readwrite("worker_cpus", &bridge::ThreadOptions::workerCpus)
+        .def_readwrite("publisher_cpus", &bridge::ThreadOptions::publisherCpus)
+        .def_readwrite("policy", &bridge::ThreadOptions::policy)
+        .def_readwrite("priority", &bridge::ThreadOptions::priority)
+        .def_readwrite("lock_memory", &bridge::ThreadOptions::lockMemory)
+        .def_readwrite("name_threads", &bridge::ThreadOptions::nameThreads)
+        .def("__repr__", [](const bridge::ThreadOptions &options) {
+            return "<ThreadOptions worker_cpus=" + std::to_string(options.workerCpus.size()) +
+                   " priority=" + std::to_string(options.priority) +
+                   " lock_memory=" + std::string(options.lockMemory ? "True" : "False") + ">";
+        });
+
+    const bridge::SocketOptions socketDefaults;
+    py::class_<bridge::SocketOptions>(m, "SocketOptions",
+             "Options of the UDP socket the T2O packets arrive on, passed as socket_options\n\n"
+             "Without CAP_NET_ADMIN the receive buffer is capped at net.core.rmem_max (see\n"
+             "get_socket_stats() for what was granted). Busy polling also needs the\n"
+             "net.core.busy_poll sysctl. DSCP marks the packets the bridge sends (O2T); the T2O\n"
+             "marking is configured on the PLC. Linux only. Every argument is also a read/write\n"
+             "attribute.")
+        .def(py::init([](int receiveBufferBytes, int busyPollUs, int dscp, bool kernelTimestamps) {
+                 bridge::SocketOptions options;
+                 options.receiveBufferBytes = receiveBufferBytes;
+                 options.busyPollUs = busyPollUs;
+                 options.dscp = dscp;
+                 options.kernelTimestamps = kernelTimestamps;
+                 return options;
+             }),
+             py::arg("receive_buffer_bytes") = socketDefaults.receiveBufferBytes,
+             py::arg("busy_poll_us") = socketDefaults.busyPollUs,
+             py::arg("dscp") = socketDefaults.dscp,
+             py::arg("kernel_timestamps") = socketDefaults.kernelTimestamps,
+             "Args:\n"
+             "    receive_buffer_bytes (int): SO_RCVBUF, 0 for the system default (default: 0)\n"
+             "    busy_poll_us (int): SO_BUSY_POLL, 0 disables busy polling (default: 0)\n"
+             "    dscp (int): DSCP of the packets sent, 0..63 (e.g. 55 for CIP I/O), -1 leaves it\n"
+             "        unchanged (default: -1)\n"
+             "    kernel_timestamps (bool): Take the receive time of every packet from the kernel\n"
+             "        (SO_TIMESTAMPNS), so latency, jitter and published timestamps include the time\n"
+             "        it waited in the socket (default: False)")
+        .def_readwrite("receive_buffer_bytes", &bridge::SocketOptions::receiveBufferBytes)
+        .def_readwrite("busy_poll_us", &bridge::SocketOptions::busyPollUs)
+        .def_readwrite("dscp", &bridge::SocketOptions::dscp)
+        .def_readwrite("kernel_timestamps", &bridge::SocketOptions::kernelTimestamps)
+        .def("__repr__", [](const bridge::SocketOptions &options) {
+            return "<SocketOptions receive_buffer_bytes=" + std::to_string(options.receiveBufferBytes) +
+                   " dscp=" + std::to_string(options.dscp) +
+                   " kernel_timestamps=" + std::string(options.kernelTimestamps ? "True" : "False") + ">";
+        });
+
+    const bridge::JetStreamOptions jetStreamDefaults;
+    py::class_<bridge::JetStreamOptions>(m, "JetStreamOptions",
+             "JetStream publishing of a bridge, passed as jetstream_options\n\n"
+             "When enabled, messages are published to JetStream with asynchronous acks instead of\n"
+             "to core NATS; a stream must capture the bridge's subject. Acks, nacks, timeouts and ack\n"
+             "latency are counted (see get_jetstream_stats()). Every argument is also a read/write\n"
+             "attribute.")
+        .def(py::init([](bool enabled, uint32_t maxPending, uint32_t ackTimeoutMs) {
+                 bridge::JetStreamOptions options;
+                 options.enabled = enabled;
+                 options.maxPending = maxPending;
+                 options.ackTimeoutMs = ackTimeoutMs;
+                 return options;
+             }),
+             py::arg("enabled") = jetStreamDefaults.enabled,
+             py::arg("max_pending") = jetStreamDefaults.maxPending,
+             py::arg("ack_timeout_ms") = jetStreamDefaults.ackTimeoutMs,
+             "Args:\n"
+             "    enabled (bool): Publish to JetStream instead of core NATS (default: False)\n"
+             "    max_pending (int): Maximum unacknowledged messages; when full, publishing waits for\n"
+             "        acks (until stop()) and packets back up in the queue (default: 256)\n"
+             "    ack_timeout_ms (int): How long to wait for each ack, and between warnings while the\n"
+             "        window is full (default: 5000)")
+        .def_readwrite("enabled", &bridge::JetStreamOptions::enabled)
+        .def_readwrite("max_pending", &bridge::JetStreamOptions::maxPending)
+        .def_readwrite("ack_timeout_ms", &bridge::JetStreamOptions::ackTimeoutMs)
+        .def("__repr__", [](const bridge::JetStreamOptions &options) {
+            return "<JetStreamOptions enabled=" + std::string(options.enabled ? "True" : "False") +
+                   " max_pending=" + std::to_string(options.maxPending) +
+                   " ack_timeout_ms=" + std::to_string(options.ackTimeoutMs) + ">";
+        });
+
+    const bridge::SpoolOptions spoolDefaults;
+    py::class_<bridge::SpoolOptions>(m, "SpoolOptions",
+             "Outage spool (store-and-forward) of a bridge, passed as spool_options\n\n"
+             "While NATS is unreachable, or a publish fails, encoded messages are appended to\n"
+             "memory-mapped segment files in directory and replayed in order after reconnecting.\n"
+             "The directory is locked while a bridge uses it, so give each bridge its own. Every\n"
+             "argument is also a read/write attribute.")
+        .def(py::init([](const std::string& directory, uint64_t maxBytes, uint32_t segmentBytes,
+                         bridge::SpoolEviction eviction, uint32_t replayRate, uint32_t replayBatch) {
+                 bridge::SpoolOptions options;
+                 options.directory = directory;
+                 options.maxBytes = maxBytes;
+                 options.segmentBytes = segmentBytes;
+                 options.eviction = eviction;
+                 options.replayRate = replayRate;
+                 options.replayBatch = replayBatch;
+                 return options;
+             }),
+             py::arg("directory") = spoolDefaults.directory,
+             py::arg("max_bytes") = spoolDefaults.maxBytes,
+             py::arg("segment_bytes") = spoolDefaults.segmentBytes,
+             py::arg("eviction") = spoolDefaults.eviction,
+             py::arg("replay_rate") = spoolDefaults.replayRate,
+             py::arg("replay_batch") = spoolDefaults.replayBatch,
+             "Args:\n"
+             "    directory (str): Where the spool files are kept; empty disables the spool (default: '')\n"
+             "    max_bytes (int): Maximum disk space of the spool, at least two segments (default: 1 GiB)\n"
+             "    segment_bytes (int): Size of each memory-mapped spool file, at least 64 KiB\n"
+             "        (default: 16 MiB)\n"
+             "    eviction (SpoolEviction): What to do when the spool is full (default: DROP_OLDEST)\n"
+             "    replay_rate (int): Maximum messages replayed per second, 0 for no limit (default: 10000)\n"
+             "    replay_batch (int): Messages replayed per publisher pass (default: 100)")
+        .def_readwrite("directory", &bridge::SpoolOptions::directory)
+        .def_readwrite("max_bytes", &bridge::SpoolOptions::maxBytes)
+        .def_readwrite("segment_bytes", &bridge::SpoolOptions::segmentBytes)
+        .def_readwrite("eviction", &bridge::SpoolOptions::eviction)
+        .def_readwrite("replay_rate", &bridge::SpoolOptions::replayRate)
+        .def_readwrite("replay_batch", &bridge::SpoolOptions::replayBatch)
+        .def("__repr__", [](const bridge::SpoolOptions &options) {
+            return "<SpoolOptions directory='" + options.directory + "'" +
+                   " max_bytes=" + std::to_string(options.maxBytes) +
+                   " replay_rate=" + std::to_string(options.replayRate) + ">";
+        });
+
+    py::class_<bridge::DiskSpool>(m, "DiskSpool",
+             "The store of an outage spool, for inspecting or draining a spool directory\n\n"
+             "Messages are a metadata and a payload byte string, read back oldest first. Opening\n"
+             "locks the directory until the object is deleted, so it fails while a bridge uses it.")
+        .def(py::init([](const std::string& directory, uint32_t segmentBytes, uint64_t maxBytes,
+                         bridge::SpoolEviction eviction) {
+                 return std::make_unique<bridge::DiskSpool>(directory, segmentBytes, maxBytes, eviction);
+             }),
+             py::arg("directory"),
+             py::arg("segment_bytes") = spoolDefaults.segmentBytes,
+             py::arg("max_bytes") = spoolDefaults.maxBytes,
+             py::arg("eviction") = spoolDefaults.eviction,
+             "Args:\n"
+             "    directory (str): Where the spool files are kept\n"
+             "    segment_bytes (int): Size of each new spool file, at least 64 KiB (default: 16 MiB)\n"
+             "    max_bytes (int): Maximum disk space, at least two segments (default: 1 GiB)\n"
+             "    eviction (SpoolEviction): What to do when the spool is full (default: DROP_OLDEST)")
+
+        .def("open", &bridge::DiskSpool::open,
+             "Create and lock the directory and recover the messages left in it\n\n"
+             "Returns:\n"
+             "    bool: False if the directory cannot be used or is locked by another spool")
+
+        .def("append", [](bridge::DiskSpool &spool, const py::bytes &payload, const py::bytes &meta) {
+            const std::string data = payload;
+            const std::string metadata = meta;
+            return spool.append(reinterpret_cast<const uint8_t*>(metadata.data()), metadata.size(),
+                                reinterpret_cast<const uint8_t*>(data.data()), data.size());
+        },
+             py::arg("payload"),
+             py::arg("meta") = py::bytes(),
+             "Append a message\n\n"
+             "Returns:\n"
+             "    bool: False if it was dropped (full with DROP_NEWEST, too large or I/O error)")
+
+        .def("front", [](bridge::DiskSpool &spool) -> py::object {
+            bridge::DiskSpool::Record record;
+            if (!spool.front(record)) return py::none();
+            return py::make_tuple(
+                py::bytes(reinterpret_cast<const char*>(record.payload), record.payloadSize),
+                py::bytes(reinterpret_cast<const char*>(record.meta), record.metaSize));
+        },
+             "Get the oldest unread message without removing it\n\n"
+             "Returns:\n"
+             "    tuple[bytes, bytes] | None: Payload and metadata, None if the spool is empty")
+
+        .def("pop", &bridge::DiskSpool::pop,
+             "Mark the message returned by front() as read")
+
+        .def("empty", &bridge::DiskSpool::empty,
+             "Check if there are no unread messages")
+
+        .def("get_stats", [](const bridge::DiskSpool &spool) {
+            return spoolToDict(spool.stats());
+        },
+             "Get the counters since construction\n\n"
+             "Returns:\n"
+             "    dict: spooled, replayed, dropped and pending messages, and bytes (disk space of\n"
+             "        the spool files)");
+
+    py::class_<bridge::PacketBatch, std::shared_ptr<bridge::PacketBatch>>(m, "PacketBatch", py::buffer_protocol(),
+             "Packets received together, stored back to back in one native buffer\n\n"
+             "batch[i] is a read-only memoryview of packet i (no copy); memoryview(batch)\n"
+             "covers the whole buffer. The buffer is reused for a later batch once no\n"
+             "Python object refers to it any more.")
+        .def_buffer([](bridge::PacketBatch &batch) {
+            return py::buffer_info(batch.buffer.data(), 1,
+                                   py::format_descriptor<uint8_t>::format(), 1,
+                                   {static_cast<py::ssize_t>(batch.buffer.size())}, {1},
+                                   true);
+        })
+
+        .def("__len__", &bridge::PacketBatch::size)
+
+        .def("__getitem__", [](py::object self, py::ssize_t index) {
+            const auto &batch = self.cast<const bridge::PacketBatch &>();
+            const auto count = static_cast<py::ssize_t>(batch.size());
+            if (index < 0) index += count;
+            if (index < 0 || index >= count) throw py::index_error("PacketBatch index out of range");
+
+            // Slice of a view over the whole batch, which keeps the batch alive
+            const auto &entry = batch.packets[index];
+            const auto start = static_cast<py::ssize_t>(entry.offset);
+            const auto stop = static_cast<py::ssize_t>(entry.offset + entry.size);
+            return py::object(py::memoryview(self)[py::slice(start, stop, 1)]);
+        },
+             py::arg("index"),
+             "Read-only memoryview of one packet")
+
+        .def("get_sequence", [](const bridge::PacketBatch &batch, size_t index) {
+            if (index >= batch.size()) throw py::index_error("PacketBatch index out of range");
+            return batch.packets[index].sequence;
+        },
+             py::arg("index"),
+             "Get the CIP sequence number of one packet\n\n"
+             "Returns:\n"
+             "    int: Sequence number")
+
+        .def("__repr__", [](const bridge::PacketBatch &batch) {
+            return "<PacketBatch packets=" + std::to_string(batch.size()) +
+                   " bytes=" + std::to_string(batch.buffer.size()) + ">";
+        });
+
+    py::class_<bridge::EIPtoNATSBridge, GilReleasingPtr<bridge::EIPtoNATSBridge>>(m, "EIPtoNATSBridge")
+        .def(py::init<const std::string&, const std::string&, const std::string&, bool, uint8_t, uint8_t, uint8_t, uint16_t, uint32_t, uint16_t, size_t, bridge::OverflowPolicy, uint32_t, uint32_t, bridge::JsonEncoding, bool, bool, const std::vector<uint8_t>&, uint32_t, bool, bool, const bridge::JetStreamOptions&, const bridge::SpoolOptions&, const bridge::NatsOptions&, const bridge::ReconnectOptions&, bridge::ConnectionType, const bridge::ThreadOptions&, const bridge::SocketOptions&, bool>(),
              py::arg("plc_address"),
              py::arg("nats_url"),
              py::arg("nats_subject"),
@@ -23,6 +565,25 @@ PYBIND11_MODULE(eip_nats_bridge, m) {
              py::arg("t2o_size") = 0,
              py::arg("rpi") = 2000,
              py::arg("port") = 2222,
+             py::arg("queue_depth") = 1024,
+             py::arg("overflow_policy") = bridge::OverflowPolicy::DropOldest,
+             py::arg("batch_max_packets") = 1,
+             py::arg("batch_max_delay_us") = 0,
+             py::arg("json_encoding") = bridge::JsonEncoding::Hex,
+             py::arg("event_driven") = false,
+             py::arg("change_only") = false,
+             py::arg("change_mask") = std::vector<uint8_t>(),
+             py::arg("heartbeat_ms") = 0,
+             py::arg("tag_sequence") = false,
+             py::arg("nats_headers") = false,
+             py::arg("jetstream_options") = bridge::JetStreamOptions(),
+             py::arg("spool_options") = bridge::SpoolOptions(),
+             py::arg("nats_options") = bridge::NatsOptions(),
+             py::arg("reconnect_options") = bridge::ReconnectOptions(),
+             py::arg("connection_type") = bridge::ConnectionType::PointToPoint,
+             py::arg("thread_options") = bridge::ThreadOptions(),
+             py::arg("socket_options") = bridge::SocketOptions(),
+             py::arg("t2o_run_idle_header") = false,
              "Bridge constructor\n\n"
              "Args:\n"
              "    plc_address (str): PLC IP address (e.g. '192.168.17.200')\n"
@@ -34,14 +595,59 @@ PYBIND11_MODULE(eip_nats_bridge, m) {
              "    t2o_assembly (int): T2O data assembly instance (default: 1)\n"
              "    t2o_size (int): T2O connection size in bytes (default: 0)\n"
              "    rpi (int): Requested Packet Interval in microseconds, applied to both O2T and T2O (default: 2000)\n"
-             "    port (int): Local UDP port for receiving implicit I/O data (default: 2222). Use different ports for parallel bridges")
+             "    port (int): Local UDP port for receiving implicit I/O data (default: 2222). Standalone bridges in one\n"
+             "        process need different ports; the bridges of a BridgeGroup can all share one\n"
+             "    queue_depth (int): Packets buffered between the EIP and NATS threads (default: 1024)\n"
+             "    overflow_policy (OverflowPolicy): Behaviour when the queue is full (default: DROP_OLDEST)\n"
+             "    batch_max_packets (int): Packets grouped into one NATS message, 1 disables batching (default: 1).\n"
+             "        Binary batches frame each packet as a 2-byte little-endian length + payload;\n"
+             "        JSON batches are arrays of the per-packet objects\n"
+             "    batch_max_delay_us (int): Maximum time a packet waits in an open batch in microseconds;\n"
+             "        0 publishes whatever is queued as soon as the queue runs empty (default: 0)\n"
+             "    json_encoding (JsonEncoding): Encoding of the JSON \"data\" field, HEX or BASE64 (default: HEX)\n"
+             "    event_driven (bool): Block on the UDP socket for up to half the RPI (max 100 ms) instead of\n"
+             "        waking up every millisecond, so idle bridges use almost no CPU (default: False)\n"
+             "    change_only (bool): Only publish packets that differ from the last published one (default: False)\n"
+             "    change_mask (list[int]): Per-byte compare mask for change_only; 0x00 ignores a byte, bytes\n"
+             "        past the end of the mask are compared in full (default: [], compare every byte)\n"
+             "    heartbeat_ms (int): With change_only, publish an unchanged packet when nothing was\n"
+             "        published for this long, 0 disables it (default: 0)\n"
+             "    tag_sequence (bool): Publish the CIP sequence count with every packet: binary packets\n"
+             "        are prefixed with it as a 2-byte little-endian value (after the length in batches),\n"
+             "        JSON objects get a \"cip_sequence\" field (default: False)\n"
+             "    nats_headers (bool): Send the packet metadata as NATS headers: Eip-Sequence (CIP sequence\n"
+             "        count), Eip-Timestamp-Ns (receive time, ns since the epoch), Eip-Plc and, with\n"
+             "        t2o_run_idle_header, Eip-Run-Idle (\"run\"/\"idle\"); batches repeat the per-packet\n"
+             "        headers once per packet. Needs NATS server 2.2+ (default: False)\n"
+             "    jetstream_options (JetStreamOptions): JetStream publishing with asynchronous acks; a\n"
+             "        stream must capture nats_subject (default: JetStreamOptions(), core NATS)\n"
+             "    spool_options (SpoolOptions): Outage spool; while NATS is unreachable messages are\n"
+             "        stored in its directory and replayed after reconnecting (default: SpoolOptions(),\n"
+             "        no spool)\n"
+             "    nats_options (NatsOptions): nats.c connection settings: cluster servers, reconnect,\n"
+             "        buffering and send-asap (default: NatsOptions())\n"
+             "    reconnect_options (ReconnectOptions): Backoff and session reuse when the EIP connection\n"
+             "        is lost (default: ReconnectOptions())\n"
+             "    connection_type (ConnectionType): POINT_TO_POINT, MULTICAST (one PLC stream shared by\n"
+             "        several consumers, received on the group and port from the Forward Open reply) or\n"
+             "        LISTEN_ONLY (default: POINT_TO_POINT)\n"
+             "    thread_options (ThreadOptions): CPU affinity, real-time priority, memory locking and\n"
+             "        names of the bridge threads (default: ThreadOptions())\n"
+             "    socket_options (SocketOptions): Receive buffer, busy polling, DSCP and kernel receive\n"
+             "        timestamps of the UDP socket (default: SocketOptions())\n"
+             "    t2o_run_idle_header (bool): Request the 32-bit run/idle header on the T2O connection;\n"
+             "        the adapter must support it. With nats_headers its run bit is published as\n"
+             "        Eip-Run-Idle (default: False)")
 
         .def("start", &bridge::EIPtoNATSBridge::start,
+             py::call_guard<py::gil_scoped_release>(),
              "Start the bridge: connect to NATS, open EIP connection and start the thread\n\n"
+             "Blocks while connecting, with the GIL released. See start_async() for asyncio.\n\n"
              "Returns:\n"
              "    bool: True if started successfully, False on error")
 
         .def("stop", &bridge::EIPtoNATSBridge::stop,
+             py::call_guard<py::gil_scoped_release>(),
              "Stop the bridge: close EIP connection, disconnect from NATS and stop the thread")
 
         .def("is_running", &bridge::EIPtoNATSBridge::isRunning,
@@ -49,10 +655,19 @@ PYBIND11_MODULE(eip_nats_bridge, m) {
              "Returns:\n"
              "    bool: True if active, False if stopped")
 
+        .def_property_readonly("plc_address", &bridge::EIPtoNATSBridge::getPlcAddress,
+             "PLC IP address")
+
+        .def_property_readonly("nats_subject", &bridge::EIPtoNATSBridge::getNatsSubject,
+             "NATS subject the packets are published to")
+
+        .def_property_readonly("connection_type", &bridge::EIPtoNATSBridge::getConnectionType,
+             "How the T2O data is delivered (ConnectionType)")
+
         .def("get_published_count", &bridge::EIPtoNATSBridge::getPublishedCount,
-             "Get the number of messages published to NATS\n\n"
+             "Get the number of packets published to NATS\n\n"
              "Returns:\n"
-             "    int: Count of sent messages")
+             "    int: Count of sent packets (a batch counts every packet it carries)")
 
         .def("get_received_count", &bridge::EIPtoNATSBridge::getReceivedCount,
              "Get the number of messages received from the PLC\n\n"
@@ -64,6 +679,210 @@ PYBIND11_MODULE(eip_nats_bridge, m) {
              "Returns:\n"
              "    int: Count of reconnections")
 
+        .def("get_reconnect_stats", [](const bridge::EIPtoNATSBridge &bridge) {
+            return reconnectToDict(bridge.getReconnectStats());
+        },
+             "Get EIP reconnection counters and time-to-recover\n\n"
+             "The recovery time runs from the moment the loss is detected (after the connection\n"
+             "timeout) until the first packet after reconnecting.\n\n"
+             "Returns:\n"
+             "    dict: reconnects, attempts, session_reuses (reconnects that kept the TCP session),\n"
+             "        recoveries, and last_recovery_ms, max_recovery_ms and mean_recovery_ms")
+
+        .def("get_overflow_count", &bridge::EIPtoNATSBridge::getOverflowCount,
+             "Get the number of packets dropped because the queue was full\n\n"
+             "Returns:\n"
+             "    int: Count of overflowed packets")
+
+        .def("get_queue_size", &bridge::EIPtoNATSBridge::getQueueSize,
+             "Get the number of packets waiting to be published\n\n"
+             "Returns:\n"
+             "    int: Current queue occupancy")
+
+        .def("get_queue_high_watermark", &bridge::EIPtoNATSBridge::getQueueHighWatermark,
+             "Get the highest queue occupancy seen so far\n\n"
+             "Returns:\n"
+             "    int: Queue high watermark")
+
+        .def("get_suppressed_count", &bridge::EIPtoNATSBridge::getSuppressedCount,
+             "Get the number of packets skipped by change_only because they had not changed\n\n"
+             "Returns:\n"
+             "    int: Count of suppressed packets")
+
+        .def("get_stats", [](bridge::EIPtoNATSBridge &bridge, bool reset) {
+            py::dict stats;
+            stats["received"] = bridge.getReceivedCount();
+            stats["published"] = bridge.getPublishedCount();
+            stats["reconnects"] = bridge.getReconnectCount();
+            stats["overflows"] = bridge.getOverflowCount();
+            stats["suppressed"] = bridge.getSuppressedCount();
+            stats["local_overflows"] = bridge.getLocalOverflowCount();
+            stats["queue_size"] = bridge.getQueueSize();
+            stats["queue_high_watermark"] = bridge.getQueueHighWatermark();
+            stats["latency_us"] = summaryToDict(bridge.getLatencyStats());
+            stats["jitter_us"] = summaryToDict(bridge.getJitterStats());
+            stats["receive_delay_us"] = summaryToDict(bridge.getReceiveDelayStats());
+            stats["sequence"] = sequenceToDict(bridge.getSequenceStats());
+            stats["jetstream"] = jetStreamToDict(bridge.getJetStreamStats());
+            stats["ack_latency_us"] = summaryToDict(bridge.getAckLatencyStats());
+            stats["spool"] = spoolToDict(bridge.getSpoolStats());
+            stats["nats"] = natsToDict(bridge.getNatsStats());
+            stats["reconnect"] = reconnectToDict(bridge.getReconnectStats());
+            stats["threads"] = threadsToDict(bridge.getThreadStatus());
+            stats["socket"] = socketToDict(bridge.getSocketStats());
+            if (reset) {
+                bridge.resetStats();
+            }
+            return stats;
+        },
+             py::arg("reset") = false,
+             "Get counters and latency/jitter percentiles\n\n"
+             "latency_us is the time from EIP receive until the NATS publish call returned;\n"
+             "jitter_us is |inter-arrival time - RPI| of consecutive T2O packets; receive_delay_us is\n"
+             "the time from the kernel receiving a packet until the worker handled it (only with\n"
+             "kernel_timestamps, which also moves the receive time of the other two to the kernel);\n"
+             "ack_latency_us is the time from JetStream publish until the ack arrived. Each is a dict\n"
+             "with count, min, p50, p99, p999, max and mean (microseconds).\n\n"
+             "Args:\n"
+             "    reset (bool): Clear the histograms after reading them (default: False)\n\n"
+             "Returns:\n"
+             "    dict: received, published, reconnects, overflows, suppressed, local_overflows, queue_size,\n"
+             "        queue_high_watermark, latency_us, jitter_us, receive_delay_us, sequence (see\n"
+             "        get_sequence_stats()), jetstream (see get_jetstream_stats()), ack_latency_us, spool\n"
+             "        (see get_spool_stats()), nats (see get_nats_stats()), reconnect (see\n"
+             "        get_reconnect_stats()), threads (see get_thread_status()) and socket (see\n"
+             "        get_socket_stats())")
+
+        .def("get_jetstream_stats", [](const bridge::EIPtoNATSBridge &bridge) {
+            return jetStreamToDict(bridge.getJetStreamStats());
+        },
+             "Get JetStream acknowledgement counters (all 0 unless JetStream is enabled)\n\n"
+             "Returns:\n"
+             "    dict: acked, nacked (rejected, e.g. no stream for the subject), timeouts and\n"
+             "        pending (published, waiting for the ack) messages")
+
+        .def("get_nats_stats", [](const bridge::EIPtoNATSBridge &bridge) {
+            return natsToDict(bridge.getNatsStats());
+        },
+             "Get the NATS connection state (shared with the group for bridges in a BridgeGroup)\n\n"
+             "Returns:\n"
+             "    dict: connected (bool), disconnects and reconnects")
+
+        .def("get_thread_status", [](const bridge::EIPtoNATSBridge &bridge) {
+            return threadsToDict(bridge.getThreadStatus());
+        },
+             "Get which thread_options took effect (the group's for bridges in a BridgeGroup)\n\n"
+             "Returns:\n"
+             "    dict: worker_realtime, worker_pinned, publisher_pinned and memory_locked (bools)")
+
+        .def("get_socket_stats", [](const bridge::EIPtoNATSBridge &bridge) {
+            return socketToDict(bridge.getSocketStats());
+        },
+             "Get the receive socket counters (the group's shared socket for bridges in a BridgeGroup)\n\n"
+             "Returns:\n"
+             "    dict: kernel_drops (datagrams dropped on a full receive buffer), malformed\n"
+             "        (datagrams dropped for invalid CPF framing) and receive_buffer_bytes\n"
+             "        (as granted by the kernel)")
+
+        .def("get_spool_stats", [](const bridge::EIPtoNATSBridge &bridge) {
+            return spoolToDict(bridge.getSpoolStats());
+        },
+             "Get outage spool counters (all 0 without a spool directory)\n\n"
+             "Returns:\n"
+             "    dict: spooled, replayed, dropped (lost to the size cap) and pending messages, and\n"
+             "        bytes (disk space of the spool files)")
+
+        .def("get_sequence_stats", [](const bridge::EIPtoNATSBridge &bridge) {
+            return sequenceToDict(bridge.getSequenceStats());
+        },
+             "Get loss counters from the 16-bit CIP sequence count of the T2O packets\n\n"
+             "A packet more than one ahead of the previous one is a gap; one behind the newest\n"
+             "is out of order and, if it fills a gap among the last 64 counts, is no longer counted\n"
+             "as lost. Adapters only advance the count for new data, so duplicates can be unchanged\n"
+             "data sent again.\n\n"
+             "Returns:\n"
+             "    dict: gaps, lost, duplicates and out_of_order")
+
+        .def("reset_stats", &bridge::EIPtoNATSBridge::resetStats,
+             "Clear the latency, jitter, receive delay and ack latency histograms")
+
+        .def("set_data_callback", [](bridge::EIPtoNATSBridge &bridge, py::object callback) {
+            if (callback.is_none()) {
+                return bridge.setDataCallback(nullptr);
+            }
+
+            // The last copy of the callback may be dropped by a native thread
+            auto function = std::shared_ptr<py::object>(new py::object(std::move(callback)),
+                                                        [](py::object *ptr) {
+                                                            py::gil_scoped_acquire gil;
+                                                            delete ptr;
+                                                        });
+            return bridge.setDataCallback([function](const std::shared_ptr<bridge::PacketBatch> &batch) {
+                py::gil_scoped_acquire gil;
+                try {
+                    (*function)(batch);
+                } catch (py::error_already_set &e) {
+                    e.discard_as_unraisable("eip2nats data callback");
+                }
+            });
+        },
+             py::arg("callback"),
+             "Call a function with every batch of received packets (only while stopped)\n\n"
+             "The callback runs on a dedicated thread and takes the GIL once per batch,\n"
+             "so a slow callback never delays EIP or NATS; packets it cannot keep up with\n"
+             "are dropped (oldest first, see get_local_overflow_count()). Change-only\n"
+             "filtering does not apply.\n\n"
+             "Args:\n"
+             "    callback (Callable[[PacketBatch], None] | None): Function to call, None to disable\n"
+             "        delivery and stop queueing packets for local consumers until read_batch()\n\n"
+             "Returns:\n"
+             "    bool: False if the bridge is running")
+
+        .def("read_batch", [](bridge::EIPtoNATSBridge &bridge, size_t maxPackets, double timeout) {
+            const auto timeoutMs = std::chrono::milliseconds(static_cast<int64_t>(std::max(timeout, 0.0) * 1000));
+            return bridge.readBatch(maxPackets, timeoutMs);
+        },
+             py::arg("max_n") = 64,
+             py::arg("timeout") = 0.1,
+             py::call_guard<py::gil_scoped_release>(),
+             "Pull received packets (cannot be combined with set_data_callback)\n\n"
+             "The first call starts queueing packets for read_batch; earlier packets are\n"
+             "not returned.\n\n"
+             "Args:\n"
+             "    max_n (int): Maximum number of packets to return (default: 64)\n"
+             "    timeout (float): Seconds to wait for the first packet (default: 0.1)\n\n"
+             "Returns:\n"
+             "    PacketBatch: 0 to max_n packets")
+
+        .def("get_local_overflow_count", &bridge::EIPtoNATSBridge::getLocalOverflowCount,
+             "Get the number of packets dropped because the callback/read_batch queue was full\n\n"
+             "Returns:\n"
+             "    int: Count of overflowed packets")
+
+        .def("receive_packet", [](bridge::EIPtoNATSBridge &bridge, uint16_t sequence,
+                                  const py::bytes &data, uint32_t realTimeHeader) {
+            if (bridge.isRunning()) {
+                throw std::runtime_error("receive_packet() needs a stopped bridge");
+            }
+            const std::string frame = data;
+            bridge.receivePacket(realTimeHeader, sequence,
+                                 reinterpret_cast<const uint8_t*>(frame.data()), frame.size());
+            bridge.notifyReceived();
+        },
+             py::arg("sequence"),
+             py::arg("data"),
+             py::arg("real_time_header") = 1,
+             "Handle one T2O frame as if it had arrived from the PLC, on a stopped bridge\n\n"
+             "Runs the receive path of the EIP worker: statistics, sequence tracking, local\n"
+             "consumers, change-only filtering and the queue to NATS, which is published once\n"
+             "the bridge is started. For tests and for replaying captured traffic.\n\n"
+             "Args:\n"
+             "    sequence (int): 16-bit CIP sequence count of the frame\n"
+             "    data (bytes): T2O payload\n"
+             "    real_time_header (int): 32-bit run/idle header, bit 0 = run (default: 1)\n\n"
+             "Raises:\n"
+             "    RuntimeError: If the bridge is running")
+
         .def("__repr__", [](const bridge::EIPtoNATSBridge &bridge) {
             return "<EIPtoNATSBridge running=" +
                    std::string(bridge.isRunning() ? "True" : "False") +
@@ -72,6 +891,128 @@ PYBIND11_MODULE(eip_nats_bridge, m) {
                    " reconnects=" + std::to_string(bridge.getReconnectCount()) + ">";
         });
 
+    py::class_<bridge::BridgeGroup, GilReleasingPtr<bridge::BridgeGroup>>(m, "BridgeGroup",
+             "Many PLC connections on one worker thread, one publisher thread and one NATS connection")
+        .def(py::init<const std::string&, bool, const bridge::NatsOptions&, const bridge::ThreadOptions&,
+                      const bridge::SocketOptions&>(),
+             py::arg("nats_url"),
+             py::arg("event_driven") = false,
+             py::arg("nats_options") = bridge::NatsOptions(),
+             py::arg("thread_options") = bridge::ThreadOptions(),
+             py::arg("socket_options") = bridge::SocketOptions(),
+             "Group constructor\n\n"
+             "Args:\n"
+             "    nats_url (str): NATS server URL shared by every bridge in the group\n"
+             "    event_driven (bool): Block on the UDP sockets for up to half the shortest RPI\n"
+             "        instead of waking up every millisecond (default: False)\n"
+             "    nats_options (NatsOptions): Settings of the shared NATS connection (default: NatsOptions())\n"
+             "    thread_options (ThreadOptions): CPU affinity, real-time priority, memory locking and\n"
+             "        names of the group threads and every bridge's delivery thread (default: ThreadOptions())\n"
+             "    socket_options (SocketOptions): Receive buffer, busy polling, DSCP and kernel receive\n"
+             "        timestamps of the shared UDP socket(s) (default: SocketOptions())")
+
+        .def("add_bridge", &bridge::BridgeGroup::addBridge,
+             py::arg("plc_address"),
+             py::arg("nats_subject"),
+             py::arg("use_binary_format") = true,
+             py::arg("config_assembly") = bridge::devices::RM75E::CONFIG_ASSEMBLY,
+             py::arg("o2t_assembly") = bridge::devices::RM75E::O2T_ASSEMBLY,
+             py::arg("t2o_assembly") = bridge::devices::RM75E::T2O_ASSEMBLY,
+             py::arg("t2o_size") = 0,
+             py::arg("rpi") = 2000,
+             py::arg("port") = 2222,
+             py::arg("queue_depth") = 1024,
+             py::arg("overflow_policy") = bridge::OverflowPolicy::DropOldest,
+             py::arg("batch_max_packets") = 1,
+             py::arg("batch_max_delay_us") = 0,
+             py::arg("json_encoding") = bridge::JsonEncoding::Hex,
+             py::arg("change_only") = false,
+             py::arg("change_mask") = std::vector<uint8_t>(),
+             py::arg("heartbeat_ms") = 0,
+             py::arg("tag_sequence") = false,
+             py::arg("nats_headers") = false,
+             py::arg("jetstream_options") = bridge::JetStreamOptions(),
+             py::arg("spool_options") = bridge::SpoolOptions(),
+             py::arg("reconnect_options") = bridge::ReconnectOptions(),
+             py::arg("connection_type") = bridge::ConnectionType::PointToPoint,
+             py::arg("t2o_run_idle_header") = false,
+             py::return_value_policy::reference_internal,
+             "Add a PLC connection to the group (only while stopped)\n\n"
+             "Arguments are the same as for EIPtoNATSBridge, without nats_url and event_driven.\n"
+             "Bridges may share the same port: it is bound once and packets are routed by connection\n"
+             "ID. Only one bridge of a group may consume a given multicast stream (same PLC and\n"
+             "t2o_assembly); raises RuntimeError otherwise.\n\n"
+             "Returns:\n"
+             "    EIPtoNATSBridge: The bridge, owned by the group, for reading its statistics")
+
+        .def("start", &bridge::BridgeGroup::start,
+             py::call_guard<py::gil_scoped_release>(),
+             "Connect to NATS, open every EIP connection and start the threads\n\n"
+             "PLCs that cannot be reached are retried in the background. Blocks while\n"
+             "connecting, with the GIL released. See start_async() for asyncio.\n\n"
+             "Returns:\n"
+             "    bool: True if started, False on error")
+
+        .def("stop", &bridge::BridgeGroup::stop,
+             py::call_guard<py::gil_scoped_release>(),
+             "Stop the threads, close every EIP connection and disconnect from NATS")
+
+        .def("is_running", &bridge::BridgeGroup::isRunning,
+             "Check if the group is running\n\n"
+             "Returns:\n"
+             "    bool: True if active, False if stopped")
+
+        .def("get_published_count", &bridge::BridgeGroup::getPublishedCount,
+             "Get the number of packets published by all bridges\n\n"
+             "Returns:\n"
+             "    int: Count of sent packets")
+
+        .def("get_received_count", &bridge::BridgeGroup::getReceivedCount,
+             "Get the number of messages received by all bridges\n\n"
+             "Returns:\n"
+             "    int: Count of received messages")
+
+        .def("get_reconnect_count", &bridge::BridgeGroup::getReconnectCount,
+             "Get the number of reconnections of all bridges\n\n"
+             "Returns:\n"
+             "    int: Count of reconnections")
+
+        .def("get_nats_stats", [](const bridge::BridgeGroup &group) {
+            return natsToDict(group.getNatsStats());
+        },
+             "Get the state of the shared NATS connection\n\n"
+             "Returns:\n"
+             "    dict: connected (bool), disconnects and reconnects")
+
+        .def("get_thread_status", [](const bridge::BridgeGroup &group) {
+            return threadsToDict(group.getThreadStatus());
+        },
+             "Get which thread_options took effect\n\n"
+             "Returns:\n"
+             "    dict: worker_realtime, worker_pinned, publisher_pinned and memory_locked (bools)")
+
+        .def("get_socket_stats", [](const bridge::BridgeGroup &group) {
+            return socketToDict(group.getSocketStats());
+        },
+             "Get the counters of the shared receive socket(s)\n\n"
+             "Returns:\n"
+             "    dict: kernel_drops (datagrams dropped on a full receive buffer), malformed\n"
+             "        (datagrams dropped for invalid CPF framing) and receive_buffer_bytes\n"
+             "        (as granted by the kernel)")
+
+        .def("__len__", &bridge::BridgeGroup::size)
+
+        .def("__getitem__", &bridge::BridgeGroup::getBridge,
+             py::arg("index"),
+             py::return_value_policy::reference_internal)
+
+        .def("__repr__", [](const bridge::BridgeGroup &group) {
+            return "<BridgeGroup bridges=" + std::to_string(group.size()) +
+                   " running=" + std::string(group.isRunning() ? "True" : "False") +
+                   " received=" + std::to_string(group.getReceivedCount()) +
+                   " published=" + std::to_string(group.getPublishedCount()) + ">";
+        });
+
     // Device presets (eip2nats.devices.RM75E)
     auto devices = m.def_submodule("devices", "Assembly presets for known EIP devices");
 
@@ -0,0 +1,128 @@
+"""
+Declarative field layouts to decode T2O frames into NumPy structured arrays
+
+Requires NumPy (pip install eip2nats[numpy]).
+"""
+
+from collections import namedtuple
+
+Field = namedtuple("Field", ["name", "offset", "dtype", "scale"], defaults=[1.0])
+Field.__doc__ = """One value inside a T2O frame
+
+Args:
+    name (str): Field name in the decoded array
+    offset (int): Byte offset from the start of the frame
+    dtype: NumPy dtype of the raw value (e.g. "i2", "u4", "f4"); multi-byte
+        values are read little-endian, as CIP sends them
+    scale (float): Multiplier applied when decoding with scaled=True (default: 1.0)
+"""
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("eip2nats layouts require NumPy: pip install numpy")
+    return numpy
+
+
+class Layout:
+    """Byte layout of a T2O frame
+
+    Args:
+        fields (list[Field | tuple]): Fields as Field or (name, offset, dtype[, scale])
+        size (int): Frame size in bytes (default: end of the last field)
+    """
+
+    def __init__(self, fields, size=None):
+        np = _numpy()
+
+        self.fields = tuple(f if isinstance(f, Field) else Field(*f) for f in fields)
+        if not self.fields:
+            raise ValueError("A layout needs at least one field")
+
+        formats = [np.dtype(f.dtype).newbyteorder("<") for f in self.fields]
+        end = max(f.offset + fmt.itemsize for f, fmt in zip(self.fields, formats))
+        if size is None:
+            size = end
+        elif size < end:
+            raise ValueError(f"Layout size {size} is smaller than its fields ({end} bytes)")
+
+        self._names = [f.name for f in self.fields]
+        self._formats = formats
+        self._offsets = [f.offset for f in self.fields]
+
+        #: Structured dtype of the raw frame
+        self.dtype = self._raw_dtype(size)
+        #: Frame size in bytes
+        self.size = size
+        #: Structured dtype of decode(..., scaled=True): scaled fields become float64
+        self.scaled_dtype = np.dtype([
+            (f.name, np.float64 if f.scale != 1.0 else fmt.newbyteorder("="))
+            for f, fmt in zip(self.fields, formats)
+        ])
+
+    def _raw_dtype(self, itemsize):
+        return _numpy().dtype({
+            "names": self._names,
+            "formats": self._formats,
+            "offsets": self._offsets,
+            "itemsize": itemsize,
+        })
+
+    def decode(self, frames, scaled=True, frame_size=None):
+        """See eip2nats.decode()"""
+        return decode(self, frames, scaled=scaled, frame_size=frame_size)
+
+    def __repr__(self):
+        return f"<Layout size={self.size} fields={self._names}>"
+
+
+def decode(layout, frames, scaled=True, frame_size=None):
+    """Decode consecutive frames into a structured NumPy array in one call
+
+    Args:
+        layout (Layout): Frame layout
+        frames: Frames stored back to back in any buffer (bytes, bytearray,
+            memoryview, numpy array or a PacketBatch from read_batch()), or a
+            list of frames
+        scaled (bool): Apply each field's scale, returning float64 for scaled
+            fields; False returns a zero-copy view of the raw values (default: True)
+        frame_size (int): Distance between frames in bytes (default: the size of
+            a PacketBatch packet, otherwise layout.size)
+
+    Returns:
+        numpy.ndarray: One record per frame
+    """
+    np = _numpy()
+
+    if isinstance(frames, (list, tuple)):
+        if frame_size is None and frames:
+            frame_size = len(memoryview(frames[0]))
+        frames = b"".join(frames)
+    elif frame_size is None and hasattr(frames, "get_sequence") and len(frames) > 0:
+        frame_size = len(frames[0])
+
+    if frame_size is None:
+        frame_size = layout.size
+    if frame_size < layout.size:
+        raise ValueError(f"Frames of {frame_size} bytes are shorter than the layout "
+                         f"({layout.size} bytes)")
+
+    buffer = memoryview(frames).cast("B")
+    if len(buffer) % frame_size != 0:
+        raise ValueError(f"Buffer of {len(buffer)} bytes is not a whole number of "
+                         f"{frame_size}-byte frames")
+
+    dtype = layout.dtype if frame_size == layout.size else layout._raw_dtype(frame_size)
+    raw = np.frombuffer(buffer, dtype=dtype)
+    if not scaled:
+        return raw
+
+    result = np.empty(len(raw), dtype=layout.scaled_dtype)
+    for field in layout.fields:
+        if field.scale != 1.0:
+            np.multiply(raw[field.name], field.scale, out=result[field.name])
+        else:
+            result[field.name] = raw[field.name]
+    return result
@@ -0,0 +1,224 @@
+"""
+Prometheus exporter for the statistics of running bridges
+
+Serves the counters, queue depths and latency percentiles of every added
+bridge over HTTP in the Prometheus text format, labelled with the PLC address
+and NATS subject. A background thread samples get_stats() every `interval`
+seconds (the native counters are atomics, so this never blocks the EIP or
+NATS threads); scrapes only return the last sample.
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# (name, type, help, value from the get_stats() dict)
+_METRICS = [
+    ("received_total", "counter", "Packets received from the PLC",
+     lambda s: s["received"]),
+    ("published_total", "counter", "Packets published to NATS",
+     lambda s: s["published"]),
+    ("receive_rate", "gauge", "Packets received per second over the last sample interval",
+     lambda s: s["receive_rate"]),
+    ("publish_rate", "gauge", "Packets published per second over the last sample interval",
+     lambda s: s["publish_rate"]),
+    ("overflows_total", "counter", "Packets dropped because the publish queue was full",
+     lambda s: s["overflows"]),
+    ("local_overflows_total", "counter",
+     "Packets dropped because the callback/read_batch queue was full",
+     lambda s: s["local_overflows"]),
+    ("suppressed_total", "counter", "Unchanged packets skipped by change_only",
+     lambda s: s["suppressed"]),
+    ("sequence_lost_total", "counter", "Packets missing from the CIP sequence count",
+     lambda s: s["sequence"]["lost"]),
+    ("queue_size", "gauge", "Packets waiting to be published",
+     lambda s: s["queue_size"]),
+    ("queue_high_watermark", "gauge", "Highest publish queue occupancy seen",
+     lambda s: s["queue_high_watermark"]),
+    ("kernel_drops_total", "counter",
+     "Datagrams the kernel dropped on a full receive buffer (per socket, shared in a group)",
+     lambda s: s["socket"]["kernel_drops"]),
+    ("malformed_datagrams_total", "counter",
+     "Datagrams dropped for invalid CPF framing (per socket, shared in a group)",
+     lambda s: s["socket"]["malformed"]),
+    ("reconnects_total", "counter", "EIP reconnections",
+     lambda s: s["reconnects"]),
+    ("reconnect_last_recovery_seconds", "gauge",
+     "Time without data across the last EIP reconnection",
+     lambda s: s["reconnect"]["last_recovery_ms"] / 1e3),
+    ("nats_connected", "gauge", "1 while the NATS connection is up",
+     lambda s: int(s["nats"]["connected"])),
+    ("nats_disconnects_total", "counter", "NATS connection losses",
+     lambda s: s["nats"]["disconnects"]),
+    ("spool_pending", "gauge", "Messages in the outage spool waiting for replay",
+     lambda s: s["spool"]["pending"]),
+    ("spool_dropped_total", "counter", "Messages lost to the outage spool size limit",
+     lambda s: s["spool"]["dropped"]),
+    ("jetstream_pending", "gauge", "JetStream messages waiting for their ack",
+     lambda s: s["jetstream"]["pending"]),
+    ("jetstream_failed_total", "counter", "JetStream messages nacked or not acked in time",
+     lambda s: s["jetstream"]["nacked"] + s["jetstream"]["timeouts"]),
+    ("publish_latency_seconds", "summary",
+     "Time from EIP receive until the NATS publish call returned",
+     lambda s: s["latency_us"]),
+    ("jitter_seconds", "summary", "Deviation of the packet inter-arrival time from the RPI",
+     lambda s: s["jitter_us"]),
+    ("receive_delay_seconds", "summary",
+     "Time from the kernel receiving a packet until the worker handled it",
+     lambda s: s["receive_delay_us"]),
+    ("jetstream_ack_latency_seconds", "summary",
+     "Time from JetStream publish until the ack arrived",
+     lambda s: s["ack_latency_us"]),
+]
+
+_QUANTILES = (("0.5", "p50"), ("0.99", "p99"), ("0.999", "p999"))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(labels, **extra):
+    items = list(labels.items()) + list(extra.items())
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in items) + "}"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsExporter:
+    """HTTP endpoint with the statistics of bridges in the Prometheus text format
+
+    Args:
+        port (int): TCP port, 0 picks a free one (see .port after start()) (default: 9108)
+        address (str): Address to listen on (default: '', every interface)
+        interval (float): Seconds between samples of the bridge statistics (default: 5.0)
+    """
+
+    def __init__(self, port=9108, address="", interval=5.0):
+        self.port = port
+        self.address = address
+        self.interval = interval
+        self._targets = []
+        self._previous = {}
+        self._lock = threading.Lock()
+        self._snapshot = b""
+        self._stop = threading.Event()
+        self._server = None
+        self._threads = []
+
+    def add(self, target, **labels):
+        """Export a bridge, or every bridge of a BridgeGroup
+
+        Every series is labelled with plc and subject, plus the given labels
+        (e.g. line="1").
+        """
+        if hasattr(target, "add_bridge"):
+            bridges = [target[i] for i in range(len(target))]
+        else:
+            bridges = [target]
+        with self._lock:
+            for bridge in bridges:
+                bridge_labels = {"plc": bridge.plc_address, "subject": bridge.nats_subject}
+                bridge_labels.update(labels)
+                self._targets.append((bridge, bridge_labels))
+        return self
+
+    def render(self):
+        """Sample every bridge now and return the metrics as text"""
+        now = time.monotonic()
+        rows = []
+        with self._lock:
+            for index, (bridge, labels) in enumerate(self._targets):
+                stats = bridge.get_stats()
+                received, published = stats["received"], stats["published"]
+                previous = self._previous.get(index)
+                if previous and now > previous[0]:
+                    elapsed = now - previous[0]
+                    stats["receive_rate"] = (received - previous[1]) / elapsed
+                    stats["publish_rate"] = (published - previous[2]) / elapsed
+                else:
+                    stats["receive_rate"] = stats["publish_rate"] = 0.0
+                self._previous[index] = (now, received, published)
+                rows.append((labels, stats))
+
+        lines = []
+        for name, kind, help_text, value in _METRICS:
+            metric = "eip2nats_" + name
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for labels, stats in rows:
+                if kind != "summary":
+                    lines.append(f"{metric}{_labels(labels)} {_number(value(stats))}")
+                    continue
+                summary = value(stats)   # microseconds
+                for quantile, key in _QUANTILES:
+                    seconds = summary[key] / 1e6
+                    lines.append(f"{metric}{_labels(labels, quantile=quantile)} {_number(seconds)}")
+                total = summary["mean"] * summary["count"] / 1e6
+                lines.append(f"{metric}_sum{_labels(labels)} {_number(total)}")
+                lines.append(f"{metric}_count{_labels(labels)} {summary['count']}")
+        return "\n".join(lines) + "\n"
+
+    def start(self):
+        """Take the first sample and start serving"""
+        if self._server is not None:
+            raise RuntimeError("MetricsExporter is already running")
+
+        self._snapshot = self.render().encode()
+        self._server = ThreadingHTTPServer((self.address, self.port), _handler(self))
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._server.serve_forever, name="eip2nats-metrics-http",
+                             daemon=True),
+            threading.Thread(target=self._sample, name="eip2nats-metrics-sampler", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving"""
+        if self._server is None:
+            return
+        self._stop.set()
+        self._server.shutdown()
+        self._server.server_close()
+        for thread in self._threads:
+            thread.join()
+        self._server = None
+        self._threads = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self._snapshot = self.render().encode()
+
+
+def _handler(exporter):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = exporter._snapshot
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
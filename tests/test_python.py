@@ -1,8 +1,14 @@
 """
 Basic tests for eip2nats
 """
+import os
+import sys
+
 import pytest
 
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARKS_DIR = os.path.join(ROOT_DIR, "benchmarks")
+
 
 def test_import():
     """Verify that the module can be imported"""
@@ -61,6 +67,680 @@ def test_bridge_with_json_format():
     assert bridge is not None
 
 
+def test_bridge_with_base64_json():
+    """Verify creation with JSON format and base64 payload encoding"""
+    import eip2nats
+
+    bridge = eip2nats.EIPtoNATSBridge(
+        "192.168.1.100",
+        "nats://localhost:4222",
+        "test.subject",
+        use_binary_format=False,
+        json_encoding=eip2nats.JsonEncoding.BASE64,
+    )
+
+    assert bridge is not None
+
+
+@pytest.mark.parametrize("policy", ["DROP_OLDEST", "DROP_NEWEST"])
+def test_queue_options(policy):
+    """Packets past queue_depth are counted as overflows"""
+    import eip2nats
+
+    bridge = eip2nats.EIPtoNATSBridge(
+        "192.168.1.100",
+        "nats://localhost:4222",
+        "test.subject",
+        queue_depth=4,
+        overflow_policy=getattr(eip2nats.OverflowPolicy, policy),
+    )
+
+    assert bridge.get_overflow_count() == 0
+    assert bridge.get_queue_size() == 0
+    assert bridge.get_queue_high_watermark() == 0
+
+    # A stopped bridge has no publisher, so the queue only fills
+    for sequence in range(10):
+        bridge.receive_packet(sequence, bytes([sequence]) * 8)
+    assert bridge.get_received_count() == 10
+    assert bridge.get_overflow_count() == 6
+    assert bridge.get_queue_size() == 4
+    assert bridge.get_queue_high_watermark() == 4
+    assert bridge.get_stats()["overflows"] == 6
+
+
+def test_batching_options():
+    """Verify creation with batching enabled"""
+    import eip2nats
+
+    bridge = eip2nats.EIPtoNATSBridge(
+        "192.168.1.100",
+        "nats://localhost:4222",
+        "test.subject",
+        batch_max_packets=16,
+        batch_max_delay_us=5000,
+    )
+
+    assert bridge is not None
+    assert bridge.get_published_count() == 0
+
+
+def test_event_driven():
+    """Verify creation with the event-driven worker loop"""
+    import eip2nats
+
+    bridge = eip2nats.EIPtoNATSBridge(
+        "192.168.1.100",
+        "nats://localhost:4222",
+        "test.subject",
+        rpi=100000,
+        event_driven=True,
+    )
+
+    assert bridge is not None
+    assert not bridge.is_running()
+
+
+def test_change_only():
+    """Only frames that differ in the masked bits are queued for NATS"""
+    import eip2nats
+
+    bridge = eip2nats.EIPtoNATSBridge(
+        "192.168.1.100",
+        "nats://localhost:4222",
+        "test.subject",
+        change_only=True,
+        change_mask=[0x00, 0x00, 0xFF, 0x0F],
+    )
+
+    assert bridge.get_suppressed_count() == 0
+    assert bridge.get_stats()["suppressed"] == 0
+
+    base = bytes(8)
+    frames = [
+        (base, True),                              # first frame always passes
+        (b"\x55\x55" + base[2:], False),           # bytes 0-1 are masked out
+        (base[:3] + b"\xf0" + base[4:], False),     # so is the high nibble of byte 3
+        (base[:3] + b"\x01" + base[4:], True),
+        (base[:3] + b"\x01" + base[4:], False),     # unchanged
+        (base[:3] + b"\x01\x00\x00\x07\x00", True),  # bytes past the mask compare in full
+        (base[:7], True),                          # so does the size
+    ]
+    bridge.read_batch(timeout=0)
+    for sequence, (frame, _) in enumerate(frames):
+        bridge.receive_packet(sequence, frame)
+
+    passed = sum(1 for _, passes in frames if passes)
+    assert bridge.get_suppressed_count() == len(frames) - passed
+    assert bridge.get_queue_size() == passed
+    # Local consumers see every frame
+    assert len(bridge.read_batch(max_n=16, timeout=0)) == len(frames)
+
+
+def test_change_only_heartbeat():
+    """An unchanged frame passes once heartbeat_ms has gone by"""
+    import time
+
+    import eip2nats
+
+    bridge = eip2nats.EIPtoNATSBridge(
+        "192.168.1.100",
+        "nats://localhost:4222",
+        "test.subject",
+        change_only=True,
+        heartbeat_ms=50,
+    )
+
+    bridge.receive_packet(0, bytes(8))
+    bridge.receive_packet(1, bytes(8))
+    assert bridge.get_suppressed_count() == 1
+    time.sleep(0.06)
+    bridge.receive_packet(2, bytes(8))
+    assert bridge.get_suppressed_count() == 1
+    assert bridge.get_queue_size() == 2
+
+
+def test_sequence_tracking():
+    """Verify creation with sequence tagging and the loss counters"""
+    import eip2nats
+
+    bridge = eip2nats.EIPtoNATSBridge(
+        "192.168.1.100",
+        "nats://localhost:4222",
+        "test.subject",
+        tag_sequence=True,
+    )
+
+    expected = {"gaps": 0, "lost": 0, "duplicates": 0, "out_of_order": 0}
+    assert bridge.get_sequence_stats() == expected
+    assert bridge.get_stats()["sequence"] == expected
+
+
+@pytest.mark.parametrize("sequences, expected", [
+    ([1, 2, 3], {"gaps": 0, "lost": 0, "duplicates": 0, "out_of_order": 0}),
+    ([1, 3, 2], {"gaps": 1, "lost": 0, "duplicates": 0, "out_of_order": 1}),
+    # 2 never arrives: a second copy of 1 fills no gap
+    ([1, 3, 1], {"gaps": 1, "lost": 1, "duplicates": 0, "out_of_order": 1}),
+    ([1, 4, 2, 2], {"gaps": 1, "lost": 1, "duplicates": 0, "out_of_order": 2}),
+    ([1, 1, 2], {"gaps": 0, "lost": 0, "duplicates": 1, "out_of_order": 0}),
+    # Wrap-around of the 16-bit count
+    ([65534, 1, 65535, 0], {"gaps": 1, "lost": 0, "duplicates": 0, "out_of_order": 2}),
+    # Only the last 64 numbers are remembered
+    ([1, 100, 50], {"gaps": 1, "lost": 97, "duplicates": 0, "out_of_order": 1}),
+    ([1, 100, 20], {"gaps": 1, "lost": 98, "duplicates": 0, "out_of_order": 1}),
+])
+def test_sequence_loss_accounting(sequences, expected):
+    """Late frames are credited only when they fill a gap"""
+    import eip2nats
+
+    bridge = eip2nats.EIPtoNATSBridge("192.168.1.100", "nats://localhost:4222", "test.subject")
+    for sequence in sequences:
+        bridge.receive_packet(sequence, b"\x00" * 8)
+
+    assert bridge.get_sequence_stats() == expected
+    assert bridge.get_received_count() == len(sequences)
+
+
+def test_nats_headers():
+    """Verify creation with metadata in NATS headers"""
+    import eip2nats
+
+    bridge = eip2nats.EIPtoNATSBridge(
+        "192.168.1.100",
+        "nats://localhost:4222",
+        "test.subject",
+        nats_headers=True,
+        batch_max_packets=8,
+    )
+
+    assert bridge is not None
+    assert bridge.is_running() is False
+
+    # Eip-Run-Idle needs the 32-bit run/idle header on the T2O connection
+    bridge = eip2nats.EIPtoNATSBridge(
+        "192.168.1.100",
+        "nats://localhost:4222",
+        "test.subject",
+        nats_headers=True,
+        t2o_run_idle_header=True,
+    )
+    assert bridge.is_running() is False
+
+    group = eip2nats.BridgeGroup("nats://localhost:4222")
+    group.add_bridge("192.168.1.101", "test.plc1", nats_headers=True, t2o_run_idle_header=True)
+    assert len(group) == 1
+
+
+def test_jetstream():
+    """Verify creation with JetStream publishing"""
+    import eip2nats
+
+    options = eip2nats.JetStreamOptions(enabled=True, max_pending=512, ack_timeout_ms=2000)
+    assert options.max_pending == 512
+    assert eip2nats.JetStreamOptions().enabled is False
+
+    bridge = eip2nats.EIPtoNATSBridge(
+        "192.168.1.100",
+        "nats://localhost:4222",
+        "test.subject",
+        jetstream_options=options,
+    )
+
+    stats = bridge.get_stats()
+    assert bridge.get_jetstream_stats() == {"acked": 0, "nacked": 0, "timeouts": 0, "pending": 0}
+    assert stats["jetstream"]["pending"] == 0
+    assert stats["ack_latency_us"]["count"] == 0
+
+
+def test_spool(tmp_path):
+    """Verify creation with an outage spool"""
+    import eip2nats
+
+    spool_dir = tmp_path / "spool"
+    options = eip2nats.SpoolOptions(
+        directory=str(spool_dir),
+        max_bytes=64 << 20,
+        segment_bytes=4 << 20,
+        eviction=eip2nats.SpoolEviction.DROP_NEWEST,
+        replay_rate=500,
+        replay_batch=50,
+    )
+    assert options.replay_batch == 50
+    assert eip2nats.SpoolOptions().directory == ""
+
+    bridge = eip2nats.EIPtoNATSBridge(
+        "192.168.1.100",
+        "nats://localhost:4222",
+        "test.subject",
+        spool_options=options,
+    )
+
+    assert spool_dir.is_dir()
+    assert bridge.get_spool_stats() == {
+        "spooled": 0, "replayed": 0, "dropped": 0, "pending": 0, "bytes": 0
+    }
+    assert bridge.get_stats()["spool"]["pending"] == 0
+
+    # The bridge holds the directory
+    assert eip2nats.DiskSpool(str(spool_dir)).open() is False
+    del bridge
+    assert eip2nats.DiskSpool(str(spool_dir)).open() is True
+
+
+SEGMENT_BYTES = 64 << 10
+MESSAGES_PER_SEGMENT = 64  # 1000 byte payload + 8 byte record header
+
+
+def _fill_spool(spool, count):
+    for i in range(count):
+        assert spool.append(i.to_bytes(4, "little") * 250, meta=b"m%d" % i) is True
+
+
+def test_spool_recovery(tmp_path):
+    """Unread messages and the read position survive reopening the spool"""
+    import eip2nats
+
+    spool = eip2nats.DiskSpool(str(tmp_path), segment_bytes=SEGMENT_BYTES)
+    assert spool.open() is True
+    _fill_spool(spool, 10)
+    for _ in range(3):
+        spool.pop()
+    assert spool.get_stats()["pending"] == 7
+
+    # A second spool is refused while the first holds the lock
+    assert eip2nats.DiskSpool(str(tmp_path)).open() is False
+    del spool
+
+    spool = eip2nats.DiskSpool(str(tmp_path), segment_bytes=SEGMENT_BYTES)
+    assert spool.open() is True
+    assert spool.get_stats()["pending"] == 7
+    payload, meta = spool.front()
+    assert payload == (3).to_bytes(4, "little") * 250
+    assert meta == b"m3"
+
+    # New messages go after the recovered ones
+    assert spool.append(b"new") is True
+    for _ in range(7):
+        spool.pop()
+    assert spool.front() == (b"new", b"")
+    spool.pop()
+    assert spool.front() is None
+    assert spool.empty()
+    assert spool.get_stats()["replayed"] == 8
+
+
+def test_spool_segment_rotation(tmp_path):
+    """Full segments roll over to new files, which are deleted once read"""
+    import eip2nats
+
+    spool = eip2nats.DiskSpool(str(tmp_path), segment_bytes=SEGMENT_BYTES)
+    assert spool.open() is True
+    _fill_spool(spool, MESSAGES_PER_SEGMENT * 2 + 1)
+
+    assert len(list(tmp_path.glob("spool-*.seg"))) == 3
+    assert spool.get_stats()["bytes"] == 3 * SEGMENT_BYTES
+
+    for _ in range(MESSAGES_PER_SEGMENT):
+        spool.pop()
+    assert len(list(tmp_path.glob("spool-*.seg"))) == 2
+    assert spool.front()[1] == b"m%d" % MESSAGES_PER_SEGMENT
+
+
+@pytest.mark.parametrize("eviction, first, dropped, pending", [
+    # The first segment makes room for the new messages
+    ("DROP_OLDEST", MESSAGES_PER_SEGMENT, MESSAGES_PER_SEGMENT, MESSAGES_PER_SEGMENT + 10),
+    # The new messages are refused
+    ("DROP_NEWEST", 0, 10, MESSAGES_PER_SEGMENT * 2),
+])
+def test_spool_eviction(tmp_path, eviction, first, dropped, pending):
+    """The size cap drops the oldest segment or the newest messages"""
+    import eip2nats
+
+    spool = eip2nats.DiskSpool(
+        str(tmp_path),
+        segment_bytes=SEGMENT_BYTES,
+        max_bytes=2 * SEGMENT_BYTES,
+        eviction=getattr(eip2nats.SpoolEviction, eviction),
+    )
+    assert spool.open() is True
+    _fill_spool(spool, MESSAGES_PER_SEGMENT * 2)
+    for _ in range(10):
+        spool.append(b"\xff" * 1000)
+
+    stats = spool.get_stats()
+    assert stats["dropped"] == dropped
+    assert stats["bytes"] == 2 * SEGMENT_BYTES
+    assert stats["pending"] == pending
+    assert spool.front()[1] == b"m%d" % first
+
+
+def test_nats_options():
+    """Verify the structured NATS connection options"""
+    import eip2nats
+
+    options = eip2nats.NatsOptions(
+        servers=["nats://10.0.0.2:4222", "nats://10.0.0.3:4222"],
+        send_asap=True,
+        max_reconnect=-1,
+    )
+    options.io_buf_size = 128 * 1024
+    assert options.servers == ["nats://10.0.0.2:4222", "nats://10.0.0.3:4222"]
+    assert options.send_asap is True
+    assert options.io_buf_size == 128 * 1024
+    assert eip2nats.NatsOptions().reconnect_buf_size == 8 * 1024 * 1024
+
+    bridge = eip2nats.EIPtoNATSBridge(
+        "192.168.1.100",
+        "nats://localhost:4222",
+        "test.subject",
+        nats_options=options,
+    )
+    assert bridge.get_nats_stats() == {"connected": False, "disconnects": 0, "reconnects": 0}
+    assert bridge.get_stats()["nats"]["reconnects"] == 0
+
+    group = eip2nats.BridgeGroup("nats://localhost:4222", nats_options=options)
+    assert group.get_nats_stats()["connected"] is False
+
+
+def test_reconnect_options():
+    """Verify the EIP reconnect backoff options and counters"""
+    import eip2nats
+
+    options = eip2nats.ReconnectOptions(initial_delay_ms=50, max_delay_ms=1000, reuse_session=False)
+    options.jitter = 0.0
+    assert options.initial_delay_ms == 50
+    assert options.reuse_session is False
+    assert eip2nats.ReconnectOptions().immediate_first_retry is True
+
+    bridge = eip2nats.EIPtoNATSBridge(
+        "192.168.1.100",
+        "nats://localhost:4222",
+        "test.subject",
+        reconnect_options=options,
+    )
+    stats = bridge.get_reconnect_stats()
+    assert stats["reconnects"] == stats["attempts"] == stats["recoveries"] == 0
+    assert stats["max_recovery_ms"] == 0.0
+    assert bridge.get_stats()["reconnect"]["session_reuses"] == 0
+
+    group = eip2nats.BridgeGroup("nats://localhost:4222")
+    group.add_bridge("192.168.1.101", "test.plc1", reconnect_options=options)
+    assert group[0].get_reconnect_stats()["attempts"] == 0
+
+
+def test_connection_type():
+    """Verify multicast and listen-only connections can be configured"""
+    import pytest
+
+    import eip2nats
+
+    bridge = eip2nats.EIPtoNATSBridge(
+        "192.168.1.100",
+        "nats://localhost:4222",
+        "test.subject",
+    )
+    assert bridge.connection_type == eip2nats.ConnectionType.POINT_TO_POINT
+
+    bridge = eip2nats.EIPtoNATSBridge(
+        "192.168.1.100",
+        "nats://localhost:4222",
+        "test.subject",
+        connection_type=eip2nats.ConnectionType.LISTEN_ONLY,
+    )
+    assert bridge.connection_type == eip2nats.ConnectionType.LISTEN_ONLY
+
+    group = eip2nats.BridgeGroup("nats://localhost:4222")
+    group.add_bridge("192.168.1.101", "test.plc1",
+                     connection_type=eip2nats.ConnectionType.MULTICAST)
+    group.add_bridge("192.168.1.101", "test.plc1.raw")
+    assert group[0].connection_type == eip2nats.ConnectionType.MULTICAST
+
+    # Same multicast stream twice in one group
+    with pytest.raises(RuntimeError):
+        group.add_bridge("192.168.1.101", "test.plc1.copy",
+                         connection_type=eip2nats.ConnectionType.LISTEN_ONLY)
+
+
+def test_thread_options():
+    """Verify thread placement and priority options can be configured"""
+    import eip2nats
+
+    options = eip2nats.ThreadOptions(
+        worker_cpus=[1],
+        policy=eip2nats.SchedulingPolicy.FIFO,
+        priority=80,
+        lock_memory=True,
+    )
+    assert options.worker_cpus == [1]
+    assert options.publisher_cpus == []
+    assert options.policy == eip2nats.SchedulingPolicy.FIFO
+    assert options.name_threads
+
+    bridge = eip2nats.EIPtoNATSBridge(
+        "192.168.1.100",
+        "nats://localhost:4222",
+        "test.subject",
+        thread_options=options,
+    )
+    status = bridge.get_thread_status()
+    assert status == {
+        "worker_realtime": False,
+        "worker_pinned": False,
+        "publisher_pinned": False,
+        "memory_locked": False,
+    }
+    assert bridge.get_stats()["threads"] == status
+
+    group = eip2nats.BridgeGroup("nats://localhost:4222", thread_options=options)
+    group.add_bridge("192.168.1.101", "test.plc1")
+    assert group.get_thread_status()["worker_realtime"] is False
+
+
+def test_socket_options():
+    """Verify receive socket options can be configured"""
+    import eip2nats
+
+    options = eip2nats.SocketOptions(
+        receive_buffer_bytes=4 << 20,
+        busy_poll_us=50,
+        dscp=55,
+        kernel_timestamps=True,
+    )
+    assert options.receive_buffer_bytes == 4 << 20
+    assert options.dscp == 55
+    assert eip2nats.SocketOptions().dscp == -1
+
+    bridge = eip2nats.EIPtoNATSBridge(
+        "192.168.1.100",
+        "nats://localhost:4222",
+        "test.subject",
+        socket_options=options,
+    )
+    assert bridge.get_socket_stats() == {
+        "kernel_drops": 0, "malformed": 0, "receive_buffer_bytes": 0
+    }
+    assert bridge.get_stats()["socket"]["kernel_drops"] == 0
+
+    group = eip2nats.BridgeGroup("nats://localhost:4222", socket_options=options)
+    group.add_bridge("192.168.1.101", "test.plc1")
+    assert group.get_socket_stats()["kernel_drops"] == 0
+    assert group[0].get_socket_stats() == group.get_socket_stats()
+
+
+def test_async_lifecycle():
+    """Verify the asyncio start/stop coroutines without connecting"""
+    import asyncio
+    import inspect
+
+    import eip2nats
+
+    bridge = eip2nats.EIPtoNATSBridge(
+        "192.168.1.100",
+        "nats://localhost:4222",
+        "test.subject"
+    )
+    group = eip2nats.BridgeGroup("nats://localhost:4222")
+
+    for obj in (bridge, group):
+        assert inspect.iscoroutinefunction(obj.start_async)
+        assert asyncio.run(obj.stop_async()) is None   # already stopped: no-op
+        assert not obj.is_running()
+
+
+def test_local_consumers():
+    """Verify the in-process data callback and read_batch without connecting"""
+    import eip2nats
+
+    bridge = eip2nats.EIPtoNATSBridge(
+        "192.168.1.100",
+        "nats://localhost:4222",
+        "test.subject"
+    )
+
+    batch = bridge.read_batch(max_n=8, timeout=0)
+    assert isinstance(batch, eip2nats.PacketBatch)
+    assert len(batch) == 0
+    with pytest.raises(IndexError):
+        batch[0]
+
+    assert bridge.set_data_callback(lambda batch: None) is True
+    with pytest.raises(RuntimeError):
+        bridge.read_batch(timeout=0)
+    assert bridge.set_data_callback(None) is True
+    assert bridge.get_local_overflow_count() == 0
+
+
+def test_local_queue_detach():
+    """Clearing the callback stops queueing packets until read_batch()"""
+    import eip2nats
+
+    bridge = eip2nats.EIPtoNATSBridge(
+        "192.168.1.100", "nats://localhost:4222", "test.subject", queue_depth=4
+    )
+    assert bridge.set_data_callback(lambda batch: None) is True
+    for sequence in range(10):
+        bridge.receive_packet(sequence, bytes([sequence]) * 8)
+    assert bridge.get_local_overflow_count() == 6
+
+    assert bridge.set_data_callback(None) is True
+    for sequence in range(10, 20):
+        bridge.receive_packet(sequence, bytes([sequence]) * 8)
+    assert bridge.get_local_overflow_count() == 6
+
+    # Nothing left over from before: read_batch() starts queueing again
+    assert len(bridge.read_batch(timeout=0)) == 0
+    for sequence in range(20, 23):
+        bridge.receive_packet(sequence, bytes([sequence]) * (sequence - 10))
+    batch = bridge.read_batch(max_n=8, timeout=0)
+    assert len(batch) == 3
+    assert [batch.get_sequence(i) for i in range(3)] == [20, 21, 22]
+    assert bytes(batch[1]) == bytes([21]) * 11
+    assert len(memoryview(batch)) == 10 + 11 + 12
+
+
+def test_decode_layout():
+    """Verify decoding frames with a field layout"""
+    np = pytest.importorskip("numpy")
+    import struct
+
+    import eip2nats
+
+    layout = eip2nats.Layout([
+        eip2nats.Field("counter", 0, "u2"),
+        ("force", 2, "i2", 0.5),
+        ("position", 4, "f4"),
+    ], size=10)
+    frames = [struct.pack("<Hhf2x", i, -2 * i, i / 4) for i in range(4)]
+
+    data = eip2nats.decode(layout, frames)
+    assert data.dtype.names == ("counter", "force", "position")
+    assert list(data["counter"]) == [0, 1, 2, 3]
+    assert np.allclose(data["force"], [0.0, -1.0, -2.0, -3.0])
+    assert np.allclose(data["position"], [0.0, 0.25, 0.5, 0.75])
+
+    raw = eip2nats.decode(layout, b"".join(frames), scaled=False)
+    assert list(raw["force"]) == [0, -2, -4, -6]
+
+    with pytest.raises(ValueError):
+        eip2nats.decode(layout, b"\x00" * 15)
+
+
+def test_stats():
+    """Verify the stats dict of a bridge that never ran"""
+    import eip2nats
+
+    bridge = eip2nats.EIPtoNATSBridge(
+        "192.168.1.100",
+        "nats://localhost:4222",
+        "test.subject"
+    )
+
+    stats = bridge.get_stats(reset=True)
+    assert stats["received"] == 0
+    assert stats["overflows"] == 0
+    for histogram in ("latency_us", "jitter_us", "receive_delay_us"):
+        assert stats[histogram]["count"] == 0
+        assert set(stats[histogram]) >= {"p50", "p99", "p999", "max"}
+    bridge.reset_stats()
+
+
+def test_metrics_exporter():
+    """Verify the Prometheus exporter of a bridge that never ran"""
+    import urllib.request
+
+    import eip2nats
+
+    bridge = eip2nats.EIPtoNATSBridge(
+        "192.168.1.100",
+        "nats://localhost:4222",
+        "test.subject"
+    )
+    assert bridge.plc_address == "192.168.1.100"
+    assert bridge.nats_subject == "test.subject"
+
+    exporter = eip2nats.MetricsExporter(port=0, address="127.0.0.1").add(bridge, line="1")
+    text = exporter.render()
+    assert '# TYPE eip2nats_received_total counter' in text
+    labels = '{plc="192.168.1.100",subject="test.subject",line="1"}'
+    assert f"eip2nats_received_total{labels} 0" in text
+    assert f"eip2nats_publish_latency_seconds_count{labels} 0" in text
+
+    with exporter:
+        url = f"http://127.0.0.1:{exporter.port}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("text/plain")
+            assert b"eip2nats_queue_size{" in response.read()
+
+
+def test_bridge_group():
+    """Verify that a group of bridges can be built without connecting"""
+    import eip2nats
+
+    group = eip2nats.BridgeGroup("nats://localhost:4222", event_driven=True)
+    first = group.add_bridge("192.168.1.100", "test.plc1")
+    group.add_bridge("192.168.1.101", "test.plc2", use_binary_format=False, rpi=10000)
+
+    assert len(group) == 2
+    assert not group.is_running()
+    assert group.get_received_count() == 0
+    assert group[0].get_published_count() == first.get_published_count() == 0
+    with pytest.raises(IndexError):
+        group[2]
+    assert "BridgeGroup" in repr(group)
+
+
+def test_log_level():
+    """Verify the native log level can be changed at runtime"""
+    import eip2nats
+
+    previous = eip2nats.get_log_level()
+    try:
+        eip2nats.set_log_level(eip2nats.LogLevel.DEBUG)
+        assert eip2nats.get_log_level() == eip2nats.LogLevel.DEBUG
+    finally:
+        eip2nats.set_log_level(previous)
+
+
 def test_repr():
     """Verify that __repr__ works"""
     import eip2nats
@@ -80,9 +760,10 @@ def test_repr():
 @pytest.mark.skip(reason="Requires configured PLC and NATS server")
 def test_start_stop():
     """Test bridge start and stop"""
-    import eip2nats
     import time
 
+    import eip2nats
+
     bridge = eip2nats.EIPtoNATSBridge(
         "192.168.17.200",
         "nats://192.168.17.138:4222",
@@ -99,3 +780,152 @@ def test_start_stop():
     # Stop
     bridge.stop()
     assert bridge.is_running() is False
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Simulator binds 127.0.0.2")
+def test_start_stop_simulated():
+    """Test a full start/stop against the adapter simulator and NATS stand-in"""
+    import time
+
+    import eip2nats
+
+    sys.path.insert(0, BENCHMARKS_DIR)
+    from eip_sim import Adapter
+    from nats_stub import NatsStub
+
+    stub = NatsStub(port=0).start()
+    # Defaults to T2O port 2222: packets only arrive if the Forward Open asks for 2322
+    adapter = Adapter("127.0.0.2", payload_size=32).start()
+    try:
+        bridge = eip2nats.EIPtoNATSBridge(
+            "127.0.0.2", stub.url, "test.sim.data", t2o_size=32, rpi=10000, port=2322
+        )
+        assert bridge.start() is True
+        time.sleep(1)
+        bridge.stop()
+        assert bridge.is_running() is False
+
+        assert bridge.get_received_count() > 0
+        deadline = time.time() + 2
+        while (stub.per_subject["test.sim.data"] < bridge.get_published_count()
+               and time.time() < deadline):
+            time.sleep(0.05)
+        assert stub.per_subject["test.sim.data"] == bridge.get_published_count()
+    finally:
+        adapter.stop()
+        stub.stop()
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Simulator binds 127.0.0.2")
+@pytest.mark.parametrize("binary", [True, False])
+def test_batch_framing_simulated(binary):
+    """Batches carry batch_max_packets consecutive packets in the documented framing"""
+    import json
+    import struct
+    import threading
+    import time
+
+    import eip2nats
+
+    sys.path.insert(0, BENCHMARKS_DIR)
+    from eip_sim import Adapter
+    from nats_stub import NatsStub
+
+    messages = []
+    lock = threading.Lock()
+
+    def on_message(subject, headers, payload):
+        with lock:
+            messages.append(bytes(payload))
+
+    stub = NatsStub(port=0, on_message=on_message).start()
+    adapter = Adapter("127.0.0.2", payload_size=32).start()
+    try:
+        bridge = eip2nats.EIPtoNATSBridge(
+            "127.0.0.2", stub.url, "test.sim.batch", use_binary_format=binary,
+            t2o_size=32, rpi=2000, port=2322,
+            batch_max_packets=8, batch_max_delay_us=1000000,
+        )
+        assert bridge.start() is True
+        time.sleep(0.5)
+        bridge.stop()
+        assert bridge.get_published_count() >= 16
+
+        # Split every message into (packet counter, receive count or None)
+        batches = []
+        deadline = time.time() + 2
+        while time.time() < deadline:
+            with lock:
+                payloads = list(messages)
+            batches = []
+            for payload in payloads:
+                packets = []
+                if binary:
+                    offset = 0
+                    while offset < len(payload):
+                        (size,) = struct.unpack_from("<H", payload, offset)
+                        assert size == 32
+                        (counter,) = struct.unpack_from("<I", payload, offset + 2)
+                        packets.append((counter, None))
+                        offset += 2 + size
+                    assert offset == len(payload)
+                else:
+                    for item in json.loads(payload):
+                        assert item["size"] == 32
+                        (counter,) = struct.unpack_from("<I", bytes.fromhex(item["data"]))
+                        packets.append((counter, item["sequence"]))
+                batches.append(packets)
+            if sum(len(b) for b in batches) == bridge.get_published_count():
+                break
+            time.sleep(0.05)
+
+        assert sum(len(b) for b in batches) == bridge.get_published_count()
+        # Only the batch flushed by stop() may be short
+        assert all(len(b) == 8 for b in batches[:-1])
+        assert 1 <= len(batches[-1]) <= 8
+        packets = [p for b in batches for p in b]
+        counters = [c for c, _ in packets]
+        assert counters == sorted(set(counters))
+        if not binary:
+            assert [s for _, s in packets] == list(range(1, len(packets) + 1))
+    finally:
+        adapter.stop()
+        stub.stop()
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"),
+                    reason="Simulator binds 127.0.0.2 and 127.0.0.3")
+def test_group_unresponsive_plc_simulated():
+    """A PLC that never answers does not hold up the other PLCs of a group"""
+    import socket
+    import time
+
+    import eip2nats
+
+    sys.path.insert(0, BENCHMARKS_DIR)
+    from eip_sim import Adapter
+    from nats_stub import NatsStub
+
+    stub = NatsStub(port=0).start()
+    adapter = Adapter("127.0.0.2", payload_size=32).start()
+    # Completes the TCP handshake (backlog) but never answers RegisterSession
+    silent = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    silent.bind(("127.0.0.3", 44818))
+    silent.listen(16)
+    try:
+        group = eip2nats.BridgeGroup(stub.url)
+        group.add_bridge("127.0.0.2", "test.sim.ok", t2o_size=32, rpi=10000, port=2322)
+        group.add_bridge("127.0.0.3", "test.sim.silent", t2o_size=32, rpi=10000, port=2322)
+        assert group.start() is True
+
+        # The silent PLC is retried on helper threads meanwhile
+        before = group[0].get_received_count()
+        time.sleep(2)
+        assert group[0].get_received_count() - before > 100
+        assert group[0].get_reconnect_stats()["attempts"] == 0
+        assert group[1].get_received_count() == 0
+        group.stop()
+    finally:
+        silent.close()
+        adapter.stop()
+        stub.stop()